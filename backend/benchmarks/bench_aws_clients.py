@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark for per-call AWS client overhead: building a client/resource/Table on every
+call (the old get_table and per-handler boto3.resource) against the cached handles in
+aws_clients. Requests are answered by botocore's Stubber, so no network or credentials
+are needed and only the in-process cost is measured.
+
+Usage: python benchmarks/bench_aws_clients.py [--calls 2000]
+"""
+
+import argparse
+import copy
+import os
+import time
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '../shared'))
+
+# Stubbed calls are never signed or sent, but client creation still resolves credentials
+os.environ.setdefault('AWS_ACCESS_KEY_ID', 'bench')
+os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'bench')
+
+import boto3
+from botocore.stub import Stubber
+
+from aws_clients import aws_clients
+
+TABLE = 'bench-table'
+GET_ITEM_RESPONSE = {'Item': {'id': {'S': 'a'}, 'quantity': {'N': '100'}}}
+
+def timed(label: str, calls: int, fn) -> float:
+    started = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    elapsed = (time.perf_counter() - started) / calls
+    print(f"  {label:<36} {elapsed * 1e6:10.1f}us/call")
+    return elapsed
+
+def stubbed_get_item(table, calls: int):
+    stubber = Stubber(table.meta.client)
+    for _ in range(calls):
+        # The resource layer deserializes responses in place, so each call needs its own copy
+        stubber.add_response('get_item', copy.deepcopy(GET_ITEM_RESPONSE))
+    stubber.activate()
+    return stubber
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--calls', type=int, default=2000)
+    parser.add_argument('--cold-calls', type=int, default=50, help='calls for the client construction cases')
+    args = parser.parse_args()
+    region = aws_clients.region
+
+    # Warm container: the shared resource and handle already exist
+    aws_clients.table(TABLE)
+
+    print(f"Handle acquisition ({args.calls} calls)")
+    resource = boto3.resource('dynamodb', region_name=region)
+    before = timed('resource.Table() per call (before)', args.calls, lambda: resource.Table(TABLE))
+    after = timed('aws_clients.table() (after)', args.calls, lambda: aws_clients.table(TABLE))
+    print(f"  speed-up {before / after:,.0f}x")
+
+    print(f"Client construction ({args.cold_calls} calls)")
+    before = timed('boto3.resource() per handler (before)', args.cold_calls,
+                   lambda: boto3.resource('dynamodb', region_name=region))
+    after = timed('aws_clients.resource() (after)', args.cold_calls, lambda: aws_clients.resource('dynamodb'))
+    print(f"  speed-up {before / after:,.0f}x")
+
+    print(f"GetItem through a stubbed client ({args.calls} calls)")
+    old_resource = boto3.resource('dynamodb', region_name=region)
+    stubber = stubbed_get_item(old_resource.Table(TABLE), args.calls)
+    before = timed('new Table per call (before)', args.calls,
+                   lambda: old_resource.Table(TABLE).get_item(Key={'id': 'a'}))
+    stubber.deactivate()
+
+    table = aws_clients.table(TABLE)
+    stubber = stubbed_get_item(table, args.calls)
+    after = timed('cached Table (after)', args.calls, lambda: aws_clients.table(TABLE).get_item(Key={'id': 'a'}))
+    stubber.deactivate()
+    print(f"  speed-up {before / after:.2f}x")
+
+if __name__ == "__main__":
+    main()
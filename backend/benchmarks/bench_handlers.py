@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the API handlers end to end against the in-memory DynamoDB stand-in
+(fake_dynamodb), with tables and indexes from serverless.yml. Each handler is invoked
+with synthetic API Gateway (HTTP API) events, after seeding portfolios, holdings, tags
+and a group; reports p50/p95/p99 latency, throughput, and DynamoDB calls and consumed
+read/write capacity units per request (from dynamodb_metrics) for each endpoint, for
+each data size. Only in-process cost is measured: boto3 request
+building and parsing run, the network does not.
+
+Usage: python benchmarks/bench_handlers.py [--holdings 10,100] [--portfolios 5]
+       [--iterations 200] [--layout multi|single] [--only stocks]
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import random
+import time
+import sys
+from datetime import date
+from decimal import Decimal
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.append(os.path.join(BACKEND, 'shared'))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Calls are answered in process, but client creation still resolves credentials
+os.environ.setdefault('AWS_ACCESS_KEY_ID', 'bench')
+os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'bench')
+
+from fake_dynamodb import FakeDynamoDB
+
+# Endpoint name -> (serverless function, request builder); builders get the seeded
+# context and return (pathParameters, queryStringParameters, body)
+ENDPOINTS = [
+    ('list portfolios', 'getPortfolios', lambda ctx: ({}, None, None)),
+    ('list stocks', 'getStocks', lambda ctx: ({'portfolioId': ctx.portfolio()}, None, None)),
+    ('list stocks fields=summary', 'getStocks', lambda ctx: ({'portfolioId': ctx.portfolio()}, {'fields': 'summary'}, None)),
+    ('list etfs', 'getETFs', lambda ctx: ({'portfolioId': ctx.portfolio()}, None, None)),
+    ('list properties', 'getProperties', lambda ctx: ({'portfolioId': ctx.portfolio()}, None, None)),
+    ('create stock', 'createStock', lambda ctx: ({'portfolioId': ctx.portfolio()}, None, ctx.new_stock())),
+    ('update stock (name)', 'updateStock', lambda ctx: ({'stockId': ctx.created()}, None, {'name': 'Renamed'})),
+    ('update stock (quantity)', 'updateStock', lambda ctx: ({'stockId': ctx.created()}, None, {'quantity': 42})),
+    ('delete stock', 'deleteStock', lambda ctx: ({'stockId': ctx.pop_created()}, None, None)),
+    ('tag summaries', 'getTagSummaries', lambda ctx: ({}, {'portfolioId': ctx.portfolio()}, None)),
+    ('group aggregation', 'getGroupAggregation', lambda ctx: ({'groupId': ctx.group_id}, None, None)),
+    ('capital gains', 'getCapitalGains', lambda ctx: ({'portfolioId': ctx.portfolio()}, None, None)),
+]
+
+TAGS = ['growth', 'income', 'long-term', 'super']
+
+def load_routes(path: str):
+    """Function name -> (handler module path, method, route) from serverless.yml"""
+    import yaml
+    from fake_dynamodb import _ServerlessLoader
+    with open(path) as f:
+        functions = yaml.load(f, Loader=_ServerlessLoader)['functions']
+    routes = {}
+    for name, function in functions.items():
+        route = next((event['httpApi'] for event in function.get('events', []) if 'httpApi' in event), None)
+        if route:
+            module = function['handler'].rsplit('.', 1)[0] + '.py'
+            routes[name] = (module, route['method'].upper(), route['path'])
+    return routes
+
+def load_handler(module_path: str):
+    spec = importlib.util.spec_from_file_location(module_path.replace('/', '_')[:-3], os.path.join(BACKEND, module_path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.handler
+
+def api_event(method: str, route: str, path_params, query, body):
+    raw_path = route
+    for name, value in (path_params or {}).items():
+        raw_path = raw_path.replace('{' + name + '}', str(value))
+    return {
+        'version': '2.0',
+        'routeKey': f"{method} {route}",
+        'rawPath': raw_path,
+        'rawQueryString': '&'.join(f"{k}={v}" for k, v in (query or {}).items()),
+        'headers': {'content-type': 'application/json', 'accept-encoding': 'gzip'},
+        'pathParameters': path_params or None,
+        'queryStringParameters': query,
+        'requestContext': {'http': {'method': method, 'path': raw_path}, 'stage': '$default'},
+        'body': json.dumps(body) if body is not None else None,
+        'isBase64Encoded': False
+    }
+
+class Context:
+    """Seeded ids plus the stocks created during the run (for update and delete)"""
+
+    def __init__(self, portfolio_ids, group_id, seed: int = 1):
+        self.portfolio_ids = portfolio_ids
+        self.group_id = group_id
+        self.rng = random.Random(seed)
+        self.created_ids = []
+
+    def portfolio(self) -> str:
+        return self.rng.choice(self.portfolio_ids)
+
+    def new_stock(self):
+        return {
+            'symbol': f"SYM{self.rng.randrange(500)}",
+            'quantity': self.rng.randint(1, 5000),
+            'purchasePrice': round(self.rng.uniform(1, 200), 2),
+            'purchaseDate': '2022-03-01',
+            'currentPrice': round(self.rng.uniform(1, 200), 2),
+            'tags': [self.rng.choice(TAGS)]
+        }
+
+    def created(self) -> str:
+        return self.rng.choice(self.created_ids)
+
+    def pop_created(self) -> str:
+        return self.created_ids.pop()
+
+def synthetic_holding(rng: random.Random, entity: str, portfolio_id: str, index: int):
+    holding = {
+        'id': f"{portfolio_id}-{entity}-{index:06d}",
+        'portfolioId': portfolio_id,
+        'tags': [rng.choice(TAGS)],
+        'purchaseDate': date(2015 + rng.randrange(10), rng.randint(1, 12), rng.randint(1, 28)).isoformat(),
+        'createdAt': '2024-01-01T00:00:00',
+        'updatedAt': '2024-01-01T00:00:00'
+    }
+    if entity == 'properties':
+        holding.update({
+            'address': f"{index} Example St",
+            'propertyType': 'house',
+            'purchasePrice': Decimal(rng.randint(400, 1500) * 1000),
+            'currentValue': Decimal(rng.randint(400, 2000) * 1000),
+            'weeklyRent': Decimal(rng.randint(300, 1200))
+        })
+    else:
+        holding.update({
+            'symbol': f"SYM{rng.randrange(500)}",
+            'name': f"Holding {index}",
+            'quantity': Decimal(rng.randint(1, 5000)),
+            'purchasePrice': Decimal(str(round(rng.uniform(1, 200), 2))),
+            'purchaseFees': Decimal('9.95'),
+            'currentPrice': Decimal(str(round(rng.uniform(1, 200), 2))),
+            'currency': 'AUD'
+        })
+        if entity == 'etfs':
+            holding['expenseRatio'] = Decimal('0.07')
+    return holding
+
+def seed(portfolios: int, holdings: int, handlers, routes, run_id: str) -> Context:
+    """Portfolios with holdings in every asset class, tags, an index rebuild and one group"""
+    from portfolio_repository import portfolio_repository, HOLDING_ENTITIES
+    from valuation import value_holdings, value_properties
+    from tag_index import tag_index
+
+    rng = random.Random(holdings)
+    portfolio_ids = []
+    for index in range(portfolios):
+        portfolio_id = f"{run_id}-p{index:03d}"
+        portfolio_repository.put_portfolio({'id': portfolio_id, 'name': f"Portfolio {index}", 'isActive': True,
+                                            'createdAt': '2024-01-01T00:00:00'})
+        portfolio_ids.append(portfolio_id)
+        for entity in HOLDING_ENTITIES:
+            items = [synthetic_holding(rng, entity, portfolio_id, i) for i in range(holdings)]
+            valued = value_properties(items) if entity == 'properties' else value_holdings(items)
+            portfolio_repository.put_holdings(entity, [{**item, **valuation} for item, valuation in zip(items, valued)])
+
+    for tag in TAGS:
+        invoke(handlers, routes, 'createTag', {}, None, {'id': tag, 'name': tag.title(), 'category': 'strategy'})
+    tag_index.rebuild()
+
+    response = invoke(handlers, routes, 'createGroup', {}, None, {'name': 'Household', 'type': 'family',
+                                                                   'portfolioIds': portfolio_ids})
+    group_id = json.loads(response['body']).get('group', {}).get('id') if response else None
+    return Context(portfolio_ids, group_id)
+
+def invoke(handlers, routes, function, path_params, query, body):
+    if function not in handlers:
+        return None
+    module, method, route = routes[function]
+    return handlers[function](api_event(method, route, path_params, query, body), None)
+
+def percentile(samples, fraction: float) -> float:
+    """Nearest-rank percentile of sorted samples"""
+    rank = max(1, int(round(fraction * len(samples) + 0.5)))
+    return samples[min(rank, len(samples)) - 1]
+
+def run_endpoint(fake, collector, handlers, routes, ctx, name, function, build, iterations: int, warmup: int):
+    module, method, route = routes[function]
+    handler = handlers[function]
+    if name.startswith('update') or name.startswith('delete'):
+        iterations = min(iterations, len(ctx.created_ids))
+        warmup = 0
+    if not iterations:
+        return None
+
+    for _ in range(warmup):
+        handler(api_event(method, route, *build(ctx)), None)
+
+    from dynamodb_metrics import dynamodb_metrics
+    calls_before = sum(fake.calls.values())
+    collector.reset()
+    samples, errors = [], 0
+    started = time.perf_counter()
+    with dynamodb_metrics.handler_scope(function):
+        for _ in range(iterations):
+            event = api_event(method, route, *build(ctx))
+            call_started = time.perf_counter()
+            response = handler(event, None)
+            samples.append(time.perf_counter() - call_started)
+            if response.get('statusCode', 500) >= 400:
+                errors += 1
+            elif function == 'createStock':
+                ctx.created_ids.append(json.loads(response['body'])['stock']['id'])
+    elapsed = time.perf_counter() - started
+    capacity = collector.totals(group_by=('Handler',)).get((function,), {})
+
+    samples.sort()
+    return {
+        'endpoint': name,
+        'route': f"{method} {route}",
+        'requests': iterations,
+        'errors': errors,
+        'p50Ms': percentile(samples, 0.50) * 1000,
+        'p95Ms': percentile(samples, 0.95) * 1000,
+        'p99Ms': percentile(samples, 0.99) * 1000,
+        'throughput': iterations / elapsed,
+        'dynamodbCallsPerRequest': (sum(fake.calls.values()) - calls_before) / iterations,
+        'readUnitsPerRequest': capacity.get('readUnits', 0.0) / iterations,
+        'writeUnitsPerRequest': capacity.get('writeUnits', 0.0) / iterations,
+        # Per table and index, to find which access pattern the capacity goes to
+        'capacityByTable': {f"{table}:{index}": {'readUnits': total['readUnits'], 'writeUnits': total['writeUnits']}
+                            for (table, index), total in collector.totals(group_by=('Table', 'Index')).items()}
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--holdings', default='10,100', help='holdings per asset class per portfolio; comma-separated sizes')
+    parser.add_argument('--portfolios', type=int, default=5)
+    parser.add_argument('--iterations', type=int, default=200, help='requests per endpoint')
+    parser.add_argument('--warmup', type=int, default=10, help='unmeasured requests per read endpoint')
+    parser.add_argument('--layout', choices=('multi', 'single'), default='multi', help='DATA_LAYOUT to benchmark')
+    parser.add_argument('--only', help='run endpoints whose name contains this text')
+    parser.add_argument('--json', action='store_true', help='print results as JSON lines')
+    args = parser.parse_args()
+
+    serverless = os.path.join(BACKEND, 'serverless.yml')
+    fake = FakeDynamoDB.from_serverless(serverless, stage='bench')
+    os.environ.update(fake.environment)
+    os.environ['DATA_LAYOUT'] = args.layout
+    os.environ['REGION'] = os.environ.get('REGION') or 'ap-southeast-2'
+
+    # Route the shared client factory to the fake before any handler builds a client
+    from aws_clients import aws_clients
+    from dynamodb_metrics import dynamodb_metrics, LocalMetricsCollector
+    fake.install(aws_clients)
+    collector = LocalMetricsCollector()
+    dynamodb_metrics.use(collector)
+
+    routes = load_routes(serverless)
+    needed = {function for _, function, _ in ENDPOINTS} | {'createTag', 'createGroup'}
+    handlers = {}
+    for function in sorted(needed):
+        try:
+            handlers[function] = load_handler(routes[function][0])
+        except Exception as e:
+            print(f"  skipping {function}: {type(e).__name__}: {str(e)}", file=sys.stderr)
+
+    endpoints = [endpoint for endpoint in ENDPOINTS
+                 if endpoint[1] in handlers and (not args.only or args.only in endpoint[0])]
+
+    for size in [int(size) for size in args.holdings.split(',')]:
+        fake.reset()
+        ctx = seed(args.portfolios, size, handlers, routes, run_id=f"h{size}")
+        if not args.json:
+            print(f"\n{args.portfolios} portfolios x {size} holdings per asset class "
+                  f"(DATA_LAYOUT={args.layout}, {args.iterations} requests per endpoint)")
+            print(f"  {'endpoint':<28} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>9} {'ddb/req':>8} {'RCU/req':>8} {'WCU/req':>8} {'errors':>7}")
+
+        for name, function, build in endpoints:
+            result = run_endpoint(fake, collector, handlers, routes, ctx, name, function, build, args.iterations, args.warmup)
+            if result is None:
+                continue
+            if args.json:
+                print(json.dumps({'holdings': size, 'portfolios': args.portfolios, 'layout': args.layout, **result}))
+            else:
+                print(f"  {name:<28} {result['p50Ms']:8.2f} {result['p95Ms']:8.2f} {result['p99Ms']:8.2f} "
+                      f"{result['throughput']:9.0f} {result['dynamodbCallsPerRequest']:8.1f} "
+                      f"{result['readUnitsPerRequest']:8.1f} {result['writeUnitsPerRequest']:8.1f} {result['errors']:7d}")
+
+if __name__ == "__main__":
+    main()
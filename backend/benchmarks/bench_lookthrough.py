@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the ETF look-through engine on a synthetic constituent universe.
+
+Usage: python benchmarks/bench_lookthrough.py [--etfs 2000] [--constituents 300] [--securities 20000]
+"""
+
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '../shared'))
+
+from etf_lookthrough import ConstituentUniverse, LookThroughEngine
+
+SECTORS = ['Financials', 'Materials', 'Health Care', 'Technology', 'Energy', 'Industrials', 'Utilities']
+COUNTRIES = ['AU', 'US', 'UK', 'JP', 'DE', 'CA']
+
+def write_universe(directory: str, etfs: int, constituents: int, securities: int, seed: int = 1):
+    rng = random.Random(seed)
+    for e in range(etfs):
+        with open(os.path.join(directory, f"ETF{e}.csv"), 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['symbol', 'name', 'weight', 'sector', 'country'])
+            for s in rng.sample(range(securities), constituents):
+                writer.writerow([f"SEC{s}", f"Security {s}", round(rng.uniform(0.01, 0.6), 4),
+                                 SECTORS[s % len(SECTORS)], COUNTRIES[s % len(COUNTRIES)]])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--etfs', type=int, default=2000)
+    parser.add_argument('--constituents', type=int, default=300)
+    parser.add_argument('--securities', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_universe(directory, args.etfs, args.constituents, args.securities)
+        print(f"Look-through: {args.etfs} ETFs x {args.constituents} constituents")
+
+        started = time.perf_counter()
+        universe = ConstituentUniverse.from_directory(directory)
+        print(f"  load + build CSR  {time.perf_counter() - started:8.3f}s  {len(universe.weights)} weights")
+
+        engine = LookThroughEngine(directory)
+        etfs = [{'symbol': symbol, 'totalValue': 10000} for symbol in universe.etfs]
+        stocks = [{'symbol': f"SEC{s}", 'totalValue': 5000, 'exchange': 'ASX'} for s in range(50)]
+        engine.exposure(stocks, etfs)
+
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            engine.exposure(stocks, etfs)
+        elapsed = (time.perf_counter() - started) / args.repeat
+        print(f"  exposure (cached) {elapsed * 1000:8.2f}ms  all {args.etfs} ETFs held")
+
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            universe.exposures(universe.allocated)
+        elapsed = (time.perf_counter() - started) / args.repeat
+        print(f"  sparse W^T v      {elapsed * 1000:8.2f}ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for the Monte Carlo projection engine.
+
+Usage: python benchmarks/bench_monte_carlo.py [--paths 100000] [--years 30] [--workers 1,2,4]
+"""
+
+import argparse
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '../shared'))
+
+from monte_carlo import MonteCarloEngine
+
+PARAMS = {
+    'listedValue': 250000.0,
+    'propertyValue': 750000.0,
+    'propertyCashFlow': 6000.0,
+    'monthlyContribution': 1500.0,
+    'annualFeeRate': 0.002,
+    'listedReturn': 0.07,
+    'listedVolatility': 0.12,
+    'propertyGrowth': 0.05,
+    'propertyVolatility': 0.08,
+    'years': 30,
+}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--paths', type=int, default=100000)
+    parser.add_argument('--years', type=int, default=30)
+    parser.add_argument('--workers', default=','.join(str(n) for n in sorted({1, 2, os.cpu_count() or 1})))
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    params = dict(PARAMS, years=args.years)
+    print(f"Monte Carlo throughput: {args.paths} paths x {args.years} years, best of {args.repeat}")
+
+    baseline = None
+    for workers in [int(w) for w in args.workers.split(',')]:
+        engine = MonteCarloEngine(workers=workers)
+        best = min(engine.project(params, paths=args.paths, seed=1)['elapsedSeconds'] for _ in range(args.repeat))
+        baseline = baseline or best
+        print(f"  workers={workers:<3} {best:7.3f}s  {args.paths / best:12,.0f} paths/s  speedup {baseline / best:4.2f}x")
+
+if __name__ == "__main__":
+    main()
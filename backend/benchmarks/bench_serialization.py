@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Benchmark for response serialization: the previous json.dumps(body, default=str) against
+the shared serializer in string and number mode, one-shot and chunked, on holdings and
+news payloads shaped like the list endpoints' responses. Reports encode time, output
+size, client parse time (json.loads plus converting quoted numbers back) and peak
+memory while encoding.
+
+Usage: python benchmarks/bench_serialization.py [--items 10000] [--repeat 5]
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import time
+import tracemalloc
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '../shared'))
+
+from datetime import date, timedelta
+from decimal import Decimal
+from serialization import JSONSerializer
+
+STOCK_NUMBERS = ('quantity', 'averagePrice', 'currentPrice', 'totalValue', 'totalCostBasis',
+                 'totalReturn', 'totalReturnPercentage', 'purchaseFees')
+
+def synthetic_stocks(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    stocks = []
+    for i in range(count):
+        quantity = Decimal(rng.randint(1, 5000))
+        average_price = Decimal(str(round(rng.uniform(1, 200), 2)))
+        current_price = Decimal(str(round(rng.uniform(1, 200), 4)))
+        cost_basis = quantity * average_price + Decimal('9.95')
+        value = quantity * current_price
+        stocks.append({
+            'id': f"{i:08d}-stock",
+            'portfolioId': 'portfolio-1',
+            'symbol': f"SYM{rng.randrange(500)}",
+            'name': f"Company {i} Holdings Ltd",
+            'exchange': 'ASX',
+            'currency': 'AUD',
+            'quantity': quantity,
+            'averagePrice': average_price,
+            'currentPrice': current_price,
+            'purchaseFees': Decimal('9.95'),
+            'totalValue': value,
+            'totalCostBasis': cost_basis,
+            'totalReturn': value - cost_basis,
+            # Division results carry 28 significant digits
+            'totalReturnPercentage': (value - cost_basis) / cost_basis * 100,
+            'purchaseDate': (date(2015, 1, 1) + timedelta(days=rng.randrange(3650))).isoformat(),
+            'tags': sorted(rng.sample(['growth', 'income', 'long-term', 'super'], 2)),
+            'createdAt': '2024-01-01T00:00:00',
+            'updatedAt': '2024-06-01T00:00:00'
+        })
+    return {'stocks': stocks, 'portfolioId': 'portfolio-1', 'count': len(stocks)}
+
+def synthetic_news(count: int, seed: int = 2):
+    rng = random.Random(seed)
+    articles = [{
+        'id': f"{i:08d}-news",
+        'symbol': f"SYM{rng.randrange(500)}",
+        'headline': f"Company {i} reports quarterly results — outlook “steady”",
+        'summary': ' '.join(rng.choice(['revenue', 'growth', 'margin', 'guidance', 'dividend', 'market'])
+                            for _ in range(60)),
+        'url': f"https://example.com/news/{i}",
+        'source': 'Financial News Network',
+        'publishedAt': '2024-06-01T10:00:00',
+        'sentimentScore': Decimal(str(round(rng.uniform(-1, 1), 3))),
+        'relevanceScore': Decimal(str(round(rng.uniform(0, 1), 3))),
+        'tags': ['earnings', 'performance']
+    } for i in range(count)]
+    return {'news': articles, 'count': len(articles)}
+
+class CountingSink:
+    """Text stream that only counts what is written to it"""
+
+    def __init__(self):
+        self.written = 0
+
+    def write(self, chunk: str) -> None:
+        self.written += len(chunk.encode())
+
+def legacy_dumps(body):
+    return json.dumps(body, default=str)
+
+def client_parse(text: str, list_key: str, numbers):
+    """What a client does with the response: parse, then turn quoted numbers into numbers"""
+    body = json.loads(text)
+    for item in body[list_key]:
+        for field in numbers:
+            value = item.get(field)
+            if isinstance(value, str):
+                item[field] = float(value)
+    return body
+
+def best_of(repeat: int, function):
+    # As timeit does: collections triggered by the 10k-dict payloads would dominate the noise
+    best = None
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = function()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+    finally:
+        gc.enable()
+    return best, result
+
+def peak_memory(function) -> int:
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=10000, help='list items per payload')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per variant; the best is reported')
+    args = parser.parse_args()
+
+    string_mode, number_mode = JSONSerializer('string'), JSONSerializer('number')
+    payloads = [
+        ('holdings', synthetic_stocks(args.items), 'stocks', STOCK_NUMBERS),
+        ('news', synthetic_news(args.items), 'news', ('sentimentScore', 'relevanceScore'))
+    ]
+
+    for name, body, list_key, numbers in payloads:
+        print(f"\n{name}: {args.items} items")
+        print(f"  {'variant':<32} {'encode ms':>10} {'MB':>7} {'MB/s':>8} {'parse ms':>9} {'peak MB':>8}")
+        variants = [
+            ('json.dumps(default=str)', lambda: legacy_dumps(body)),
+            ('serializer, string mode', lambda: string_mode.dumps(body)),
+            ('serializer, number mode', lambda: number_mode.dumps(body)),
+            ('serializer, number, chunked', lambda: ''.join(number_mode.iter_encode(body)))
+        ]
+        for label, encode in variants:
+            elapsed, text = best_of(args.repeat, encode)
+            parse, _ = best_of(args.repeat, lambda: client_parse(text, list_key, numbers))
+            megabytes = len(text.encode()) / 1e6
+            print(f"  {label:<32} {elapsed * 1000:10.1f} {megabytes:7.2f} {megabytes / elapsed:8.1f} "
+                  f"{parse * 1000:9.1f} {peak_memory(encode) / 1e6:8.1f}")
+
+        # Streaming only pays off when the chunks go somewhere (a socket, S3, gzip) instead of being joined
+        sink = CountingSink()
+        streamed = peak_memory(lambda: number_mode.dump(body, sink))
+        print(f"  {'serializer, number, to a stream':<32} {'':>10} {sink.written / 1e6:7.2f} {'':>8} {'':>9} {streamed / 1e6:8.1f}")
+
+        assert json.loads(number_mode.dumps(body)) == json.loads(''.join(number_mode.iter_encode(body, 333)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the tax-lot matching engine on a synthetic account.
+
+Usage: python benchmarks/bench_tax_lots.py [--transactions 100000] [--symbols 200]
+"""
+
+import argparse
+import os
+import random
+import time
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '../shared'))
+
+from datetime import date, timedelta
+from tax_lots import TaxLotLedger, summarize_by_financial_year
+
+def synthetic_transactions(count: int, symbols: int, seed: int = 1):
+    rng = random.Random(seed)
+    start = date(2010, 1, 1)
+    held = {}
+    transactions = []
+    for i in range(count):
+        symbol = f"SYM{rng.randrange(symbols)}"
+        day = (start + timedelta(days=i * 5000 // count)).isoformat()
+        if held.get(symbol, 0) > 10 and rng.random() < 0.4:
+            quantity = rng.randint(1, held[symbol])
+            held[symbol] -= quantity
+            transaction_type = 'SELL'
+        else:
+            quantity = rng.randint(1, 100)
+            held[symbol] = held.get(symbol, 0) + quantity
+            transaction_type = 'BUY'
+        transactions.append({
+            'type': transaction_type, 'symbol': symbol, 'quantity': quantity,
+            'price': round(rng.uniform(5, 50), 2), 'fees': 9.5, 'date': day,
+            'transactionId': f"{i:08d}", 'sk': f"TXN#{day}#{i:08d}"
+        })
+    return transactions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--transactions', type=int, default=100000)
+    parser.add_argument('--symbols', type=int, default=200)
+    args = parser.parse_args()
+
+    transactions = synthetic_transactions(args.transactions, args.symbols)
+    print(f"Tax-lot engine: {args.transactions} transactions over {args.symbols} symbols")
+
+    for method in ('FIFO', 'LIFO'):
+        started = time.perf_counter()
+        ledger = TaxLotLedger(method)
+        ledger.apply_all(transactions)
+        years = summarize_by_financial_year(ledger.disposals)
+        elapsed = time.perf_counter() - started
+        print(f"  {method:<5} full replay   {elapsed:6.3f}s  {len(ledger.disposals):7} disposals  {len(years)} years")
+
+    # Incremental: restore open lots and apply the last 1% of transactions
+    split = len(transactions) * 99 // 100
+    ledger = TaxLotLedger('FIFO')
+    ledger.apply_all(transactions[:split])
+    lots = ledger.open_lots()
+    started = time.perf_counter()
+    incremental = TaxLotLedger('FIFO')
+    incremental.load_lots(lots)
+    incremental.apply_all(transactions[split:])
+    elapsed = time.perf_counter() - started
+    print(f"  FIFO  incremental   {elapsed:6.3f}s  {len(transactions) - split} new transactions, {len(lots)} open lots")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the shared valuation kernel against the per-holding code it replaced.
+
+Usage: python benchmarks/bench_valuation.py [--holdings 100000]
+"""
+
+import argparse
+import os
+import random
+import time
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '../shared'))
+
+from datetime import datetime, date
+from decimal import Decimal
+from valuation import value_holdings
+
+def synthetic_holdings(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    return [{
+        'id': f"{i:08d}",
+        'symbol': f"SYM{rng.randrange(500)}",
+        'quantity': Decimal(rng.randint(1, 5000)),
+        'purchasePrice': Decimal(str(round(rng.uniform(1, 200), 2))),
+        'purchaseFees': Decimal('9.95'),
+        'currentPrice': Decimal(str(round(rng.uniform(1, 200), 2))),
+        'purchaseDate': date(2015 + rng.randrange(10), rng.randint(1, 12), rng.randint(1, 28)).isoformat()
+    } for i in range(count)]
+
+def legacy_valuation(stock):
+    """The calculation previously repeated in each handler"""
+    quantity = Decimal(str(stock.get('quantity', 0)))
+    purchase_price = Decimal(str(stock.get('purchasePrice', stock.get('averagePrice', 0))))
+    purchase_fees = Decimal(str(stock.get('purchaseFees', 0)))
+    current_price = Decimal(str(stock.get('currentPrice', purchase_price)))
+    total_cost_basis = (quantity * purchase_price) + purchase_fees
+    total_value = quantity * current_price
+    total_return = total_value - total_cost_basis
+    return_percentage = (total_return / total_cost_basis * Decimal('100')) if total_cost_basis > 0 else Decimal('0')
+    purchase_dt = datetime.fromisoformat(stock['purchaseDate'].replace('Z', '+00:00')).date()
+    days_held = (date.today() - purchase_dt).days
+    return total_cost_basis, total_value, total_return, return_percentage, days_held
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--holdings', type=int, default=100000)
+    args = parser.parse_args()
+
+    holdings = synthetic_holdings(args.holdings)
+    print(f"Valuation: {args.holdings} holdings")
+
+    started = time.perf_counter()
+    for holding in holdings:
+        legacy_valuation(holding)
+    legacy = time.perf_counter() - started
+    print(f"  per-handler code  {legacy:6.3f}s  {args.holdings / legacy:10.0f} holdings/s")
+
+    started = time.perf_counter()
+    value_holdings(holdings)
+    kernel = time.perf_counter() - started
+    print(f"  shared kernel     {kernel:6.3f}s  {args.holdings / kernel:10.0f} holdings/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,954 @@
+"""
+In-memory DynamoDB stand-in for benchmarks and local runs.
+
+Tables and global secondary indexes are loaded from serverless.yml. The fake answers at
+the HTTP layer (botocore's before-send event), so handlers, boto3 resources, condition
+builders and (de)serialization all run unchanged; only the network and the service are
+replaced. Supported: GetItem, PutItem, UpdateItem, DeleteItem, Query (table and GSIs),
+Scan (with segments), BatchGetItem, BatchWriteItem, TransactWriteItems, with condition,
+filter, projection and update expressions, Limit / ExclusiveStartKey / 1 MB pagination,
+ReturnValues and ReturnConsumedCapacity (TOTAL or INDEXES). Not modelled: LSIs, streams,
+TTL expiry, throttling, eventual consistency and GSI write capacity.
+
+Usage:
+    fake = FakeDynamoDB.from_serverless('serverless.yml', stage='bench')
+    os.environ.update(fake.environment)   # before importing shared modules
+    from aws_clients import aws_clients
+    fake.install(aws_clients)
+"""
+
+import copy
+import json
+import math
+import os
+import re
+import threading
+import zlib
+from decimal import Decimal
+from typing import Dict, Any, List, Optional, Tuple
+
+import yaml
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer, Binary
+from botocore.awsrequest import AWSResponse
+
+# Page size DynamoDB applies to Query and Scan before Limit
+PAGE_BYTES = 1024 * 1024
+
+BATCH_GET_LIMIT = 100
+BATCH_WRITE_LIMIT = 25
+TRANSACTION_LIMIT = 100
+
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+class DynamoDBError(Exception):
+    """Error returned to the caller as a DynamoDB error response"""
+
+    def __init__(self, code: str, message: str, extra: Optional[Dict[str, Any]] = None):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.extra = extra or {}
+
+def _validation(message: str) -> DynamoDBError:
+    return DynamoDBError('ValidationException', message)
+
+def _deserialize(item: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    return None if item is None else {k: _deserializer.deserialize(v) for k, v in item.items()}
+
+def _serialize(item: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    return None if item is None else {k: _serializer.serialize(v) for k, v in item.items()}
+
+def _item_size(item: Dict[str, Any]) -> int:
+    """Approximate stored size in bytes: attribute names plus values"""
+    size = 0
+    for name, value in item.items():
+        size += len(name.encode()) + _value_size(value)
+    return size
+
+def _value_size(value: Any) -> int:
+    if isinstance(value, str):
+        return len(value.encode())
+    if isinstance(value, (Binary, bytes, bytearray)):
+        return len(bytes(value))
+    if isinstance(value, (Decimal, int, float)):
+        return len(str(value).lstrip('-')) // 2 + 1
+    if isinstance(value, bool) or value is None:
+        return 1
+    if isinstance(value, dict):
+        return 3 + sum(len(k.encode()) + _value_size(v) + 1 for k, v in value.items())
+    if isinstance(value, (list, set, frozenset)):
+        return 3 + sum(_value_size(v) + 1 for v in value)
+    return len(str(value))
+
+# Serverless variable resolution
+
+_VARIABLE = re.compile(r"\$\{([^${}]+)\}")
+
+def _resolve(value: Any, config: Dict[str, Any], options: Dict[str, str]) -> Any:
+    """Resolve ${self:...}, ${opt:...} and ${env:...} references, innermost first"""
+    if isinstance(value, dict):
+        return {k: _resolve(v, config, options) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_resolve(v, config, options) for v in value]
+    if not isinstance(value, str):
+        return value
+
+    def lookup(match):
+        reference, _, default = match.group(1).partition(',')
+        default = default.strip().strip("'\"") if default else ''
+        source, _, path = reference.strip().partition(':')
+        if source == 'self':
+            node = config
+            for part in path.split('.'):
+                if not isinstance(node, dict) or part not in node:
+                    return default
+                node = node[part]
+            return str(_resolve(node, config, options))
+        if source == 'opt':
+            return options.get(path, default)
+        if source == 'env':
+            return os.environ.get(path, default)
+        return default
+
+    while True:
+        resolved = _VARIABLE.sub(lookup, value)
+        if resolved == value:
+            return resolved
+        value = resolved
+
+class _ServerlessLoader(yaml.SafeLoader):
+    """Safe loader that keeps CloudFormation tags (!Ref, !Sub ...) as plain values"""
+    pass
+
+_ServerlessLoader.add_multi_constructor('!', lambda loader, suffix, node: (
+    loader.construct_scalar(node) if isinstance(node, yaml.ScalarNode)
+    else loader.construct_sequence(node) if isinstance(node, yaml.SequenceNode)
+    else loader.construct_mapping(node)))
+
+# Expressions
+
+_TOKEN = re.compile(r"\s*(?:(<>|<=|>=|[=<>(),.\[\]+-])|(#[A-Za-z0-9_]+)|(:[A-Za-z0-9_]+)|([A-Za-z_][A-Za-z0-9_]*)|(\d+))")
+_KEYWORDS = {'AND', 'OR', 'NOT', 'BETWEEN', 'IN'}
+_MISSING = object()
+
+class _Parser:
+    """Recursive-descent parser for DynamoDB expression syntax"""
+
+    def __init__(self, expression: str, names: Dict[str, str], values: Dict[str, Any]):
+        self.tokens = []
+        position = 0
+        expression = expression.strip()
+        while position < len(expression):
+            match = _TOKEN.match(expression, position)
+            if not match or match.end() == position:
+                raise _validation(f"Invalid expression near: {expression[position:]}")
+            position = match.end()
+            symbol, name, value, word, number = match.groups()
+            if symbol:
+                self.tokens.append(('sym', symbol))
+            elif name:
+                if name not in names:
+                    raise _validation(f"Undefined attribute name {name}")
+                self.tokens.append(('name', names[name]))
+            elif value:
+                if value not in values:
+                    raise _validation(f"Undefined attribute value {value}")
+                self.tokens.append(('value', values[value]))
+            elif word:
+                self.tokens.append(('kw', word.upper()) if word.upper() in _KEYWORDS else ('word', word))
+            else:
+                self.tokens.append(('num', int(number)))
+        self.position = 0
+
+    def peek(self, offset: int = 0) -> Tuple[str, Any]:
+        index = self.position + offset
+        return self.tokens[index] if index < len(self.tokens) else ('end', None)
+
+    def next(self) -> Tuple[str, Any]:
+        token = self.peek()
+        self.position += 1
+        return token
+
+    def accept(self, kind: str, value: Any = None) -> bool:
+        token = self.peek()
+        if token[0] == kind and (value is None or token[1] == value):
+            self.position += 1
+            return True
+        return False
+
+    def expect(self, kind: str, value: Any = None) -> Any:
+        token = self.next()
+        if token[0] != kind or (value is not None and token[1] != value):
+            raise _validation(f"Syntax error: expected {value or kind}, got {token[1]}")
+        return token[1]
+
+    def at_end(self) -> bool:
+        return self.peek()[0] == 'end'
+
+    # Paths and operands
+
+    def path(self) -> Tuple:
+        token = self.next()
+        if token[0] not in ('name', 'word'):
+            raise _validation(f"Syntax error: expected attribute, got {token[1]}")
+        parts = [token[1]]
+        while True:
+            if self.accept('sym', '.'):
+                token = self.next()
+                if token[0] not in ('name', 'word'):
+                    raise _validation("Syntax error in document path")
+                parts.append(token[1])
+            elif self.accept('sym', '['):
+                parts.append(self.expect('num'))
+                self.expect('sym', ']')
+            else:
+                return tuple(parts)
+
+    def operand(self) -> Tuple:
+        token = self.peek()
+        if token[0] == 'value':
+            self.next()
+            return ('value', token[1])
+        if token[0] == 'word' and token[1] == 'size' and self.peek(1) == ('sym', '('):
+            self.next()
+            self.expect('sym', '(')
+            path = self.path()
+            self.expect('sym', ')')
+            return ('size', path)
+        return ('path', self.path())
+
+    # Conditions
+
+    def condition(self) -> Tuple:
+        node = self.conjunction()
+        while self.accept('kw', 'OR'):
+            node = ('or', node, self.conjunction())
+        return node
+
+    def conjunction(self) -> Tuple:
+        node = self.negation()
+        while self.accept('kw', 'AND'):
+            node = ('and', node, self.negation())
+        return node
+
+    def negation(self) -> Tuple:
+        if self.accept('kw', 'NOT'):
+            return ('not', self.negation())
+        return self.predicate()
+
+    def predicate(self) -> Tuple:
+        if self.accept('sym', '('):
+            node = self.condition()
+            self.expect('sym', ')')
+            return node
+
+        token = self.peek()
+        if token[0] == 'word' and self.peek(1) == ('sym', '(') and token[1] != 'size':
+            function = self.next()[1]
+            self.expect('sym', '(')
+            arguments = [self.operand()]
+            while self.accept('sym', ','):
+                arguments.append(self.operand())
+            self.expect('sym', ')')
+            if function not in ('attribute_exists', 'attribute_not_exists', 'attribute_type',
+                                'begins_with', 'contains'):
+                raise _validation(f"Invalid function name: {function}")
+            return ('function', function, arguments)
+
+        left = self.operand()
+        if self.accept('kw', 'BETWEEN'):
+            low = self.operand()
+            self.expect('kw', 'AND')
+            return ('between', left, low, self.operand())
+        if self.accept('kw', 'IN'):
+            self.expect('sym', '(')
+            options = [self.operand()]
+            while self.accept('sym', ','):
+                options.append(self.operand())
+            self.expect('sym', ')')
+            return ('in', left, options)
+        comparator = self.expect('sym')
+        if comparator not in ('=', '<>', '<', '<=', '>', '>='):
+            raise _validation(f"Syntax error: unexpected {comparator}")
+        return ('compare', comparator, left, self.operand())
+
+def _get_path(item: Dict[str, Any], path: Tuple) -> Any:
+    node = item
+    for part in path:
+        if isinstance(part, int):
+            if not isinstance(node, list) or part >= len(node):
+                return _MISSING
+            node = node[part]
+        else:
+            if not isinstance(node, dict) or part not in node:
+                return _MISSING
+            node = node[part]
+    return node
+
+def _set_path(item: Dict[str, Any], path: Tuple, value: Any) -> None:
+    node = item
+    for part in path[:-1]:
+        node = node[part] if isinstance(part, int) else node.setdefault(part, {})
+    last = path[-1]
+    if isinstance(last, int) and isinstance(node, list) and last >= len(node):
+        node.append(value)
+    else:
+        node[last] = value
+
+def _remove_path(item: Dict[str, Any], path: Tuple) -> None:
+    parent = _get_path(item, path[:-1]) if len(path) > 1 else item
+    if parent is _MISSING:
+        return
+    if isinstance(path[-1], int):
+        if isinstance(parent, list) and path[-1] < len(parent):
+            del parent[path[-1]]
+    elif isinstance(parent, dict):
+        parent.pop(path[-1], None)
+
+def _type_of(value: Any) -> str:
+    return next(iter(_serializer.serialize(value)))
+
+def _comparable(left: Any, right: Any) -> bool:
+    """Ordering comparisons only apply between two numbers, two strings or two binaries"""
+    for kind in (Decimal, str, (Binary, bytes)):
+        if isinstance(left, kind) and isinstance(right, kind):
+            return True
+    return False
+
+def _evaluate_operand(item: Dict[str, Any], operand: Tuple) -> Any:
+    kind, argument = operand
+    if kind == 'value':
+        return argument
+    value = _get_path(item, argument)
+    if kind == 'size':
+        if value is _MISSING:
+            return _MISSING
+        return Decimal(len(bytes(value) if isinstance(value, Binary) else value))
+    return value
+
+def _evaluate(item: Dict[str, Any], node: Tuple) -> bool:
+    kind = node[0]
+    if kind == 'and':
+        return _evaluate(item, node[1]) and _evaluate(item, node[2])
+    if kind == 'or':
+        return _evaluate(item, node[1]) or _evaluate(item, node[2])
+    if kind == 'not':
+        return not _evaluate(item, node[1])
+    if kind == 'function':
+        function, arguments = node[1], node[2]
+        value = _evaluate_operand(item, arguments[0])
+        if function == 'attribute_exists':
+            return value is not _MISSING
+        if function == 'attribute_not_exists':
+            return value is _MISSING
+        if value is _MISSING:
+            return False
+        argument = _evaluate_operand(item, arguments[1])
+        if function == 'attribute_type':
+            return _type_of(value) == argument
+        if function == 'begins_with':
+            return isinstance(value, type(argument)) and isinstance(value, (str, bytes)) and value.startswith(argument)
+        if isinstance(value, str):
+            return isinstance(argument, str) and argument in value
+        if isinstance(value, (set, list)):
+            return argument in value
+        return False
+    if kind == 'between':
+        value, low, high = (_evaluate_operand(item, operand) for operand in node[1:])
+        return _comparable(value, low) and _comparable(value, high) and low <= value <= high
+    if kind == 'in':
+        value = _evaluate_operand(item, node[1])
+        return value is not _MISSING and any(value == _evaluate_operand(item, option) for option in node[2])
+    comparator = node[1]
+    left, right = _evaluate_operand(item, node[2]), _evaluate_operand(item, node[3])
+    if left is _MISSING or right is _MISSING:
+        return comparator == '<>' and (left is _MISSING) != (right is _MISSING)
+    if comparator == '=':
+        return left == right
+    if comparator == '<>':
+        return left != right
+    if not _comparable(left, right):
+        return False
+    return {'<': left < right, '<=': left <= right, '>': left > right, '>=': left >= right}[comparator]
+
+def _condition(expression: Optional[str], names: Dict[str, str], values: Dict[str, Any]) -> Optional[Tuple]:
+    if not expression:
+        return None
+    parser = _Parser(expression, names, values)
+    node = parser.condition()
+    if not parser.at_end():
+        raise _validation(f"Syntax error: unexpected {parser.peek()[1]}")
+    return node
+
+def _projection(expression: Optional[str], names: Dict[str, str]) -> Optional[List[Tuple]]:
+    if not expression:
+        return None
+    parser = _Parser(expression, names, {})
+    paths = [parser.path()]
+    while parser.accept('sym', ','):
+        paths.append(parser.path())
+    if not parser.at_end():
+        raise _validation("Syntax error in ProjectionExpression")
+    return paths
+
+def _project(item: Dict[str, Any], paths: Optional[List[Tuple]]) -> Dict[str, Any]:
+    if paths is None:
+        return item
+    projected = {}
+    for path in paths:
+        value = _get_path(item, path)
+        if value is _MISSING:
+            continue
+        if len(path) == 1 or any(isinstance(part, int) for part in path):
+            # List elements are returned within their whole top-level attribute
+            projected[path[0]] = item[path[0]]
+        else:
+            _set_path(projected, path, value)
+    return projected
+
+def _update_value(parser: _Parser) -> Tuple:
+    """An update SET value: operand, function or operand +/- operand"""
+    token = parser.peek()
+    if token[0] == 'word' and token[1] in ('if_not_exists', 'list_append') and parser.peek(1) == ('sym', '('):
+        function = parser.next()[1]
+        parser.expect('sym', '(')
+        first = _update_value(parser)
+        parser.expect('sym', ',')
+        second = _update_value(parser)
+        parser.expect('sym', ')')
+        node = (function, first, second)
+    else:
+        node = parser.operand()
+    if parser.peek() in (('sym', '+'), ('sym', '-')):
+        return (parser.next()[1], node, _update_value(parser))
+    return node
+
+def _compute(item: Dict[str, Any], node: Tuple) -> Any:
+    kind = node[0]
+    if kind in ('value', 'path', 'size'):
+        value = _evaluate_operand(item, node)
+        if value is _MISSING:
+            raise _validation("The provided expression refers to an attribute that does not exist in the item")
+        return value
+    if kind == 'if_not_exists':
+        if node[1][0] != 'path':
+            raise _validation("if_not_exists needs a document path")
+        value = _get_path(item, node[1][1])
+        return _compute(item, node[2]) if value is _MISSING else value
+    if kind == 'list_append':
+        first, second = _compute(item, node[1]), _compute(item, node[2])
+        if not isinstance(first, list) or not isinstance(second, list):
+            raise _validation("list_append operands must be lists")
+        return first + second
+    left, right = _compute(item, node[1]), _compute(item, node[2])
+    if not isinstance(left, Decimal) or not isinstance(right, Decimal):
+        raise _validation("An operand in the update expression has an incorrect data type")
+    return left + right if kind == '+' else left - right
+
+def _apply_update(item: Dict[str, Any], expression: str, names: Dict[str, str], values: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply an UpdateExpression to a copy of item; returns the new item"""
+    parser = _Parser(expression, names, values)
+    actions = []
+    while not parser.at_end():
+        clause = parser.expect('word').upper()
+        while True:
+            path = parser.path()
+            if clause == 'SET':
+                parser.expect('sym', '=')
+                actions.append(('SET', path, _update_value(parser)))
+            elif clause == 'REMOVE':
+                actions.append(('REMOVE', path, None))
+            elif clause in ('ADD', 'DELETE'):
+                actions.append((clause, path, parser.operand()))
+            else:
+                raise _validation(f"Invalid UpdateExpression clause: {clause}")
+            if not parser.accept('sym', ','):
+                break
+
+    # Every right-hand side sees the item as it was before the update
+    original = item
+    updated = copy.deepcopy(item)
+    for clause, path, argument in actions:
+        if clause == 'SET':
+            _set_path(updated, path, _compute(original, argument))
+        elif clause == 'REMOVE':
+            _remove_path(updated, path)
+        else:
+            value = _compute(original, argument)
+            current = _get_path(updated, path)
+            if clause == 'ADD':
+                if current is _MISSING:
+                    _set_path(updated, path, value)
+                elif isinstance(current, Decimal) and isinstance(value, Decimal):
+                    _set_path(updated, path, current + value)
+                elif isinstance(current, set) and isinstance(value, set):
+                    _set_path(updated, path, current | value)
+                else:
+                    raise _validation("ADD needs a number or set attribute")
+            elif current is not _MISSING:
+                remaining = current - value
+                if remaining:
+                    _set_path(updated, path, remaining)
+                else:
+                    _remove_path(updated, path)
+    return updated
+
+# Tables
+
+class _Index:
+    """Key schema of a table or GSI plus the item keys it holds, grouped by partition"""
+
+    def __init__(self, name: Optional[str], hash_key: str, range_key: Optional[str],
+                 projection: str = 'ALL', non_key_attributes: Optional[List[str]] = None):
+        self.name = name
+        self.hash_key = hash_key
+        self.range_key = range_key
+        self.projection = projection
+        self.non_key_attributes = non_key_attributes or []
+        self.partitions = {}
+
+    def keys_of(self, item: Dict[str, Any]) -> Optional[Tuple]:
+        """Index key of an item, or None for items the (sparse) index does not hold"""
+        if self.hash_key not in item or (self.range_key and self.range_key not in item):
+            return None
+        return (item[self.hash_key], item[self.range_key] if self.range_key else None)
+
+class FakeTable:
+    def __init__(self, name: str, hash_key: str, range_key: Optional[str], attribute_types: Dict[str, str]):
+        self.name = name
+        self.primary = _Index(None, hash_key, range_key)
+        self.attribute_types = attribute_types
+        self.indexes = {}
+        self.items = {}
+
+    @property
+    def key_attributes(self) -> List[str]:
+        return [attribute for attribute in (self.primary.hash_key, self.primary.range_key) if attribute]
+
+    def add_index(self, index: _Index) -> None:
+        self.indexes[index.name] = index
+
+    def key_of(self, key: Dict[str, Any]) -> Tuple:
+        """Validated primary key tuple of a Key or Item"""
+        for attribute in self.key_attributes:
+            if attribute not in key:
+                raise _validation("The provided key element does not match the schema")
+            expected = self.attribute_types.get(attribute)
+            value = key[attribute]
+            if expected and _type_of(value) != expected:
+                raise _validation(f"Type mismatch for key {attribute}: expected {expected}")
+            if value == '' or value == b'':
+                raise _validation(f"One or more parameter values are not valid. The AttributeValue for a key attribute cannot contain an empty string value. Key: {attribute}")
+        return tuple(key[attribute] for attribute in self.key_attributes)
+
+    def get(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        return self.items.get(key)
+
+    def put(self, item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        key = self.key_of(item)
+        for attribute, expected in self.attribute_types.items():
+            if attribute in item and _type_of(item[attribute]) != expected:
+                raise _validation(f"One or more parameter values were invalid: Type mismatch for Index Key {attribute}")
+        old = self.items.get(key)
+        if old is not None:
+            self._unindex(key, old)
+        self.items[key] = item
+        self._index(key, item)
+        return old
+
+    def delete(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        old = self.items.pop(key, None)
+        if old is not None:
+            self._unindex(key, old)
+        return old
+
+    def _index(self, key: Tuple, item: Dict[str, Any]) -> None:
+        for index in [self.primary, *self.indexes.values()]:
+            index_key = index.keys_of(item)
+            if index_key is not None:
+                index.partitions.setdefault(index_key[0], {})[key] = index_key[1]
+
+    def _unindex(self, key: Tuple, item: Dict[str, Any]) -> None:
+        for index in [self.primary, *self.indexes.values()]:
+            index_key = index.keys_of(item)
+            if index_key is not None:
+                partition = index.partitions.get(index_key[0], {})
+                partition.pop(key, None)
+                if not partition:
+                    index.partitions.pop(index_key[0], None)
+
+    def index(self, name: Optional[str]) -> _Index:
+        if name is None:
+            return self.primary
+        if name not in self.indexes:
+            raise _validation(f"The table does not have the specified index: {name}")
+        return self.indexes[name]
+
+    def project_for_index(self, index: _Index, item: Dict[str, Any]) -> Dict[str, Any]:
+        if index.projection == 'ALL':
+            return item
+        keep = set(self.key_attributes) | {index.hash_key, index.range_key}
+        if index.projection == 'INCLUDE':
+            keep |= set(index.non_key_attributes)
+        return {k: v for k, v in item.items() if k in keep}
+
+    def page_key(self, index: _Index, item: Dict[str, Any]) -> Dict[str, Any]:
+        """LastEvaluatedKey for an item read through an index"""
+        attributes = set(self.key_attributes) | {index.hash_key, index.range_key} - {None}
+        return {attribute: item[attribute] for attribute in attributes if attribute in item}
+
+def _sort_value(value: Any) -> Tuple:
+    # Partitions only hold one key type, so this only has to order like values
+    if isinstance(value, Decimal):
+        return (0, value)
+    return (1, bytes(value) if isinstance(value, Binary) else value)
+
+class FakeDynamoDB:
+    """In-memory tables behind a botocore before-send hook"""
+
+    def __init__(self, page_bytes: int = PAGE_BYTES):
+        self.tables = {}
+        self.environment = {}
+        self.page_bytes = page_bytes
+        self.calls = {}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_serverless(cls, path: str, stage: str = 'dev', region: str = 'ap-southeast-2') -> 'FakeDynamoDB':
+        """Tables and GSIs from the resources section, named as the stage's environment names them"""
+        with open(path) as f:
+            config = yaml.load(f, Loader=_ServerlessLoader)
+        options = {'stage': stage, 'region': region}
+        fake = cls()
+        environment = config.get('provider', {}).get('environment', {})
+        fake.environment = {name: str(_resolve(value, config, options)) for name, value in environment.items()}
+        for resource in (config.get('resources', {}).get('Resources') or {}).values():
+            if resource.get('Type') == 'AWS::DynamoDB::Table':
+                fake.create_table(_resolve(resource['Properties'], config, options))
+        return fake
+
+    def create_table(self, properties: Dict[str, Any]) -> FakeTable:
+        """Create a table from CloudFormation / CreateTable style properties"""
+        def schema(key_schema):
+            keys = {entry['KeyType']: entry['AttributeName'] for entry in key_schema}
+            return keys['HASH'], keys.get('RANGE')
+
+        types = {entry['AttributeName']: entry['AttributeType'] for entry in properties.get('AttributeDefinitions', [])}
+        table = FakeTable(properties['TableName'], *schema(properties['KeySchema']), types)
+        for index in properties.get('GlobalSecondaryIndexes') or []:
+            projection = index.get('Projection', {})
+            table.add_index(_Index(index['IndexName'], *schema(index['KeySchema']),
+                                   projection.get('ProjectionType', 'ALL'), projection.get('NonKeyAttributes')))
+        self.tables[table.name] = table
+        return table
+
+    def install(self, factory) -> None:
+        """Answer every DynamoDB call made through an AWSClientFactory (aws_clients)"""
+        factory.register_event('before-send.dynamodb', self.handle)
+
+    def table(self, name: str) -> FakeTable:
+        if name not in self.tables:
+            raise DynamoDBError('ResourceNotFoundException', f"Requested resource not found: Table: {name} not found")
+        return self.tables[name]
+
+    def item_count(self, name: str) -> int:
+        return len(self.table(name).items)
+
+    def reset(self) -> None:
+        """Drop every item and the call counts, keeping the tables"""
+        with self._lock:
+            for table in self.tables.values():
+                table.items.clear()
+                for index in [table.primary, *table.indexes.values()]:
+                    index.partitions.clear()
+            self.calls.clear()
+
+    # HTTP layer
+
+    def handle(self, request, **kwargs) -> AWSResponse:
+        target = request.headers['X-Amz-Target']
+        operation = (target.decode() if isinstance(target, bytes) else target).split('.')[-1]
+        body = json.loads(request.body or b'{}')
+        try:
+            handler = getattr(self, f"_{re.sub(r'(?<!^)(?=[A-Z])', '_', operation).lower()}", None)
+            if handler is None:
+                raise _validation(f"Operation {operation} is not supported by the in-memory fake")
+            with self._lock:
+                self.calls[operation] = self.calls.get(operation, 0) + 1
+                result = handler(body)
+            status = 200
+        except DynamoDBError as e:
+            status = 400
+            result = {'__type': f"com.amazonaws.dynamodb.v20120810#{e.code}", 'message': e.message, **e.extra}
+        payload = json.dumps(result).encode()
+        return AWSResponse(request.url, status, {'Content-Type': 'application/x-amz-json-1.0',
+                                                 'Content-Length': str(len(payload))}, _RawBody(payload))
+
+    # Shared request helpers
+
+    @staticmethod
+    def _names_values(body: Dict[str, Any]) -> Tuple[Dict[str, str], Dict[str, Any]]:
+        return body.get('ExpressionAttributeNames') or {}, _deserialize(body.get('ExpressionAttributeValues') or {})
+
+    def _check(self, table: FakeTable, existing: Optional[Dict[str, Any]], body: Dict[str, Any]) -> None:
+        names, values = self._names_values(body)
+        condition = _condition(body.get('ConditionExpression'), names, values)
+        if condition is not None and not _evaluate(existing or {}, condition):
+            raise DynamoDBError('ConditionalCheckFailedException', 'The conditional request failed')
+
+    @staticmethod
+    def _capacity(body: Dict[str, Any], table: str, units: float, read: bool) -> Dict[str, Any]:
+        if body.get('ReturnConsumedCapacity', 'NONE') == 'NONE':
+            return {}
+        field = 'ReadCapacityUnits' if read else 'WriteCapacityUnits'
+        consumed = {'TableName': table, 'CapacityUnits': units, field: units}
+        if body['ReturnConsumedCapacity'] == 'INDEXES':
+            # Reads are charged to the index they ran on; index write amplification is not modelled
+            if body.get('IndexName'):
+                consumed['Table'] = {'CapacityUnits': 0.0, field: 0.0}
+                consumed['GlobalSecondaryIndexes'] = {body['IndexName']: {'CapacityUnits': units, field: units}}
+            else:
+                consumed['Table'] = {'CapacityUnits': units, field: units}
+        return {'ConsumedCapacity': consumed}
+
+    @staticmethod
+    def _read_units(size: int, consistent: bool) -> float:
+        units = max(1, math.ceil(size / 4096))
+        return float(units if consistent else units / 2)
+
+    @staticmethod
+    def _write_units(*items: Optional[Dict[str, Any]]) -> float:
+        return float(max(1, max(math.ceil(_item_size(item) / 1024) for item in items if item) if any(items) else 1))
+
+    # Single-item operations
+
+    def _get_item(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        table = self.table(body['TableName'])
+        item = table.get(table.key_of(_deserialize(body['Key'])))
+        names, _ = self._names_values(body)
+        paths = _projection(body.get('ProjectionExpression'), names)
+        result = self._capacity(body, table.name, self._read_units(_item_size(item) if item else 0,
+                                                                    body.get('ConsistentRead', False)), True)
+        if item is not None:
+            result['Item'] = _serialize(_project(item, paths))
+        return result
+
+    def _put_item(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        table = self.table(body['TableName'])
+        item = _deserialize(body['Item'])
+        key = table.key_of(item)
+        existing = table.get(key)
+        self._check(table, existing, body)
+        table.put(item)
+        result = self._capacity(body, table.name, self._write_units(item, existing), False)
+        if body.get('ReturnValues') == 'ALL_OLD' and existing is not None:
+            result['Attributes'] = _serialize(existing)
+        return result
+
+    def _update_item(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        table = self.table(body['TableName'])
+        key_item = _deserialize(body['Key'])
+        key = table.key_of(key_item)
+        existing = table.get(key)
+        self._check(table, existing, body)
+        names, values = self._names_values(body)
+        base = existing if existing is not None else dict(key_item)
+        updated = _apply_update(base, body['UpdateExpression'], names, values) if body.get('UpdateExpression') else dict(base)
+        for attribute in table.key_attributes:
+            if updated.get(attribute) != key_item[attribute]:
+                raise _validation(f"Cannot update attribute {attribute}. This attribute is part of the key")
+        table.put(updated)
+
+        result = self._capacity(body, table.name, self._write_units(updated, existing), False)
+        return_values = body.get('ReturnValues', 'NONE')
+        if return_values == 'ALL_NEW':
+            result['Attributes'] = _serialize(updated)
+        elif return_values == 'ALL_OLD' and existing is not None:
+            result['Attributes'] = _serialize(existing)
+        elif return_values in ('UPDATED_NEW', 'UPDATED_OLD'):
+            source = updated if return_values == 'UPDATED_NEW' else (existing or {})
+            changed = {name for name in set(updated) | set(existing or {})
+                       if (existing or {}).get(name, _MISSING) != updated.get(name, _MISSING)}
+            result['Attributes'] = _serialize({k: v for k, v in source.items() if k in changed})
+        return result
+
+    def _delete_item(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        table = self.table(body['TableName'])
+        key = table.key_of(_deserialize(body['Key']))
+        existing = table.get(key)
+        self._check(table, existing, body)
+        table.delete(key)
+        result = self._capacity(body, table.name, self._write_units(existing), False)
+        if body.get('ReturnValues') == 'ALL_OLD' and existing is not None:
+            result['Attributes'] = _serialize(existing)
+        return result
+
+    # Query and Scan
+
+    def _page(self, body: Dict[str, Any], table: FakeTable, index: _Index,
+              candidates: List[Tuple[Tuple, Dict[str, Any]]]) -> Dict[str, Any]:
+        """Apply ExclusiveStartKey, Limit, the page size, filter and projection to ordered candidates"""
+        start = body.get('ExclusiveStartKey')
+        if start:
+            start_key = table.key_of(_deserialize(start))
+            positions = [position for position, (key, _) in enumerate(candidates) if key == start_key]
+            candidates = candidates[positions[0] + 1:] if positions else []
+
+        names, values = self._names_values(body)
+        condition = _condition(body.get('FilterExpression'), names, values)
+        paths = _projection(body.get('ProjectionExpression'), names)
+        limit = body.get('Limit')
+
+        items, scanned, size, last = [], 0, 0, None
+        for position, (key, item) in enumerate(candidates):
+            stored = table.project_for_index(index, item)
+            scanned += 1
+            size += _item_size(stored)
+            if condition is None or _evaluate(stored, condition):
+                items.append(_project(stored, paths))
+            more = position + 1 < len(candidates)
+            if more and ((limit and scanned >= limit) or size >= self.page_bytes):
+                last = table.page_key(index, item)
+                break
+
+        result = {'Count': len(items), 'ScannedCount': scanned}
+        if body.get('Select') != 'COUNT':
+            result['Items'] = [_serialize(item) for item in items]
+        if last is not None:
+            result['LastEvaluatedKey'] = _serialize(last)
+        result.update(self._capacity(body, table.name, self._read_units(size, body.get('ConsistentRead', False)), True))
+        return result
+
+    def _query(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        table = self.table(body['TableName'])
+        index = table.index(body.get('IndexName'))
+        names, values = self._names_values(body)
+        condition = _condition(body.get('KeyConditionExpression'), names, values)
+        if condition is None:
+            raise _validation("Either the KeyConditions or KeyConditionExpression parameter must be specified")
+
+        # Split the key condition into the partition equality and an optional sort-key predicate
+        terms = [condition]
+        while terms and terms[0][0] == 'and':
+            node = terms.pop(0)
+            terms[:0] = [node[1], node[2]]
+        partition_value, sort_terms = _MISSING, []
+        for term in terms:
+            if term[0] == 'compare' and term[1] == '=' and term[2] == ('path', (index.hash_key,)):
+                partition_value = term[3][1]
+            elif term[0] in ('compare', 'between', 'function'):
+                sort_terms.append(term)
+            else:
+                raise _validation("Invalid KeyConditionExpression")
+        if partition_value is _MISSING:
+            raise _validation("Query condition missed key schema element: " + index.hash_key)
+
+        partition = index.partitions.get(partition_value, {})
+        candidates = [(key, table.items[key]) for key in partition]
+        candidates = [(key, item) for key, item in candidates if all(_evaluate(item, term) for term in sort_terms)]
+        candidates.sort(key=lambda entry: (_sort_value(partition[entry[0]]) if index.range_key else (0,),
+                                           tuple(_sort_value(part) for part in entry[0])),
+                        reverse=body.get('ScanIndexForward', True) is False)
+        return self._page(body, table, index, candidates)
+
+    def _scan(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        table = self.table(body['TableName'])
+        index = table.index(body.get('IndexName'))
+        candidates = [(key, item) for key, item in table.items.items() if index.keys_of(item) is not None]
+        if 'TotalSegments' in body:
+            segments, segment = body['TotalSegments'], body.get('Segment', 0)
+            candidates = [(key, item) for key, item in candidates
+                          if zlib.crc32(json.dumps(_serialize({'k': key[0]})).encode()) % segments == segment]
+        return self._page(body, table, index, candidates)
+
+    # Batch and transactional operations
+
+    def _batch_get_item(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        requests = body['RequestItems']
+        if sum(len(request['Keys']) for request in requests.values()) > BATCH_GET_LIMIT:
+            raise _validation(f"Too many items requested for the BatchGetItem call (max {BATCH_GET_LIMIT})")
+        responses, consumed = {}, []
+        for table_name, request in requests.items():
+            table = self.table(table_name)
+            names = request.get('ExpressionAttributeNames') or {}
+            paths = _projection(request.get('ProjectionExpression'), names)
+            found, size = [], 0
+            for key in request['Keys']:
+                item = table.get(table.key_of(_deserialize(key)))
+                if item is not None:
+                    size += _item_size(item)
+                    found.append(_serialize(_project(item, paths)))
+            responses[table_name] = found
+            capacity = self._capacity(body, table_name, self._read_units(size, request.get('ConsistentRead', False)), True)
+            consumed.extend(capacity.values())
+        result = {'Responses': responses, 'UnprocessedKeys': {}}
+        if consumed:
+            result['ConsumedCapacity'] = consumed
+        return result
+
+    def _batch_write_item(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        requests = body['RequestItems']
+        if sum(len(entries) for entries in requests.values()) > BATCH_WRITE_LIMIT:
+            raise _validation(f"Too many items requested for the BatchWriteItem call (max {BATCH_WRITE_LIMIT})")
+        consumed = []
+        for table_name, entries in requests.items():
+            table = self.table(table_name)
+            units = 0.0
+            for entry in entries:
+                if 'PutRequest' in entry:
+                    item = _deserialize(entry['PutRequest']['Item'])
+                    units += self._write_units(item, table.put(item))
+                else:
+                    units += self._write_units(table.delete(table.key_of(_deserialize(entry['DeleteRequest']['Key']))))
+            consumed.extend(self._capacity(body, table_name, units, False).values())
+        result = {'UnprocessedItems': {}}
+        if consumed:
+            result['ConsumedCapacity'] = consumed
+        return result
+
+    def _transact_write_items(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        operations = body['TransactItems']
+        if len(operations) > TRANSACTION_LIMIT:
+            raise _validation(f"Member must have length less than or equal to {TRANSACTION_LIMIT}")
+
+        # Check every condition before applying anything, as DynamoDB does
+        reasons, failed, seen = [], False, set()
+        for operation in operations:
+            (kind, params), = operation.items()
+            table = self.table(params['TableName'])
+            key = table.key_of(_deserialize(params.get('Key') or params.get('Item')))
+            if (table.name, key) in seen:
+                raise _validation("Transaction request cannot include multiple operations on one item")
+            seen.add((table.name, key))
+            try:
+                self._check(table, table.get(key), params)
+                reasons.append({'Code': 'None'})
+            except DynamoDBError as e:
+                failed = True
+                reasons.append({'Code': 'ConditionalCheckFailed', 'Message': e.message})
+        if failed:
+            codes = ', '.join(reason['Code'] for reason in reasons)
+            raise DynamoDBError('TransactionCanceledException',
+                                f"Transaction cancelled, please refer cancellation reasons for specific reasons [{codes}]",
+                                {'CancellationReasons': reasons})
+
+        for operation in operations:
+            (kind, params), = operation.items()
+            params = {k: v for k, v in params.items() if k != 'ConditionExpression'}
+            if kind == 'Put':
+                self._put_item(params)
+            elif kind == 'Update':
+                self._update_item(params)
+            elif kind == 'Delete':
+                self._delete_item(params)
+        return {}
+
+class _RawBody:
+    """Minimal urllib3-style body for AWSResponse"""
+
+    def __init__(self, payload: bytes):
+        self._payload = payload
+
+    def stream(self, **kwargs):
+        yield self._payload
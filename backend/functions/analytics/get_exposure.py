@@ -0,0 +1,64 @@
+import json
+import os
+import logging
+from typing import Dict, Any
+
+# Set up logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Import shared utilities
+import sys
+sys.path.append('/opt/python')
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared'))
+
+from etf_lookthrough import lookthrough_engine
+from portfolio_summary import get_portfolio_holdings
+from response_utils import success_response, bad_request_response, internal_error_response, conditional_get
+
+@conditional_get
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Look through a portfolio's ETFs to its true exposure by security, sector and country
+    Query parameters:
+    - top: number of securities to return (default 25, max 500)
+    ETF constituents (<SYMBOL>.csv files) come from ETF_CONSTITUENTS_DIR, an s3:// prefix in the
+    stage's reference data bucket (scripts/upload-reference-data.sh), or data/etf_constituents
+    """
+    try:
+        logger.info("Calculating look-through exposure")
+
+        # Get portfolio ID from path parameters
+        path_params = event.get('pathParameters', {})
+        portfolio_id = path_params.get('portfolioId')
+
+        if not portfolio_id:
+            return bad_request_response("Portfolio ID is required")
+
+        query_params = event.get('queryStringParameters') or {}
+        try:
+            top = int(query_params.get('top', 25))
+        except ValueError:
+            return bad_request_response("top must be an integer")
+        if top < 1 or top > 500:
+            return bad_request_response("top must be between 1 and 500")
+
+        try:
+            holdings = get_portfolio_holdings(portfolio_id)
+        except Exception as e:
+            logger.error(f"Error loading holdings for portfolio {portfolio_id}: {str(e)}")
+            return internal_error_response("Failed to retrieve holdings")
+
+        result = lookthrough_engine.exposure(holdings['stocks'], holdings['etfs'], top=top)
+
+        logger.info(f"Exposure for portfolio {portfolio_id}: {result['securityCount']} securities, "
+                    f"{result['etfsLookedThrough']} ETFs looked through")
+
+        return success_response({
+            'portfolioId': portfolio_id,
+            **result
+        })
+
+    except Exception as e:
+        logger.error(f"Error calculating exposure: {str(e)}")
+        return internal_error_response("Failed to calculate exposure")
@@ -0,0 +1,100 @@
+import json
+import os
+import logging
+from typing import Dict, Any
+
+# Set up logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Import shared utilities
+import sys
+sys.path.append('/opt/python')
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared'))
+
+from portfolio_optimizer import portfolio_optimizer
+from portfolio_summary import get_portfolio_holdings
+from response_utils import success_response, bad_request_response, internal_error_response
+
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Mean-variance optimization for a portfolio's listed holdings
+    Request body (all optional):
+    - symbols: symbols to optimize over (default: the portfolio's stocks and ETFs)
+    - windowDays: history window for returns and covariance (default 365)
+    - riskFreeRate: annual risk-free rate as a decimal (default 0)
+    - targetReturn: annual target return as a decimal
+    - frontierPoints: number of efficient-frontier points (default 25)
+    - allowShort: allow negative weights, true or false (default true); long-only
+      targetReturn must lie between the lowest and highest expected return
+    """
+    try:
+        logger.info("Optimizing portfolio")
+        
+        # Get portfolio ID from path parameters
+        path_params = event.get('pathParameters', {})
+        portfolio_id = path_params.get('portfolioId')
+        
+        if not portfolio_id:
+            return bad_request_response("Portfolio ID is required")
+        
+        try:
+            body = json.loads(event.get('body') or '{}')
+        except json.JSONDecodeError:
+            return bad_request_response("Invalid JSON in request body")
+        
+        try:
+            window_days = int(body.get('windowDays', 365))
+            risk_free_rate = float(body.get('riskFreeRate', 0))
+            target_return = float(body['targetReturn']) if body.get('targetReturn') is not None else None
+            frontier_points = min(int(body.get('frontierPoints', 25)), 200)
+        except (ValueError, TypeError):
+            return bad_request_response("Invalid numeric values")
+        
+        # A JSON boolean only: bool("false") would allow shorting
+        allow_short = body.get('allowShort', True)
+        if not isinstance(allow_short, bool):
+            return bad_request_response("allowShort must be true or false")
+        
+        if window_days < 30:
+            return bad_request_response("windowDays must be at least 30")
+        
+        # Current weights come from the portfolio's listed holdings
+        try:
+            holdings = get_portfolio_holdings(portfolio_id)
+        except Exception as e:
+            logger.error(f"Error loading holdings for portfolio {portfolio_id}: {str(e)}")
+            return internal_error_response("Failed to retrieve holdings")
+        
+        current_weights = {}
+        for item in holdings['stocks'] + holdings['etfs']:
+            symbol = item['symbol'].upper()
+            current_weights[symbol] = current_weights.get(symbol, 0.0) + float(item.get('totalValue', 0) or 0)
+        
+        symbols = [s.upper() for s in body.get('symbols') or current_weights.keys()]
+        if len(set(symbols)) < 2:
+            return bad_request_response("At least two symbols are required to optimize")
+        
+        try:
+            result = portfolio_optimizer.optimize(
+                symbols,
+                window_days=window_days,
+                risk_free_rate=risk_free_rate,
+                target_return=target_return,
+                frontier_points=frontier_points,
+                allow_short=allow_short,
+                current_weights=current_weights
+            )
+        except ValueError as e:
+            return bad_request_response(str(e))
+        
+        logger.info(f"Optimized portfolio {portfolio_id} over {len(result['symbols'])} symbols")
+        
+        return success_response({
+            'portfolioId': portfolio_id,
+            **result
+        })
+        
+    except Exception as e:
+        logger.error(f"Error optimizing portfolio: {str(e)}")
+        return internal_error_response("Failed to optimize portfolio")
@@ -0,0 +1,99 @@
+import json
+import os
+import logging
+from typing import Dict, Any
+
+# Set up logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Import shared utilities
+import sys
+sys.path.append('/opt/python')
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared'))
+
+from monte_carlo import monte_carlo_engine, RISK_PROFILES, PROPERTY_PROFILE
+from portfolio_summary import get_portfolio_holdings
+from response_utils import success_response, bad_request_response, internal_error_response
+
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Monte Carlo goal and retirement projection for a portfolio
+    Request body (all optional):
+    - years: projection horizon, 1-50 (default 30)
+    - paths: number of simulated paths (default 100000)
+    - seed: random seed for reproducible results (default 0)
+    - monthlyContribution: amount added to listed assets each month
+    - annualFeeRate: extra annual fee as a decimal, on top of ETF expense ratios
+    - riskTolerance: conservative | moderate | aggressive (as in portfolioSettings)
+    - investmentGoals: [{name, targetAmount, years}] (as in portfolioSettings)
+    - expectedReturn / volatility: override the risk profile for listed assets
+    """
+    try:
+        logger.info("Projecting portfolio")
+        
+        # Get portfolio ID from path parameters
+        path_params = event.get('pathParameters', {})
+        portfolio_id = path_params.get('portfolioId')
+        
+        if not portfolio_id:
+            return bad_request_response("Portfolio ID is required")
+        
+        try:
+            body = json.loads(event.get('body') or '{}')
+        except json.JSONDecodeError:
+            return bad_request_response("Invalid JSON in request body")
+        
+        risk_tolerance = body.get('riskTolerance', 'moderate')
+        if risk_tolerance not in RISK_PROFILES:
+            return bad_request_response(f"riskTolerance must be one of {', '.join(RISK_PROFILES)}")
+        
+        goals = body.get('investmentGoals', [])
+        if any('targetAmount' not in goal for goal in goals):
+            return bad_request_response("Each investment goal needs a targetAmount")
+        
+        try:
+            holdings = get_portfolio_holdings(portfolio_id)
+        except Exception as e:
+            logger.error(f"Error loading holdings for portfolio {portfolio_id}: {str(e)}")
+            return internal_error_response("Failed to retrieve holdings")
+        
+        listed_value = sum(float(item.get('totalValue', 0) or 0) for item in holdings['stocks'] + holdings['etfs'])
+        property_value = sum(float(item.get('currentValue', 0) or 0) for item in holdings['properties'])
+        property_cash_flow = sum(float(item.get('annualCashFlow', 0) or 0) for item in holdings['properties'])
+        
+        # Value-weighted ETF expense ratios (stored as percentages)
+        etf_fees = sum(float(item.get('totalValue', 0) or 0) * float(item.get('expenseRatio', 0) or 0) / 100
+                       for item in holdings['etfs'])
+        
+        listed_return, listed_volatility = RISK_PROFILES[risk_tolerance]
+        try:
+            params = {
+                'listedValue': listed_value,
+                'propertyValue': property_value,
+                'propertyCashFlow': property_cash_flow,
+                'monthlyContribution': float(body.get('monthlyContribution', 0)),
+                'annualFeeRate': float(body.get('annualFeeRate', 0)) + (etf_fees / listed_value if listed_value > 0 else 0),
+                'listedReturn': float(body.get('expectedReturn', listed_return)),
+                'listedVolatility': float(body.get('volatility', listed_volatility)),
+                'propertyGrowth': float(body.get('propertyGrowth', PROPERTY_PROFILE[0])),
+                'propertyVolatility': float(body.get('propertyVolatility', PROPERTY_PROFILE[1])),
+                'years': int(body.get('years', 30))
+            }
+            paths = int(body.get('paths', 100000))
+            seed = int(body.get('seed', 0))
+            result = monte_carlo_engine.project(params, paths=paths, seed=seed, goals=goals)
+        except (ValueError, TypeError) as e:
+            return bad_request_response(f"Invalid projection parameters: {str(e)}")
+        
+        logger.info(f"Projected portfolio {portfolio_id}: {paths} paths in {result['elapsedSeconds']}s")
+        
+        return success_response({
+            'portfolioId': portfolio_id,
+            'riskTolerance': risk_tolerance,
+            **result
+        })
+        
+    except Exception as e:
+        logger.error(f"Error projecting portfolio: {str(e)}")
+        return internal_error_response("Failed to project portfolio")
@@ -0,0 +1,100 @@
+import json
+import os
+import logging
+from statistics import median
+from typing import Dict, Any
+
+# Set up logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Import shared utilities
+import sys
+sys.path.append('/opt/python')
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared'))
+
+from rebalancer import rebalance, RISK_TOLERANCE_TARGETS, TARGET_DIMENSIONS
+from portfolio_summary import get_portfolio_holdings
+from response_utils import success_response, bad_request_response, internal_error_response
+
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Compute the trades that bring a portfolio's listed holdings back to target weights
+    Request body:
+    - by: assetClass | symbol | tag (default assetClass)
+    - targets: group -> weight (weights sum to 1); defaults from riskTolerance when by is assetClass
+    - riskTolerance: conservative | moderate | aggressive (as in portfolioSettings)
+    - driftBand: absolute drift tolerated before trading (default 0.05)
+    - cash: extra cash to invest (default 0)
+    - tradeFee: brokerage per trade (default: median purchaseFees of the holdings)
+    - lotSizes: symbol -> minimum tradeable unit (default 1)
+    - taxAware: sell lowest-gain holdings first, true or false (default true)
+    """
+    try:
+        logger.info("Rebalancing portfolio")
+        
+        # Get portfolio ID from path parameters
+        path_params = event.get('pathParameters', {})
+        portfolio_id = path_params.get('portfolioId')
+        
+        if not portfolio_id:
+            return bad_request_response("Portfolio ID is required")
+        
+        try:
+            body = json.loads(event.get('body') or '{}')
+        except json.JSONDecodeError:
+            return bad_request_response("Invalid JSON in request body")
+        
+        by = body.get('by', 'assetClass')
+        if by not in TARGET_DIMENSIONS:
+            return bad_request_response(f"by must be one of {', '.join(TARGET_DIMENSIONS)}")
+        
+        targets = body.get('targets')
+        if not targets:
+            risk_tolerance = body.get('riskTolerance', 'moderate')
+            if by != 'assetClass' or risk_tolerance not in RISK_TOLERANCE_TARGETS:
+                return bad_request_response("targets are required unless rebalancing by assetClass with a known riskTolerance")
+            targets = RISK_TOLERANCE_TARGETS[risk_tolerance]
+        
+        # A JSON boolean only: bool("false") would select lots tax-aware
+        tax_aware = body.get('taxAware', True)
+        if not isinstance(tax_aware, bool):
+            return bad_request_response("taxAware must be true or false")
+        
+        try:
+            holdings = get_portfolio_holdings(portfolio_id)
+        except Exception as e:
+            logger.error(f"Error loading holdings for portfolio {portfolio_id}: {str(e)}")
+            return internal_error_response("Failed to retrieve holdings")
+        
+        listed = [{**item, 'assetClass': 'stocks'} for item in holdings['stocks']]
+        listed += [{**item, 'assetClass': 'etfs'} for item in holdings['etfs']]
+        if not listed:
+            return bad_request_response("Portfolio has no listed holdings to rebalance")
+        
+        fees = [float(item['purchaseFees']) for item in listed if item.get('purchaseFees') is not None]
+        
+        try:
+            result = rebalance(
+                listed,
+                {str(k): float(v) for k, v in targets.items()},
+                by=by,
+                drift_band=float(body.get('driftBand', 0.05)),
+                cash=float(body.get('cash', 0)),
+                trade_fee=float(body.get('tradeFee', median(fees) if fees else 0)),
+                lot_sizes={str(k).upper(): float(v) for k, v in (body.get('lotSizes') or {}).items()},
+                tax_aware=tax_aware
+            )
+        except (ValueError, TypeError, AttributeError) as e:
+            return bad_request_response(f"Invalid rebalance parameters: {str(e)}")
+        
+        logger.info(f"Rebalanced portfolio {portfolio_id}: {len(result['trades'])} trades")
+        
+        return success_response({
+            'portfolioId': portfolio_id,
+            **result
+        })
+        
+    except Exception as e:
+        logger.error(f"Error rebalancing portfolio: {str(e)}")
+        return internal_error_response("Failed to rebalance portfolio")
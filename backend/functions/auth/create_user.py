@@ -1,5 +1,4 @@
 import json
-import boto3
 import os
 import uuid
 from datetime import datetime
@@ -9,17 +8,17 @@ import logging
 # Import our shared modules
 import sys
 sys.path.append('/opt/python')
-sys.path.append('../../shared')
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared'))
 
+from aws_clients import get_table
 from auth_middleware import require_auth, log_financial_activity
 from response_utils import create_response, handle_error
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# Initialize AWS clients
-dynamodb = boto3.resource('dynamodb')
-users_table = dynamodb.Table(os.environ['USERS_TABLE'])
+# Shared, pooled table handle
+users_table = get_table(os.environ['USERS_TABLE'])
 
 @require_auth
 def handler(event, context):
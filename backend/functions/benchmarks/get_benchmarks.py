@@ -0,0 +1,78 @@
+import json
+import os
+import logging
+from typing import Dict, Any
+
+# Set up logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Import shared utilities
+import sys
+sys.path.append('/opt/python')
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared'))
+
+from benchmark_service import benchmark_service, PERFORMANCE_PERIODS
+from portfolio_snapshots import snapshot_store
+from portfolio_summary import summarize_portfolio
+from response_utils import success_response, bad_request_response, internal_error_response, conditional_get
+
+@conditional_get
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Compare a portfolio against the benchmark indices for a period
+    Query parameters:
+    - period: one of 1w, 1m, 3m, 6m, 1y, 2y, 3y, 5y (default 1y)
+    - symbols: optional comma-separated subset of index symbols
+    
+    The portfolio return is time-weighted over the same period as the index returns, from
+    its daily snapshots; it (and outperformance) is null until the snapshots cover the period.
+    """
+    try:
+        logger.info("Getting benchmark comparison for portfolio")
+        
+        # Get portfolio ID from path parameters
+        path_params = event.get('pathParameters', {})
+        portfolio_id = path_params.get('portfolioId')
+        
+        if not portfolio_id:
+            return bad_request_response("Portfolio ID is required")
+        
+        query_params = event.get('queryStringParameters') or {}
+        period = query_params.get('period', '1y')
+        if period not in PERFORMANCE_PERIODS:
+            return bad_request_response(f"period must be one of {', '.join(PERFORMANCE_PERIODS)}")
+        
+        symbols = None
+        if query_params.get('symbols'):
+            symbols = [s.strip().upper() for s in query_params['symbols'].split(',') if s.strip()]
+        
+        # Portfolio side: current totals from one pass over its holdings, and its return
+        # over the period from its snapshots
+        try:
+            summary = summarize_portfolio(portfolio_id)
+            portfolio_return = snapshot_store.get_period_return(portfolio_id, period)
+        except Exception as e:
+            logger.error(f"Error summarizing portfolio {portfolio_id}: {str(e)}")
+            return internal_error_response("Failed to retrieve portfolio holdings")
+        
+        # Index side: precomputed once for every portfolio
+        comparisons = benchmark_service.compare(portfolio_return, period, symbols)
+        
+        logger.info(f"Compared portfolio {portfolio_id} against {len(comparisons)} benchmarks for {period}")
+        
+        return success_response({
+            'portfolioId': portfolio_id,
+            'period': period,
+            'portfolioReturn': portfolio_return,
+            'portfolioReturnBasis': 'timeWeighted',
+            'costBasisReturn': summary['returnPercentage'],
+            'totalValue': summary['totalValue'],
+            'totalCostBasis': summary['totalCostBasis'],
+            'benchmarks': comparisons,
+            'count': len(comparisons)
+        })
+        
+    except Exception as e:
+        logger.error(f"Error getting benchmark comparison: {str(e)}")
+        return internal_error_response("Failed to compare benchmarks")
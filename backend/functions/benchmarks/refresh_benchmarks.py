@@ -0,0 +1,48 @@
+import json
+import os
+import logging
+from datetime import datetime
+from typing import Dict, Any
+
+# Set up logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Import shared utilities
+import sys
+sys.path.append('/opt/python')
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared'))
+
+from benchmark_service import benchmark_service
+from response_utils import success_response, internal_error_response
+
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Ingest benchmark index series and precompute period returns
+    Runs daily on a schedule; can also be called with:
+    - symbols: comma-separated subset of index symbols
+    - fullHistory: 'true' to backfill the full available history
+    """
+    try:
+        logger.info("Starting benchmark ingest")
+        
+        query_params = event.get('queryStringParameters') or {}
+        symbols = None
+        if query_params.get('symbols'):
+            symbols = [s.strip().upper() for s in query_params['symbols'].split(',') if s.strip()]
+        full_history = query_params.get('fullHistory', '').lower() == 'true'
+        
+        results = benchmark_service.ingest_all(symbols=symbols, full_history=full_history)
+        successful = len([r for r in results if r['success']])
+        
+        logger.info(f"Benchmark ingest completed: {successful}/{len(results)} indices")
+        
+        return success_response({
+            'message': f'Ingested {successful} of {len(results)} benchmark indices',
+            'results': results,
+            'timestamp': datetime.utcnow().isoformat()
+        })
+        
+    except Exception as e:
+        logger.error(f"Error ingesting benchmarks: {str(e)}")
+        return internal_error_response("Benchmark ingest failed")
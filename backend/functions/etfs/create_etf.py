@@ -15,8 +15,11 @@ import sys
 sys.path.append('/opt/python')
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared'))
 
-from dynamodb_client import db_client
+from portfolio_repository import portfolio_repository
 from market_data_service import market_data_service
+from valuation import value_holding
+from portfolio_summary import touch_portfolios
+from tag_index import tag_index, parse_tags
 from response_utils import success_response, created_response, bad_request_response, internal_error_response
 
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
@@ -48,10 +51,10 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             if field not in body:
                 return bad_request_response(f"{field} is required")
         
-        # Get table name from environment
-        table_name = os.environ.get('ETFS_TABLE')
+        # Table for the active data layout
+        table_name = portfolio_repository.table_name('etfs')
         if not table_name:
-            logger.error("ETFS_TABLE environment variable not set")
+            logger.error(f"ETFs table not configured for DATA_LAYOUT={portfolio_repository.layout}")
             return internal_error_response("Configuration error")
         
         # Extract and validate data
@@ -82,27 +85,6 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         except Exception as e:
             logger.warning(f"Could not fetch current price for {symbol}: {str(e)}")
         
-        # Calculate enhanced P&L values
-        total_cost_basis = (quantity * purchase_price) + purchase_fees
-        total_value = quantity * current_price
-        total_return = total_value - total_cost_basis
-        return_percentage = (total_return / total_cost_basis * Decimal('100')) if total_cost_basis > 0 else Decimal('0')
-        
-        # Calculate annual expense cost if expense ratio provided
-        annual_expense_cost = None
-        if expense_ratio and expense_ratio > 0:
-            annual_expense_cost = (total_value * expense_ratio) / Decimal('100')
-        
-        # Calculate days held
-        days_held = 0
-        try:
-            from datetime import datetime, date
-            purchase_dt = datetime.fromisoformat(purchase_date.replace('Z', '+00:00')).date()
-            current_dt = date.today()
-            days_held = (current_dt - purchase_dt).days
-        except:
-            days_held = 0
-        
         # Create ETF item
         etf_id = str(uuid.uuid4())
         now = datetime.utcnow().isoformat()
@@ -121,11 +103,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'currency': currency,
             'exchange': exchange,
             'category': category,
-            'totalCostBasis': total_cost_basis,
-            'totalValue': total_value,
-            'totalReturn': total_return,
-            'returnPercentage': return_percentage,
-            'daysHeld': days_held,
+            'tags': parse_tags(body.get('tags')),
             'createdAt': now,
             'updatedAt': now
         }
@@ -133,8 +111,6 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         # Add ETF-specific fields if provided
         if expense_ratio is not None:
             etf['expenseRatio'] = expense_ratio
-        if annual_expense_cost is not None:
-            etf['annualExpenseCost'] = annual_expense_cost
         if distribution_frequency:
             etf['distributionFrequency'] = distribution_frequency
         if last_distribution_amount is not None:
@@ -142,8 +118,13 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         if last_distribution_date:
             etf['lastDistributionDate'] = last_distribution_date
         
+        # Cost basis, value, return, days held and expense cost from the shared valuation kernel
+        etf.update(value_holding(etf))
+        
         # Save to DynamoDB
-        db_client.put_item(table_name, etf)
+        portfolio_repository.put_holding('etfs', etf)
+        touch_portfolios([portfolio_id], 'etfs')
+        tag_index.sync_assets('etfs', [(None, etf)])
         
         logger.info(f"Created ETF {symbol} with ID: {etf_id}")
         
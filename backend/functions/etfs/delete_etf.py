@@ -12,12 +12,17 @@ import sys
 sys.path.append('/opt/python')
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared'))
 
-from dynamodb_client import db_client
+from portfolio_repository import portfolio_repository
+from dynamodb_client import ItemNotFoundError
+from portfolio_summary import touch_portfolios
+from tag_index import tag_index
 from response_utils import success_response, bad_request_response, not_found_response, internal_error_response
 
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     Delete an ETF from portfolio
+    Query parameters:
+    - portfolioId: the ETF's portfolio, when known (addresses it directly)
     """
     try:
         logger.info("Deleting ETF")
@@ -29,24 +34,20 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         if not etf_id:
             return bad_request_response("ETF ID is required")
         
-        # Get table name from environment
-        table_name = os.environ.get('ETFS_TABLE')
+        # The holding's portfolio, when the client sends it, addresses the item directly
+        portfolio_id = (event.get('queryStringParameters') or {}).get('portfolioId')
+        
+        # Table for the active data layout
+        table_name = portfolio_repository.table_name('etfs')
         if not table_name:
-            logger.error("ETFS_TABLE environment variable not set")
+            logger.error(f"ETFs table not configured for DATA_LAYOUT={portfolio_repository.layout}")
             return internal_error_response("Configuration error")
         
-        # Check if ETF exists before deletion
-        try:
-            existing_etf = db_client.get_item(table_name, {'id': etf_id})
-            if not existing_etf:
-                return not_found_response("ETF not found")
-        except Exception as e:
-            logger.error(f"Error checking ETF existence: {str(e)}")
-            return internal_error_response("Failed to check ETF")
-        
-        # Delete the ETF
+        # Delete the ETF if it exists, getting back the deleted item in the same call
         try:
-            db_client.delete_item(table_name, {'id': etf_id})
+            existing_etf = portfolio_repository.delete_holding_by_id('etfs', etf_id, portfolio_id)
+            touch_portfolios([existing_etf.get('portfolioId')], 'etfs')
+            tag_index.sync_assets('etfs', [(existing_etf, None)])
             logger.info(f"Deleted ETF {etf_id}")
             
             return success_response({
@@ -54,6 +55,8 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 'deletedId': etf_id
             })
             
+        except ItemNotFoundError:
+            return not_found_response("ETF not found")
         except Exception as e:
             logger.error(f"Error deleting ETF: {str(e)}")
             return internal_error_response("Failed to delete ETF")
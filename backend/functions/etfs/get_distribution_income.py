@@ -0,0 +1,57 @@
+import json
+import os
+import logging
+from typing import Dict, Any
+
+# Set up logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Import shared utilities
+import sys
+sys.path.append('/opt/python')
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared'))
+
+from etf_distributions import distribution_store
+from portfolio_summary import get_portfolio_holdings
+from response_utils import success_response, bad_request_response, internal_error_response, conditional_get
+
+@conditional_get
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Distribution income for every ETF in a portfolio: trailing yield, payout growth,
+    annual income and a 12-month income calendar
+    """
+    try:
+        logger.info("Getting ETF distribution income")
+
+        # Get portfolio ID from path parameters
+        path_params = event.get('pathParameters', {})
+        portfolio_id = path_params.get('portfolioId')
+
+        if not portfolio_id:
+            return bad_request_response("Portfolio ID is required")
+
+        if not os.environ.get('ETF_DISTRIBUTIONS_TABLE'):
+            logger.error("ETF_DISTRIBUTIONS_TABLE environment variable not set")
+            return internal_error_response("Configuration error")
+
+        try:
+            etfs = get_portfolio_holdings(portfolio_id)['etfs']
+        except Exception as e:
+            logger.error(f"Error loading holdings for portfolio {portfolio_id}: {str(e)}")
+            return internal_error_response("Failed to retrieve holdings")
+
+        income = distribution_store.portfolio_income(etfs)
+
+        logger.info(f"Distribution income for portfolio {portfolio_id}: {len(income['etfs'])} ETFs, "
+                    f"{len(income['events'])} expected distributions")
+
+        return success_response({
+            'portfolioId': portfolio_id,
+            **income
+        })
+
+    except Exception as e:
+        logger.error(f"Error getting distribution income: {str(e)}")
+        return internal_error_response("Failed to retrieve distribution income")
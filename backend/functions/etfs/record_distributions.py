@@ -0,0 +1,66 @@
+import json
+import os
+import logging
+from typing import Dict, Any
+
+# Set up logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Import shared utilities
+import sys
+sys.path.append('/opt/python')
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared'))
+
+from etf_distributions import distribution_store, distribution_record
+from response_utils import created_response, bad_request_response, internal_error_response
+
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Record distributions for an ETF, shared by every holder of the symbol
+    Request body:
+    - distributions: list of {exDate, amount (per unit), payDate?, frankingPercentage?}
+    A distribution with an existing exDate replaces it.
+    """
+    try:
+        logger.info("Recording ETF distributions")
+
+        # Get symbol from path parameters
+        path_params = event.get('pathParameters', {})
+        symbol = path_params.get('symbol')
+
+        if not symbol:
+            return bad_request_response("Symbol is required")
+
+        if not os.environ.get('ETF_DISTRIBUTIONS_TABLE'):
+            logger.error("ETF_DISTRIBUTIONS_TABLE environment variable not set")
+            return internal_error_response("Configuration error")
+
+        try:
+            body = json.loads(event.get('body') or '{}')
+        except json.JSONDecodeError:
+            return bad_request_response("Invalid JSON in request body")
+
+        distributions = body.get('distributions')
+        if not isinstance(distributions, list) or not distributions:
+            return bad_request_response("distributions must be a non-empty list")
+
+        try:
+            records = [distribution_record(symbol, d.get('exDate'), d.get('amount'), d.get('payDate'),
+                                           d.get('frankingPercentage')) for d in distributions]
+        except (ValueError, ArithmeticError, AttributeError) as e:
+            return bad_request_response(f"Invalid distribution: {str(e)}")
+
+        written = distribution_store.put_distributions(records)
+
+        logger.info(f"Recorded {written} distributions for {symbol.upper()}")
+
+        return created_response({
+            'symbol': symbol.upper(),
+            'recorded': written,
+            'message': 'Distributions recorded successfully'
+        })
+
+    except Exception as e:
+        logger.error(f"Error recording distributions: {str(e)}")
+        return internal_error_response("Failed to record distributions")
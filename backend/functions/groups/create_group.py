@@ -0,0 +1,90 @@
+import json
+import os
+import logging
+import uuid
+from datetime import datetime
+from typing import Dict, Any
+
+# Set up logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Import shared utilities
+import sys
+sys.path.append('/opt/python')
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared'))
+
+from dynamodb_client import db_client
+from portfolio_groups import group_validation_error, unknown_portfolios, group_members
+from response_utils import created_response, bad_request_response, internal_error_response
+
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Create a portfolio group (family, household, investment club ...)
+    Request body:
+    - name (required), description, color
+    - type: family | business | investment_club | partnership | trust | other (default family)
+    - portfolioIds: member portfolios
+    - members: list of {userId, displayName?, role?, status?}
+    """
+    try:
+        logger.info("Creating portfolio group")
+
+        # Parse request body
+        if 'body' not in event:
+            return bad_request_response("Request body is required")
+
+        try:
+            body = json.loads(event['body'])
+        except json.JSONDecodeError:
+            return bad_request_response("Invalid JSON in request body")
+
+        if not body.get('name'):
+            return bad_request_response("Group name is required")
+
+        error = group_validation_error(body)
+        if error:
+            return bad_request_response(error)
+
+        # Get table names from environment
+        table_name = os.environ.get('GROUPS_TABLE')
+        portfolios_table = os.environ.get('PORTFOLIOS_TABLE')
+        if not table_name or not portfolios_table:
+            logger.error("GROUPS_TABLE or PORTFOLIOS_TABLE environment variable not set")
+            return internal_error_response("Configuration error")
+
+        portfolio_ids = list(dict.fromkeys(str(portfolio_id) for portfolio_id in body.get('portfolioIds', [])))
+        unknown = unknown_portfolios(portfolio_ids)
+        if unknown:
+            return bad_request_response(f"Unknown portfolios: {', '.join(unknown)}")
+
+        # Create group item
+        group_id = str(uuid.uuid4())
+        now = datetime.utcnow().isoformat()
+
+        group = {
+            'id': group_id,
+            'name': body['name'],
+            'description': body.get('description', ''),
+            'type': body.get('type', 'family'),
+            'color': body.get('color', '#3B82F6'),
+            'portfolioIds': portfolio_ids,
+            'members': group_members(body.get('members', []), now),
+            'createdAt': now,
+            'updatedAt': now,
+            'createdBy': body.get('createdBy', '')
+        }
+
+        # Save to DynamoDB
+        db_client.put_item(table_name, group)
+
+        logger.info(f"Created group with ID: {group_id}")
+
+        return created_response({
+            'group': group,
+            'message': 'Group created successfully'
+        })
+
+    except Exception as e:
+        logger.error(f"Error creating group: {str(e)}")
+        return internal_error_response("Failed to create group")
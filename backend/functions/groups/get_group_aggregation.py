@@ -0,0 +1,53 @@
+import json
+import os
+import logging
+from typing import Dict, Any
+
+# Set up logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Import shared utilities
+import sys
+sys.path.append('/opt/python')
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared'))
+
+from dynamodb_client import db_client
+from portfolio_groups import group_aggregator
+from response_utils import success_response, bad_request_response, not_found_response, internal_error_response, conditional_get
+
+@conditional_get
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Combined value, return, asset allocation and per-portfolio performance for every
+    portfolio in a group. Served from cache until the group or a member portfolio changes.
+    """
+    try:
+        logger.info("Getting group aggregation")
+
+        # Get group ID from path parameters
+        path_params = event.get('pathParameters', {})
+        group_id = path_params.get('groupId')
+
+        if not group_id:
+            return bad_request_response("Group ID is required")
+
+        # Get table name from environment
+        table_name = os.environ.get('GROUPS_TABLE')
+        if not table_name or not os.environ.get('PORTFOLIOS_TABLE'):
+            logger.error("GROUPS_TABLE or PORTFOLIOS_TABLE environment variable not set")
+            return internal_error_response("Configuration error")
+
+        group = db_client.get_item(table_name, {'id': group_id})
+        if not group:
+            return not_found_response("Group not found")
+
+        aggregation = group_aggregator.aggregate(group)
+
+        logger.info(f"Aggregated group {group_id} ({'cached' if aggregation['cached'] else 'computed'})")
+
+        return success_response(aggregation)
+
+    except Exception as e:
+        logger.error(f"Error getting group aggregation: {str(e)}")
+        return internal_error_response("Failed to retrieve group aggregation")
@@ -0,0 +1,91 @@
+import json
+import os
+import logging
+from datetime import datetime
+from typing import Dict, Any
+
+# Set up logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Import shared utilities
+import sys
+sys.path.append('/opt/python')
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared'))
+
+from dynamodb_client import db_client
+from portfolio_groups import group_validation_error, unknown_portfolios, group_members
+from response_utils import success_response, bad_request_response, not_found_response, internal_error_response
+
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Update a portfolio group
+    Request body (all optional): name, description, type, color, portfolioIds, members.
+    portfolioIds and members replace the existing lists.
+    """
+    try:
+        logger.info("Updating portfolio group")
+
+        # Get group ID from path parameters
+        path_params = event.get('pathParameters', {})
+        group_id = path_params.get('groupId')
+
+        if not group_id:
+            return bad_request_response("Group ID is required")
+
+        # Parse request body
+        if 'body' not in event:
+            return bad_request_response("Request body is required")
+
+        try:
+            body = json.loads(event['body'])
+        except json.JSONDecodeError:
+            return bad_request_response("Invalid JSON in request body")
+
+        error = group_validation_error(body)
+        if error:
+            return bad_request_response(error)
+
+        # Get table name from environment
+        table_name = os.environ.get('GROUPS_TABLE')
+        if not table_name or not os.environ.get('PORTFOLIOS_TABLE'):
+            logger.error("GROUPS_TABLE or PORTFOLIOS_TABLE environment variable not set")
+            return internal_error_response("Configuration error")
+
+        existing_group = db_client.get_item(table_name, {'id': group_id})
+        if not existing_group:
+            return not_found_response("Group not found")
+
+        now = datetime.utcnow().isoformat()
+        group = {**existing_group, 'updatedAt': now}
+        for field in ('name', 'description', 'type', 'color'):
+            if field in body:
+                group[field] = body[field]
+
+        if 'portfolioIds' in body:
+            portfolio_ids = list(dict.fromkeys(str(portfolio_id) for portfolio_id in body['portfolioIds']))
+            unknown = unknown_portfolios(portfolio_ids)
+            if unknown:
+                return bad_request_response(f"Unknown portfolios: {', '.join(unknown)}")
+            group['portfolioIds'] = portfolio_ids
+
+        if 'members' in body:
+            # Members already in the group keep their original join date
+            joined = {member.get('userId'): member.get('joinedAt') for member in existing_group.get('members', [])}
+            group['members'] = group_members([
+                {**member, 'joinedAt': joined.get(member['userId']) or now} for member in body['members']
+            ], now)
+
+        # Save to DynamoDB; the new updatedAt invalidates cached aggregations
+        db_client.put_item(table_name, group)
+
+        logger.info(f"Updated group {group_id}")
+
+        return success_response({
+            'group': group,
+            'message': 'Group updated successfully'
+        })
+
+    except Exception as e:
+        logger.error(f"Error updating group: {str(e)}")
+        return internal_error_response("Failed to update group")
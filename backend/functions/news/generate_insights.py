@@ -1,5 +1,4 @@
 import json
-import boto3
 import os
 from datetime import datetime
 from boto3.dynamodb.conditions import Key
@@ -8,19 +7,19 @@ import logging
 # Import shared modules
 import sys
 sys.path.append('/opt/python')
-sys.path.append('../../shared')
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared'))
 
+from aws_clients import get_table
 from response_utils import create_response, handle_error
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# Initialize AWS clients
-dynamodb = boto3.resource('dynamodb')
-news_table = dynamodb.Table(os.environ['NEWS_TABLE'])
+# Shared, pooled table handles
+news_table = get_table(os.environ['NEWS_TABLE'])
 
 # Bedrock client (will be used when ready)
-# bedrock_runtime = boto3.client('bedrock-runtime', region_name=os.environ.get('BEDROCK_REGION', 'us-east-1'))
+# bedrock_runtime = aws_clients.client('bedrock-runtime', os.environ.get('BEDROCK_REGION', 'us-east-1'))
 
 def handler(event, context):
     """
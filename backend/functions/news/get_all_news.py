@@ -1,71 +1,118 @@
 import json
-import boto3
+import heapq
 import os
 from datetime import datetime, timedelta
-from boto3.dynamodb.conditions import Key
 import logging
 
 # Import shared modules
 import sys
 sys.path.append('/opt/python')
-sys.path.append('../../shared')
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared'))
 
-from response_utils import create_response, handle_error
+from dynamodb_client import db_client
+from field_presets import resolve_fields
+from pagination import cursor_codec
+from response_utils import success_response, bad_request_response, internal_error_response, conditional_get
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# Initialize DynamoDB
-dynamodb = boto3.resource('dynamodb')
-news_table = dynamodb.Table(os.environ['NEWS_TABLE'])
+NEWS_TABLE = os.environ['NEWS_TABLE']
 
+# Scan calls one page without symbols may make to fill itself past filtered-out items
+MAX_SCAN_READS = 5
+
+def news_key(item):
+    """symbol-publishedAt-index position of a news item, as a page's last_key"""
+    return {'id': item['id'], 'symbol': item['symbol'], 'publishedAt': item['publishedAt']}
+
+def symbols_page(symbols, positions, limit, since, fields):
+    """
+    Newest limit items across symbols. positions maps each symbol not yet exhausted to the
+    key its previous page ended at (None: from the newest); each symbol is read one page
+    ahead and the pages merged, so every symbol contributes a prefix of its own order.
+    Returns the items and the positions for the next page (empty when all are exhausted).
+    """
+    pages = {}
+    for symbol in symbols:
+        if symbol in positions:
+            pages[symbol] = db_client.query_page(
+                NEWS_TABLE, 'symbol', symbol, limit, positions[symbol],
+                sort_key='publishedAt', start=since,
+                index_name='symbol-publishedAt-index', projection=fields, forward=False
+            )
+
+    # Ties on publishedAt go to the earlier symbol, so the merge order is deterministic
+    merged = heapq.merge(*(items for items, _ in pages.values()),
+                         key=lambda item: item['publishedAt'], reverse=True)
+    news = [item for _, item in zip(range(limit), merged)]
+
+    taken = {}
+    for item in news:
+        taken[item['symbol']] = taken.get(item['symbol'], 0) + 1
+    next_positions = {}
+    for symbol, (items, last_key) in pages.items():
+        count = taken.get(symbol, 0)
+        if count < len(items):
+            next_positions[symbol] = news_key(items[count - 1]) if count else positions[symbol]
+        elif last_key:
+            next_positions[symbol] = last_key
+    return news, next_positions
+
+def recent_page(limit, start_key, since, fields):
+    """
+    Up to limit items published since, across all symbols. publishedAt-index has no sort
+    key to range over, so this is a filtered Scan: pages follow table order, not time.
+    """
+    news, last_key = [], start_key
+    for _ in range(MAX_SCAN_READS):
+        items, last_key = db_client.scan_page(NEWS_TABLE, limit - len(news), last_key,
+                                              filter_expression='publishedAt >= :since',
+                                              expression_values={':since': since}, projection=fields)
+        news.extend(items)
+        if not last_key or len(news) >= limit:
+            break
+    return news, last_key
+
+@conditional_get
 def handler(event, context):
     """
     Get recent news items across all symbols
+    Query parameters:
+    - limit: items per page (default 20, at most 500)
+    - cursor: nextCursor from the previous page
+    - days, symbols
+    - fields: summary, table or full (default, includes rawData), or a comma-separated list
+    
+    With symbols, pages are newest first across the symbols. Without, pages are in table
+    order (newest first within a page) and can be short while nextCursor is still set.
     """
     try:
         # Get query parameters
         query_params = event.get('queryStringParameters') or {}
-        limit = int(query_params.get('limit', '20'))
         days = int(query_params.get('days', '3'))
-        symbols = query_params.get('symbols', '').split(',') if query_params.get('symbols') else None
+        fields = resolve_fields('news', query_params.get('fields'))
+        symbols = list(dict.fromkeys(symbol.strip().upper() for symbol in query_params.get('symbols', '').split(',')
+                                     if symbol.strip())) or None
         
         # Calculate date range
         end_date = datetime.utcnow()
         start_date = end_date - timedelta(days=days)
         start_date_str = start_date.isoformat()
         
+        # Cursors are only valid for the symbol set they were issued for
+        scope = f"news:{','.join(symbols)}" if symbols else 'news:*'
+        limit, position = cursor_codec.page_params(query_params, scope, default_limit=20)
+        
         logger.info(f"Fetching all news, limit: {limit}, days: {days}, symbols: {symbols}")
         
-        if symbols and len(symbols) > 0 and symbols[0]:
-            # Fetch news for specific symbols
-            all_news = []
-            for symbol in symbols:
-                symbol = symbol.strip().upper()
-                if not symbol:
-                    continue
-                    
-                response = news_table.query(
-                    IndexName='symbol-publishedAt-index',
-                    KeyConditionExpression=Key('symbol').eq(symbol) & 
-                                         Key('publishedAt').gte(start_date_str),
-                    ScanIndexForward=False,
-                    Limit=min(limit // len(symbols) + 5, 20)  # Distribute limit across symbols
-                )
-                all_news.extend(response.get('Items', []))
+        if symbols:
+            if position is None:
+                position = {symbol: None for symbol in symbols}
+            all_news, position = symbols_page(symbols, position, limit, start_date_str, fields)
         else:
-            # Fetch recent news across all symbols using publishedAt index
-            response = news_table.query(
-                IndexName='publishedAt-index',
-                KeyConditionExpression=Key('publishedAt').gte(start_date_str),
-                ScanIndexForward=False,
-                Limit=limit * 2  # Get more to account for filtering
-            )
-            all_news = response.get('Items', [])
-        
-        # Sort by publishedAt descending and limit results
-        all_news.sort(key=lambda x: x.get('publishedAt', ''), reverse=True)
-        all_news = all_news[:limit]
+            all_news, position = recent_page(limit, position, start_date_str, fields)
+            all_news.sort(key=lambda x: x.get('publishedAt', ''), reverse=True)
         
         # Group by symbol for easier frontend consumption
         news_by_symbol = {}
@@ -77,11 +124,12 @@ def handler(event, context):
         
         logger.info(f"Found {len(all_news)} news items across {len(news_by_symbol)} symbols")
         
-        return create_response(200, {
+        return success_response({
             'news': all_news,
             'newsBySymbol': news_by_symbol,
             'count': len(all_news),
             'symbolCount': len(news_by_symbol),
+            'nextCursor': cursor_codec.encode(position, scope),
             'dateRange': {
                 'from': start_date_str,
                 'to': end_date.isoformat()
@@ -90,7 +138,7 @@ def handler(event, context):
         })
         
     except ValueError as e:
-        return handle_error(f"Invalid parameter: {str(e)}", 400)
+        return bad_request_response(f"Invalid parameter: {str(e)}")
     except Exception as e:
         logger.error(f"Error fetching all news: {str(e)}")
-        return handle_error(f"Failed to fetch news: {str(e)}", 500)
\ No newline at end of file
+        return internal_error_response("Failed to fetch news")
\ No newline at end of file
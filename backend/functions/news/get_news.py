@@ -1,40 +1,47 @@
 import json
-import boto3
 import os
 from datetime import datetime, timedelta
-from boto3.dynamodb.conditions import Key
 import logging
 
 # Import shared modules
 import sys
 sys.path.append('/opt/python')
-sys.path.append('../../shared')
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared'))
 
-from response_utils import create_response, handle_error
+from dynamodb_client import db_client
+from field_presets import resolve_fields
+from pagination import cursor_codec
+from response_utils import success_response, bad_request_response, internal_error_response, conditional_get
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# Initialize DynamoDB
-dynamodb = boto3.resource('dynamodb')
-news_table = dynamodb.Table(os.environ['NEWS_TABLE'])
+NEWS_TABLE = os.environ['NEWS_TABLE']
 
+@conditional_get
 def handler(event, context):
     """
-    Get news items for a specific symbol
+    Get news items for a specific symbol, newest first
+    Query parameters:
+    - limit: items per page (default 10, at most 500)
+    - cursor: nextCursor from the previous page
+    - days
+    - fields: summary, table or full (default, includes rawData), or a comma-separated list
     """
     try:
         # Get symbol from path parameters
         symbol = event.get('pathParameters', {}).get('symbol')
         if not symbol:
-            return handle_error("Symbol is required", 400)
+            return bad_request_response("Symbol is required")
         
         symbol = symbol.upper()
         
         # Get query parameters
         query_params = event.get('queryStringParameters') or {}
-        limit = int(query_params.get('limit', '10'))
+        scope = f"news:{symbol}"
+        limit, start_key = cursor_codec.page_params(query_params, scope, default_limit=10)
         days = int(query_params.get('days', '7'))
+        fields = resolve_fields('news', query_params.get('fields'))
         
         # Calculate date range
         end_date = datetime.utcnow()
@@ -43,26 +50,20 @@ def handler(event, context):
         
         logger.info(f"Fetching news for symbol: {symbol}, limit: {limit}, days: {days}")
         
-        # Query news items for the symbol
-        response = news_table.query(
-            IndexName='symbol-publishedAt-index',
-            KeyConditionExpression=Key('symbol').eq(symbol) & 
-                                 Key('publishedAt').gte(start_date_str),
-            ScanIndexForward=False,  # Sort by publishedAt descending (newest first)
-            Limit=limit
+        # Query news items for the symbol, newest first; the index order is the page order
+        news_items, last_key = db_client.query_page(
+            NEWS_TABLE, 'symbol', symbol, limit, start_key,
+            sort_key='publishedAt', start=start_date_str,
+            index_name='symbol-publishedAt-index', projection=fields, forward=False
         )
         
-        news_items = response.get('Items', [])
-        
-        # Sort by publishedAt descending to ensure newest first
-        news_items.sort(key=lambda x: x.get('publishedAt', ''), reverse=True)
-        
         logger.info(f"Found {len(news_items)} news items for {symbol}")
         
-        return create_response(200, {
+        return success_response({
             'symbol': symbol,
             'news': news_items,
             'count': len(news_items),
+            'nextCursor': cursor_codec.encode(last_key, scope),
             'dateRange': {
                 'from': start_date_str,
                 'to': end_date.isoformat()
@@ -70,7 +71,7 @@ def handler(event, context):
         })
         
     except ValueError as e:
-        return handle_error(f"Invalid parameter: {str(e)}", 400)
+        return bad_request_response(f"Invalid parameter: {str(e)}")
     except Exception as e:
         logger.error(f"Error fetching news: {str(e)}")
-        return handle_error(f"Failed to fetch news: {str(e)}", 500)
\ No newline at end of file
+        return internal_error_response("Failed to fetch news")
\ No newline at end of file
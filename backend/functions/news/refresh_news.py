@@ -1,5 +1,4 @@
 import json
-import boto3
 import os
 import requests
 import uuid
@@ -10,18 +9,18 @@ import logging
 # Import shared modules
 import sys
 sys.path.append('/opt/python')
-sys.path.append('../../shared')
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared'))
 
+from aws_clients import get_table
 from response_utils import create_response, handle_error
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# Initialize AWS clients
-dynamodb = boto3.resource('dynamodb')
-news_table = dynamodb.Table(os.environ['NEWS_TABLE'])
-stocks_table = dynamodb.Table(os.environ['STOCKS_TABLE'])
-etfs_table = dynamodb.Table(os.environ['ETFS_TABLE'])
+# Shared, pooled table handles
+news_table = get_table(os.environ['NEWS_TABLE'])
+stocks_table = get_table(os.environ['STOCKS_TABLE'])
+etfs_table = get_table(os.environ['ETFS_TABLE'])
 
 def handler(event, context):
     """
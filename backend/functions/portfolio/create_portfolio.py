@@ -15,7 +15,7 @@ import sys
 sys.path.append('/opt/python')
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared'))
 
-from dynamodb_client import db_client
+from portfolio_repository import portfolio_repository
 from response_utils import success_response, created_response, bad_request_response, internal_error_response
 
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
@@ -38,10 +38,9 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         if 'name' not in body:
             return bad_request_response("Portfolio name is required")
         
-        # Get table name from environment
-        table_name = os.environ.get('PORTFOLIOS_TABLE')
-        if not table_name:
-            logger.error("PORTFOLIOS_TABLE environment variable not set")
+        # Table for the active data layout
+        if not portfolio_repository.table_name('portfolios'):
+            logger.error(f"Portfolios table not configured for DATA_LAYOUT={portfolio_repository.layout}")
             return internal_error_response("Configuration error")
         
         # Create portfolio item
@@ -60,7 +59,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         }
         
         # Save to DynamoDB
-        db_client.put_item(table_name, portfolio)
+        portfolio_repository.put_portfolio(portfolio)
         
         logger.info(f"Created portfolio with ID: {portfolio_id}")
         
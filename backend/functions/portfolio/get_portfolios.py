@@ -12,30 +12,40 @@ import sys
 sys.path.append('/opt/python')
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared'))
 
-from dynamodb_client import db_client
-from response_utils import success_response, internal_error_response
+from portfolio_repository import portfolio_repository
+from pagination import cursor_codec
+from response_utils import success_response, bad_request_response, internal_error_response, conditional_get
 
+@conditional_get
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
-    Get all portfolios
+    Get all portfolios, a page at a time
+    Query parameters:
+    - limit: portfolios per page (default 100, at most 500)
+    - cursor: nextCursor from the previous page
     """
     try:
         logger.info("Getting all portfolios")
         
-        # Get table name from environment
-        table_name = os.environ.get('PORTFOLIOS_TABLE')
-        if not table_name:
-            logger.error("PORTFOLIOS_TABLE environment variable not set")
+        # Table for the active data layout
+        if not portfolio_repository.table_name('portfolios'):
+            logger.error(f"Portfolios table not configured for DATA_LAYOUT={portfolio_repository.layout}")
             return internal_error_response("Configuration error")
         
-        # Scan the portfolios table
-        portfolios = db_client.scan_table(table_name)
+        query_params = event.get('queryStringParameters') or {}
+        try:
+            limit, start_key = cursor_codec.page_params(query_params, 'portfolios')
+        except ValueError as e:
+            return bad_request_response(str(e))
+        
+        portfolios, last_key = portfolio_repository.list_portfolios_page(limit, start_key)
         
         logger.info(f"Retrieved {len(portfolios)} portfolios")
         
         return success_response({
             'portfolios': portfolios,
-            'count': len(portfolios)
+            'count': len(portfolios),
+            'nextCursor': cursor_codec.encode(last_key, 'portfolios')
         })
         
     except Exception as e:
@@ -0,0 +1,62 @@
+import json
+import os
+import logging
+from typing import Dict, Any
+
+from botocore.exceptions import ClientError
+
+# Set up logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Import shared utilities
+import sys
+sys.path.append('/opt/python')
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared'))
+
+from corporate_actions import corporate_actions
+from response_utils import success_response, bad_request_response, not_found_response, error_response, internal_error_response
+
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Apply splits, consolidations and symbol changes from the corporate actions feed
+    to every affected holding; actions already recorded are skipped, and malformed feed rows
+    are skipped and listed in invalidRows. The feed comes from CORPORATE_ACTIONS_FILE, an s3://
+    location in the stage's reference data bucket (scripts/upload-reference-data.sh)
+    Query parameters:
+    - dryRun: 'true' to report the holdings that would change without writing
+    """
+    try:
+        logger.info("Applying corporate actions")
+
+        if not os.environ.get('CORPORATE_ACTIONS_TABLE'):
+            logger.error("CORPORATE_ACTIONS_TABLE environment variable not set")
+            return internal_error_response("Configuration error")
+
+        query_params = event.get('queryStringParameters') or {}
+        dry_run = query_params.get('dryRun', '').lower() == 'true'
+
+        try:
+            result = corporate_actions.apply_feed(dry_run=dry_run)
+        except FileNotFoundError:
+            logger.error(f"Corporate actions feed not found: {corporate_actions.feed_file}")
+            return not_found_response("Corporate actions feed not found")
+        except ValueError as e:
+            return bad_request_response(f"Invalid corporate action: {str(e)}")
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') != 'TransactionCanceledException':
+                raise
+            # A holding changed while the action was being applied; nothing in that transaction was written
+            logger.warning(f"Corporate action transaction cancelled: {str(e)}")
+            return error_response(409, "Holdings changed while applying corporate actions; retry", 'CONFLICT')
+
+        logger.info(f"Applied {result['applied']} of {result['actions']} corporate actions")
+
+        return success_response({
+            **result,
+            'message': 'Corporate actions checked' if dry_run else 'Corporate actions applied successfully'
+        })
+
+    except Exception as e:
+        logger.error(f"Error applying corporate actions: {str(e)}")
+        return internal_error_response("Failed to apply corporate actions")
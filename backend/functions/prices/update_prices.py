@@ -3,6 +3,7 @@ import os
 import logging
 import requests
 from datetime import datetime
+from decimal import Decimal
 from typing import Dict, Any, List
 
 # Set up logging
@@ -15,6 +16,10 @@ sys.path.append('/opt/python')
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared'))
 
 from dynamodb_client import db_client
+from portfolio_repository import portfolio_repository
+from valuation import value_holdings
+from portfolio_summary import touch_portfolios
+from tag_index import tag_index
 from response_utils import success_response, internal_error_response
 
 def get_stock_price(symbol: str, api_key: str) -> float:
@@ -69,8 +74,8 @@ def update_stock_prices():
             return False
         
         # Get table names
-        stocks_table = os.environ.get('STOCKS_TABLE')
-        etfs_table = os.environ.get('ETFS_TABLE')
+        stocks_table = portfolio_repository.table_name('stocks')
+        etfs_table = portfolio_repository.table_name('etfs')
         price_history_table = os.environ.get('PRICE_HISTORY_TABLE')
         
         if not all([stocks_table, etfs_table, price_history_table]):
@@ -79,82 +84,45 @@ def update_stock_prices():
         
         updated_count = 0
         
-        # Update stock prices
-        stocks = db_client.scan_table(stocks_table)
-        for stock in stocks:
-            symbol = stock['symbol']
-            new_price = get_stock_price(symbol, api_key)
+        # Fetch each distinct symbol once, then revalue every holding in one batch
+        for asset_class in ('stocks', 'etfs'):
+            holdings = portfolio_repository.scan_entities(asset_class)
             
-            if new_price:
-                # Calculate new values
-                quantity = stock['quantity']
-                average_price = stock['averagePrice']
-                total_value = quantity * new_price
-                total_cost = quantity * average_price
-                total_return = total_value - total_cost
-                return_percentage = (total_return / total_cost) * 100 if total_cost > 0 else 0.0
-                
-                # Update stock record
-                db_client.update_item(
-                    table_name=stocks_table,
-                    key={'id': stock['id']},
-                    update_expression='SET currentPrice = :price, totalValue = :value, totalReturn = :return, returnPercentage = :percentage, updatedAt = :updated',
-                    expression_values={
-                        ':price': new_price,
-                        ':value': total_value,
-                        ':return': total_return,
-                        ':percentage': return_percentage,
-                        ':updated': datetime.utcnow().isoformat()
-                    }
-                )
-                
-                # Save price history
-                db_client.put_item(price_history_table, {
-                    'symbol': symbol,
-                    'date': datetime.utcnow().isoformat(),
-                    'price': new_price
-                })
-                
-                updated_count += 1
-                logger.info(f"Updated {symbol}: ${new_price}")
-        
-        # Update ETF prices (similar logic)
-        etfs = db_client.scan_table(etfs_table)
-        for etf in etfs:
-            symbol = etf['symbol']
-            new_price = get_stock_price(symbol, api_key)
+            prices = {}
+            for symbol in {holding['symbol'] for holding in holdings}:
+                new_price = get_stock_price(symbol, api_key)
+                if new_price:
+                    prices[symbol] = Decimal(str(new_price))
+            
+            priced = [holding for holding in holdings if holding['symbol'] in prices]
+            now = datetime.utcnow().isoformat()
             
-            if new_price:
-                # Calculate new values
-                quantity = etf['quantity']
-                average_price = etf['averagePrice']
-                total_value = quantity * new_price
-                total_cost = quantity * average_price
-                total_return = total_value - total_cost
-                return_percentage = (total_return / total_cost) * 100 if total_cost > 0 else 0.0
-                
-                # Update ETF record
-                db_client.update_item(
-                    table_name=etfs_table,
-                    key={'id': etf['id']},
-                    update_expression='SET currentPrice = :price, totalValue = :value, totalReturn = :return, returnPercentage = :percentage, updatedAt = :updated',
+            changes = []
+            for holding, valuation in zip(priced, value_holdings(priced, prices)):
+                portfolio_repository.update_holding(
+                    asset_class, holding,
+                    update_expression='SET currentPrice = :price, totalCostBasis = :cost, totalValue = :value, totalReturn = :return, returnPercentage = :percentage, updatedAt = :updated',
                     expression_values={
-                        ':price': new_price,
-                        ':value': total_value,
-                        ':return': total_return,
-                        ':percentage': return_percentage,
-                        ':updated': datetime.utcnow().isoformat()
+                        ':price': valuation['currentPrice'],
+                        ':cost': valuation['totalCostBasis'],
+                        ':value': valuation['totalValue'],
+                        ':return': valuation['totalReturn'],
+                        ':percentage': valuation['returnPercentage'],
+                        ':updated': now
                     }
                 )
-                
-                # Save price history
-                db_client.put_item(price_history_table, {
-                    'symbol': symbol,
-                    'date': datetime.utcnow().isoformat(),
-                    'price': new_price
-                })
-                
+                changes.append((holding, {**holding, **valuation}))
                 updated_count += 1
+            
+            touch_portfolios((holding.get('portfolioId') for holding in priced), asset_class)
+            tag_index.sync_assets(asset_class, changes)
+            
+            # Save price history once per symbol
+            db_client.batch_put_items(price_history_table, [
+                {'symbol': symbol, 'date': now, 'price': new_price}
+                for symbol, new_price in prices.items()
+            ])
+            for symbol, new_price in prices.items():
                 logger.info(f"Updated {symbol}: ${new_price}")
         
         logger.info(f"Updated prices for {updated_count} securities")
@@ -15,7 +15,10 @@ import sys
 sys.path.append('/opt/python')
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared'))
 
-from dynamodb_client import db_client
+from portfolio_repository import portfolio_repository
+from valuation import value_property, suburb_from_address
+from portfolio_summary import touch_portfolios
+from tag_index import tag_index, parse_tags
 from response_utils import success_response, created_response, bad_request_response, internal_error_response
 
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
@@ -47,10 +50,10 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             if field not in body:
                 return bad_request_response(f"{field} is required")
         
-        # Get table name from environment
-        table_name = os.environ.get('PROPERTIES_TABLE')
+        # Table for the active data layout
+        table_name = portfolio_repository.table_name('properties')
         if not table_name:
-            logger.error("PROPERTIES_TABLE environment variable not set")
+            logger.error(f"Properties table not configured for DATA_LAYOUT={portfolio_repository.layout}")
             return internal_error_response("Configuration error")
         
         # Extract and validate data
@@ -68,16 +71,16 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         floor_area = Decimal(str(body.get('floorArea', 0))) if body.get('floorArea') else None
         year_built = body.get('yearBuilt')
         council_area = body.get('councilArea', '')
+        # Suburb selects the property's price index; taken from the address when not given
+        suburb = body.get('suburb') or suburb_from_address(address)
         
         # Purchase costs
         stamp_duty = Decimal(str(body.get('stampDuty', 0)))
         legal_fees = Decimal(str(body.get('legalFees', 0)))
         other_purchase_costs = Decimal(str(body.get('otherPurchaseCosts', 0)))
-        total_purchase_costs = purchase_price + stamp_duty + legal_fees + other_purchase_costs
         
         # Rental information
         weekly_rent = Decimal(str(body.get('weeklyRent', 0))) if body.get('weeklyRent') else None
-        annual_rental_income = (weekly_rent * 52) if weekly_rent else Decimal('0')
         tenant_name = body.get('tenantName', '')
         lease_start_date = body.get('leaseStartDate')
         lease_end_date = body.get('leaseEndDate')
@@ -93,27 +96,6 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         maintenance_repairs = Decimal(str(body.get('maintenanceRepairs', 0)))
         strata_fees = Decimal(str(body.get('strataFees', 0)))
         land_tax = Decimal(str(body.get('landTax', 0)))
-        total_annual_expenses = (council_rates + water_rates + insurance + 
-                               property_management_fees + maintenance_repairs + 
-                               strata_fees + land_tax)
-        
-        # Calculate derived fields
-        capital_growth = current_value - total_purchase_costs
-        capital_growth_percentage = (capital_growth / total_purchase_costs * Decimal('100')) if total_purchase_costs > 0 else Decimal('0')
-        gross_rental_yield = (annual_rental_income / current_value * Decimal('100')) if current_value > 0 else Decimal('0')
-        net_rental_yield = ((annual_rental_income - total_annual_expenses) / current_value * Decimal('100')) if current_value > 0 else Decimal('0')
-        annual_cash_flow = annual_rental_income - total_annual_expenses
-        total_return = capital_growth + annual_cash_flow
-        return_percentage = (total_return / total_purchase_costs * Decimal('100')) if total_purchase_costs > 0 else Decimal('0')
-        
-        # Calculate days held
-        days_held = 0
-        try:
-            purchase_dt = datetime.fromisoformat(purchase_date.replace('Z', '+00:00')).date()
-            current_dt = date.today()
-            days_held = (current_dt - purchase_dt).days
-        except:
-            days_held = 0
         
         # Valuation information
         valuation_date = body.get('valuationDate')
@@ -140,17 +122,17 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'floorArea': floor_area,
             'yearBuilt': year_built,
             'councilArea': council_area,
+            'suburb': suburb,
             
             # Purchase costs
             'stampDuty': stamp_duty,
             'legalFees': legal_fees,
             'otherPurchaseCosts': other_purchase_costs,
-            'totalPurchaseCosts': total_purchase_costs,
             
             # Rental information
             'weeklyRent': weekly_rent,
-            'annualRentalIncome': annual_rental_income,
             'tenantName': tenant_name,
+            'tags': parse_tags(body.get('tags')),
             'leaseStartDate': lease_start_date,
             'leaseEndDate': lease_end_date,
             'bondAmount': bond_amount,
@@ -165,17 +147,6 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'maintenanceRepairs': maintenance_repairs,
             'strataFees': strata_fees,
             'landTax': land_tax,
-            'totalAnnualExpenses': total_annual_expenses,
-            
-            # Calculated fields
-            'capitalGrowth': capital_growth,
-            'capitalGrowthPercentage': capital_growth_percentage,
-            'grossRentalYield': gross_rental_yield,
-            'netRentalYield': net_rental_yield,
-            'annualCashFlow': annual_cash_flow,
-            'totalReturn': total_return,
-            'returnPercentage': return_percentage,
-            'daysHeld': days_held,
             
             # Valuation information
             'valuationDate': valuation_date,
@@ -186,11 +157,16 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'updatedAt': now
         }
         
+        # Calculated fields from the shared valuation kernel
+        property_item.update(value_property(property_item))
+        
         # Remove None values to avoid DynamoDB issues
         property_item = {k: v for k, v in property_item.items() if v is not None}
         
         # Save to DynamoDB
-        db_client.put_item(table_name, property_item)
+        portfolio_repository.put_holding('properties', property_item)
+        touch_portfolios([portfolio_id], 'properties')
+        tag_index.sync_assets('properties', [(None, property_item)])
         
         logger.info(f"Created property {address} with ID: {property_id}")
         
@@ -12,12 +12,17 @@ import sys
 sys.path.append('/opt/python')
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared'))
 
-from dynamodb_client import db_client
+from portfolio_repository import portfolio_repository
+from dynamodb_client import ItemNotFoundError
+from portfolio_summary import touch_portfolios
+from tag_index import tag_index
 from response_utils import success_response, bad_request_response, not_found_response, internal_error_response
 
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     Delete a property from portfolio
+    Query parameters:
+    - portfolioId: the property's portfolio, when known (addresses it directly)
     """
     try:
         logger.info("Deleting property")
@@ -29,24 +34,20 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         if not property_id:
             return bad_request_response("Property ID is required")
         
-        # Get table name from environment
-        table_name = os.environ.get('PROPERTIES_TABLE')
+        # The holding's portfolio, when the client sends it, addresses the item directly
+        portfolio_id = (event.get('queryStringParameters') or {}).get('portfolioId')
+        
+        # Table for the active data layout
+        table_name = portfolio_repository.table_name('properties')
         if not table_name:
-            logger.error("PROPERTIES_TABLE environment variable not set")
+            logger.error(f"Properties table not configured for DATA_LAYOUT={portfolio_repository.layout}")
             return internal_error_response("Configuration error")
         
-        # Check if property exists before deletion
-        try:
-            existing_property = db_client.get_item(table_name, {'id': property_id})
-            if not existing_property:
-                return not_found_response("Property not found")
-        except Exception as e:
-            logger.error(f"Error checking property existence: {str(e)}")
-            return internal_error_response("Failed to check property")
-        
-        # Delete the property
+        # Delete the property if it exists, getting back the deleted item in the same call
         try:
-            db_client.delete_item(table_name, {'id': property_id})
+            existing_property = portfolio_repository.delete_holding_by_id('properties', property_id, portfolio_id)
+            touch_portfolios([existing_property.get('portfolioId')], 'properties')
+            tag_index.sync_assets('properties', [(existing_property, None)])
             logger.info(f"Deleted property {property_id}")
             
             return success_response({
@@ -54,6 +55,8 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 'deletedId': property_id
             })
             
+        except ItemNotFoundError:
+            return not_found_response("Property not found")
         except Exception as e:
             logger.error(f"Error deleting property: {str(e)}")
             return internal_error_response("Failed to delete property")
@@ -12,12 +12,22 @@ import sys
 sys.path.append('/opt/python')
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared'))
 
-from dynamodb_client import db_client
-from response_utils import success_response, bad_request_response, internal_error_response
+from portfolio_repository import portfolio_repository
+from field_presets import resolve_fields
+from pagination import cursor_codec
+from holdings_cache import holdings_cache
+from response_utils import (success_response, bad_request_response, internal_error_response, conditional_get,
+                            etag_matches, not_modified_response)
 
+@conditional_get
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     Get all properties for a specific portfolio
+    Query parameters:
+    - fields: summary, table or full (default), or a comma-separated list of attributes;
+      id and portfolioId are always included
+    - limit: items per page (default 100, at most 500)
+    - cursor: nextCursor from the previous page
     """
     try:
         logger.info("Getting properties for portfolio")
@@ -29,20 +39,30 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         if not portfolio_id:
             return bad_request_response("Portfolio ID is required")
         
-        # Get table name from environment
-        table_name = os.environ.get('PROPERTIES_TABLE')
+        # Table for the active data layout
+        table_name = portfolio_repository.table_name('properties')
         if not table_name:
-            logger.error("PROPERTIES_TABLE environment variable not set")
+            logger.error(f"Properties table not configured for DATA_LAYOUT={portfolio_repository.layout}")
             return internal_error_response("Configuration error")
         
-        # Query properties for the portfolio
+        query_params = event.get('queryStringParameters') or {}
         try:
-            properties = db_client.query_index(
-                table_name=table_name,
-                index_name='portfolioId-index',
-                key_condition='portfolioId = :portfolio_id',
-                expression_values={':portfolio_id': portfolio_id}
-            )
+            fields = resolve_fields('properties', query_params.get('fields'))
+            # Cursors are only valid for the list they were issued for
+            scope = f"properties:{portfolio_id}"
+            limit, start_key = cursor_codec.page_params(query_params, scope)
+        except ValueError as e:
+            return bad_request_response(str(e))
+        
+        # Query properties for the portfolio. The portfolio's properties version names the
+        # list, so a client that already has it is answered without reading the holdings
+        try:
+            versions = portfolio_repository.get_holdings_versions(portfolio_id)
+            etag = holdings_cache.etag('properties', portfolio_id, versions, fields, (limit, query_params.get('cursor')))
+            if etag and etag_matches(event, etag):
+                return not_modified_response(etag)
+            properties, last_key = holdings_cache.get_entity_holdings_page('properties', portfolio_id, limit, start_key,
+                                                                           fields, versions)
         except Exception as e:
             logger.error(f"Error querying properties for portfolio {portfolio_id}: {str(e)}")
             return internal_error_response("Failed to retrieve properties")
@@ -55,8 +75,9 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         
         return success_response({
             'properties': properties,
-            'count': len(properties)
-        })
+            'count': len(properties),
+            'nextCursor': cursor_codec.encode(last_key, scope)
+        }, etag=etag)
         
     except Exception as e:
         logger.error(f"Error getting properties: {str(e)}")
@@ -0,0 +1,91 @@
+import json
+import os
+import math
+import logging
+from typing import Dict, Any
+
+# Set up logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Import shared utilities
+import sys
+sys.path.append('/opt/python')
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared'))
+
+from portfolio_repository import portfolio_repository
+from property_projection import property_projection_engine, PROPERTY_SCENARIOS, MAX_PROJECTION_YEARS
+from response_utils import success_response, bad_request_response, not_found_response, internal_error_response, conditional_get
+
+CUSTOM_FIELDS = ('capitalGrowth', 'rentGrowth', 'expenseInflation', 'vacancyRate')
+
+@conditional_get
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Project a property's cash flow and equity over time under several scenarios
+    Query parameters:
+    - years: projection horizon, 1-30 (default 10)
+    - scenarios: comma-separated subset of conservative, base, optimistic (default all)
+    - capitalGrowth, rentGrowth, expenseInflation, vacancyRate: annual rates for an extra
+      'custom' scenario; unspecified rates come from the base scenario
+    - loanAmount, interestRate: interest-only loan to include in cash flow and equity
+    - portfolioId: the property's portfolio, when known (addresses it directly)
+    """
+    try:
+        logger.info("Projecting property")
+        
+        # Get property ID from path parameters
+        path_params = event.get('pathParameters', {})
+        property_id = path_params.get('propertyId')
+        
+        if not property_id:
+            return bad_request_response("Property ID is required")
+        
+        # Table for the active data layout
+        table_name = portfolio_repository.table_name('properties')
+        if not table_name:
+            logger.error(f"Properties table not configured for DATA_LAYOUT={portfolio_repository.layout}")
+            return internal_error_response("Configuration error")
+        
+        query_params = event.get('queryStringParameters') or {}
+        try:
+            years = int(query_params.get('years', 10))
+            loan_amount = float(query_params.get('loanAmount', 0))
+            interest_rate = float(query_params.get('interestRate', 0))
+            custom = {field: float(query_params[field]) for field in CUSTOM_FIELDS if field in query_params}
+        except ValueError:
+            return bad_request_response("years, rates and loan parameters must be numeric")
+        
+        # float() accepts 'nan' and 'inf', which would turn every projected figure into NaN
+        if not all(math.isfinite(value) for value in (loan_amount, interest_rate, *custom.values())):
+            return bad_request_response("rates and loan parameters must be finite numbers")
+        
+        if years < 1 or years > MAX_PROJECTION_YEARS:
+            return bad_request_response(f"years must be between 1 and {MAX_PROJECTION_YEARS}")
+        
+        names = [s.strip() for s in query_params.get('scenarios', '').split(',') if s.strip()] or list(PROPERTY_SCENARIOS)
+        unknown = [name for name in names if name not in PROPERTY_SCENARIOS]
+        if unknown:
+            return bad_request_response(f"Unknown scenarios: {', '.join(unknown)}")
+        
+        scenarios = {name: PROPERTY_SCENARIOS[name] for name in names}
+        if custom:
+            scenarios['custom'] = {**PROPERTY_SCENARIOS['base'], **custom}
+        
+        property_item = portfolio_repository.get_holding('properties', property_id, query_params.get('portfolioId'))
+        if not property_item:
+            return not_found_response("Property not found")
+        
+        projection = property_projection_engine.project(
+            property_item,
+            years=years,
+            scenarios=scenarios,
+            loan_amount=loan_amount,
+            interest_rate=interest_rate
+        )
+        
+        return success_response(projection)
+        
+    except Exception as e:
+        logger.error(f"Error projecting property: {str(e)}")
+        return internal_error_response("Failed to project property")
@@ -0,0 +1,54 @@
+import json
+import os
+import logging
+from datetime import datetime
+from typing import Dict, Any
+
+# Set up logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Import shared utilities
+import sys
+sys.path.append('/opt/python')
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared'))
+
+from property_revaluation import revalue_properties, DEFAULT_INDEX_FILE
+from portfolio_repository import portfolio_repository
+from response_utils import success_response, internal_error_response
+
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Revalue every property against the suburb/council-area price index
+    Runs monthly on a schedule; can also be called with:
+    - dryRun: 'true' to compute the new values without writing them
+    The index file (area,date,index CSV) comes from PROPERTY_INDEX_FILE, an s3:// location in the
+    stage's reference data bucket (scripts/upload-reference-data.sh), or data/property_price_index.csv
+    """
+    try:
+        logger.info("Starting property revaluation")
+        
+        if not portfolio_repository.table_name('properties'):
+            logger.error(f"Properties table not configured for DATA_LAYOUT={portfolio_repository.layout}")
+            return internal_error_response("Configuration error")
+        
+        index_path = os.environ.get('PROPERTY_INDEX_FILE') or DEFAULT_INDEX_FILE
+        
+        query_params = event.get('queryStringParameters') or {}
+        dry_run = query_params.get('dryRun', '').lower() == 'true'
+        
+        try:
+            result = revalue_properties(index_path, dry_run=dry_run)
+        except FileNotFoundError:
+            logger.error(f"Property price index file not found: {index_path}")
+            return internal_error_response("Configuration error")
+        
+        return success_response({
+            'message': f"Revalued {result['revalued']} of {result['properties']} properties",
+            **result,
+            'timestamp': datetime.utcnow().isoformat()
+        })
+        
+    except Exception as e:
+        logger.error(f"Error revaluing properties: {str(e)}")
+        return internal_error_response("Property revaluation failed")
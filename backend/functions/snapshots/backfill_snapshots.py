@@ -0,0 +1,68 @@
+import json
+import os
+import logging
+from datetime import date
+from typing import Dict, Any
+
+# Set up logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Import shared utilities
+import sys
+sys.path.append('/opt/python')
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared'))
+
+from portfolio_reconstruction import reconstruct_portfolio
+from response_utils import success_response, bad_request_response, internal_error_response
+
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Reconstruct historical snapshots for a portfolio from its holdings and stored daily bars
+    Request body (all optional):
+    - from: start date YYYY-MM-DD (default: earliest purchaseDate)
+    - to: end date YYYY-MM-DD (default: today)
+    - overwrite: replace snapshots written by the daily job (default false)
+    - fetchMissing: backfill price history for symbols without stored bars (default false)
+    """
+    try:
+        logger.info("Reconstructing portfolio snapshots")
+        
+        # Get portfolio ID from path parameters
+        path_params = event.get('pathParameters', {})
+        portfolio_id = path_params.get('portfolioId')
+        
+        if not portfolio_id:
+            return bad_request_response("Portfolio ID is required")
+        
+        if not os.environ.get('PORTFOLIO_SNAPSHOTS_TABLE'):
+            logger.error("PORTFOLIO_SNAPSHOTS_TABLE environment variable not set")
+            return internal_error_response("Configuration error")
+        
+        try:
+            body = json.loads(event.get('body') or '{}')
+        except json.JSONDecodeError:
+            return bad_request_response("Invalid JSON in request body")
+        
+        try:
+            start = date.fromisoformat(body['from']) if body.get('from') else None
+            end = date.fromisoformat(body['to']) if body.get('to') else None
+        except ValueError:
+            return bad_request_response("from and to must be dates in YYYY-MM-DD format")
+        
+        try:
+            result = reconstruct_portfolio(
+                portfolio_id,
+                start=start,
+                end=end,
+                overwrite=bool(body.get('overwrite', False)),
+                fetch_missing=bool(body.get('fetchMissing', False))
+            )
+        except ValueError as e:
+            return bad_request_response(str(e))
+        
+        return success_response(result)
+        
+    except Exception as e:
+        logger.error(f"Error reconstructing portfolio snapshots: {str(e)}")
+        return internal_error_response("Failed to reconstruct portfolio snapshots")
@@ -0,0 +1,40 @@
+import json
+import os
+import logging
+from datetime import datetime
+from typing import Dict, Any
+
+# Set up logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Import shared utilities
+import sys
+sys.path.append('/opt/python')
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared'))
+
+from portfolio_snapshots import snapshot_store
+from response_utils import success_response, internal_error_response
+
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Scheduled function to write one value snapshot per portfolio for today
+    """
+    try:
+        logger.info("Starting portfolio snapshot job")
+        
+        if not os.environ.get('PORTFOLIO_SNAPSHOTS_TABLE'):
+            logger.error("PORTFOLIO_SNAPSHOTS_TABLE environment variable not set")
+            return internal_error_response("Configuration error")
+        
+        result = snapshot_store.create_daily_snapshots()
+        
+        return success_response({
+            'message': f"Created {result['written']} portfolio snapshots",
+            **result,
+            'timestamp': datetime.utcnow().isoformat()
+        })
+        
+    except Exception as e:
+        logger.error(f"Error creating portfolio snapshots: {str(e)}")
+        return internal_error_response("Portfolio snapshot job failed")
@@ -0,0 +1,65 @@
+import json
+import os
+import logging
+from datetime import date, timedelta
+from typing import Dict, Any
+
+# Set up logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Import shared utilities
+import sys
+sys.path.append('/opt/python')
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared'))
+
+from portfolio_snapshots import snapshot_store
+from response_utils import success_response, bad_request_response, internal_error_response, conditional_get
+
+@conditional_get
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Get the daily value series for a portfolio
+    Query parameters:
+    - from: start date YYYY-MM-DD (default one year ago)
+    - to: end date YYYY-MM-DD (default today)
+    """
+    try:
+        logger.info("Getting portfolio snapshots")
+        
+        # Get portfolio ID from path parameters
+        path_params = event.get('pathParameters', {})
+        portfolio_id = path_params.get('portfolioId')
+        
+        if not portfolio_id:
+            return bad_request_response("Portfolio ID is required")
+        
+        if not os.environ.get('PORTFOLIO_SNAPSHOTS_TABLE'):
+            logger.error("PORTFOLIO_SNAPSHOTS_TABLE environment variable not set")
+            return internal_error_response("Configuration error")
+        
+        query_params = event.get('queryStringParameters') or {}
+        try:
+            end_date = date.fromisoformat(query_params.get('to') or date.today().isoformat())
+            start_date = date.fromisoformat(query_params.get('from') or (end_date - timedelta(days=365)).isoformat())
+        except ValueError:
+            return bad_request_response("from and to must be dates in YYYY-MM-DD format")
+        
+        if start_date > end_date:
+            return bad_request_response("from must not be after to")
+        
+        snapshots = snapshot_store.get_snapshots(portfolio_id, start_date.isoformat(), end_date.isoformat())
+        
+        logger.info(f"Retrieved {len(snapshots)} snapshots for portfolio {portfolio_id}")
+        
+        return success_response({
+            'portfolioId': portfolio_id,
+            'from': start_date.isoformat(),
+            'to': end_date.isoformat(),
+            'snapshots': snapshots,
+            'count': len(snapshots)
+        })
+        
+    except Exception as e:
+        logger.error(f"Error getting portfolio snapshots: {str(e)}")
+        return internal_error_response("Failed to retrieve portfolio snapshots")
@@ -15,7 +15,10 @@ import sys
 sys.path.append('/opt/python')
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared'))
 
-from dynamodb_client import db_client
+from portfolio_repository import portfolio_repository
+from valuation import value_holding, parse_purchase_date
+from portfolio_summary import touch_portfolios
+from tag_index import tag_index, parse_tags
 from response_utils import success_response, created_response, bad_request_response, internal_error_response
 
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
@@ -74,35 +77,19 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         
         # Validate purchase date if provided
         purchase_date = body.get('purchaseDate')
-        if purchase_date:
-            try:
-                from datetime import datetime
-                datetime.fromisoformat(purchase_date.replace('Z', '+00:00'))
-            except ValueError:
-                return bad_request_response("Invalid date format. Use ISO format (YYYY-MM-DD)")
-        
-        # Get table name from environment
-        table_name = os.environ.get('STOCKS_TABLE')
+        if purchase_date and not parse_purchase_date(purchase_date):
+            return bad_request_response("Invalid date format. Use ISO format (YYYY-MM-DD)")
+        
+        # Table for the active data layout
+        table_name = portfolio_repository.table_name('stocks')
         if not table_name:
-            logger.error("STOCKS_TABLE environment variable not set")
+            logger.error(f"Stocks table not configured for DATA_LAYOUT={portfolio_repository.layout}")
             return internal_error_response("Configuration error")
         
-        # Calculate values using enhanced P&L logic
-        total_cost_basis = (quantity * purchase_price) + purchase_fees
-        total_value = quantity * current_price
-        total_return = total_value - total_cost_basis
-        return_percentage = (total_return / total_cost_basis) * Decimal('100') if total_cost_basis > 0 else Decimal('0')
-        
-        # Calculate days held if purchase date provided
-        days_held = None
-        if purchase_date:
-            try:
-                from datetime import datetime, date
-                purchase_dt = datetime.fromisoformat(purchase_date.replace('Z', '+00:00')).date()
-                current_dt = date.today()
-                days_held = (current_dt - purchase_dt).days
-            except:
-                days_held = 0
+        try:
+            tags = parse_tags(body.get('tags'))
+        except ValueError as e:
+            return bad_request_response(str(e))
         
         # Create stock item
         stock_id = str(uuid.uuid4())
@@ -122,17 +109,18 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'currency': body.get('currency', 'USD'),
             'exchange': body.get('exchange'),
             'sector': body.get('sector'),
-            'totalCostBasis': total_cost_basis,
-            'totalValue': total_value,
-            'totalReturn': total_return,
-            'returnPercentage': return_percentage,
-            'daysHeld': days_held,
+            'tags': tags,
             'createdAt': now,
             'updatedAt': now
         }
         
+        # Cost basis, value, return and days held from the shared valuation kernel
+        stock.update(value_holding(stock))
+        
         # Save to DynamoDB
-        db_client.put_item(table_name, stock)
+        portfolio_repository.put_holding('stocks', stock)
+        touch_portfolios([portfolio_id], 'stocks')
+        tag_index.sync_assets('stocks', [(None, stock)])
         
         logger.info(f"Created stock {body['symbol']} with ID: {stock_id}")
         
@@ -12,12 +12,17 @@ import sys
 sys.path.append('/opt/python')
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared'))
 
-from dynamodb_client import db_client
+from portfolio_repository import portfolio_repository
+from dynamodb_client import ItemNotFoundError
+from portfolio_summary import touch_portfolios
+from tag_index import tag_index
 from response_utils import success_response, bad_request_response, internal_error_response, not_found_response
 
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     Delete a stock by ID
+    Query parameters:
+    - portfolioId: the stock's portfolio, when known (addresses it directly)
     """
     try:
         logger.info("Deleting stock")
@@ -29,36 +34,27 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         if not stock_id:
             return bad_request_response("Stock ID is required")
         
-        # Get table name from environment
-        table_name = os.environ.get('STOCKS_TABLE')
+        # The holding's portfolio, when the client sends it, addresses the item directly
+        portfolio_id = (event.get('queryStringParameters') or {}).get('portfolioId')
+        
+        # Table for the active data layout
+        table_name = portfolio_repository.table_name('stocks')
         if not table_name:
-            logger.error("STOCKS_TABLE environment variable not set")
+            logger.error(f"Stocks table not configured for DATA_LAYOUT={portfolio_repository.layout}")
             return internal_error_response("Configuration error")
         
-        # Check if stock exists first
+        # Delete the stock if it exists, getting back the deleted item in the same call
         try:
-            existing_stock = db_client.get_item(
-                table_name=table_name,
-                key={'id': stock_id}
-            )
-            
-            if not existing_stock:
-                return not_found_response("Stock not found")
-                
-        except Exception as e:
-            logger.error(f"Error checking stock existence: {str(e)}")
-            return internal_error_response("Failed to check stock")
-        
-        # Delete the stock
-        try:
-            db_client.delete_item(
-                table_name=table_name,
-                key={'id': stock_id}
-            )
+            existing_stock = portfolio_repository.delete_holding_by_id('stocks', stock_id, portfolio_id)
+        except ItemNotFoundError:
+            return not_found_response("Stock not found")
         except Exception as e:
             logger.error(f"Error deleting stock: {str(e)}")
             return internal_error_response("Failed to delete stock")
         
+        touch_portfolios([existing_stock.get('portfolioId')], 'stocks')
+        tag_index.sync_assets('stocks', [(existing_stock, None)])
+        
         logger.info(f"Successfully deleted stock {stock_id}")
         
         return success_response({
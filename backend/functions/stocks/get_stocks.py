@@ -12,12 +12,22 @@ import sys
 sys.path.append('/opt/python')
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared'))
 
-from dynamodb_client import db_client
-from response_utils import success_response, bad_request_response, internal_error_response
+from portfolio_repository import portfolio_repository
+from field_presets import resolve_fields
+from pagination import cursor_codec
+from holdings_cache import holdings_cache
+from response_utils import (success_response, bad_request_response, internal_error_response, conditional_get,
+                            etag_matches, not_modified_response)
 
+@conditional_get
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     Get stocks for a specific portfolio
+    Query parameters:
+    - fields: summary, table or full (default), or a comma-separated list of attributes;
+      id and portfolioId are always included
+    - limit: items per page (default 100, at most 500)
+    - cursor: nextCursor from the previous page
     """
     try:
         logger.info("Getting stocks for portfolio")
@@ -29,20 +39,30 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         if not portfolio_id:
             return bad_request_response("Portfolio ID is required")
         
-        # Get table name from environment
-        table_name = os.environ.get('STOCKS_TABLE')
+        # Table for the active data layout
+        table_name = portfolio_repository.table_name('stocks')
         if not table_name:
-            logger.error("STOCKS_TABLE environment variable not set")
+            logger.error(f"Stocks table not configured for DATA_LAYOUT={portfolio_repository.layout}")
             return internal_error_response("Configuration error")
         
-        # Query stocks by portfolio ID using GSI
+        query_params = event.get('queryStringParameters') or {}
         try:
-            stocks = db_client.query_index(
-                table_name=table_name,
-                index_name='portfolioId-index',
-                key_condition='portfolioId = :portfolio_id',
-                expression_values={':portfolio_id': portfolio_id}
-            )
+            fields = resolve_fields('stocks', query_params.get('fields'))
+            # Cursors are only valid for the list they were issued for
+            scope = f"stocks:{portfolio_id}"
+            limit, start_key = cursor_codec.page_params(query_params, scope)
+        except ValueError as e:
+            return bad_request_response(str(e))
+        
+        # Query stocks by portfolio ID. The portfolio's stocks version names the
+        # list, so a client that already has it is answered without reading the holdings
+        try:
+            versions = portfolio_repository.get_holdings_versions(portfolio_id)
+            etag = holdings_cache.etag('stocks', portfolio_id, versions, fields, (limit, query_params.get('cursor')))
+            if etag and etag_matches(event, etag):
+                return not_modified_response(etag)
+            stocks, last_key = holdings_cache.get_entity_holdings_page('stocks', portfolio_id, limit, start_key,
+                                                                       fields, versions)
         except Exception as e:
             logger.error(f"Error querying stocks: {str(e)}")
             return internal_error_response("Failed to query stocks")
@@ -52,8 +72,9 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         return success_response({
             'stocks': stocks,
             'portfolioId': portfolio_id,
-            'count': len(stocks)
-        })
+            'count': len(stocks),
+            'nextCursor': cursor_codec.encode(last_key, scope)
+        }, etag=etag)
         
     except Exception as e:
         logger.error(f"Error getting stocks: {str(e)}")
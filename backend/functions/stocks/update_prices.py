@@ -14,8 +14,11 @@ import sys
 sys.path.append('/opt/python')
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared'))
 
-from dynamodb_client import db_client
+from portfolio_repository import portfolio_repository
 from market_data_service import market_data_service
+from valuation import value_holdings
+from portfolio_summary import touch_portfolios
+from tag_index import tag_index
 from response_utils import success_response, bad_request_response, internal_error_response
 
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
@@ -34,10 +37,10 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         symbols_param = query_params.get('symbols')
         force_refresh = query_params.get('forceRefresh', '').lower() == 'true'
         
-        # Get table name from environment
-        table_name = os.environ.get('STOCKS_TABLE')
+        # Table for the active data layout
+        table_name = portfolio_repository.table_name('stocks')
         if not table_name:
-            logger.error("STOCKS_TABLE environment variable not set")
+            logger.error(f"Stocks table not configured for DATA_LAYOUT={portfolio_repository.layout}")
             return internal_error_response("Configuration error")
         
         stocks_to_update = []
@@ -45,12 +48,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         if portfolio_id:
             # Get all stocks in the portfolio
             try:
-                stocks_to_update = db_client.query_index(
-                    table_name=table_name,
-                    index_name='portfolioId-index',
-                    key_condition='portfolioId = :portfolio_id',
-                    expression_values={':portfolio_id': portfolio_id}
-                )
+                stocks_to_update = portfolio_repository.get_entity_holdings('stocks', portfolio_id)
             except Exception as e:
                 logger.error(f"Error querying stocks for portfolio {portfolio_id}: {str(e)}")
                 return internal_error_response("Failed to retrieve stocks")
@@ -59,10 +57,8 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             # Get specific stocks by symbols
             symbols = [s.strip().upper() for s in symbols_param.split(',')]
             try:
-                # For now, we'll scan the table to find stocks by symbol
-                # In production, you might want a symbol-based GSI for better performance
-                all_stocks = db_client.scan_table(table_name)
-                stocks_to_update = [stock for stock in all_stocks if stock.get('symbol', '').upper() in symbols]
+                stocks_to_update = [stock for symbol in dict.fromkeys(symbols)
+                                    for stock in portfolio_repository.holdings_by_symbol('stocks', symbol)]
             except Exception as e:
                 logger.error(f"Error finding stocks by symbols: {str(e)}")
                 return internal_error_response("Failed to retrieve stocks")
@@ -86,58 +82,45 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             logger.error(f"Error fetching market data: {str(e)}")
             return internal_error_response("Failed to fetch market data")
         
+        # Revalue every priced stock in one batch
+        priced_stocks = [stock for stock in stocks_to_update if stock['symbol'] in market_prices]
+        for stock in stocks_to_update:
+            if stock['symbol'] not in market_prices:
+                logger.warning(f"No market data available for {stock['symbol']}")
+        
+        valuations = value_holdings(
+            priced_stocks,
+            prices={symbol: data['price'] for symbol, data in market_prices.items()}
+        )
+        
         # Update stocks with new prices
         updated_stocks = []
+        # (before, after) pairs for the tag index
+        changes = []
         update_count = 0
         
-        for stock in stocks_to_update:
+        for stock, valuation in zip(priced_stocks, valuations):
             symbol = stock['symbol']
             
-            if symbol not in market_prices:
-                logger.warning(f"No market data available for {symbol}")
-                continue
-            
             try:
                 market_data = market_prices[symbol]
-                new_price = market_data['price']
-                
-                # Recalculate stock values with new price
-                quantity = Decimal(str(stock.get('quantity', 0)))
-                purchase_price = Decimal(str(stock.get('purchasePrice', stock.get('averagePrice', 0))))
-                purchase_fees = Decimal(str(stock.get('purchaseFees', 0)))
-                
-                # Calculate new values
-                total_cost_basis = (quantity * purchase_price) + purchase_fees
-                total_value = quantity * new_price
-                total_return = total_value - total_cost_basis
-                return_percentage = (total_return / total_cost_basis * Decimal('100')) if total_cost_basis > 0 else Decimal('0')
-                
-                # Calculate days held if purchase date available
-                days_held = stock.get('daysHeld')
-                purchase_date = stock.get('purchaseDate')
-                if purchase_date:
-                    try:
-                        from datetime import datetime, date
-                        purchase_dt = datetime.fromisoformat(purchase_date.replace('Z', '+00:00')).date()
-                        current_dt = date.today()
-                        days_held = (current_dt - purchase_dt).days
-                    except:
-                        pass
+                new_price = valuation['currentPrice']
                 
                 # Prepare update data
                 now = datetime.utcnow().isoformat()
                 update_data = {
                     'currentPrice': new_price,
-                    'totalValue': total_value,
-                    'totalReturn': total_return,
-                    'returnPercentage': return_percentage,
+                    'totalCostBasis': valuation['totalCostBasis'],
+                    'totalValue': valuation['totalValue'],
+                    'totalReturn': valuation['totalReturn'],
+                    'returnPercentage': valuation['returnPercentage'],
                     'updatedAt': now,
                     'lastPriceUpdate': now,
                     'priceSource': market_data['source']
                 }
                 
-                if days_held is not None:
-                    update_data['daysHeld'] = days_held
+                if valuation['daysHeld'] is not None:
+                    update_data['daysHeld'] = valuation['daysHeld']
                 
                 # Build update expression
                 update_expressions = []
@@ -150,15 +133,15 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 update_expression = "SET " + ", ".join(update_expressions)
                 
                 # Update the stock
-                updated_stock = db_client.update_item(
-                    table_name=table_name,
-                    key={'id': stock['id']},
+                updated_stock = portfolio_repository.update_holding(
+                    'stocks', stock,
                     update_expression=update_expression,
                     expression_values=expression_values
                 )
                 
                 updated_stocks.append({
                     'id': stock['id'],
+                    'portfolioId': stock.get('portfolioId'),
                     'symbol': symbol,
                     'oldPrice': str(stock.get('currentPrice', 0)),
                     'newPrice': str(new_price),
@@ -169,12 +152,16 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                     'ageHours': market_data.get('age_hours', 0)
                 })
                 
+                changes.append((stock, updated_stock))
                 update_count += 1
                 
             except Exception as e:
                 logger.error(f"Error updating stock {symbol}: {str(e)}")
                 continue
         
+        touch_portfolios((stock['portfolioId'] for stock in updated_stocks), 'stocks')
+        tag_index.sync_assets('stocks', changes)
+        
         logger.info(f"Successfully updated prices for {update_count} stocks")
         
         return success_response({
@@ -0,0 +1,75 @@
+import json
+import os
+import logging
+import uuid
+from datetime import datetime
+from typing import Dict, Any
+
+# Set up logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Import shared utilities
+import sys
+sys.path.append('/opt/python')
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared'))
+
+from tag_index import tag_index, TAG_CATEGORIES
+from response_utils import created_response, bad_request_response, internal_error_response
+
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Create or replace a tag definition
+    Request body:
+    - name (required), description, color
+    - category: strategy | timeframe | purpose | risk | geographic | tax | custom (default custom)
+    - id: keep a client-side id (e.g. the default tags); generated if omitted
+    - isDefault, isArchived
+    """
+    try:
+        logger.info("Creating tag")
+
+        # Parse request body
+        if 'body' not in event:
+            return bad_request_response("Request body is required")
+
+        try:
+            body = json.loads(event['body'])
+        except json.JSONDecodeError:
+            return bad_request_response("Invalid JSON in request body")
+
+        if not body.get('name'):
+            return bad_request_response("Tag name is required")
+
+        category = body.get('category', 'custom')
+        if category not in TAG_CATEGORIES:
+            return bad_request_response(f"category must be one of {', '.join(TAG_CATEGORIES)}")
+
+        if not os.environ.get('TAGS_TABLE'):
+            logger.error("TAGS_TABLE environment variable not set")
+            return internal_error_response("Configuration error")
+
+        now = datetime.utcnow().isoformat()
+        tag = tag_index.create_tag({
+            'id': str(body.get('id') or uuid.uuid4()),
+            'name': body['name'],
+            'description': body.get('description', ''),
+            'color': body.get('color', '#6B7280'),
+            'category': category,
+            'isDefault': bool(body.get('isDefault', False)),
+            'isArchived': bool(body.get('isArchived', False)),
+            'createdAt': body.get('createdAt', now),
+            'updatedAt': now,
+            'createdBy': body.get('createdBy', '')
+        })
+
+        logger.info(f"Created tag {tag['id']}")
+
+        return created_response({
+            'tag': tag,
+            'message': 'Tag created successfully'
+        })
+
+    except Exception as e:
+        logger.error(f"Error creating tag: {str(e)}")
+        return internal_error_response("Failed to create tag")
@@ -0,0 +1,54 @@
+import json
+import os
+import logging
+from typing import Dict, Any
+
+# Set up logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Import shared utilities
+import sys
+sys.path.append('/opt/python')
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared'))
+
+from tag_index import tag_index
+from response_utils import success_response, bad_request_response, internal_error_response, conditional_get
+
+@conditional_get
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Assets carrying a tag, from the inverted index, best return first
+    Query parameters:
+    - portfolioId: limit to one portfolio
+    """
+    try:
+        logger.info("Getting tagged assets")
+
+        # Get tag ID from path parameters
+        path_params = event.get('pathParameters', {})
+        tag_id = path_params.get('tagId')
+
+        if not tag_id:
+            return bad_request_response("Tag ID is required")
+
+        if not os.environ.get('TAGS_TABLE'):
+            logger.error("TAGS_TABLE environment variable not set")
+            return internal_error_response("Configuration error")
+
+        query_params = event.get('queryStringParameters') or {}
+        assets = tag_index.get_tag_assets(tag_id, query_params.get('portfolioId'))
+
+        logger.info(f"Retrieved {len(assets)} assets tagged {tag_id}")
+
+        return success_response({
+            'tagId': tag_id,
+            'assets': assets,
+            'bestPerformer': assets[0] if assets else None,
+            'worstPerformer': assets[-1] if assets else None,
+            'count': len(assets)
+        })
+
+    except Exception as e:
+        logger.error(f"Error getting tagged assets: {str(e)}")
+        return internal_error_response("Failed to retrieve tagged assets")
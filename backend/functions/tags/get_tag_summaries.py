@@ -0,0 +1,47 @@
+import json
+import os
+import logging
+from typing import Dict, Any
+
+# Set up logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Import shared utilities
+import sys
+sys.path.append('/opt/python')
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared'))
+
+from tag_index import tag_index
+from response_utils import success_response, internal_error_response, conditional_get
+
+@conditional_get
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Value, return and asset counts per tag, read from the maintained counters
+    Query parameters:
+    - portfolioId: limit to one portfolio (default all portfolios)
+    """
+    try:
+        logger.info("Getting tag summaries")
+
+        if not os.environ.get('TAGS_TABLE'):
+            logger.error("TAGS_TABLE environment variable not set")
+            return internal_error_response("Configuration error")
+
+        query_params = event.get('queryStringParameters') or {}
+        portfolio_id = query_params.get('portfolioId')
+
+        summaries = tag_index.get_summaries(portfolio_id)
+
+        logger.info(f"Retrieved {len(summaries)} tag summaries")
+
+        return success_response({
+            'portfolioId': portfolio_id,
+            'summaries': summaries,
+            'count': len(summaries)
+        })
+
+    except Exception as e:
+        logger.error(f"Error getting tag summaries: {str(e)}")
+        return internal_error_response("Failed to retrieve tag summaries")
@@ -0,0 +1,48 @@
+import json
+import os
+import logging
+from typing import Dict, Any
+
+# Set up logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Import shared utilities
+import sys
+sys.path.append('/opt/python')
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared'))
+
+from tag_index import tag_index
+from response_utils import success_response, internal_error_response, conditional_get
+
+@conditional_get
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Get every tag definition with its usageCount (assets carrying the tag)
+    Query parameters:
+    - includeArchived: 'true' to include archived tags
+    """
+    try:
+        logger.info("Getting tags")
+
+        if not os.environ.get('TAGS_TABLE'):
+            logger.error("TAGS_TABLE environment variable not set")
+            return internal_error_response("Configuration error")
+
+        query_params = event.get('queryStringParameters') or {}
+        include_archived = query_params.get('includeArchived', '').lower() == 'true'
+
+        tags = [tag for tag in tag_index.get_tags() if include_archived or not tag.get('isArchived')]
+        tags.sort(key=lambda tag: (tag.get('category', ''), tag.get('name', '')))
+
+        logger.info(f"Retrieved {len(tags)} tags")
+
+        return success_response({
+            'tags': tags,
+            'usage': {tag['id']: tag['usageCount'] for tag in tags},
+            'count': len(tags)
+        })
+
+    except Exception as e:
+        logger.error(f"Error getting tags: {str(e)}")
+        return internal_error_response("Failed to retrieve tags")
@@ -0,0 +1,39 @@
+import json
+import os
+import logging
+from typing import Dict, Any
+
+# Set up logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Import shared utilities
+import sys
+sys.path.append('/opt/python')
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared'))
+
+from tag_index import tag_index
+from response_utils import success_response, internal_error_response
+
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Recompute the tag index and counters from the holdings tables
+    Used after a bulk import or to repair counters after failed incremental updates
+    """
+    try:
+        logger.info("Rebuilding tag index")
+
+        if not os.environ.get('TAGS_TABLE'):
+            logger.error("TAGS_TABLE environment variable not set")
+            return internal_error_response("Configuration error")
+
+        result = tag_index.rebuild()
+
+        return success_response({
+            **result,
+            'message': 'Tag index rebuilt successfully'
+        })
+
+    except Exception as e:
+        logger.error(f"Error rebuilding tag index: {str(e)}")
+        return internal_error_response("Failed to rebuild tag index")
@@ -0,0 +1,80 @@
+import json
+import os
+import logging
+from typing import Dict, Any
+
+# Set up logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Import shared utilities
+import sys
+sys.path.append('/opt/python')
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared'))
+
+from tax_lots import tax_lot_store, MATCHING_METHODS
+from response_utils import created_response, bad_request_response, internal_error_response
+
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Record buy/sell transactions and update the portfolio's tax-lot ledger
+    Request body: a single transaction or {'transactions': [...], 'method': 'FIFO'}
+    Each transaction: type (BUY|SELL), symbol, quantity, price, date, optional fees,
+    optional lotSelections [{lotId, quantity}] for specific-ID sells
+    """
+    try:
+        logger.info("Recording transactions")
+        
+        # Get portfolio ID from path parameters
+        path_params = event.get('pathParameters', {})
+        portfolio_id = path_params.get('portfolioId')
+        
+        if not portfolio_id:
+            return bad_request_response("Portfolio ID is required")
+        
+        # Parse request body
+        if 'body' not in event:
+            return bad_request_response("Request body is required")
+        
+        try:
+            body = json.loads(event['body'])
+        except json.JSONDecodeError:
+            return bad_request_response("Invalid JSON in request body")
+        
+        if not os.environ.get('TAX_LOTS_TABLE'):
+            logger.error("TAX_LOTS_TABLE environment variable not set")
+            return internal_error_response("Configuration error")
+        
+        method = body.get('method')
+        if method and method.upper() not in MATCHING_METHODS:
+            return bad_request_response(f"method must be one of {', '.join(MATCHING_METHODS)}")
+        
+        transactions = body.get('transactions', [body])
+        if not transactions:
+            return bad_request_response("At least one transaction is required")
+        
+        try:
+            stored = tax_lot_store.add_transactions(portfolio_id, transactions)
+        except (ValueError, TypeError, ArithmeticError) as e:
+            return bad_request_response(f"Invalid transaction: {str(e)}")
+        
+        # Apply the new transactions to the stored lots
+        try:
+            result = tax_lot_store.process(portfolio_id, method=method.upper() if method else None)
+        except ValueError as e:
+            # e.g. a sell larger than the holding; the transactions stay stored for correction
+            logger.warning(f"Ledger update failed for portfolio {portfolio_id}: {str(e)}")
+            return bad_request_response(f"Transactions stored but ledger not updated: {str(e)}")
+        
+        logger.info(f"Recorded {len(stored)} transactions for portfolio {portfolio_id}")
+        
+        return created_response({
+            'portfolioId': portfolio_id,
+            'transactions': stored,
+            'ledger': result,
+            'message': f'Recorded {len(stored)} transactions'
+        })
+        
+    except Exception as e:
+        logger.error(f"Error recording transactions: {str(e)}")
+        return internal_error_response("Failed to record transactions")
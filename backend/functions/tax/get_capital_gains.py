@@ -0,0 +1,91 @@
+import json
+import os
+import logging
+from decimal import Decimal
+from typing import Dict, Any
+
+# Set up logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Import shared utilities
+import sys
+sys.path.append('/opt/python')
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared'))
+
+from tax_lots import tax_lot_store, summarize_by_financial_year, unrealized_gains, MATCHING_METHODS
+from portfolio_summary import get_portfolio_holdings
+from response_utils import success_response, bad_request_response, internal_error_response, conditional_get
+
+@conditional_get
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Realized and unrealized capital gains for a portfolio
+    Query parameters:
+    - method: FIFO | LIFO | SPECIFIC (default: the ledger's stored method)
+    - financialYear: e.g. 2024-25 to return a single year
+    """
+    try:
+        logger.info("Getting capital gains")
+        
+        # Get portfolio ID from path parameters
+        path_params = event.get('pathParameters', {})
+        portfolio_id = path_params.get('portfolioId')
+        
+        if not portfolio_id:
+            return bad_request_response("Portfolio ID is required")
+        
+        if not os.environ.get('TAX_LOTS_TABLE'):
+            logger.error("TAX_LOTS_TABLE environment variable not set")
+            return internal_error_response("Configuration error")
+        
+        query_params = event.get('queryStringParameters') or {}
+        method = query_params.get('method', '').upper() or None
+        if method and method not in MATCHING_METHODS:
+            return bad_request_response(f"method must be one of {', '.join(MATCHING_METHODS)}")
+        
+        state = tax_lot_store.get_state(portfolio_id) or {}
+        stored_method = state.get('method', 'FIFO')
+        
+        lots = tax_lot_store.get_open_lots(portfolio_id)
+        if ((method and method != stored_method) or state.get('needsReplay') or
+                tax_lot_store.is_stale(state, {lot['symbol'] for lot in lots})):
+            # What-if under another method, or lots a corporate action has not reached yet:
+            # replay in memory, leave the stored ledger alone
+            try:
+                ledger = tax_lot_store.replay(portfolio_id, method or stored_method)
+            except ValueError as e:
+                return bad_request_response(str(e))
+            disposals = ledger.disposals
+            lots = ledger.open_lots()
+        else:
+            disposals = tax_lot_store.get_disposals(portfolio_id)
+        
+        realized = summarize_by_financial_year(disposals)
+        if query_params.get('financialYear'):
+            realized = [year for year in realized if year['financialYear'] == query_params['financialYear']]
+        
+        # Value open lots at the holdings' current prices
+        holdings = get_portfolio_holdings(portfolio_id)
+        prices = {
+            item['symbol'].upper(): Decimal(str(item['currentPrice']))
+            for item in holdings['stocks'] + holdings['etfs'] if item.get('currentPrice') is not None
+        }
+        unrealized = unrealized_gains(
+            [{**lot, 'quantity': Decimal(str(lot['quantity'])), 'costPerUnit': Decimal(str(lot['costPerUnit']))}
+             for lot in lots],
+            prices
+        )
+        
+        logger.info(f"Capital gains for portfolio {portfolio_id}: {len(disposals)} disposals, {len(lots)} open lots")
+        
+        return success_response({
+            'portfolioId': portfolio_id,
+            'method': method or stored_method,
+            'realized': realized,
+            'unrealized': unrealized
+        })
+        
+    except Exception as e:
+        logger.error(f"Error getting capital gains: {str(e)}")
+        return internal_error_response("Failed to get capital gains")
@@ -1,13 +1,14 @@
 import json
 import jwt
 import os
-import boto3
 from functools import wraps
 from typing import Dict, Any, Optional
 import requests
 from botocore.exceptions import ClientError
 import logging
 
+from aws_clients import aws_clients
+
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
@@ -22,7 +23,7 @@ class AuthMiddleware:
         self.region = os.environ.get('REGION', 'ap-southeast-2')
         self.auth_enabled = os.environ.get('AUTH_ENABLED', 'true').lower() == 'true'
         self.jwt_secret = os.environ.get('JWT_SECRET', 'dev-secret-key-change-in-production')
-        self.cognito_client = boto3.client('cognito-idp', region_name=self.region)
+        self.cognito_client = aws_clients.client('cognito-idp', self.region)
         
         # Cache for JWKs
         self._jwks_cache = None
@@ -0,0 +1,110 @@
+import os
+import threading
+from typing import Dict, Optional
+
+import boto3
+from botocore.config import Config
+
+from dynamodb_metrics import dynamodb_metrics
+
+# Sized for the thread pools in dynamodb_client and the bulk jobs (max 8-16 workers)
+MAX_POOL_CONNECTIONS = int(os.environ.get('AWS_MAX_POOL_CONNECTIONS', '32'))
+
+# Lambda handlers should fail fast rather than wait out botocore's 60s defaults
+CONNECT_TIMEOUT_SECONDS = float(os.environ.get('AWS_CONNECT_TIMEOUT', '2'))
+READ_TIMEOUT_SECONDS = float(os.environ.get('AWS_READ_TIMEOUT', '10'))
+
+# Adaptive mode adds client-side rate limiting on top of exponential backoff, which keeps
+# bulk jobs from hammering a throttled table
+MAX_ATTEMPTS = int(os.environ.get('AWS_MAX_ATTEMPTS', '5'))
+
+DEFAULT_CONFIG = Config(
+    max_pool_connections=MAX_POOL_CONNECTIONS,
+    tcp_keepalive=True,
+    connect_timeout=CONNECT_TIMEOUT_SECONDS,
+    read_timeout=READ_TIMEOUT_SECONDS,
+    retries={'mode': 'adaptive', 'max_attempts': MAX_ATTEMPTS}
+)
+
+class AWSClientFactory:
+    """
+    One boto3 session per container with cached, tuned clients, resources and DynamoDB
+    Table handles. Creating a client parses the service model and builds a connection
+    pool, which costs milliseconds per call; handlers and shared modules should get
+    every AWS client from here so a warm container reuses the same pooled connections.
+
+    Low-level clients are thread-safe and can be shared across worker threads; resources
+    and Table handles should be used from one thread at a time.
+    """
+
+    def __init__(self):
+        self.region = os.environ.get('REGION', 'us-east-1')
+        self._session = None
+        self._clients = {}
+        self._resources = {}
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    def _get_session(self) -> boto3.session.Session:
+        # Called under the lock: sessions are not safe to create clients from concurrently
+        if self._session is None:
+            self._session = boto3.session.Session()
+        return self._session
+
+    def client(self, service: str, region: Optional[str] = None):
+        """Cached low-level client for a service, built on the tuned configuration"""
+        key = (service, region or self.region)
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = self._get_session().client(service, region_name=key[1], config=DEFAULT_CONFIG)
+                    self._clients[key] = client
+        return client
+
+    def resource(self, service: str, region: Optional[str] = None):
+        """Cached resource for a service, built on the tuned configuration"""
+        key = (service, region or self.region)
+        resource = self._resources.get(key)
+        if resource is None:
+            with self._lock:
+                resource = self._resources.get(key)
+                if resource is None:
+                    resource = self._get_session().resource(service, region_name=key[1], config=DEFAULT_CONFIG)
+                    self._resources[key] = resource
+        return resource
+
+    def table(self, table_name: str):
+        """Cached DynamoDB Table handle"""
+        table = self._tables.get(table_name)
+        if table is None:
+            table = self.resource('dynamodb').Table(table_name)
+            self._tables[table_name] = table
+        return table
+
+    def register_event(self, event_name: str, handler) -> None:
+        """
+        Register a botocore event handler (e.g. 'before-send.dynamodb') on the session and on
+        every client and resource already built, so it applies to all of them; used to route
+        calls to a local stand-in in benchmarks.
+        """
+        # The unique id stops a double registration where a client shares the session's emitter
+        unique_id = f"{event_name}:{id(handler)}"
+        with self._lock:
+            self._get_session().events.register(event_name, handler, unique_id=unique_id)
+            clients = list(self._clients.values()) + [resource.meta.client for resource in self._resources.values()]
+        for client in clients:
+            client.meta.events.register(event_name, handler, unique_id=unique_id)
+
+    def stats(self) -> Dict[str, int]:
+        return {'clients': len(self._clients), 'resources': len(self._resources), 'tables': len(self._tables)}
+
+# Singleton instance
+aws_clients = AWSClientFactory()
+
+# Capacity and latency metrics for every DynamoDB call made through the factory
+dynamodb_metrics.install(aws_clients)
+
+def get_table(table_name: str):
+    return aws_clients.table(table_name)
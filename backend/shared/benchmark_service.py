@@ -0,0 +1,189 @@
+import os
+import time
+import logging
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Dict, Any, List, Optional, Tuple
+
+from dynamodb_client import db_client
+from price_history import price_history
+
+logger = logging.getLogger()
+
+# Keep in sync with BENCHMARK_INDICES in frontend/src/services/benchmarkService.ts
+BENCHMARK_INDICES = [
+    {'symbol': '^AXJO', 'name': 'ASX 200', 'country': 'AU',
+     'description': 'S&P/ASX 200 Index - Top 200 Australian companies'},
+    {'symbol': '^AORD', 'name': 'All Ordinaries', 'country': 'AU',
+     'description': 'All Ordinaries Index - Broader Australian market'},
+    {'symbol': '^GSPC', 'name': 'S&P 500', 'country': 'US',
+     'description': 'S&P 500 Index - Top 500 US companies'},
+    {'symbol': '^IXIC', 'name': 'NASDAQ', 'country': 'US',
+     'description': 'NASDAQ Composite Index - US technology focus'},
+    {'symbol': '^DJI', 'name': 'Dow Jones', 'country': 'US',
+     'description': 'Dow Jones Industrial Average - 30 major US companies'},
+    {'symbol': '^FTSE', 'name': 'FTSE 100', 'country': 'UK',
+     'description': 'FTSE 100 Index - Top 100 UK companies'},
+]
+
+# Keep in sync with PERFORMANCE_PERIODS in frontend/src/services/benchmarkService.ts
+PERFORMANCE_PERIODS = {
+    '1w': 7,
+    '1m': 30,
+    '3m': 90,
+    '6m': 180,
+    '1y': 365,
+    '2y': 730,
+    '3y': 1095,
+    '5y': 1825,
+}
+
+# Summaries change once a day, so warm containers can reuse them for a while
+SUMMARY_CACHE_TTL_SECONDS = 900
+
+def calculate_period_returns(closes: List[Tuple[str, Decimal]]) -> Dict[str, Decimal]:
+    """
+    Calculate percentage returns for every performance period from an ascending close series.
+    The base close is the last one on or before the period start; periods longer than the
+    series are omitted.
+    """
+    if not closes:
+        return {}
+
+    dates = [day for day, _ in closes]
+    last_day, last_close = closes[-1]
+    as_of = date.fromisoformat(last_day)
+
+    returns = {}
+    for period, days in PERFORMANCE_PERIODS.items():
+        start = (as_of - timedelta(days=days)).isoformat()
+        if start < dates[0]:
+            continue
+
+        # Binary search for the last close on or before the period start
+        lo, hi = 0, len(dates) - 1
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if dates[mid] <= start:
+                lo = mid
+            else:
+                hi = mid - 1
+
+        base_close = closes[lo][1]
+        if base_close > 0:
+            returns[period] = round((last_close / base_close - 1) * Decimal('100'), 4)
+
+    return returns
+
+class BenchmarkService:
+    def __init__(self):
+        self.table_name = os.environ.get('BENCHMARKS_TABLE')
+        self._summary_cache = None
+        self._summary_cached_at = 0.0
+
+    def ingest_index(self, index: Dict[str, str], full_history: bool = False) -> Dict[str, Any]:
+        """
+        Fetch, store and summarize one benchmark index.
+        The series goes into PRICE_HISTORY_TABLE; the precomputed returns go into BENCHMARKS_TABLE.
+        """
+        from market_data_service import market_data_service
+
+        symbol = index['symbol']
+        bars = market_data_service.get_daily_series(symbol, full_history=full_history)
+        if not bars:
+            raise ValueError(f"No daily series available for {symbol}")
+
+        price_history.put_daily_closes(symbol, bars, source='benchmark-ingest')
+
+        # Recompute from the stored series so older bars from previous runs count too
+        start = (date.today() - timedelta(days=max(PERFORMANCE_PERIODS.values()) + 10)).isoformat()
+        closes = price_history.get_daily_closes(symbol, start_date=start)
+        last_day, last_close = closes[-1]
+
+        summary = {
+            **index,
+            'lastClose': last_close,
+            'asOf': last_day,
+            'returns': calculate_period_returns(closes),
+            'seriesLength': len(closes),
+            'updatedAt': datetime.utcnow().isoformat()
+        }
+
+        if self.table_name:
+            db_client.put_item(self.table_name, summary)
+        else:
+            logger.warning("BENCHMARKS_TABLE not configured, summary not stored")
+
+        return summary
+
+    def ingest_all(self, symbols: Optional[List[str]] = None, full_history: bool = False) -> List[Dict[str, Any]]:
+        """Ingest every configured index (or the given subset)"""
+        results = []
+        for index in BENCHMARK_INDICES:
+            if symbols and index['symbol'] not in symbols:
+                continue
+            try:
+                summary = self.ingest_index(index, full_history=full_history)
+                results.append({'symbol': index['symbol'], 'success': True,
+                                'asOf': summary['asOf'], 'seriesLength': summary['seriesLength']})
+            except Exception as e:
+                logger.error(f"Error ingesting benchmark {index['symbol']}: {str(e)}")
+                results.append({'symbol': index['symbol'], 'success': False, 'error': str(e)})
+
+        self._summary_cache = None
+        return results
+
+    def get_summaries(self) -> List[Dict[str, Any]]:
+        """Get precomputed index summaries, shared by every portfolio in this container"""
+        now = time.time()
+        if self._summary_cache is not None and now - self._summary_cached_at < SUMMARY_CACHE_TTL_SECONDS:
+            return self._summary_cache
+
+        if not self.table_name:
+            logger.warning("BENCHMARKS_TABLE not configured")
+            return []
+
+        summaries = db_client.batch_get_items(
+            self.table_name, [{'symbol': index['symbol']} for index in BENCHMARK_INDICES]
+        )
+        order = {index['symbol']: position for position, index in enumerate(BENCHMARK_INDICES)}
+        summaries.sort(key=lambda item: order.get(item['symbol'], len(order)))
+
+        self._summary_cache = summaries
+        self._summary_cached_at = now
+        return summaries
+
+    def compare(self, portfolio_return: Optional[Decimal], period: str,
+                symbols: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Compare a portfolio's return over one period against every index's return over
+        the same period; without a portfolio return only the index returns are listed
+        """
+        comparisons = []
+        for summary in self.get_summaries():
+            if symbols and summary['symbol'] not in symbols:
+                continue
+
+            benchmark_return = summary.get('returns', {}).get(period)
+            if benchmark_return is None:
+                continue
+
+            outperformance = None
+            if portfolio_return is not None:
+                outperformance = portfolio_return - Decimal(str(benchmark_return))
+            comparisons.append({
+                'symbol': summary['symbol'],
+                'name': summary.get('name'),
+                'country': summary.get('country'),
+                'period': period,
+                'benchmarkReturn': benchmark_return,
+                'portfolioReturn': portfolio_return,
+                'outperformance': outperformance,
+                'alpha': outperformance,
+                'asOf': summary.get('asOf')
+            })
+
+        return comparisons
+
+# Singleton instance
+benchmark_service = BenchmarkService()
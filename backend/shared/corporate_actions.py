@@ -0,0 +1,269 @@
+import io
+import os
+import csv
+import time
+import logging
+import threading
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Any, List, Optional, Tuple
+
+from dynamodb_client import db_client, TRANSACTION_LIMIT
+from portfolio_repository import portfolio_repository
+from valuation import value_holding, to_decimal, parse_purchase_date
+from reference_data import read_text
+
+logger = logging.getLogger()
+
+ACTION_TYPES = ('split', 'consolidation', 'symbol_change')
+
+# Offline runs read data/; deployed stages set CORPORATE_ACTIONS_FILE to the reference data bucket
+DEFAULT_FEED_FILE = os.path.join(os.path.dirname(__file__), '../data/corporate_actions.csv')
+
+# Actions are few and change rarely; containers reload the whole table at most this often
+ACTIONS_CACHE_TTL_SECONDS = 900
+
+# Asset classes that carry listed symbols
+LISTED_ASSET_CLASSES = ('stocks', 'etfs')
+
+def parse_ratio(value: Any) -> Decimal:
+    """'2:1' (two new shares per old share) -> 2, '1:10' -> 0.1, '3' -> 3"""
+    text = str(value or '').strip()
+    try:
+        if ':' in text:
+            new, old = text.split(':', 1)
+            ratio = Decimal(new.strip()) / Decimal(old.strip())
+        else:
+            ratio = Decimal(text)
+    except (InvalidOperation, ArithmeticError):
+        raise ValueError(f"Invalid ratio: {value}")
+    if not ratio.is_finite() or ratio <= 0:
+        raise ValueError(f"Invalid ratio: {value}")
+    return ratio
+
+def action_key(action: Dict[str, Any]) -> str:
+    return f"{action['exDate']}#{action['type']}"
+
+def parse_action(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate one feed row (symbol, exDate, type, ratio, newSymbol) into an action"""
+    action_type = str(row.get('type') or '').strip().lower()
+    if action_type not in ACTION_TYPES:
+        raise ValueError(f"type must be one of {', '.join(ACTION_TYPES)}")
+    symbol = str(row.get('symbol') or '').strip().upper()
+    if not symbol:
+        raise ValueError("symbol is required")
+    ex_day = parse_purchase_date(row.get('exDate'))
+    if not ex_day:
+        raise ValueError(f"Invalid exDate: {row.get('exDate')}")
+
+    action = {'symbol': symbol, 'exDate': ex_day.isoformat(), 'type': action_type}
+    if action_type == 'symbol_change':
+        new_symbol = str(row.get('newSymbol') or '').strip().upper()
+        if not new_symbol or new_symbol == symbol:
+            raise ValueError("symbol_change needs a different newSymbol")
+        action['newSymbol'] = new_symbol
+    else:
+        action['factor'] = parse_ratio(row.get('ratio'))
+    action['actionKey'] = action_key(action)
+    return action
+
+def load_feed(path: str) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    Read a corporate actions CSV (symbol,exDate,type,ratio,newSymbol) from a local path or
+    s3:// location. A malformed row is logged and skipped so it cannot hold back the rest.
+    Returns (actions in ex-date order, an error per skipped row).
+    """
+    actions, errors = [], []
+    for line, row in enumerate(csv.DictReader(io.StringIO(read_text(path))), start=2):
+        try:
+            actions.append(parse_action(row))
+        except ValueError as e:
+            errors.append(f"{os.path.basename(path)} line {line}: {str(e)}")
+            logger.warning(f"Skipping corporate action: {errors[-1]}")
+    return sorted(actions, key=lambda action: (action['exDate'], action['symbol'])), errors
+
+def adjust_closes(closes: List[Tuple[str, Decimal]], actions: List[Dict[str, Any]]) -> List[Tuple[str, Decimal]]:
+    """
+    Divide each close by the product of the split/consolidation factors that take effect
+    after it, so the series is comparable with today's share count.
+    """
+    splits = sorted((action['exDate'], to_decimal(action['factor'])) for action in actions if 'factor' in action)
+    if not splits or not closes:
+        return closes
+
+    # Walk backwards accumulating the factor of every later ex-date
+    adjusted = []
+    factor = Decimal('1')
+    pending = list(splits)
+    for day, close in reversed(closes):
+        while pending and pending[-1][0] > day:
+            factor *= pending.pop()[1]
+        adjusted.append((day, close / factor if factor != 1 else close))
+    adjusted.reverse()
+    return adjusted
+
+class CorporateActionsStore:
+    """
+    Applied corporate actions in CORPORATE_ACTIONS_TABLE, keyed (symbol, actionKey = exDate#type).
+    Splits and consolidations carry the adjustment factor used to adjust price history at
+    read time; a symbol change is stored under the old symbol and as an alias under the new one.
+    Tax lots are not rewritten here: tax_lots applies recorded actions to open lots on replay,
+    and treats a ledger processed before an action was recorded as stale.
+    """
+
+    def __init__(self):
+        self.table_name = os.environ.get('CORPORATE_ACTIONS_TABLE')
+        self.feed_file = os.environ.get('CORPORATE_ACTIONS_FILE') or DEFAULT_FEED_FILE
+        self._by_symbol = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def get_actions(self, symbol: str) -> List[Dict[str, Any]]:
+        """Actions recorded under a symbol, oldest first (whole table cached per container)"""
+        if not self.table_name:
+            return []
+        with self._lock:
+            if self._by_symbol is None or time.time() - self._loaded_at > ACTIONS_CACHE_TTL_SECONDS:
+                by_symbol = defaultdict(list)
+                for item in db_client.scan_table(self.table_name):
+                    by_symbol[item['symbol']].append(item)
+                for items in by_symbol.values():
+                    items.sort(key=lambda item: item['actionKey'])
+                self._by_symbol = dict(by_symbol)
+                self._loaded_at = time.time()
+            return self._by_symbol.get(symbol.upper(), [])
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._by_symbol = None
+
+    def _listed_holdings(self, symbol: str) -> Dict[str, List[Dict[str, Any]]]:
+        return {asset_class: portfolio_repository.holdings_by_symbol(asset_class, symbol)
+                if portfolio_repository.table_name(asset_class) else []
+                for asset_class in LISTED_ASSET_CLASSES}
+
+    def _adjusted_holding(self, holding: Dict[str, Any], action: Dict[str, Any], action_id: str) -> Optional[Dict[str, Any]]:
+        """The holding after the action, or None if it does not apply"""
+        if action_id in (holding.get('appliedCorporateActions') or []):
+            return None
+        updated = {**holding, 'appliedCorporateActions': list(holding.get('appliedCorporateActions') or []) + [action_id]}
+
+        if action['type'] == 'symbol_change':
+            updated['symbol'] = action['newSymbol']
+            if holding.get('name') in (None, '', holding.get('symbol')):
+                updated['name'] = action['newSymbol']
+            return updated
+
+        # Holdings bought on or after the ex-date are already in post-action units
+        purchased = parse_purchase_date(holding.get('purchaseDate'))
+        if purchased and purchased.isoformat() >= action['exDate']:
+            return None
+
+        factor = to_decimal(action['factor'])
+        updated['quantity'] = to_decimal(holding.get('quantity')) * factor
+        for field in ('purchasePrice', 'averagePrice'):
+            if holding.get(field) is not None:
+                updated[field] = to_decimal(holding[field]) / factor
+        # A price fetched before the ex-date is still in pre-action units
+        priced_at = str(holding.get('lastPriceUpdate') or holding.get('updatedAt') or '')[:10]
+        if holding.get('currentPrice') is not None and priced_at < action['exDate']:
+            updated['currentPrice'] = to_decimal(holding['currentPrice']) / factor
+        updated.update(value_holding(updated))
+        return updated
+
+    def apply_action(self, action: Dict[str, Any], dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Apply one action to every holding of the symbol and record it.
+
+        Each holding is rewritten with a condition on its updatedAt, so a concurrent edit
+        fails the transaction instead of being overwritten. Writes go in transactions of up
+        to TRANSACTION_LIMIT operations with the action record in the last one; holdings
+        carry the applied action id, so re-running after a partial failure is safe.
+        """
+        symbol = action['symbol']
+        action_id = f"{symbol}#{action['actionKey']}"
+        now = datetime.utcnow().isoformat()
+
+        changes = {}
+        operations = []
+        for asset_class, holdings in self._listed_holdings(symbol).items():
+            table_name = portfolio_repository.table_name(asset_class)
+            for holding in holdings:
+                updated = self._adjusted_holding(holding, action, action_id)
+                if updated is None:
+                    continue
+                updated['updatedAt'] = now
+                changes.setdefault(asset_class, []).append((holding, updated))
+                operations.append({'Put': {
+                    'TableName': table_name,
+                    'Item': portfolio_repository.storage_item(asset_class, updated),
+                    'ConditionExpression': 'updatedAt = :expected' if holding.get('updatedAt') else 'attribute_not_exists(updatedAt)',
+                    'ExpressionAttributeValues': {':expected': holding['updatedAt']} if holding.get('updatedAt') else None
+                }})
+        for operation in operations:
+            if operation['Put']['ExpressionAttributeValues'] is None:
+                del operation['Put']['ExpressionAttributeValues']
+
+        records = [{**action, 'appliedAt': now, 'holdingsAdjusted': len(operations)}]
+        if action['type'] == 'symbol_change':
+            records.append({
+                'symbol': action['newSymbol'], 'exDate': action['exDate'], 'type': 'alias',
+                'actionKey': f"{action['exDate']}#alias", 'previousSymbol': symbol, 'appliedAt': now
+            })
+        operations.extend({'Put': {'TableName': self.table_name, 'Item': record}} for record in records)
+
+        if not dry_run:
+            db_client.transact_write_items(operations)
+            self.invalidate()
+
+            # Derived state: portfolio versions for cached aggregates and tag index names
+            from portfolio_summary import touch_portfolios
+            from tag_index import tag_index
+            touch_portfolios(updated.get('portfolioId') for pairs in changes.values() for _, updated in pairs)
+            for asset_class, pairs in changes.items():
+                tag_index.sync_assets(asset_class, pairs)
+
+        adjusted = sum(len(pairs) for pairs in changes.values())
+        logger.info(f"{'Checked' if dry_run else 'Applied'} {action['type']} for {symbol} on {action['exDate']}: "
+                    f"{adjusted} holdings in {-(-len(operations) // TRANSACTION_LIMIT)} transaction(s)")
+        return {
+            'symbol': symbol,
+            'exDate': action['exDate'],
+            'type': action['type'],
+            'holdingsAdjusted': adjusted,
+            'sample': [{
+                'id': updated['id'],
+                'symbol': updated['symbol'],
+                'quantity': updated.get('quantity'),
+                'previousQuantity': holding.get('quantity')
+            } for pairs in changes.values() for holding, updated in pairs[:5]]
+        }
+
+    def apply_feed(self, path: Optional[str] = None, dry_run: bool = False) -> Dict[str, Any]:
+        """Apply every action in the feed that is not yet recorded, in ex-date order"""
+        actions, errors = load_feed(path or self.feed_file)
+        today = date.today().isoformat()
+        results, skipped, pending = [], 0, 0
+        for action in actions:
+            if action['exDate'] > today:
+                # Not effective yet; applied by the run on or after the ex-date
+                pending += 1
+                continue
+            if any(item['actionKey'] == action['actionKey'] for item in self.get_actions(action['symbol'])):
+                skipped += 1
+                continue
+            results.append(self.apply_action(action, dry_run))
+
+        return {
+            'actions': len(actions),
+            'applied': len(results),
+            'alreadyApplied': skipped,
+            'notYetEffective': pending,
+            'invalidRows': errors,
+            'dryRun': dry_run,
+            'results': results
+        }
+
+# Singleton instance
+corporate_actions = CorporateActionsStore()
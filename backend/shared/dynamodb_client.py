@@ -1,17 +1,69 @@
-import boto3
-import os
-from typing import Dict, Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from botocore.exceptions import ClientError
+
+from aws_clients import aws_clients, MAX_POOL_CONNECTIONS
+
+# Concurrent partition queries per call; well inside the shared connection pool
+QUERY_FAN_OUT_WORKERS = min(8, MAX_POOL_CONNECTIONS)
+
+# Most operations DynamoDB accepts in one TransactWriteItems call
+TRANSACTION_LIMIT = 100
+
+class ItemNotFoundError(Exception):
+    """Raised by conditional writes when the addressed item does not exist"""
+    pass
+
+def _raise_if_missing(error: ClientError, key: Dict[str, Any]) -> None:
+    if error.response.get('Error', {}).get('Code') == 'ConditionalCheckFailedException':
+        raise ItemNotFoundError(f"No item with key {key}") from error
+
+def _key_condition(partition_key: str, sort_key: Optional[str], start: Optional[Any], end: Optional[Any],
+                   projection: Optional[List[str]]) -> Tuple[str, Dict[str, str], Dict[str, Any], Dict[str, str]]:
+    """Key condition, attribute names, sort-key bounds and projection aliases for a partition query"""
+    condition = "#pk = :pk"
+    names = {'#pk': partition_key}
+    bounds = {}
+    if sort_key and (start is not None or end is not None):
+        names['#sk'] = sort_key
+        if start is not None and end is not None:
+            condition += " AND #sk BETWEEN :start AND :end"
+            bounds = {':start': start, ':end': end}
+        elif start is not None:
+            condition += " AND #sk >= :start"
+            bounds = {':start': start}
+        else:
+            condition += " AND #sk <= :end"
+            bounds = {':end': end}
+    aliases = {}
+    if projection:
+        aliases = {f"#p{index}": field for index, field in enumerate(dict.fromkeys(projection))}
+        names.update(aliases)
+    return condition, names, bounds, aliases
 
 class DynamoDBClient:
     def __init__(self):
-        self.dynamodb = boto3.resource('dynamodb', region_name=os.environ.get('REGION', 'us-east-1'))
+        self.dynamodb = aws_clients.resource('dynamodb')
+        # A plain low-level client for the wire-format paths below. The resource's own
+        # meta.client has boto3's high-level (de)serialization hooks registered on it.
+        self.client = aws_clients.client('dynamodb')
         
     def get_table(self, table_name: str):
-        return self.dynamodb.Table(table_name)
+        return aws_clients.table(table_name)
     
-    def get_item(self, table_name: str, key: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    def get_item(self, table_name: str, key: Dict[str, Any], consistent: bool = False,
+                 projection: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
         table = self.get_table(table_name)
-        response = table.get_item(Key=key)
+        params = {'Key': key}
+        if consistent:
+            params['ConsistentRead'] = True
+        if projection:
+            aliases = {f"#p{index}": field for index, field in enumerate(dict.fromkeys(projection))}
+            params['ProjectionExpression'] = ', '.join(aliases)
+            params['ExpressionAttributeNames'] = aliases
+        response = table.get_item(**params)
         return response.get('Item')
     
     def put_item(self, table_name: str, item: Dict[str, Any]) -> Dict[str, Any]:
@@ -42,11 +94,238 @@ class DynamoDBClient:
         table.delete_item(Key=key)
         return True
     
+    def update_existing_item(self, table_name: str, key: Dict[str, Any], update_expression: str,
+                             expression_values: Dict[str, Any],
+                             expression_names: Optional[Dict[str, str]] = None,
+                             return_values: str = 'ALL_NEW') -> Dict[str, Any]:
+        """
+        Update an item only if it exists, in one round trip (no read first).
+        Returns the item as selected by return_values (ALL_NEW or ALL_OLD);
+        raises ItemNotFoundError if there is no item with the key.
+        """
+        table = self.get_table(table_name)
+        key_attribute = next(iter(key))
+        try:
+            response = table.update_item(
+                Key=key,
+                UpdateExpression=update_expression,
+                ConditionExpression="attribute_exists(#existsKey)",
+                ExpressionAttributeNames={**(expression_names or {}), '#existsKey': key_attribute},
+                ExpressionAttributeValues=expression_values,
+                ReturnValues=return_values
+            )
+        except ClientError as e:
+            _raise_if_missing(e, key)
+            raise
+        return response['Attributes']
+    
+    def delete_existing_item(self, table_name: str, key: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Delete an item only if it exists, in one round trip (no read first).
+        Returns the deleted item; raises ItemNotFoundError if there is no item with the key.
+        """
+        table = self.get_table(table_name)
+        try:
+            response = table.delete_item(
+                Key=key,
+                ConditionExpression="attribute_exists(#existsKey)",
+                ExpressionAttributeNames={'#existsKey': next(iter(key))},
+                ReturnValues='ALL_OLD'
+            )
+        except ClientError as e:
+            _raise_if_missing(e, key)
+            raise
+        return response['Attributes']
+    
+    def batch_put_items(self, table_name: str, items: List[Dict[str, Any]]) -> int:
+        """Write many items using the batch writer (25 items per request, retries unprocessed)"""
+        table = self.get_table(table_name)
+        with table.batch_writer() as batch:
+            for item in items:
+                batch.put_item(Item=item)
+        return len(items)
+    
+    def batch_delete_items(self, table_name: str, keys: List[Dict[str, Any]]) -> int:
+        """Delete many items by key using the batch writer"""
+        table = self.get_table(table_name)
+        with table.batch_writer() as batch:
+            for key in keys:
+                batch.delete_item(Key=key)
+        return len(keys)
+    
+    def batch_get_items(self, table_name: str, keys: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Fetch many items by key in chunks of 100, retrying unprocessed keys"""
+        items = []
+        for start in range(0, len(keys), 100):
+            request = {table_name: {'Keys': keys[start:start + 100]}}
+            while request:
+                response = self.dynamodb.batch_get_item(RequestItems=request)
+                items.extend(response.get('Responses', {}).get(table_name, []))
+                request = response.get('UnprocessedKeys') or None
+        return items
+    
+    def transact_write_items(self, operations: List[Dict[str, Any]]) -> int:
+        """
+        Write operations ({'Put'|'Update'|'Delete'|'ConditionCheck': {...}} with plain Python
+        Item/Key/ExpressionAttributeValues) in transactions of TRANSACTION_LIMIT operations.
+        Each chunk is all-or-nothing; a failed condition raises and stops later chunks, so
+        callers that need more than one chunk should make their writes idempotent.
+        """
+        client = self.client
+        serializer = TypeSerializer()
+
+        def serialize(operation):
+            (kind, params), = operation.items()
+            params = dict(params)
+            for field in ('Item', 'Key', 'ExpressionAttributeValues'):
+                if field in params:
+                    params[field] = {k: serializer.serialize(v) for k, v in params[field].items()}
+            return {kind: params}
+
+        for start in range(0, len(operations), TRANSACTION_LIMIT):
+            client.transact_write_items(TransactItems=[serialize(operation)
+                                                       for operation in operations[start:start + TRANSACTION_LIMIT]])
+        return len(operations)
+    
     def scan_table(self, table_name: str) -> List[Dict[str, Any]]:
+        """Scan every item in a table, following LastEvaluatedKey past the 1 MB page limit"""
         table = self.get_table(table_name)
-        response = table.scan()
-        return response.get('Items', [])
+        params = {}
+        items = []
+        while True:
+            response = table.scan(**params)
+            items.extend(response.get('Items', []))
+            last_key = response.get('LastEvaluatedKey')
+            if not last_key:
+                return items
+            params['ExclusiveStartKey'] = last_key
+
+    def parallel_scan(self, table_name: str, segments: int = QUERY_FAN_OUT_WORKERS) -> List[Dict[str, Any]]:
+        """
+        Scan every item using segmented scans on concurrent threads (Segment/TotalSegments).
+        Each segment follows its own LastEvaluatedKey; order across segments is not defined.
+        """
+        client = self.client
+        deserializer = TypeDeserializer()
+
+        def scan(segment):
+            params = {'TableName': table_name, 'Segment': segment, 'TotalSegments': segments}
+            items = []
+            while True:
+                response = client.scan(**params)
+                items.extend({k: deserializer.deserialize(v) for k, v in item.items()}
+                             for item in response.get('Items', []))
+                last_key = response.get('LastEvaluatedKey')
+                if not last_key:
+                    return items
+                params['ExclusiveStartKey'] = last_key
+
+        with ThreadPoolExecutor(max_workers=min(segments, MAX_POOL_CONNECTIONS)) as pool:
+            return [item for items in pool.map(scan, range(segments)) for item in items]
+
+    def query_partitions(self, table_name: str, partition_key: str, values: List[Any],
+                         sort_key: Optional[str] = None, start: Optional[Any] = None,
+                         end: Optional[Any] = None, index_name: Optional[str] = None,
+                         projection: Optional[List[str]] = None) -> Dict[Any, List[Dict[str, Any]]]:
+        """
+        Query several partitions (of the table or a GSI) concurrently, optionally limited to
+        a sort-key range and to the top-level attributes in projection.
+        Returns partition value -> items (every page). Uses the low-level client, which unlike
+        resource objects is safe to share across threads.
+        """
+        client = self.client
+        serializer, deserializer = TypeSerializer(), TypeDeserializer()
+        condition, names, bounds, aliases = _key_condition(partition_key, sort_key, start, end, projection)
+
+        def query(value):
+            params = {
+                'TableName': table_name,
+                'KeyConditionExpression': condition,
+                'ExpressionAttributeNames': names,
+                'ExpressionAttributeValues': {
+                    name: serializer.serialize(v) for name, v in {':pk': value, **bounds}.items()
+                }
+            }
+            if index_name:
+                params['IndexName'] = index_name
+            if projection:
+                params['ProjectionExpression'] = ', '.join(aliases)
+            items = []
+            while True:
+                response = client.query(**params)
+                items.extend({k: deserializer.deserialize(v) for k, v in item.items()}
+                             for item in response.get('Items', []))
+                last_key = response.get('LastEvaluatedKey')
+                if not last_key:
+                    return items
+                params['ExclusiveStartKey'] = last_key
+
+        values = list(dict.fromkeys(values))
+        if len(values) <= 1:
+            return {value: query(value) for value in values}
+        with ThreadPoolExecutor(max_workers=min(QUERY_FAN_OUT_WORKERS, len(values))) as pool:
+            return dict(zip(values, pool.map(query, values)))
     
+    def query_page(self, table_name: str, partition_key: str, value: Any, limit: int,
+                   start_key: Optional[Dict[str, Any]] = None, sort_key: Optional[str] = None,
+                   start: Optional[Any] = None, end: Optional[Any] = None, index_name: Optional[str] = None,
+                   projection: Optional[List[str]] = None,
+                   forward: bool = True) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        One page of a partition: at most limit items in key order, starting after start_key
+        (the last_key of the previous page). Returns (items, last_key); last_key is None once
+        the partition is exhausted. A page can be short when it hits the 1 MB read limit.
+        """
+        serializer, deserializer = TypeSerializer(), TypeDeserializer()
+        condition, names, bounds, aliases = _key_condition(partition_key, sort_key, start, end, projection)
+        params = {
+            'TableName': table_name,
+            'KeyConditionExpression': condition,
+            'ExpressionAttributeNames': names,
+            'ExpressionAttributeValues': {
+                name: serializer.serialize(v) for name, v in {':pk': value, **bounds}.items()
+            },
+            'Limit': limit,
+            'ScanIndexForward': forward
+        }
+        if index_name:
+            params['IndexName'] = index_name
+        if projection:
+            params['ProjectionExpression'] = ', '.join(aliases)
+        return self._page(self.client.query, params, start_key, serializer, deserializer)
+
+    def scan_page(self, table_name: str, limit: int, start_key: Optional[Dict[str, Any]] = None,
+                  filter_expression: Optional[str] = None, expression_values: Optional[Dict[str, Any]] = None,
+                  projection: Optional[List[str]] = None) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        One page of a Scan in the table's hash order, as query_page. With a filter, limit
+        counts items read rather than returned, so a page can be short (or empty) while
+        last_key is still set.
+        """
+        serializer, deserializer = TypeSerializer(), TypeDeserializer()
+        params = {'TableName': table_name, 'Limit': limit}
+        if filter_expression:
+            params['FilterExpression'] = filter_expression
+            params['ExpressionAttributeValues'] = {
+                name: serializer.serialize(v) for name, v in (expression_values or {}).items()
+            }
+        if projection:
+            aliases = {f"#p{index}": field for index, field in enumerate(dict.fromkeys(projection))}
+            params['ProjectionExpression'] = ', '.join(aliases)
+            params['ExpressionAttributeNames'] = aliases
+        return self._page(self.client.scan, params, start_key, serializer, deserializer)
+
+    def _page(self, operation, params: Dict[str, Any], start_key: Optional[Dict[str, Any]],
+              serializer: TypeSerializer, deserializer: TypeDeserializer):
+        if start_key:
+            params['ExclusiveStartKey'] = {k: serializer.serialize(v) for k, v in start_key.items()}
+        response = operation(**params)
+        items = [{k: deserializer.deserialize(v) for k, v in item.items()} for item in response.get('Items', [])]
+        last_key = response.get('LastEvaluatedKey')
+        if last_key:
+            last_key = {k: deserializer.deserialize(v) for k, v in last_key.items()}
+        return items, last_key or None
+
     def query_index(self, table_name: str, index_name: str, 
                    key_condition: str, expression_values: Dict[str, Any]) -> List[Dict[str, Any]]:
         table = self.get_table(table_name)
@@ -0,0 +1,203 @@
+import os
+import sys
+import json
+import time
+import logging
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger()
+
+# 'emf' writes one CloudWatch Embedded Metric Format line per DynamoDB call, 'local' keeps
+# the numbers in process (benchmarks, local runs), 'off' disables the instrumentation
+METRICS_MODES = ('emf', 'local', 'off')
+
+METRICS_NAMESPACE = os.environ.get('DYNAMODB_METRICS_NAMESPACE', 'PortfolioSync/DynamoDB')
+
+# Dimension sets published per call; Operation is always recorded as a log property, so
+# Logs Insights can break a table's cost down further without extra metric cardinality
+METRIC_DIMENSIONS = [['Handler', 'Table', 'Index'], ['Handler', 'Operation']]
+
+# Dimension value for calls against the base table rather than a GSI
+BASE_TABLE = '-'
+
+READ_OPERATIONS = frozenset(['GetItem', 'BatchGetItem', 'Query', 'Scan', 'TransactGetItems'])
+
+class LocalMetricsCollector:
+    """In-process sink: keeps every call record and totals by handler, table and index"""
+
+    def __init__(self):
+        self.records = []
+        self._lock = threading.Lock()
+
+    def emit(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self.records.append(record)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.records = []
+
+    def totals(self, group_by: tuple = ('Handler', 'Table', 'Index')) -> Dict[tuple, Dict[str, float]]:
+        """Calls, capacity units and latency summed per group_by key"""
+        totals = defaultdict(lambda: {'calls': 0, 'readUnits': 0.0, 'writeUnits': 0.0, 'latencyMs': 0.0})
+        with self._lock:
+            records = list(self.records)
+        for record in records:
+            total = totals[tuple(record[name] for name in group_by)]
+            total['calls'] += 1
+            total['readUnits'] += record['ReadCapacityUnits']
+            total['writeUnits'] += record['WriteCapacityUnits']
+            total['latencyMs'] += record['Latency']
+        return dict(totals)
+
+class EMFEmitter:
+    """
+    Writes records as CloudWatch Embedded Metric Format lines. They go straight to stdout:
+    the Lambda logging handler prefixes messages, and EMF is only extracted from log events
+    that are a single JSON document.
+    """
+
+    def __init__(self, namespace: str = METRICS_NAMESPACE, stream=None):
+        self.namespace = namespace
+        self.stream = stream or sys.stdout
+
+    def emit(self, record: Dict[str, Any]) -> None:
+        metrics = [
+            {'Name': 'Latency', 'Unit': 'Milliseconds'},
+            {'Name': 'ReadCapacityUnits', 'Unit': 'Count'},
+            {'Name': 'WriteCapacityUnits', 'Unit': 'Count'}
+        ]
+        if 'ItemsScanned' in record:
+            metrics += [{'Name': 'ItemsReturned', 'Unit': 'Count'}, {'Name': 'ItemsScanned', 'Unit': 'Count'}]
+        document = {
+            '_aws': {
+                'Timestamp': int(time.time() * 1000),
+                'CloudWatchMetrics': [{
+                    'Namespace': self.namespace,
+                    'Dimensions': METRIC_DIMENSIONS,
+                    'Metrics': metrics
+                }]
+            },
+            **record
+        }
+        self.stream.write(json.dumps(document, default=str) + '\n')
+        self.stream.flush()
+
+class DynamoDBMetrics:
+    """
+    Capacity and latency for every DynamoDB call made through aws_clients, whether it comes
+    from DynamoDBClient, a Table handle or a batch_writer. Installed as botocore event
+    handlers: each call is asked for ReturnConsumedCapacity=INDEXES, timed across its
+    retries, and recorded once per table it touched, tagged with the handler (the Lambda
+    function name unless a handler_scope is active), table, index and operation.
+
+    Capacity a call consumed on GSIs is reported in the record's IndexCapacity property,
+    so write amplification from index projections shows up next to the base-table cost.
+    """
+
+    def __init__(self, sink=None, handler: Optional[str] = None):
+        self.sink = sink
+        self.handler = handler or os.environ.get('AWS_LAMBDA_FUNCTION_NAME', 'local')
+        self._installed = set()
+
+    @property
+    def enabled(self) -> bool:
+        return self.sink is not None
+
+    def use(self, sink) -> None:
+        """Route records to a sink (EMFEmitter, LocalMetricsCollector or None to disable)"""
+        self.sink = sink
+
+    @contextmanager
+    def handler_scope(self, handler: str):
+        """Tag calls made inside the block with another handler name (one process, many handlers)"""
+        previous = self.handler
+        self.handler = handler
+        try:
+            yield
+        finally:
+            self.handler = previous
+
+    def install(self, factory) -> None:
+        """Register the event handlers on an AWSClientFactory's session and clients"""
+        if id(factory) in self._installed:
+            return
+        factory.register_event('before-parameter-build.dynamodb', self._request_capacity)
+        factory.register_event('before-call.dynamodb', self._start_timer)
+        factory.register_event('after-call.dynamodb', self._record_call)
+        self._installed.add(id(factory))
+
+    # botocore event handlers
+
+    def _request_capacity(self, params, model, context, **kwargs) -> None:
+        if not self.enabled:
+            return
+        # Mutated in place: the resource layer's own hooks copy params after this event
+        if ('ReturnConsumedCapacity' in model.input_shape.members
+                and params.get('ReturnConsumedCapacity', 'NONE') == 'NONE'):
+            params['ReturnConsumedCapacity'] = 'INDEXES'
+        # Noted here because before-call only sees the serialized request
+        context['dynamodbMetricsTarget'] = (params.get('TableName'), params.get('IndexName'))
+
+    def _start_timer(self, context, **kwargs) -> None:
+        if self.enabled:
+            context['dynamodbMetricsStart'] = time.perf_counter()
+
+    def _record_call(self, http_response, parsed, model, context, **kwargs) -> None:
+        start = context.pop('dynamodbMetricsStart', None)
+        if start is None or not self.enabled:
+            return
+        try:
+            latency = (time.perf_counter() - start) * 1000
+            table_name, index_name = context.get('dynamodbMetricsTarget', (None, None))
+            for record in self._records(model.name, table_name, index_name, parsed, latency):
+                self.sink.emit(record)
+        except Exception as e:
+            # Metrics must never fail the call they describe
+            logger.warning(f"Error recording DynamoDB metrics: {str(e)}")
+
+    def _records(self, operation: str, table_name: Optional[str], index_name: Optional[str],
+                 parsed: Dict[str, Any], latency: float) -> List[Dict[str, Any]]:
+        consumed = parsed.get('ConsumedCapacity') or []
+        if isinstance(consumed, dict):
+            consumed = [consumed]
+        read = operation in READ_OPERATIONS
+        records = []
+        # A failed or capacity-less call still gets one record so its latency is counted
+        for position, capacity in enumerate(consumed or [{}]):
+            indexes = {name: float(units.get('CapacityUnits', 0))
+                       for name, units in (capacity.get('GlobalSecondaryIndexes') or {}).items()}
+            units = float(capacity.get('CapacityUnits', 0))
+            record = {
+                'Handler': self.handler,
+                'Table': capacity.get('TableName') or table_name or 'unknown',
+                'Index': index_name or BASE_TABLE,
+                'Operation': operation,
+                # Batch and transaction calls report one entry per table; latency goes on the first
+                'Latency': latency if position == 0 else 0.0,
+                'ReadCapacityUnits': units if read else 0.0,
+                'WriteCapacityUnits': 0.0 if read else units,
+                'IndexCapacity': indexes
+            }
+            if operation in ('Query', 'Scan') and 'ScannedCount' in parsed:
+                record['ItemsReturned'] = parsed.get('Count', 0)
+                record['ItemsScanned'] = parsed['ScannedCount']
+            records.append(record)
+        return records
+
+def _configured_sink():
+    mode = os.environ.get('DYNAMODB_METRICS', 'emf' if os.environ.get('AWS_LAMBDA_FUNCTION_NAME') else 'off')
+    if mode not in METRICS_MODES:
+        logger.warning(f"Unknown DYNAMODB_METRICS={mode}, metrics disabled")
+        return None
+    if mode == 'emf':
+        return EMFEmitter()
+    if mode == 'local':
+        return LocalMetricsCollector()
+    return None
+
+# Singleton instance
+dynamodb_metrics = DynamoDBMetrics(_configured_sink())
@@ -0,0 +1,179 @@
+import os
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, Any, List, Optional
+
+from dynamodb_client import db_client
+from valuation import to_decimal, parse_purchase_date, MONEY_QUANTUM, HUNDRED, ZERO
+
+logger = logging.getLogger()
+
+# Two trailing years give the current and prior twelve months for payout growth
+HISTORY_DAYS = 730
+
+def _one_year_later(day: date) -> date:
+    try:
+        return day.replace(year=day.year + 1)
+    except ValueError:
+        # 29 February
+        return day.replace(year=day.year + 1, day=28)
+
+def distribution_record(symbol: str, ex_date: str, amount: Any, pay_date: Optional[str] = None,
+                        franking_percentage: Any = None, source: str = 'manual') -> Dict[str, Any]:
+    """Build a per-unit distribution item; raises ValueError on an invalid date or amount"""
+    ex_day = parse_purchase_date(ex_date)
+    if not ex_day:
+        raise ValueError(f"Invalid exDate: {ex_date}")
+    amount = to_decimal(amount)
+    if amount < 0:
+        raise ValueError("amount must not be negative")
+
+    record = {
+        'symbol': symbol.upper(),
+        'exDate': ex_day.isoformat(),
+        'amount': amount,
+        'source': source,
+        'createdAt': datetime.utcnow().isoformat()
+    }
+    if pay_date:
+        pay_day = parse_purchase_date(pay_date)
+        if not pay_day:
+            raise ValueError(f"Invalid payDate: {pay_date}")
+        record['payDate'] = pay_day.isoformat()
+    if franking_percentage is not None:
+        record['frankingPercentage'] = to_decimal(franking_percentage)
+    return record
+
+def distribution_analytics(holdings: List[Dict[str, Any]], histories: Dict[str, List[Dict[str, Any]]],
+                           as_of: Optional[date] = None) -> Dict[str, Any]:
+    """
+    Trailing yield, payout growth and a 12-month income calendar for a set of ETF holdings.
+
+    histories maps symbol -> per-unit distributions (exDate, amount, optional payDate).
+    Per ETF: trailing twelve-month distribution per unit, trailingYield (% of currentPrice),
+    payoutGrowth (% change on the prior twelve months, None without a prior year) and the
+    annual income on the units held. The calendar projects last year's distributions one
+    year forward at the current units held.
+    """
+    as_of = as_of or date.today()
+    year_ago = as_of - timedelta(days=365)
+    two_years_ago = as_of - timedelta(days=HISTORY_DAYS)
+
+    # Units held per symbol across every holding of it
+    units, prices, names = defaultdict(Decimal), {}, {}
+    for holding in holdings:
+        symbol = str(holding.get('symbol', '')).upper()
+        units[symbol] += to_decimal(holding.get('quantity'))
+        prices.setdefault(symbol, to_decimal(holding.get('currentPrice'), to_decimal(holding.get('purchasePrice'))))
+        names.setdefault(symbol, holding.get('name') or symbol)
+
+    etfs, events = [], []
+    for symbol, quantity in units.items():
+        trailing, prior, count = ZERO, ZERO, 0
+        latest = None
+        for distribution in histories.get(symbol, []):
+            ex_day = parse_purchase_date(distribution.get('exDate'))
+            if not ex_day or ex_day > as_of:
+                continue
+            amount = to_decimal(distribution.get('amount'))
+            if ex_day > year_ago:
+                trailing += amount
+                count += 1
+                pay_day = parse_purchase_date(distribution.get('payDate'))
+                events.append({
+                    'symbol': symbol,
+                    'exDate': _one_year_later(ex_day).isoformat(),
+                    'payDate': _one_year_later(pay_day).isoformat() if pay_day else None,
+                    'amountPerUnit': amount,
+                    'expectedIncome': (amount * quantity).quantize(MONEY_QUANTUM, ROUND_HALF_UP)
+                })
+            elif ex_day > two_years_ago:
+                prior += amount
+            if latest is None or ex_day.isoformat() > latest['exDate']:
+                latest = {'exDate': ex_day.isoformat(), 'amount': amount}
+
+        price = prices[symbol]
+        etfs.append({
+            'symbol': symbol,
+            'name': names[symbol],
+            'units': quantity,
+            'trailingDistribution': trailing,
+            'distributionsPerYear': count,
+            'trailingYield': (trailing * HUNDRED / price).quantize(MONEY_QUANTUM, ROUND_HALF_UP) if price > 0 else ZERO,
+            'payoutGrowth': ((trailing / prior - 1) * HUNDRED).quantize(MONEY_QUANTUM, ROUND_HALF_UP) if prior > 0 else None,
+            'annualIncome': (trailing * quantity).quantize(MONEY_QUANTUM, ROUND_HALF_UP),
+            'lastDistribution': latest
+        })
+
+    events.sort(key=lambda event: (event['payDate'] or event['exDate'], event['symbol']))
+    by_month = defaultdict(Decimal)
+    for event in events:
+        by_month[(event['payDate'] or event['exDate'])[:7]] += event['expectedIncome']
+
+    annual_income = sum((etf['annualIncome'] for etf in etfs), ZERO)
+    market_value = sum((units[etf['symbol']] * prices[etf['symbol']] for etf in etfs), ZERO)
+    return {
+        'asOf': as_of.isoformat(),
+        'annualIncome': annual_income,
+        'portfolioYield': (annual_income * HUNDRED / market_value).quantize(MONEY_QUANTUM, ROUND_HALF_UP) if market_value > 0 else ZERO,
+        'etfs': sorted(etfs, key=lambda etf: -etf['annualIncome']),
+        'calendar': [{'month': month, 'expectedIncome': income} for month, income in sorted(by_month.items())],
+        'events': events
+    }
+
+def holding_histories(etfs: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Per-symbol distributions from the lastDistribution* fields entered on holdings"""
+    histories = defaultdict(dict)
+    for etf in etfs:
+        try:
+            if etf.get('lastDistributionAmount') and etf.get('lastDistributionDate'):
+                record = distribution_record(etf.get('symbol', ''), etf['lastDistributionDate'],
+                                             etf['lastDistributionAmount'], source='holding')
+                histories[record['symbol']][record['exDate']] = record
+        except (ValueError, ArithmeticError) as e:
+            logger.warning(f"Ignoring last distribution on ETF {etf.get('id')}: {str(e)}")
+    return {symbol: sorted(records.values(), key=lambda record: record['exDate'])
+            for symbol, records in histories.items()}
+
+class DistributionStore:
+    """
+    Per-unit ETF distributions in ETF_DISTRIBUTIONS_TABLE, keyed (symbol, exDate).
+    One series per symbol is shared by every holder of that ETF, so it is only written
+    from distribution data (POST /distributions/{symbol}), never from holding edits.
+    """
+
+    def __init__(self):
+        self.table_name = os.environ.get('ETF_DISTRIBUTIONS_TABLE')
+
+    def put_distributions(self, records: List[Dict[str, Any]]) -> int:
+        if not self.table_name:
+            logger.warning("ETF_DISTRIBUTIONS_TABLE not configured, skipping store")
+            return 0
+        return db_client.batch_put_items(self.table_name, records)
+
+    def get_histories(self, symbols: List[str], start_date: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Distributions per symbol since start_date, one concurrent query per symbol"""
+        if not self.table_name:
+            logger.warning("ETF_DISTRIBUTIONS_TABLE not configured")
+            return {}
+        symbols = sorted({symbol.upper() for symbol in symbols})
+        return db_client.query_partitions(self.table_name, 'symbol', symbols, sort_key='exDate', start=start_date)
+
+    def portfolio_income(self, etfs: List[Dict[str, Any]], as_of: Optional[date] = None) -> Dict[str, Any]:
+        """
+        distribution_analytics over the shared series. A symbol with no shared series uses
+        the lastDistribution* fields entered on the portfolio's own holdings of it; those
+        stay on the holdings and never enter the series other holders read.
+        """
+        as_of = as_of or date.today()
+        start = (as_of - timedelta(days=HISTORY_DAYS)).isoformat()
+        histories = self.get_histories([etf.get('symbol', '') for etf in etfs], start)
+        for symbol, history in holding_histories(etfs).items():
+            if not histories.get(symbol):
+                histories[symbol] = history
+        return distribution_analytics(etfs, histories, as_of)
+
+# Singleton instance
+distribution_store = DistributionStore()
@@ -0,0 +1,215 @@
+import io
+import os
+import csv
+import math
+import time
+import logging
+import threading
+from collections import defaultdict
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from reference_data import list_files, read_text
+
+logger = logging.getLogger()
+
+# Offline runs read data/; deployed stages set ETF_CONSTITUENTS_DIR to the reference data bucket
+DEFAULT_CONSTITUENTS_DIR = os.path.join(os.path.dirname(__file__), '../data/etf_constituents')
+
+# Constituent files change at most daily, so warm containers reuse the parsed matrix
+CONSTITUENT_CACHE_TTL_SECONDS = 3600
+
+UNKNOWN = 'Unknown'
+UNALLOCATED = 'Cash & Other'
+
+# Country for directly held stocks by exchange
+EXCHANGE_COUNTRIES = {
+    'ASX': 'AU', 'NYSE': 'US', 'NASDAQ': 'US', 'LSE': 'UK', 'TSX': 'CA', 'NZX': 'NZ',
+}
+
+class ConstituentUniverse:
+    """
+    Constituent weights of every ETF with a holdings file, as a CSR sparse matrix
+    (ETFs x securities) built with plain NumPy arrays.
+
+    Files are <constituents dir>/<ETF SYMBOL>.csv with columns symbol,name,weight,sector,country;
+    the directory may be an s3:// prefix. Weights may be fractions or percentages; a file
+    whose weights sum above 1.5 is read as percentages. Whatever the weights leave
+    unallocated is reported as cash and other. Rows with a missing, negative or non-numeric
+    weight and unreadable files are logged and skipped, so one bad line costs only itself.
+    """
+
+    def __init__(self, etfs: List[str], securities: List[Dict[str, str]], indptr: np.ndarray,
+                 indices: np.ndarray, weights: np.ndarray):
+        self.etfs = etfs
+        self.etf_index = {symbol: row for row, symbol in enumerate(etfs)}
+        self.securities = securities
+        self.security_index = {security['symbol']: column for column, security in enumerate(securities)}
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+
+        # Row id of every stored weight, so a position vector can be expanded without a loop
+        self.rows = np.repeat(np.arange(len(etfs)), np.diff(indptr))
+        self.allocated = np.bincount(self.rows, weights=weights, minlength=len(etfs))
+
+        # Sector and country of each security as ids, for bincount aggregation
+        self.sectors, self.sector_ids = self._encode([security['sector'] for security in securities])
+        self.countries, self.country_ids = self._encode([security['country'] for security in securities])
+
+    @staticmethod
+    def _encode(labels: List[str]):
+        names = sorted(set(labels))
+        ids = {name: i for i, name in enumerate(names)}
+        return names, np.array([ids[label] for label in labels], dtype=np.int64)
+
+    @staticmethod
+    def _read_rows(location: str) -> List[Dict[str, Any]]:
+        """Constituent rows of one file with weight parsed to a float; bad rows are skipped"""
+        rows = []
+        for line, row in enumerate(csv.DictReader(io.StringIO(read_text(location))), start=2):
+            if not (row.get('symbol') or '').strip():
+                continue
+            try:
+                weight = float(row.get('weight') or '')
+            except ValueError:
+                weight = math.nan
+            if not math.isfinite(weight) or weight < 0:
+                logger.warning(f"Skipping {os.path.basename(location)} line {line}: "
+                               f"invalid weight {row.get('weight')!r}")
+                continue
+            rows.append({**row, 'weight': weight})
+        return rows
+
+    @classmethod
+    def from_directory(cls, directory: str) -> 'ConstituentUniverse':
+        etfs, securities, security_index = [], [], {}
+        indptr, indices, weights = [0], [], []
+
+        files = list_files(directory, '.csv')
+        if not files:
+            logger.warning(f"No ETF constituent files in {directory}; ETFs will not be looked through")
+        for location in files:
+            try:
+                rows = cls._read_rows(location)
+            except Exception as e:
+                logger.error(f"Skipping ETF constituents file {location}: {str(e)}")
+                continue
+
+            scale = 100.0 if sum(row['weight'] for row in rows) > 1.5 else 1.0
+            for row in rows:
+                symbol = row['symbol'].strip().upper()
+                if symbol not in security_index:
+                    security_index[symbol] = len(securities)
+                    securities.append({
+                        'symbol': symbol,
+                        'name': (row.get('name') or symbol).strip(),
+                        'sector': (row.get('sector') or UNKNOWN).strip(),
+                        'country': (row.get('country') or '').strip().upper() or UNKNOWN
+                    })
+                indices.append(security_index[symbol])
+                weights.append(row['weight'] / scale)
+
+            etfs.append(os.path.basename(location)[:-4].upper())
+            indptr.append(len(indices))
+
+        logger.info(f"Loaded constituents for {len(etfs)} ETFs covering {len(securities)} securities")
+        return cls(etfs, securities, np.array(indptr, dtype=np.int64),
+                   np.array(indices, dtype=np.int64), np.array(weights, dtype=float))
+
+    def exposures(self, etf_values: np.ndarray) -> np.ndarray:
+        """Value held in each security through the ETFs: W^T v as one bincount over the stored weights"""
+        return np.bincount(self.indices, weights=self.weights * etf_values[self.rows],
+                           minlength=len(self.securities))
+
+class LookThroughEngine:
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or os.environ.get('ETF_CONSTITUENTS_DIR') or DEFAULT_CONSTITUENTS_DIR
+        self._universe = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def get_universe(self) -> ConstituentUniverse:
+        with self._lock:
+            if self._universe is None or time.time() - self._loaded_at > CONSTITUENT_CACHE_TTL_SECONDS:
+                self._universe = ConstituentUniverse.from_directory(self.directory)
+                self._loaded_at = time.time()
+            return self._universe
+
+    def exposure(self, stocks: List[Dict[str, Any]], etfs: List[Dict[str, Any]], top: int = 25) -> Dict[str, Any]:
+        """
+        Aggregate a portfolio's listed exposure by security, sector and country.
+        ETFs with a constituents file are looked through; others count as a single security.
+        """
+        universe = self.get_universe()
+
+        # Position values per ETF row in the universe
+        etf_values = np.zeros(len(universe.etfs))
+        opaque = []
+        for etf in etfs:
+            symbol = str(etf.get('symbol', '')).upper()
+            value = float(etf.get('totalValue', 0) or 0)
+            row = universe.etf_index.get(symbol)
+            if row is None:
+                opaque.append((symbol, etf.get('name') or symbol, 'ETF (no look-through)', None, value))
+            else:
+                etf_values[row] += value
+
+        security_values = universe.exposures(etf_values)
+        unallocated = float((etf_values * np.maximum(1.0 - universe.allocated, 0.0)).sum())
+
+        # Direct holdings and opaque ETFs: add to a known security or keep as extras
+        extras = {}
+        direct = [(str(stock.get('symbol', '')).upper(), stock.get('name'), stock.get('sector'),
+                   stock.get('country') or EXCHANGE_COUNTRIES.get(str(stock.get('exchange') or '').upper()),
+                   float(stock.get('totalValue', 0) or 0)) for stock in stocks]
+        for symbol, name, sector, country, value in direct + opaque:
+            column = universe.security_index.get(symbol)
+            if column is not None:
+                security_values[column] += value
+                continue
+            if symbol not in extras:
+                extras[symbol] = {'symbol': symbol, 'name': name or symbol, 'sector': sector or UNKNOWN,
+                                  'country': str(country).upper() if country else UNKNOWN, 'value': 0.0}
+            extras[symbol]['value'] += value
+
+        by_sector, by_country = defaultdict(float), defaultdict(float)
+        for names, ids, totals in ((universe.sectors, universe.sector_ids, by_sector),
+                                   (universe.countries, universe.country_ids, by_country)):
+            for name, value in zip(names, np.bincount(ids, weights=security_values, minlength=len(names))):
+                if value > 0:
+                    totals[name] += float(value)
+        for extra in extras.values():
+            by_sector[extra['sector']] += extra['value']
+            by_country[extra['country']] += extra['value']
+        if unallocated > 0:
+            by_sector[UNALLOCATED] += unallocated
+            by_country[UNALLOCATED] += unallocated
+        total = sum(by_sector.values())
+
+        # Only the largest positions are materialised; the universe can hold tens of thousands
+        held = np.flatnonzero(security_values > 0)
+        largest = held[np.argsort(-security_values[held], kind='stable')[:top]]
+        rows = [{**universe.securities[column], 'value': float(security_values[column])} for column in largest]
+        rows = sorted(rows + list(extras.values()), key=lambda row: -row['value'])[:top]
+
+        def breakdown(values: Dict[str, float], key: str) -> List[Dict[str, Any]]:
+            return [{key: name, 'value': round(value, 2), 'weight': round(value / total, 6) if total else 0.0}
+                    for name, value in sorted(values.items(), key=lambda entry: -entry[1])]
+
+        looked_through = float(etf_values.sum())
+        return {
+            'totalValue': round(total, 2),
+            'lookThroughCoverage': round(looked_through / total, 6) if total else 0.0,
+            'etfsLookedThrough': int(np.count_nonzero(etf_values)),
+            'etfsWithoutConstituents': sorted({symbol for symbol, *_ in opaque}),
+            'securityCount': len(held) + len(extras),
+            'bySecurity': [{**row, 'value': round(row['value'], 2),
+                            'weight': round(row['value'] / total, 6) if total else 0.0} for row in rows],
+            'bySector': breakdown(by_sector, 'sector'),
+            'byCountry': breakdown(by_country, 'country')
+        }
+
+# Singleton instance
+lookthrough_engine = LookThroughEngine()
@@ -0,0 +1,84 @@
+import re
+from typing import Dict, Any, List, Optional
+
+# Named fieldsets per entity for the fields= query parameter. 'full' (no projection)
+# is always available and is the default, so existing clients see no change.
+# summary: enough for cards, pickers and allocation charts
+# table: the columns of the holdings tables
+FIELD_PRESETS = {
+    'stocks': {
+        'summary': ['symbol', 'name', 'quantity', 'currentPrice', 'totalValue', 'returnPercentage'],
+        'table': ['symbol', 'name', 'quantity', 'purchasePrice', 'purchaseDate', 'currentPrice',
+                  'totalCostBasis', 'totalValue', 'totalReturn', 'returnPercentage', 'daysHeld',
+                  'exchange', 'currency', 'sector', 'tags', 'updatedAt'],
+    },
+    'etfs': {
+        'summary': ['symbol', 'name', 'quantity', 'currentPrice', 'totalValue', 'returnPercentage'],
+        'table': ['symbol', 'name', 'quantity', 'purchasePrice', 'purchaseDate', 'currentPrice',
+                  'totalCostBasis', 'totalValue', 'totalReturn', 'returnPercentage', 'daysHeld',
+                  'expenseRatio', 'annualExpenseCost', 'category', 'exchange', 'currency', 'tags', 'updatedAt'],
+    },
+    'properties': {
+        'summary': ['address', 'propertyType', 'currentValue', 'capitalGrowthPercentage', 'grossRentalYield'],
+        'table': ['address', 'propertyType', 'purchasePrice', 'purchaseDate', 'currentValue',
+                  'totalPurchaseCosts', 'capitalGrowth', 'capitalGrowthPercentage', 'weeklyRent',
+                  'grossRentalYield', 'netRentalYield', 'annualCashFlow', 'returnPercentage',
+                  'valuationDate', 'tags', 'updatedAt'],
+    },
+    'news': {
+        'summary': ['symbol', 'headline', 'sourceName', 'publishedAt'],
+        'table': ['symbol', 'headline', 'summary', 'sourceUrl', 'sourceName', 'publishedAt',
+                  'assetType', 'status', 'tags'],
+    },
+}
+
+# Always returned so clients can address, group and key-page the items they get back
+KEY_FIELDS = {
+    'stocks': ['id', 'portfolioId'],
+    'etfs': ['id', 'portfolioId'],
+    'properties': ['id', 'portfolioId'],
+    'news': ['id', 'symbol', 'publishedAt'],
+}
+
+FULL_PRESET = 'full'
+
+# Explicit field lists: top-level attribute names only, and a bounded count
+FIELD_NAME_PATTERN = re.compile(r'^[A-Za-z][A-Za-z0-9_]{0,63}$')
+MAX_FIELDS = 50
+
+def resolve_fields(entity: str, value: Optional[str]) -> Optional[List[str]]:
+    """
+    Turn a fields= value into the attributes to read, or None for full items.
+    Accepts a preset name (summary, table, full) or a comma-separated attribute list;
+    raises ValueError for invalid attribute names.
+    """
+    value = (value or '').strip()
+    if not value or value == FULL_PRESET:
+        return None
+
+    presets = FIELD_PRESETS[entity]
+    if value in presets:
+        fields = presets[value]
+    else:
+        fields = [field.strip() for field in value.split(',') if field.strip()]
+        invalid = [field for field in fields if not FIELD_NAME_PATTERN.match(field)]
+        if invalid:
+            raise ValueError(f"Invalid field names: {', '.join(invalid)}")
+        if len(fields) > MAX_FIELDS:
+            raise ValueError(f"At most {MAX_FIELDS} fields can be requested")
+
+    return list(dict.fromkeys(KEY_FIELDS[entity] + fields))
+
+def projection_params(fields: Optional[List[str]], extra: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    ProjectionExpression and ExpressionAttributeNames for a field list (empty for full items).
+    Every name is aliased, so reserved words like name, status and size need no special casing.
+    extra adds attributes the caller needs internally (e.g. sort keys) to the projection.
+    """
+    if fields is None:
+        return {}
+    names = {f"#f{index}": field for index, field in enumerate(dict.fromkeys(fields + (extra or [])))}
+    return {
+        'ProjectionExpression': ', '.join(names),
+        'ExpressionAttributeNames': names
+    }
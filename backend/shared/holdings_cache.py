@@ -0,0 +1,289 @@
+import os
+import copy
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+from portfolio_repository import portfolio_repository, HOLDING_ENTITIES
+from response_utils import entity_etag
+
+logger = logging.getLogger()
+
+# In-process tier: entries per warm container, least recently used evicted first
+HOLDINGS_CACHE_SIZE = int(os.environ.get('HOLDINGS_CACHE_SIZE', '256'))
+
+# Entries are addressed by version, so this only bounds memory and the window in which a
+# lost version bump (touch_portfolios is best effort) could go unnoticed
+HOLDINGS_CACHE_TTL_SECONDS = 300
+
+# Holdings queries (the portfolioId-index, or an eventually consistent query of the
+# portfolio's partition) can trail a write by up to about a second. For this long after
+# holdingsUpdatedAt a list may predate the version just read, so it is neither cached nor
+# given a version ETag
+HOLDINGS_SETTLE_SECONDS = 5
+
+# Shared tier: 'none' (in-process only), 'local' (in-memory stand-in for tests and local
+# runs) or 'redis' (HOLDINGS_CACHE_URL; needs the redis package and VPC access to the cluster)
+CACHE_BACKENDS = ('none', 'local', 'redis')
+
+class LocalCacheBackend:
+    """Shared-tier stand-in: a process-local key/value store with expiry"""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.time():
+                del self._entries[key]
+                return None
+            return copy.deepcopy(entry[1])
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, copy.deepcopy(value))
+
+class RedisCacheBackend:
+    """
+    Shared tier on Redis / ElastiCache. Values are stored in DynamoDB's typed JSON form,
+    so Decimals and sets round-trip exactly.
+    """
+
+    def __init__(self, url: str):
+        import redis
+        self._redis = redis.Redis.from_url(url, socket_timeout=0.2, socket_connect_timeout=0.2)
+        self._serializer, self._deserializer = TypeSerializer(), TypeDeserializer()
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self._redis.get(key)
+        if raw is None:
+            return None
+        return self._deserializer.deserialize(json.loads(raw))
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        self._redis.set(key, json.dumps(self._serializer.serialize(value)), ex=ttl)
+
+def create_backend(name: str, url: Optional[str] = None):
+    """Shared-tier backend by name (None for 'none')"""
+    if name not in CACHE_BACKENDS:
+        raise ValueError(f"Unknown holdings cache backend {name}")
+    if name == 'local':
+        return LocalCacheBackend()
+    if name == 'redis':
+        if not url:
+            raise ValueError("HOLDINGS_CACHE_URL is required for the redis backend")
+        return RedisCacheBackend(url)
+    return None
+
+class HoldingsCache:
+    """
+    Read-through cache of a portfolio's holdings, one entry per (portfolio, entity, version).
+
+    Versions are counters on the portfolio item that every holdings write bumps
+    (portfolio_summary.touch_portfolios). A lookup reads them with one strongly consistent
+    GetItem of a few attributes, so an entry written before a completed write is never
+    addressed again, and stale entries simply age out instead of needing invalidation.
+    The holdings query itself is eventually consistent, so a miss is only cached once the
+    last bump has settled (HOLDINGS_SETTLE_SECONDS) and the version is unchanged after it.
+    Misses go to the repository and fill both tiers; the shared tier lets a cold container
+    reuse what another one loaded. Errors in the shared tier fall back to DynamoDB.
+    """
+
+    def __init__(self, backend=None, size: int = HOLDINGS_CACHE_SIZE, ttl: int = HOLDINGS_CACHE_TTL_SECONDS):
+        self.backend = backend
+        self.size = size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'sharedHits': 0, 'misses': 0, 'bypassed': 0, 'unsettled': 0}
+
+    @staticmethod
+    def cache_key(portfolio_id: str, entity: str, version: int) -> str:
+        return f"holdings:{portfolio_id}:{entity}:v{version}"
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self._stats[stat] += 1
+
+    def _cached(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] >= time.time():
+                    self._entries.move_to_end(key)
+                    self._stats['hits'] += 1
+                    return entry[1]
+                del self._entries[key]
+
+        if self.backend is not None:
+            try:
+                items = self.backend.get(key)
+            except Exception as e:
+                logger.warning(f"Holdings cache backend read failed for {key}: {str(e)}")
+                items = None
+            if items is not None:
+                self._store_local(key, items)
+                self._count('sharedHits')
+                return items
+        return None
+
+    def _store_local(self, key: str, items: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl, items)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def _store(self, key: str, items: List[Dict[str, Any]]) -> None:
+        self._store_local(key, items)
+        if self.backend is not None:
+            try:
+                self.backend.set(key, items, self.ttl)
+            except Exception as e:
+                logger.warning(f"Holdings cache backend write failed for {key}: {str(e)}")
+
+    @staticmethod
+    def settled(versions: Dict[str, Any]) -> bool:
+        """Whether a holdings query now sees every write counted in versions"""
+        updated_at = versions.get('holdingsUpdatedAt')
+        if not updated_at:
+            return True
+        try:
+            age = (datetime.utcnow() - datetime.fromisoformat(updated_at)).total_seconds()
+        except ValueError:
+            return True
+        return age >= HOLDINGS_SETTLE_SECONDS
+
+    def _store_if_current(self, key: str, entity: str, portfolio_id: str, versions: Dict[str, Any],
+                          items: List[Dict[str, Any]]) -> None:
+        """Cache items read for versions, unless they may be older than the version names them"""
+        if not self.settled(versions):
+            self._count('unsettled')
+            return
+        current = portfolio_repository.get_holdings_versions(portfolio_id)
+        if current is None or current[entity] != versions[entity]:
+            # Written to while it was read: the list may hold either side of the write
+            self._count('unsettled')
+            return
+        self._store(key, items)
+
+    def _entity_holdings(self, entity: str, portfolio_id: str, versions: Dict[str, Any]) -> List[Dict[str, Any]]:
+        key = self.cache_key(portfolio_id, entity, versions[entity])
+        items = self._cached(key)
+        if items is None:
+            self._count('misses')
+            items = portfolio_repository.get_entity_holdings(entity, portfolio_id)
+            self._store_if_current(key, entity, portfolio_id, versions, items)
+        # Callers are free to modify what they get back
+        return copy.deepcopy(items)
+
+    def etag(self, entity: str, portfolio_id: str, versions: Optional[Dict[str, Any]],
+             fields: Optional[List[str]] = None, page: Optional[Tuple[int, Optional[str]]] = None) -> Optional[str]:
+        """
+        Strong ETag for a holdings list (or a page of it, page = (limit, cursor)) named by
+        the entity's version, or None for a portfolio without versions or whose last write
+        has not settled (the list read now may not match the version yet). The TTL window
+        is part of it, so a lost version bump can answer 304s for no longer than it can
+        serve a stale cache entry.
+        """
+        if versions is None or not self.settled(versions):
+            return None
+        return entity_etag(portfolio_id, entity, versions[entity], fields, page, int(time.time() // self.ttl))
+
+    def get_entity_holdings(self, entity: str, portfolio_id: str, fields: Optional[List[str]] = None,
+                            versions: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        One entity's holdings in a portfolio, optionally only the given top-level fields.
+        Projected reads are answered from a cached full list, or go to DynamoDB with the
+        projection pushed down (and are not cached) when there is none. Pass versions
+        when the caller has already read them (e.g. for an ETag).
+        """
+        if versions is None:
+            versions = portfolio_repository.get_holdings_versions(portfolio_id)
+        if versions is None:
+            self._count('bypassed')
+            return portfolio_repository.get_entity_holdings(entity, portfolio_id, fields)
+
+        if fields is None:
+            return self._entity_holdings(entity, portfolio_id, versions)
+
+        items = self._cached(self.cache_key(portfolio_id, entity, versions[entity]))
+        if items is None:
+            self._count('misses')
+            return portfolio_repository.get_entity_holdings(entity, portfolio_id, fields)
+        return [{field: copy.deepcopy(item[field]) for field in fields if field in item} for item in items]
+
+    def get_entity_holdings_page(self, entity: str, portfolio_id: str, limit: int,
+                                 start_key: Optional[Dict[str, Any]] = None, fields: Optional[List[str]] = None,
+                                 versions: Optional[Dict[str, Any]] = None) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        A page of one entity's holdings and the key to continue from, as
+        portfolio_repository.get_entity_holdings_page. Sliced from a cached full list when
+        there is one; otherwise (or when start_key's holding has since left the list) one
+        bounded DynamoDB page. A first full page that turns out to be the whole list is
+        cached as it; longer lists are never read in full here. Both paths follow the same
+        query order and hand out the same keys, so a client can move between them.
+        """
+        if versions is None:
+            versions = portfolio_repository.get_holdings_versions(portfolio_id)
+        key = self.cache_key(portfolio_id, entity, versions[entity]) if versions else None
+        items = self._cached(key) if key else None
+
+        position = 0
+        if items is not None and start_key is not None:
+            position = next((index + 1 for index, item in enumerate(items)
+                             if portfolio_repository.page_key(entity, portfolio_id, item) == start_key), None)
+        if items is None or position is None:
+            self._count('misses' if key else 'bypassed')
+            page, last_key = portfolio_repository.get_entity_holdings_page(entity, portfolio_id, limit,
+                                                                           start_key, fields)
+            if key and start_key is None and fields is None and last_key is None:
+                self._store_if_current(key, entity, portfolio_id, versions, page)
+                page = copy.deepcopy(page)
+            return page, last_key
+
+        page = items[position:position + limit]
+        last_key = None
+        if position + limit < len(items):
+            last_key = portfolio_repository.page_key(entity, portfolio_id, page[-1])
+        if fields is None:
+            return copy.deepcopy(page), last_key
+        return [{field: copy.deepcopy(item[field]) for field in fields if field in item} for item in page], last_key
+
+    def get_holdings(self, portfolio_id: str) -> Dict[str, List[Dict[str, Any]]]:
+        """Every holding in a portfolio, grouped by entity"""
+        versions = portfolio_repository.get_holdings_versions(portfolio_id)
+        if versions is None:
+            self._count('bypassed')
+            return portfolio_repository.get_holdings(portfolio_id)
+        return {entity: self._entity_holdings(entity, portfolio_id, versions) for entity in HOLDING_ENTITIES}
+
+    def clear(self) -> None:
+        """Drop the in-process tier (the shared tier expires by TTL)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, 'entries': len(self._entries)}
+
+def _configured_backend():
+    try:
+        return create_backend(os.environ.get('HOLDINGS_CACHE_BACKEND', 'none').lower() or 'none',
+                              os.environ.get('HOLDINGS_CACHE_URL'))
+    except Exception as e:
+        logger.warning(f"Holdings cache shared tier unavailable, using in-process cache only: {str(e)}")
+        return None
+
+# Singleton instance
+holdings_cache = HoldingsCache(_configured_backend())
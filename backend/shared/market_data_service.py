@@ -1,12 +1,13 @@
 import os
 import requests
 import logging
-import boto3
 import json
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from decimal import Decimal
 import time
 
+from aws_clients import aws_clients
+
 logger = logging.getLogger()
 
 class MarketDataService:
@@ -14,7 +15,7 @@ class MarketDataService:
         self.alpha_vantage_key = None
         self.finnhub_key = None
         self.session = requests.Session()
-        self.secrets_client = boto3.client('secretsmanager')
+        self.secrets_client = aws_clients.client('secretsmanager')
         
         # Load API keys from Secrets Manager
         self._load_api_keys()
@@ -241,6 +242,73 @@ class MarketDataService:
         
         return results
     
+    def get_daily_series(self, symbol: str, full_history: bool = False) -> List[Dict[str, Any]]:
+        """
+        Get daily closing prices for a symbol, oldest first
+        
+        Args:
+            symbol: Stock or index symbol (e.g. '^AXJO')
+            full_history: If True, request 20+ years instead of the last 100 trading days
+            
+        Returns: [{'date': 'YYYY-MM-DD', 'close': Decimal}, ...]
+        """
+        if self.alpha_vantage_key:
+            try:
+                series = self._get_daily_series_from_alpha_vantage(symbol, full_history)
+                if series:
+                    return series
+            except Exception as e:
+                logger.warning(f"Alpha Vantage daily series failed for {symbol}: {str(e)}")
+        
+        logger.warning(f"No daily series available, using demo mode for {symbol}")
+        return self._get_demo_daily_series(symbol, 5000 if full_history else 100)
+    
+    def _get_daily_series_from_alpha_vantage(self, symbol: str, full_history: bool) -> List[Dict[str, Any]]:
+        """Get daily closes from the Alpha Vantage TIME_SERIES_DAILY endpoint"""
+        url = "https://www.alphavantage.co/query"
+        params = {
+            'function': 'TIME_SERIES_DAILY',
+            'symbol': symbol,
+            'outputsize': 'full' if full_history else 'compact',
+            'apikey': self.alpha_vantage_key
+        }
+        
+        response = self.session.get(url, params=params, timeout=30)
+        response.raise_for_status()
+        
+        data = response.json()
+        
+        if 'Error Message' in data or 'Note' in data:
+            logger.warning(f"Alpha Vantage daily series unavailable for {symbol}")
+            return []
+        
+        series = data.get('Time Series (Daily)', {})
+        return [
+            {'date': day, 'close': Decimal(str(values['4. close']))}
+            for day, values in sorted(series.items())
+        ]
+    
+    def _get_demo_daily_series(self, symbol: str, days: int) -> List[Dict[str, Any]]:
+        """
+        Get a deterministic demo random walk so every container sees the same series
+        """
+        import random
+        from datetime import date, timedelta
+        
+        rng = random.Random(symbol.upper())
+        level = rng.uniform(1000, 8000)
+        end = date.today()
+        
+        series = []
+        for offset in range(days, -1, -1):
+            day = end - timedelta(days=offset)
+            if day.weekday() >= 5:
+                continue
+            level *= 1 + rng.gauss(0.0003, 0.01)
+            series.append({'date': day.isoformat(), 'close': round(Decimal(str(level)), 2)})
+        
+        return series
+    
     def _get_cached_price(self, symbol: str, allow_stale: bool = False) -> Optional[Dict[str, Any]]:
         """
         Get cached price data if it's fresh enough
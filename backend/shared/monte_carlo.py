@@ -0,0 +1,175 @@
+import os
+import time
+import logging
+import multiprocessing
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger()
+
+# Annual (expected return, volatility) for listed assets by portfolioSettings.riskTolerance
+RISK_PROFILES = {
+    'conservative': (0.05, 0.08),
+    'moderate': (0.07, 0.12),
+    'aggressive': (0.09, 0.18),
+}
+
+# Annual (capital growth, volatility) for residential property
+PROPERTY_PROFILE = (0.05, 0.08)
+
+# Paths per unit of work. Chunks are seeded independently, so results do not
+# depend on how many workers the chunks are spread across.
+CHUNK_SIZE = 10000
+
+FAN_PERCENTILES = [5, 10, 25, 50, 75, 90, 95]
+
+MAX_PATHS = 1000000
+
+# Longest horizon; wealth is kept per path per year, so this also bounds memory
+MAX_YEARS = 50
+
+def simulate_chunk(params: Dict[str, Any], paths: int, seed_sequence: np.random.SeedSequence) -> np.ndarray:
+    """
+    Simulate monthly wealth paths and return total wealth at each year end.
+
+    Listed assets compound at lognormal monthly returns, pay fees monthly and receive
+    contributions plus property net cash flow. Property values compound separately.
+    Returns a paths x (years + 1) array.
+    """
+    rng = np.random.default_rng(seed_sequence)
+    years = params['years']
+    months = years * 12
+
+    listed_mu, listed_sigma = params['listedReturn'], params['listedVolatility']
+    property_mu, property_sigma = params['propertyGrowth'], params['propertyVolatility']
+
+    # Convert annual arithmetic parameters to monthly log-normal drift and volatility
+    listed_drift = np.log1p(listed_mu) / 12 - listed_sigma ** 2 / 24
+    listed_vol = listed_sigma / np.sqrt(12)
+    property_drift = np.log1p(property_mu) / 12 - property_sigma ** 2 / 24
+    property_vol = property_sigma / np.sqrt(12)
+
+    monthly_fee = params['annualFeeRate'] / 12
+    monthly_inflow = params['monthlyContribution'] + params['propertyCashFlow'] / 12
+
+    listed = np.full(paths, params['listedValue'], dtype=float)
+    property_value = np.full(paths, params['propertyValue'], dtype=float)
+    wealth = np.empty((paths, years + 1))
+    wealth[:, 0] = listed + property_value
+
+    has_property = params['propertyValue'] > 0
+    for month in range(1, months + 1):
+        listed *= np.exp(listed_drift + listed_vol * rng.standard_normal(paths))
+        listed *= 1 - monthly_fee
+        listed += monthly_inflow
+        if has_property:
+            property_value *= np.exp(property_drift + property_vol * rng.standard_normal(paths))
+        if month % 12 == 0:
+            wealth[:, month // 12] = listed + property_value
+
+    return wealth
+
+def _worker(connection, params: Dict[str, Any], tasks: List[tuple]) -> None:
+    try:
+        connection.send([simulate_chunk(params, paths, seed) for paths, seed in tasks])
+    except Exception as e:
+        connection.send(e)
+    finally:
+        connection.close()
+
+def run_chunks(params: Dict[str, Any], tasks: List[tuple], workers: int) -> List[np.ndarray]:
+    """
+    Run chunk tasks across worker processes.
+
+    Uses Process + Pipe rather than multiprocessing.Pool or ProcessPoolExecutor, which need
+    /dev/shm semaphores that AWS Lambda does not provide.
+    """
+    workers = max(1, min(workers, len(tasks)))
+    if workers == 1:
+        return [simulate_chunk(params, paths, seed) for paths, seed in tasks]
+
+    processes = []
+    for index in range(workers):
+        parent, child = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(target=_worker, args=(child, params, tasks[index::workers]))
+        process.start()
+        child.close()
+        processes.append((process, parent))
+
+    # Chunk i is assigned to worker i % workers; put results back in chunk order
+    results = [None] * len(tasks)
+    for index, (process, parent) in enumerate(processes):
+        received = parent.recv()
+        process.join()
+        if isinstance(received, Exception):
+            raise received
+        results[index::workers] = received
+
+    return results
+
+class MonteCarloEngine:
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers or int(os.environ.get('MONTE_CARLO_WORKERS', os.cpu_count() or 1))
+
+    def project(self, params: Dict[str, Any], paths: int = 100000, seed: int = 0,
+                goals: Optional[List[Dict[str, Any]]] = None,
+                workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Project portfolio wealth and the probability of meeting each goal.
+
+        params: listedValue, propertyValue, propertyCashFlow (annual), monthlyContribution,
+                annualFeeRate, listedReturn, listedVolatility, propertyGrowth,
+                propertyVolatility, years
+        goals: [{'name': str, 'targetAmount': number, 'years': int}] - years defaults to the
+               horizon and must be within it
+        """
+        if paths < 1 or paths > MAX_PATHS:
+            raise ValueError(f"paths must be between 1 and {MAX_PATHS}")
+        if params['years'] < 1 or params['years'] > MAX_YEARS:
+            raise ValueError(f"years must be between 1 and {MAX_YEARS}")
+        goal_years = [int(goal.get('years', params['years'])) for goal in goals or []]
+        if any(year < 1 or year > params['years'] for year in goal_years):
+            raise ValueError(f"goal years must be between 1 and the horizon of {params['years']}")
+
+        started = time.perf_counter()
+
+        chunk_sizes = [CHUNK_SIZE] * (paths // CHUNK_SIZE)
+        if paths % CHUNK_SIZE:
+            chunk_sizes.append(paths % CHUNK_SIZE)
+        seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+        tasks = list(zip(chunk_sizes, seeds))
+
+        wealth = np.vstack(run_chunks(params, tasks, workers or self.workers))
+
+        fan = np.percentile(wealth, FAN_PERCENTILES, axis=0)
+        fan_chart = [
+            {'year': year, **{f"p{p}": round(float(fan[i, year]), 2) for i, p in enumerate(FAN_PERCENTILES)}}
+            for year in range(params['years'] + 1)
+        ]
+
+        goal_results = []
+        for goal, year in zip(goals or [], goal_years):
+            target = float(goal['targetAmount'])
+            goal_results.append({
+                'name': goal.get('name'),
+                'targetAmount': target,
+                'years': year,
+                'probability': round(float(np.mean(wealth[:, year] >= target)), 4),
+                'medianShortfall': round(float(max(target - np.median(wealth[:, year]), 0.0)), 2)
+            })
+
+        elapsed = time.perf_counter() - started
+        return {
+            'paths': paths,
+            'seed': seed,
+            'years': params['years'],
+            'assumptions': params,
+            'fanChart': fan_chart,
+            'goals': goal_results,
+            'elapsedSeconds': round(elapsed, 3),
+            'pathsPerSecond': round(paths / elapsed) if elapsed > 0 else None
+        }
+
+# Singleton instance
+monte_carlo_engine = MonteCarloEngine()
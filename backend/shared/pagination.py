@@ -0,0 +1,143 @@
+import os
+import hmac
+import json
+import base64
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+from aws_clients import aws_clients
+
+logger = logging.getLogger()
+
+# Items per page when a request gives no limit, and the most it may ask for
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# Bumped if the payload layout changes; older cursors are then rejected as invalid
+CURSOR_VERSION = 1
+
+# Bytes of the HMAC-SHA256 kept in a cursor
+SIGNATURE_BYTES = 16
+
+# Secrets Manager secret holding a stage's signing key, when CURSOR_SIGNING_KEY is not set
+CURSOR_SECRET_ID = 'portfoliosync/{stage}/cursor-signing-key'
+
+# Only these runs may sign with the well-known development key; a deployed stage without
+# a key fails closed rather than hand out cursors anyone could forge
+LOCAL_STAGES = ('local', 'test')
+DEV_SIGNING_KEY = 'dev-cursor-signing-key-change-in-production'
+
+class CursorError(ValueError):
+    """Raised for a cursor that is malformed, tampered with or issued for another list"""
+    pass
+
+class CursorKeyError(RuntimeError):
+    """Raised when no cursor signing key is configured for a deployed stage"""
+    pass
+
+def is_local_run() -> bool:
+    return os.environ.get('IS_OFFLINE') == 'true' or os.environ.get('STAGE', '').lower() in LOCAL_STAGES
+
+def load_signing_key() -> str:
+    """
+    The stage's cursor signing key: CURSOR_SIGNING_KEY, else the development key on local
+    runs, else the stage's secret in Secrets Manager. Raises CursorKeyError.
+    """
+    key = os.environ.get('CURSOR_SIGNING_KEY')
+    if key:
+        return key
+    stage = os.environ.get('STAGE', 'dev')
+    if is_local_run():
+        return DEV_SIGNING_KEY
+    try:
+        response = aws_clients.client('secretsmanager').get_secret_value(
+            SecretId=CURSOR_SECRET_ID.format(stage=stage))
+        key = response['SecretString']
+    except Exception as e:
+        logger.error(f"Could not load cursor signing key for stage {stage}: {str(e)}")
+        key = None
+    if not key:
+        raise CursorKeyError(f"No cursor signing key configured for stage {stage}")
+    return key
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode()
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+class CursorCodec:
+    """
+    Opaque page cursors: a DynamoDB position (a LastEvaluatedKey, or a structure of them)
+    in wire format, with the list it was issued for (scope), signed with HMAC-SHA256.
+    Clients cannot read or forge positions, and a cursor from one list (say another
+    portfolio's stocks) is rejected by every other.
+
+    Without a signing_key, the stage's key is loaded (load_signing_key) on first use, so a
+    misconfigured stage fails the requests that need a cursor (CursorKeyError) rather than
+    every import.
+    """
+
+    def __init__(self, signing_key: Optional[str] = None):
+        self._key = signing_key.encode() if signing_key else None
+        self._key_lock = threading.Lock()
+        self._serializer = TypeSerializer()
+        self._deserializer = TypeDeserializer()
+
+    def _signing_key(self) -> bytes:
+        if self._key is None:
+            with self._key_lock:
+                if self._key is None:
+                    self._key = load_signing_key().encode()
+        return self._key
+
+    def _signature(self, payload: str) -> str:
+        return _b64encode(hmac.new(self._signing_key(), payload.encode(), hashlib.sha256).digest()[:SIGNATURE_BYTES])
+
+    def encode(self, position: Optional[Any], scope: str) -> Optional[str]:
+        """Cursor for the page after position in scope; None when there is no next page"""
+        if not position:
+            return None
+        document = {'v': CURSOR_VERSION, 's': scope, 'p': self._serializer.serialize(position)}
+        payload = _b64encode(json.dumps(document, separators=(',', ':'), sort_keys=True).encode())
+        return f"{payload}.{self._signature(payload)}"
+
+    def decode(self, cursor: Optional[str], scope: str) -> Optional[Any]:
+        """Position a cursor issued for scope points at; None for no cursor. Raises CursorError."""
+        if not cursor:
+            return None
+        payload, _, signature = cursor.partition('.')
+        if not signature or not hmac.compare_digest(signature, self._signature(payload)):
+            raise CursorError("Invalid cursor")
+        try:
+            document = json.loads(_b64decode(payload))
+            position = self._deserializer.deserialize(document['p'])
+        except (ValueError, KeyError, TypeError) as e:
+            # Signed by us but unreadable: only possible across a key or format change
+            logger.warning(f"Unreadable signed cursor: {str(e)}")
+            raise CursorError("Invalid cursor")
+        if document.get('v') != CURSOR_VERSION or document.get('s') != scope:
+            raise CursorError("Cursor does not belong to this list")
+        return position
+
+    def page_params(self, query_params: Dict[str, Any], scope: str,
+                    default_limit: int = DEFAULT_PAGE_SIZE) -> Tuple[int, Optional[Any]]:
+        """
+        (limit, position) from a request's limit and cursor query parameters; limit is
+        clamped to MAX_PAGE_SIZE. Raises CursorError for a bad limit or cursor.
+        """
+        value = query_params.get('limit')
+        try:
+            limit = int(value) if value else default_limit
+        except ValueError:
+            raise CursorError("limit must be a positive integer")
+        if limit < 1:
+            raise CursorError("limit must be a positive integer")
+        return min(limit, MAX_PAGE_SIZE), self.decode(query_params.get('cursor'), scope)
+
+# Singleton instance
+cursor_codec = CursorCodec()
@@ -0,0 +1,172 @@
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Any, List, Optional
+
+from portfolio_repository import portfolio_repository
+from portfolio_summary import ASSET_CLASSES, summarize_holdings
+from valuation import MONEY_QUANTUM, HUNDRED, ZERO
+
+logger = logging.getLogger()
+
+GROUP_TYPES = ('family', 'business', 'investment_club', 'partnership', 'trust', 'other')
+MEMBER_ROLES = ('owner', 'admin', 'editor', 'viewer')
+
+# Per-container caches: portfolio summaries by (id, holdingsVersion) and group results
+PORTFOLIO_SUMMARY_CACHE_SIZE = 1024
+GROUP_AGGREGATION_CACHE_SIZE = 128
+
+def group_validation_error(body: Dict[str, Any]) -> Optional[str]:
+    """Check the optional type, portfolioIds and members fields of a group body; returns the error or None"""
+    if 'type' in body and body['type'] not in GROUP_TYPES:
+        return f"type must be one of {', '.join(GROUP_TYPES)}"
+    if not isinstance(body.get('portfolioIds', []), list) or not isinstance(body.get('members', []), list):
+        return "portfolioIds and members must be lists"
+    for member in body.get('members', []):
+        if not isinstance(member, dict) or not member.get('userId'):
+            return "Each member needs a userId"
+        if member.get('role', 'viewer') not in MEMBER_ROLES:
+            return f"role must be one of {', '.join(MEMBER_ROLES)}"
+    return None
+
+def unknown_portfolios(portfolio_ids: List[str]) -> List[str]:
+    """Portfolio ids that do not exist, checked with one batch read"""
+    if not portfolio_ids:
+        return []
+    found = {item['id'] for item in portfolio_repository.get_portfolios(portfolio_ids)}
+    return [portfolio_id for portfolio_id in portfolio_ids if portfolio_id not in found]
+
+def group_members(members: List[Dict[str, Any]], now: str) -> List[Dict[str, Any]]:
+    return [{
+        'userId': member['userId'],
+        'displayName': member.get('displayName', ''),
+        'role': member.get('role', 'viewer'),
+        'status': member.get('status', 'active'),
+        'joinedAt': member.get('joinedAt', now)
+    } for member in members]
+
+def _percentage(part: Decimal, whole: Decimal) -> Decimal:
+    return (part * HUNDRED / whole).quantize(MONEY_QUANTUM) if whole > 0 else ZERO
+
+class GroupAggregator:
+    """
+    Combines the holdings of every portfolio in a group (family, household, club ...).
+
+    Each portfolio's holdingsVersion is bumped whenever its holdings are written
+    (portfolio_summary.touch_portfolios), so cached summaries are keyed by version and a
+    group result is reused until the group or any member portfolio changes.
+    """
+
+    def __init__(self):
+        self._summaries = OrderedDict()
+        self._groups = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cached(self, cache: OrderedDict, key: Any) -> Optional[Any]:
+        with self._lock:
+            value = cache.get(key)
+            if value is not None:
+                cache.move_to_end(key)
+            return value
+
+    def _store(self, cache: OrderedDict, key: Any, value: Any, size: int) -> None:
+        with self._lock:
+            cache[key] = value
+            cache.move_to_end(key)
+            while len(cache) > size:
+                cache.popitem(last=False)
+
+    def portfolio_summaries(self, portfolios: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Summary per portfolio id; portfolios not cached at their current version are loaded concurrently"""
+        summaries, stale = {}, []
+        for portfolio in portfolios:
+            key = (portfolio['id'], int(portfolio.get('holdingsVersion', 0) or 0))
+            summary = self._cached(self._summaries, key)
+            if summary is None:
+                stale.append(key)
+            else:
+                summaries[portfolio['id']] = summary
+
+        if stale:
+            stale_ids = [portfolio_id for portfolio_id, _ in stale]
+            holdings = portfolio_repository.get_holdings_many(stale_ids)
+
+            for key in stale:
+                portfolio_id = key[0]
+                summary = summarize_holdings(holdings[portfolio_id])
+                self._store(self._summaries, key, summary, PORTFOLIO_SUMMARY_CACHE_SIZE)
+                summaries[portfolio_id] = summary
+
+        return summaries
+
+    def aggregate(self, group: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Combined value, return, asset allocation and per-portfolio performance for a group,
+        in the shape of the frontend's GroupAggregation.
+        """
+        portfolio_ids = list(dict.fromkeys(group.get('portfolioIds') or []))
+        portfolios = []
+        if portfolio_ids:
+            portfolios = portfolio_repository.get_portfolios(portfolio_ids)
+        order = {portfolio_id: position for position, portfolio_id in enumerate(portfolio_ids)}
+        portfolios.sort(key=lambda portfolio: order[portfolio['id']])
+
+        signature = (group.get('updatedAt'),
+                     tuple((portfolio['id'], int(portfolio.get('holdingsVersion', 0) or 0)) for portfolio in portfolios))
+        cached = self._cached(self._groups, group['id'])
+        if cached is not None and cached[0] == signature:
+            return {**cached[1], 'cached': True}
+
+        summaries = self.portfolio_summaries(portfolios)
+        members = group.get('members') or []
+        member_names = {member.get('userId'): member.get('displayName') for member in members}
+
+        totals = {asset_class: {'value': ZERO, 'count': 0} for asset_class in ASSET_CLASSES}
+        total_value, total_cost = ZERO, ZERO
+        performance = []
+        for portfolio in portfolios:
+            summary = summaries[portfolio['id']]
+            for asset_class, breakdown in summary['byAssetClass'].items():
+                totals[asset_class]['value'] += breakdown['value']
+                totals[asset_class]['count'] += breakdown['count']
+            total_value += summary['totalValue']
+            total_cost += summary['totalCostBasis']
+            performance.append({
+                'portfolioId': portfolio['id'],
+                'portfolioName': portfolio.get('name', ''),
+                'ownerName': portfolio.get('ownerName') or member_names.get(portfolio.get('ownerId')) or '',
+                'value': summary['totalValue'],
+                'return': summary['totalReturn'],
+                'returnPercentage': summary['returnPercentage'].quantize(MONEY_QUANTUM)
+            })
+
+        total_return = total_value - total_cost
+        result = {
+            'groupId': group['id'],
+            'totalValue': total_value,
+            'totalReturn': total_return,
+            'returnPercentage': _percentage(total_return, total_cost),
+            **{f"{asset_class}Value": totals[asset_class]['value'] for asset_class in ASSET_CLASSES},
+            **{f"{asset_class}Count": totals[asset_class]['count'] for asset_class in ASSET_CLASSES},
+            'portfoliosCount': len(portfolios),
+            'activePortfoliosCount': sum(1 for portfolio in portfolios if portfolio.get('isActive', True)),
+            'membersCount': len(members),
+            'activeMembersCount': sum(1 for member in members if member.get('status', 'active') == 'active'),
+            'portfolioPerformance': performance,
+            'assetAllocation': {
+                asset_class: {'value': totals[asset_class]['value'],
+                              'percentage': _percentage(totals[asset_class]['value'], total_value)}
+                for asset_class in ASSET_CLASSES
+            },
+            'missingPortfolioIds': [portfolio_id for portfolio_id in portfolio_ids
+                                    if portfolio_id not in summaries],
+            'computedAt': datetime.utcnow().isoformat()
+        }
+
+        self._store(self._groups, group['id'], (signature, result), GROUP_AGGREGATION_CACHE_SIZE)
+        return {**result, 'cached': False}
+
+# Singleton instance
+group_aggregator = GroupAggregator()
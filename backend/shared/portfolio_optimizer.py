@@ -0,0 +1,314 @@
+import logging
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from price_history import price_history
+
+logger = logging.getLogger()
+
+TRADING_DAYS_PER_YEAR = 252
+
+# Number of (symbol set, window) covariance models kept per container
+COVARIANCE_CACHE_SIZE = 64
+
+def load_returns_matrix(symbols: List[str], window_days: int,
+                        as_of: Optional[date] = None) -> Tuple[List[str], np.ndarray]:
+    """
+    Build a T x N matrix of daily simple returns from stored closes.
+    Only dates on which every symbol has a close are used.
+    """
+    as_of = as_of or date.today()
+    start = (as_of - timedelta(days=window_days)).isoformat()
+
+    series = {}
+    for symbol in symbols:
+        closes = price_history.get_daily_closes(symbol, start_date=start, end_date=as_of.isoformat())
+        if len(closes) < 2:
+            raise ValueError(f"Not enough price history for {symbol}")
+        series[symbol] = dict(closes)
+
+    common_dates = sorted(set.intersection(*(set(closes) for closes in series.values())))
+    if len(common_dates) < 3:
+        raise ValueError("Not enough overlapping price history for the requested symbols")
+
+    prices = np.array([[float(series[symbol][day]) for symbol in symbols] for day in common_dates])
+    returns = prices[1:] / prices[:-1] - 1.0
+    return common_dates, returns
+
+def shrinkage_covariance(returns: np.ndarray) -> Tuple[np.ndarray, float]:
+    """
+    Ledoit-Wolf covariance estimate shrunk towards a scaled identity matrix.
+    Returns (covariance, shrinkage intensity).
+    """
+    t, n = returns.shape
+    centered = returns - returns.mean(axis=0)
+    sample = centered.T @ centered / t
+
+    mu = np.trace(sample) / n
+    target = mu * np.eye(n)
+
+    delta = np.sum((sample - target) ** 2) / n
+    # sum_t ||x_t x_t' - S||^2 = sum_t ||x_t||^4 - T ||S||^2
+    row_norms = np.sum(centered ** 2, axis=1)
+    beta_bar = (np.sum(row_norms ** 2) - t * np.sum(sample ** 2)) / (t ** 2 * n)
+    beta = min(beta_bar, delta)
+    shrinkage = beta / delta if delta > 0 else 1.0
+
+    return shrinkage * target + (1 - shrinkage) * sample, float(shrinkage)
+
+class MeanVarianceModel:
+    """
+    Annualized expected returns and shrunk covariance for a symbol set, with the
+    closed-form Markowitz quantities precomputed so each what-if costs O(N).
+    """
+
+    def __init__(self, symbols: List[str], expected_returns: np.ndarray, covariance: np.ndarray,
+                 observations: int = 0, shrinkage: float = 0.0):
+        self.symbols = symbols
+        self.expected_returns = expected_returns
+        self.covariance = covariance
+        self.observations = observations
+        self.shrinkage = shrinkage
+
+        ones = np.ones(len(symbols))
+        # Solve once for both right-hand sides instead of inverting the matrix
+        solved = np.linalg.solve(covariance, np.column_stack([ones, expected_returns]))
+        self._inv_ones = solved[:, 0]
+        self._inv_mu = solved[:, 1]
+        self._a = ones @ self._inv_ones
+        self._b = ones @ self._inv_mu
+        self._c = expected_returns @ self._inv_mu
+        self._d = self._a * self._c - self._b ** 2
+
+    @classmethod
+    def from_returns(cls, symbols: List[str], returns: np.ndarray) -> 'MeanVarianceModel':
+        """Build an annualized model from a T x N matrix of daily returns"""
+        covariance, shrinkage = shrinkage_covariance(returns)
+        return cls(symbols, returns.mean(axis=0) * TRADING_DAYS_PER_YEAR,
+                   covariance * TRADING_DAYS_PER_YEAR, returns.shape[0], shrinkage)
+
+    def subset(self, indices: np.ndarray) -> 'MeanVarianceModel':
+        """Model restricted to a subset of assets"""
+        return MeanVarianceModel([self.symbols[i] for i in indices], self.expected_returns[indices],
+                                 self.covariance[np.ix_(indices, indices)], self.observations, self.shrinkage)
+
+    def stats(self, weights: np.ndarray, risk_free_rate: float = 0.0) -> Dict[str, Any]:
+        """Expected return, volatility and Sharpe ratio for a weight vector"""
+        expected_return = float(weights @ self.expected_returns)
+        volatility = float(np.sqrt(max(weights @ self.covariance @ weights, 0.0)))
+        return {
+            'weights': {symbol: round(float(w), 6) for symbol, w in zip(self.symbols, weights)},
+            'expectedReturn': round(expected_return, 6),
+            'volatility': round(volatility, 6),
+            'sharpeRatio': round((expected_return - risk_free_rate) / volatility, 6) if volatility > 0 else None
+        }
+
+    def min_variance_weights(self) -> np.ndarray:
+        return self._inv_ones / self._a
+
+    def max_sharpe_weights(self, risk_free_rate: float = 0.0) -> np.ndarray:
+        inv_excess = self._inv_mu - risk_free_rate * self._inv_ones
+        total = inv_excess.sum()
+        if abs(total) < 1e-12:
+            raise ValueError("Max-Sharpe portfolio is undefined for this risk-free rate")
+        return inv_excess / total
+
+    def target_return_weights(self, target_returns: np.ndarray) -> np.ndarray:
+        """
+        Minimum-variance weights for one or more target returns.
+        Returns a K x N matrix for K targets.
+        """
+        if abs(self._d) < 1e-12:
+            raise ValueError("Expected returns are identical; target-return portfolios are undefined")
+        targets = np.atleast_1d(np.asarray(target_returns, dtype=float))
+        lam = (self._c - self._b * targets) / self._d
+        gam = (self._a * targets - self._b) / self._d
+        return np.outer(lam, self._inv_ones) + np.outer(gam, self._inv_mu)
+
+    def long_only_min_variance_weights(self) -> np.ndarray:
+        n = len(self.symbols)
+        start = np.eye(n)[int(np.argmin(np.diag(self.covariance)))]
+        return solve_long_only(self.covariance, np.ones((1, n)), np.ones(1), start)
+
+    def long_only_max_sharpe_weights(self, risk_free_rate: float = 0.0) -> np.ndarray:
+        """
+        Long-only tangency portfolio: minimize y' covariance y with excess return 1 and
+        y >= 0, then scale y to sum to one
+        """
+        excess = self.expected_returns - risk_free_rate
+        best = int(np.argmax(excess))
+        if excess[best] <= 0:
+            raise ValueError("Max-Sharpe portfolio is undefined: no asset returns more than the risk-free rate")
+        start = np.eye(len(self.symbols))[best] / excess[best]
+        scaled = solve_long_only(self.covariance, excess[np.newaxis, :], np.ones(1), start)
+        return scaled / scaled.sum()
+
+    def long_only_target_return_weights(self, target_return: float) -> np.ndarray:
+        """Minimum-variance long-only weights whose expected return is exactly target_return"""
+        mu = self.expected_returns
+        low, high = int(np.argmin(mu)), int(np.argmax(mu))
+        if not mu[low] - 1e-12 <= target_return <= mu[high] + 1e-12:
+            raise ValueError(f"targetReturn must be between {mu[low]:.6f} and {mu[high]:.6f} "
+                             f"without short positions")
+        # Start from the mix of the lowest- and highest-return assets that hits the target
+        start = np.zeros(len(self.symbols))
+        share = (target_return - mu[low]) / (mu[high] - mu[low]) if mu[high] > mu[low] else 1.0
+        share = min(max(share, 0.0), 1.0)
+        start[low] += 1.0 - share
+        start[high] += share
+        constraints = np.vstack([np.ones(len(mu)), mu])
+        return solve_long_only(self.covariance, constraints, np.array([1.0, target_return]), start)
+
+    def long_only_efficient_frontier(self, points: int = 25) -> List[Dict[str, float]]:
+        """
+        Trace the long-only frontier from the long-only min-variance portfolio up to the
+        highest expected return, solving each point exactly
+        """
+        min_weights = self.long_only_min_variance_weights()
+        min_return = float(min_weights @ self.expected_returns)
+        max_return = max(float(self.expected_returns.max()), min_return)
+        frontier = []
+        for target in np.linspace(min_return, max_return, points):
+            weights = min_weights if target == min_return else self.long_only_target_return_weights(target)
+            frontier.append({
+                'expectedReturn': round(float(target), 6),
+                'volatility': round(float(np.sqrt(max(weights @ self.covariance @ weights, 0.0))), 6)
+            })
+        return frontier
+
+    def efficient_frontier(self, points: int = 25, max_return: Optional[float] = None) -> List[Dict[str, float]]:
+        """Trace the upper branch of the frontier from the min-variance portfolio"""
+        if abs(self._d) < 1e-12:
+            raise ValueError("Expected returns are identical; the efficient frontier is undefined")
+        min_return = self._b / self._a
+        max_return = max_return if max_return is not None else max(float(self.expected_returns.max()), min_return)
+        targets = np.linspace(min_return, max_return, points)
+        # sigma^2(r) = (a r^2 - 2 b r + c) / d, no need to form the weights
+        variances = (self._a * targets ** 2 - 2 * self._b * targets + self._c) / self._d
+        return [
+            {'expectedReturn': round(float(r), 6), 'volatility': round(float(np.sqrt(max(v, 0.0))), 6)}
+            for r, v in zip(targets, variances)
+        ]
+
+def solve_long_only(covariance: np.ndarray, constraints: np.ndarray, rhs: np.ndarray,
+                    start: np.ndarray) -> np.ndarray:
+    """
+    Minimize w' covariance w subject to constraints @ w = rhs and w >= 0 by the primal
+    active-set method, from a feasible start. Each step solves the equality-constrained
+    problem with the zero-weight assets held at zero, so the equality constraints (budget,
+    target return) hold exactly at the solution.
+    """
+    n = len(start)
+    m = constraints.shape[0]
+    weights = start.astype(float)
+    held = weights <= 0
+    for _ in range(10 * n + 10):
+        free = np.flatnonzero(~held)
+        k = len(free)
+        kkt = np.block([[covariance[np.ix_(free, free)], -constraints[:, free].T],
+                        [constraints[:, free], np.zeros((m, m))]])
+        solution = np.linalg.lstsq(kkt, np.concatenate([np.zeros(k), rhs]), rcond=None)[0]
+        step = np.zeros(n)
+        step[free] = solution[:k] - weights[free]
+
+        if np.abs(step).max() < 1e-12:
+            # Optimal once no held-at-zero asset would lower the variance by entering
+            multipliers = covariance @ weights - constraints.T @ solution[k:]
+            candidates = np.flatnonzero(held)
+            if not len(candidates) or multipliers[candidates].min() >= -1e-12:
+                return np.clip(weights, 0.0, None)
+            held[candidates[np.argmin(multipliers[candidates])]] = False
+            continue
+
+        # Move towards the subproblem's solution until a weight reaches zero
+        shrinking = free[step[free] < 0]
+        ratios = -weights[shrinking] / step[shrinking]
+        if len(ratios) and ratios.min() < 1.0:
+            blocking = shrinking[int(np.argmin(ratios))]
+            weights = weights + ratios.min() * step
+            weights[blocking] = 0.0
+            held[blocking] = True
+        else:
+            weights = weights + step
+    raise ValueError("Long-only optimization did not converge")
+
+class PortfolioOptimizer:
+    def __init__(self, cache_size: int = COVARIANCE_CACHE_SIZE):
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_model(self, symbols: List[str], window_days: int = 365) -> MeanVarianceModel:
+        """Get the mean-variance model for a symbol set and window, building it on a cache miss"""
+        symbols = sorted({s.upper() for s in symbols})
+        if len(symbols) < 2:
+            raise ValueError("At least two symbols are required")
+
+        # Keyed by day so the model refreshes once new closes arrive
+        key = (tuple(symbols), window_days, date.today().isoformat())
+        with self._lock:
+            model = self._cache.get(key)
+            if model is not None:
+                self._cache.move_to_end(key)
+                return model
+
+        _, returns = load_returns_matrix(symbols, window_days)
+        model = MeanVarianceModel.from_returns(symbols, returns)
+
+        with self._lock:
+            self._cache[key] = model
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        logger.info(f"Built covariance model for {len(symbols)} symbols over {window_days} days "
+                    f"(shrinkage {model.shrinkage:.3f})")
+        return model
+
+    def optimize(self, symbols: List[str], window_days: int = 365, risk_free_rate: float = 0.0,
+                 target_return: Optional[float] = None, frontier_points: int = 25,
+                 allow_short: bool = True,
+                 current_weights: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """Solve the standard portfolios and trace the efficient frontier"""
+        model = self.get_model(symbols, window_days)
+
+        if allow_short:
+            min_var = model.min_variance_weights()
+            max_sharpe = model.max_sharpe_weights(risk_free_rate)
+        else:
+            min_var = model.long_only_min_variance_weights()
+            max_sharpe = model.long_only_max_sharpe_weights(risk_free_rate)
+
+        result = {
+            'symbols': model.symbols,
+            'windowDays': window_days,
+            'observations': model.observations,
+            'shrinkage': round(model.shrinkage, 6),
+            'riskFreeRate': risk_free_rate,
+            'allowShort': allow_short,
+            'minVariance': model.stats(min_var, risk_free_rate),
+            'maxSharpe': model.stats(max_sharpe, risk_free_rate),
+            'efficientFrontier': [] if frontier_points <= 0 else (
+                model.efficient_frontier(frontier_points) if allow_short
+                else model.long_only_efficient_frontier(frontier_points))
+        }
+
+        if target_return is not None:
+            if allow_short:
+                weights = model.target_return_weights(target_return)[0]
+            else:
+                weights = model.long_only_target_return_weights(target_return)
+            result['targetReturn'] = model.stats(weights, risk_free_rate)
+
+        if current_weights:
+            weights = np.array([current_weights.get(symbol, 0.0) for symbol in model.symbols])
+            if weights.sum() > 0:
+                result['current'] = model.stats(weights / weights.sum(), risk_free_rate)
+
+        return result
+
+# Singleton instance
+portfolio_optimizer = PortfolioOptimizer()
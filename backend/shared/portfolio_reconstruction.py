@@ -0,0 +1,190 @@
+import logging
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from portfolio_summary import ASSET_CLASSES, get_portfolio_holdings
+from portfolio_snapshots import snapshot_store, snapshot_record, LISTED_ASSET_CLASSES
+from price_history import price_history
+
+logger = logging.getLogger()
+
+# Closes this far before the range start seed the forward-fill (weekends, holidays)
+SEED_LOOKBACK_DAYS = 14
+
+def forward_fill(matrix: np.ndarray) -> np.ndarray:
+    """
+    Carry the last non-NaN value down each column of a days x symbols matrix.
+    Leading NaNs (before a column's first value) stay NaN.
+    """
+    rows = np.arange(matrix.shape[0])[:, None]
+    last_valid = np.where(np.isnan(matrix), 0, rows)
+    np.maximum.accumulate(last_valid, axis=0, out=last_valid)
+    return matrix[last_valid, np.arange(matrix.shape[1])]
+
+def _acquired_date(item: Dict[str, Any]) -> str:
+    return str(item.get('purchaseDate') or item.get('createdAt') or date.today().isoformat())[:10]
+
+def _cost_basis(item: Dict[str, Any], cost_field: str) -> float:
+    if item.get(cost_field) is not None:
+        return float(item[cost_field])
+    # Legacy rows without a stored cost basis, as in summarize_holdings
+    return float(item.get('quantity', 0) or 0) * float(item.get('averagePrice', item.get('purchasePrice', 0)) or 0)
+
+def reconstruct_series(holdings: Dict[str, List[Dict[str, Any]]],
+                       closes: Dict[str, List[Tuple[str, Decimal]]],
+                       start: date, end: date) -> Dict[str, np.ndarray]:
+    """
+    Daily value, cost basis and holding count per asset class from start to end inclusive.
+
+    Listed holdings are valued at quantity x the forward-filled daily close of their symbol
+    (the purchase price until the first stored bar). Properties have no price series, so
+    their value is interpolated geometrically from purchasePrice on the purchase date to
+    currentValue today. A holding counts from its purchase date onwards.
+
+    Returns {'days': datetime64[D] array, 'value', 'cost', 'count': days x asset classes arrays}.
+    """
+    asset_classes = list(ASSET_CLASSES)
+    days = np.arange(np.datetime64(start, 'D'), np.datetime64(end, 'D') + 1)
+    n_days = len(days)
+
+    # Price matrix over the range plus a seed window, one column per symbol
+    symbols = sorted({str(item['symbol']).upper() for asset_class in LISTED_ASSET_CLASSES
+                      for item in holdings.get(asset_class, [])})
+    column = {symbol: i for i, symbol in enumerate(symbols)}
+    origin = days[0] - SEED_LOOKBACK_DAYS
+    prices = np.full((n_days + SEED_LOOKBACK_DAYS, len(symbols)), np.nan)
+    for symbol, series in closes.items():
+        if symbol not in column or not series:
+            continue
+        offsets = (np.array([day for day, _ in series], dtype='datetime64[D]') - origin).astype(int)
+        values = np.array([float(close) for _, close in series])
+        in_range = (offsets >= 0) & (offsets < prices.shape[0])
+        prices[offsets[in_range], column[symbol]] = values[in_range]
+    prices = forward_fill(prices)[SEED_LOOKBACK_DAYS:]
+
+    # Per asset class, a days x holdings matrix of values masked to the days each holding was held
+    value = np.zeros((n_days, len(asset_classes)))
+    cost = np.zeros((n_days, len(asset_classes)))
+    count = np.zeros((n_days, len(asset_classes)), dtype=int)
+    day_index = np.arange(n_days)[:, None]
+    today = np.datetime64(date.today(), 'D')
+
+    for class_index, asset_class in enumerate(asset_classes):
+        items = holdings.get(asset_class, [])
+        if not items:
+            continue
+        _, _, cost_field = ASSET_CLASSES[asset_class]
+        acquired = np.array([_acquired_date(item) for item in items], dtype='datetime64[D]')
+        held = day_index >= (acquired - days[0]).astype(int)[None, :]
+        costs = np.array([_cost_basis(item, cost_field) for item in items])
+
+        if asset_class in LISTED_ASSET_CLASSES:
+            quantity = np.array([float(item.get('quantity', 0) or 0) for item in items])
+            fallback = np.array([float(item.get('purchasePrice', item.get('averagePrice', 0)) or 0) for item in items])
+            item_prices = prices[:, [column[str(item['symbol']).upper()] for item in items]]
+            item_prices = np.where(np.isnan(item_prices), fallback[None, :], item_prices)
+            item_values = item_prices * quantity[None, :]
+        else:
+            purchase = np.array([float(item.get('purchasePrice', 0) or 0) for item in items])
+            current = np.array([float(item.get('currentValue', 0) or 0) for item in items])
+            span = np.maximum((today - acquired).astype(int), 1)
+            growth = np.divide(current, purchase, out=np.ones(len(items)), where=purchase > 0)
+            elapsed = np.clip((days[:, None] - acquired[None, :]).astype(int) / span[None, :], 0.0, 1.0)
+            item_values = np.where(purchase > 0, purchase * growth ** elapsed, current)
+
+        value[:, class_index] = np.where(held, item_values, 0.0).sum(axis=1)
+        cost[:, class_index] = (held * costs[None, :]).sum(axis=1)
+        count[:, class_index] = held.sum(axis=1)
+
+    return {'days': days, 'assetClasses': asset_classes, 'value': value, 'cost': cost, 'count': count}
+
+def series_to_snapshots(portfolio_id: str, series: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    """Convert a reconstructed series into snapshot items"""
+    snapshots = []
+    asset_classes = series['assetClasses']
+    for i, day in enumerate(series['days'].astype(str).tolist()):
+        by_asset_class = {
+            asset_class: {
+                'value': Decimal(str(round(float(series['value'][i, j]), 2))),
+                'costBasis': Decimal(str(round(float(series['cost'][i, j]), 2))),
+                'count': int(series['count'][i, j])
+            }
+            for j, asset_class in enumerate(asset_classes)
+        }
+        summary = {
+            'totalValue': sum((totals['value'] for totals in by_asset_class.values()), Decimal('0')),
+            'totalCostBasis': sum((totals['costBasis'] for totals in by_asset_class.values()), Decimal('0')),
+            'byAssetClass': by_asset_class
+        }
+        snapshots.append(snapshot_record(portfolio_id, day, summary, 'reconstructed'))
+    return snapshots
+
+def load_closes(symbols: List[str], start: date, end: date, fetch_missing: bool = False) -> Dict[str, List[Tuple[str, Decimal]]]:
+    """
+    Stored daily closes for each symbol over the range plus the seed window.
+    With fetch_missing, symbols whose stored history starts after the range start are
+    backfilled from the market data provider first.
+    """
+    seed_start = (start - timedelta(days=SEED_LOOKBACK_DAYS)).isoformat()
+    closes = {}
+    for symbol in symbols:
+        series = price_history.get_daily_closes(symbol, start_date=seed_start, end_date=end.isoformat())
+        if fetch_missing and (not series or series[0][0] > start.isoformat()):
+            from market_data_service import market_data_service
+            bars = market_data_service.get_daily_series(symbol, full_history=True)
+            if bars:
+                price_history.put_daily_closes(symbol, bars, source='reconstruction')
+                series = price_history.get_daily_closes(symbol, start_date=seed_start, end_date=end.isoformat())
+        closes[symbol] = series
+    return closes
+
+def reconstruct_portfolio(portfolio_id: str, start: Optional[date] = None, end: Optional[date] = None,
+                          overwrite: bool = False, fetch_missing: bool = False) -> Dict[str, Any]:
+    """
+    Backfill snapshots for a portfolio from its first purchase (or start) up to end.
+    Days that already have a snapshot from the daily job are kept unless overwrite is set.
+    """
+    holdings = get_portfolio_holdings(portfolio_id)
+    items = [item for asset_class in ASSET_CLASSES for item in holdings.get(asset_class, [])]
+    if not items:
+        raise ValueError("Portfolio has no holdings to reconstruct")
+
+    end = end or date.today()
+    start = start or min(date.fromisoformat(_acquired_date(item)) for item in items)
+    if start > end:
+        raise ValueError("Start date must not be after end date")
+
+    started = datetime.utcnow()
+    symbols = sorted({str(item['symbol']).upper() for asset_class in LISTED_ASSET_CLASSES
+                      for item in holdings.get(asset_class, [])})
+    closes = load_closes(symbols, start, end, fetch_missing=fetch_missing)
+    series = reconstruct_series(holdings, closes, start, end)
+    snapshots = series_to_snapshots(portfolio_id, series)
+
+    skipped = 0
+    if not overwrite:
+        existing = {item['date'] for item in snapshot_store.get_snapshots(portfolio_id, start.isoformat(), end.isoformat())
+                    if item.get('source') != 'reconstructed'}
+        skipped = len([item for item in snapshots if item['date'] in existing])
+        snapshots = [item for item in snapshots if item['date'] not in existing]
+
+    written = snapshot_store.put_snapshots(snapshots)
+    missing = [symbol for symbol in symbols if not closes.get(symbol)]
+    if missing:
+        logger.warning(f"No stored closes for {', '.join(missing)}; valued at purchase price")
+
+    logger.info(f"Reconstructed {len(series['days'])} days for portfolio {portfolio_id} "
+                f"({len(symbols)} symbols) in {(datetime.utcnow() - started).total_seconds():.2f}s")
+
+    return {
+        'portfolioId': portfolio_id,
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'days': len(series['days']),
+        'written': written,
+        'skippedExisting': skipped,
+        'symbolsWithoutHistory': missing
+    }
@@ -0,0 +1,313 @@
+import os
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+
+from dynamodb_client import db_client, ItemNotFoundError
+
+logger = logging.getLogger()
+
+# 'multi': one table per entity (PORTFOLIOS_TABLE, STOCKS_TABLE ...), each with a portfolioId-index
+# 'single': every entity of a portfolio in PORTFOLIO_DATA_TABLE under one partition
+DATA_LAYOUTS = ('multi', 'single')
+
+ENTITY_TABLES = {
+    'portfolios': 'PORTFOLIOS_TABLE',
+    'stocks': 'STOCKS_TABLE',
+    'etfs': 'ETFS_TABLE',
+    'properties': 'PROPERTIES_TABLE',
+}
+
+HOLDING_ENTITIES = ('stocks', 'etfs', 'properties')
+
+# Single-table sort keys: META for the portfolio itself, <PREFIX><id> for each holding
+SORT_KEY_PREFIXES = {
+    'portfolios': 'META',
+    'stocks': 'STOCK#',
+    'etfs': 'ETF#',
+    'properties': 'PROP#',
+}
+
+PARTITION_PREFIX = 'PORTFOLIO#'
+
+# Per-entity change counters on the portfolio item, bumped by portfolio_summary.touch_portfolios
+VERSION_ATTRIBUTES = {entity: f"{entity}Version" for entity in HOLDING_ENTITIES}
+
+# Attributes only the single-table layout stores; stripped before items leave the repository
+STORAGE_ATTRIBUTES = ('pk', 'sk', 'entityType')
+
+def single_table_item(entity: str, item: Dict[str, Any]) -> Dict[str, Any]:
+    """An entity item with its single-table keys (pk = PORTFOLIO#id, sk = META | STOCK#id ...)"""
+    portfolio_id = item['id'] if entity == 'portfolios' else item.get('portfolioId')
+    if not portfolio_id:
+        raise ValueError(f"{entity} item {item.get('id')} has no portfolioId")
+    sort_key = SORT_KEY_PREFIXES[entity] if entity == 'portfolios' else f"{SORT_KEY_PREFIXES[entity]}{item['id']}"
+    return {**item, 'pk': f"{PARTITION_PREFIX}{portfolio_id}", 'sk': sort_key, 'entityType': entity}
+
+def entity_of(item: Dict[str, Any]) -> Optional[str]:
+    """Entity name of a single-table item, from its sort key"""
+    sort_key = item.get('sk', '')
+    for entity, prefix in SORT_KEY_PREFIXES.items():
+        if sort_key.startswith(prefix):
+            return entity
+    return None
+
+def strip_storage(item: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if item is None:
+        return None
+    return {k: v for k, v in item.items() if k not in STORAGE_ATTRIBUTES}
+
+class PortfolioRepository:
+    """
+    Reads and writes portfolios and holdings in the layout selected by DATA_LAYOUT.
+
+    In the single-table layout a portfolio and all its holdings share the partition
+    PORTFOLIO#<id>, so get_holdings is one query instead of one per holdings table.
+    GSIs cover the remaining access paths: keys-only id-index finds the table key of a
+    holding addressed by id alone, entityType-index (entityType, id) lists every item of
+    one entity for the bulk jobs, and sparse symbol-index finds every holding of a listed
+    symbol. Items returned to callers have the same shape in both layouts.
+    """
+
+    def __init__(self):
+        self.layout = os.environ.get('DATA_LAYOUT', 'multi').lower()
+        if self.layout not in DATA_LAYOUTS:
+            logger.warning(f"Unknown DATA_LAYOUT {self.layout}, using multi")
+            self.layout = 'multi'
+        self.single_table = os.environ.get('PORTFOLIO_DATA_TABLE')
+
+    @property
+    def is_single(self) -> bool:
+        return self.layout == 'single'
+
+    def table_name(self, entity: str) -> Optional[str]:
+        """Table holding an entity in the active layout"""
+        return self.single_table if self.is_single else os.environ.get(ENTITY_TABLES[entity])
+
+    def key(self, entity: str, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Primary key of an entity item in the active layout"""
+        if not self.is_single:
+            return {'id': item['id']}
+        stored = single_table_item(entity, item)
+        return {'pk': stored['pk'], 'sk': stored['sk']}
+
+    def storage_item(self, entity: str, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Item as written in the active layout (for callers building their own writes)"""
+        return single_table_item(entity, item) if self.is_single else item
+
+    # Portfolios
+
+    def get_portfolio(self, portfolio_id: str) -> Optional[Dict[str, Any]]:
+        return strip_storage(db_client.get_item(self.table_name('portfolios'),
+                                                self.key('portfolios', {'id': portfolio_id})))
+
+    def get_holdings_versions(self, portfolio_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Current holdings version per entity of a portfolio (strongly consistent, so a bump made
+        by a completed write is always seen), plus holdingsUpdatedAt, the time of the last
+        bump (None if never bumped); None if the portfolio does not exist.
+        """
+        item = db_client.get_item(self.table_name('portfolios'), self.key('portfolios', {'id': portfolio_id}),
+                                  consistent=True, projection=['id', 'holdingsUpdatedAt', *VERSION_ATTRIBUTES.values()])
+        if item is None:
+            return None
+        versions = {entity: int(item.get(attribute, 0) or 0) for entity, attribute in VERSION_ATTRIBUTES.items()}
+        versions['holdingsUpdatedAt'] = item.get('holdingsUpdatedAt')
+        return versions
+
+    def get_portfolios(self, portfolio_ids: List[str]) -> List[Dict[str, Any]]:
+        """Portfolios by id with one batch read; missing ids are left out"""
+        if not portfolio_ids:
+            return []
+        keys = [self.key('portfolios', {'id': portfolio_id}) for portfolio_id in dict.fromkeys(portfolio_ids)]
+        return [strip_storage(item) for item in db_client.batch_get_items(self.table_name('portfolios'), keys)]
+
+    def list_portfolios(self) -> List[Dict[str, Any]]:
+        if not self.is_single:
+            return db_client.scan_table(self.table_name('portfolios'))
+        return self.scan_entities('portfolios')
+
+    def put_portfolio(self, portfolio: Dict[str, Any]) -> Dict[str, Any]:
+        db_client.put_item(self.table_name('portfolios'), self.storage_item('portfolios', portfolio))
+        return portfolio
+
+    # Holdings
+
+    def get_holding(self, entity: str, holding_id: str, portfolio_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """A holding by id, read strongly consistent (see holding_key for portfolio_id)"""
+        try:
+            key = self.holding_key(entity, holding_id, portfolio_id)
+        except ItemNotFoundError:
+            return None
+        return strip_storage(db_client.get_item(self.table_name(entity), key, consistent=True))
+
+    def get_holdings(self, portfolio_id: str) -> Dict[str, List[Dict[str, Any]]]:
+        """Every holding in a portfolio, grouped by entity"""
+        return self.get_holdings_many([portfolio_id])[portfolio_id]
+
+    def get_entity_holdings(self, entity: str, portfolio_id: str,
+                            fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """One entity's holdings in a portfolio, optionally only the given top-level fields"""
+        if not self.is_single:
+            return db_client.query_partitions(self.table_name(entity), 'portfolioId', [portfolio_id],
+                                              index_name='portfolioId-index', projection=fields)[portfolio_id]
+        # The entity's sort keys are contiguous under the portfolio partition
+        prefix = SORT_KEY_PREFIXES[entity]
+        partition = f"{PARTITION_PREFIX}{portfolio_id}"
+        items = db_client.query_partitions(self.single_table, 'pk', [partition], sort_key='sk',
+                                           start=prefix, end=prefix + '\uffff', projection=fields)[partition]
+        return [strip_storage(item) for item in items]
+
+    def get_entity_holdings_page(self, entity: str, portfolio_id: str, limit: int,
+                                 start_key: Optional[Dict[str, Any]] = None,
+                                 fields: Optional[List[str]] = None) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Up to limit of one entity's holdings after start_key, in get_entity_holdings order,
+        and the key to continue from (None on the last page)
+        """
+        if not self.is_single:
+            return db_client.query_page(self.table_name(entity), 'portfolioId', portfolio_id, limit, start_key,
+                                        index_name='portfolioId-index', projection=fields)
+        prefix = SORT_KEY_PREFIXES[entity]
+        items, last_key = db_client.query_page(self.single_table, 'pk', f"{PARTITION_PREFIX}{portfolio_id}", limit,
+                                               start_key, sort_key='sk', start=prefix, end=prefix + '\uffff',
+                                               projection=fields)
+        return [strip_storage(item) for item in items], last_key
+
+    def page_key(self, entity: str, portfolio_id: str, item: Dict[str, Any]) -> Dict[str, Any]:
+        """The last_key get_entity_holdings_page returns for a page ending at item"""
+        if not self.is_single:
+            return {'id': item['id'], 'portfolioId': portfolio_id}
+        return {'pk': f"{PARTITION_PREFIX}{portfolio_id}", 'sk': f"{SORT_KEY_PREFIXES[entity]}{item['id']}"}
+
+    def get_holdings_many(self, portfolio_ids: List[str]) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+        """
+        Holdings of several portfolios, queried concurrently:
+        one query per portfolio (single) or per portfolio and holdings table (multi).
+        """
+        portfolio_ids = list(dict.fromkeys(portfolio_ids))
+        result = {portfolio_id: {entity: [] for entity in HOLDING_ENTITIES} for portfolio_id in portfolio_ids}
+        if not portfolio_ids:
+            return result
+
+        if self.is_single:
+            partitions = db_client.query_partitions(self.single_table, 'pk',
+                                                    [f"{PARTITION_PREFIX}{portfolio_id}" for portfolio_id in portfolio_ids])
+            for portfolio_id in portfolio_ids:
+                for item in partitions.get(f"{PARTITION_PREFIX}{portfolio_id}", []):
+                    entity = entity_of(item)
+                    if entity in HOLDING_ENTITIES:
+                        result[portfolio_id][entity].append(strip_storage(item))
+            return result
+
+        for entity in HOLDING_ENTITIES:
+            table_name = self.table_name(entity)
+            if not table_name:
+                logger.warning(f"{ENTITY_TABLES[entity]} not configured, skipping {entity}")
+                continue
+            by_portfolio = db_client.query_partitions(table_name, 'portfolioId', portfolio_ids,
+                                                      index_name='portfolioId-index')
+            for portfolio_id in portfolio_ids:
+                result[portfolio_id][entity] = by_portfolio.get(portfolio_id, [])
+        return result
+
+    def list_portfolios_page(self, limit: int,
+                             start_key: Optional[Dict[str, Any]] = None) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Up to limit portfolios after start_key, and the key to continue from (None on the last
+        page). Scan order (multi) or id order on entityType-index (single); both are stable.
+        """
+        if not self.is_single:
+            return db_client.scan_page(self.table_name('portfolios'), limit, start_key)
+        items, last_key = db_client.query_page(self.single_table, 'entityType', 'portfolios', limit, start_key,
+                                               index_name='entityType-index')
+        return [strip_storage(item) for item in items], last_key
+
+    def scan_entities(self, entity: str) -> List[Dict[str, Any]]:
+        """Every item of one entity, for bulk jobs"""
+        if not self.is_single:
+            return db_client.scan_table(self.table_name(entity))
+        items = db_client.query_partitions(self.single_table, 'entityType', [entity],
+                                           index_name='entityType-index').get(entity, [])
+        return [strip_storage(item) for item in items]
+
+    def holdings_by_symbol(self, entity: str, symbol: str) -> List[Dict[str, Any]]:
+        """Every holding of a listed symbol (symbol-index)"""
+        items = db_client.query_partitions(self.table_name(entity), 'symbol', [symbol],
+                                           index_name='symbol-index').get(symbol, [])
+        if not self.is_single:
+            return items
+        return [strip_storage(item) for item in items if item.get('entityType') == entity]
+
+    def put_holding(self, entity: str, holding: Dict[str, Any]) -> Dict[str, Any]:
+        db_client.put_item(self.table_name(entity), self.storage_item(entity, holding))
+        return holding
+
+    def put_holdings(self, entity: str, holdings: List[Dict[str, Any]]) -> int:
+        """Batch write full holding items"""
+        return db_client.batch_put_items(self.table_name(entity),
+                                         [self.storage_item(entity, holding) for holding in holdings])
+
+    def update_holding(self, entity: str, existing: Dict[str, Any], update_expression: str,
+                       expression_values: Dict[str, Any],
+                       expression_names: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Apply an update expression to a holding and return the updated item"""
+        kwargs = {'expression_names': expression_names} if expression_names else {}
+        updated = db_client.update_item(
+            table_name=self.table_name(entity),
+            key=self.key(entity, existing),
+            update_expression=update_expression,
+            expression_values=expression_values,
+            **kwargs
+        )
+        return strip_storage(updated)
+
+    def delete_holding(self, entity: str, existing: Dict[str, Any]) -> bool:
+        return db_client.delete_item(self.table_name(entity), self.key(entity, existing))
+
+    def holding_key(self, entity: str, holding_id: str, portfolio_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Primary key of a holding addressed by id, as the PUT/DELETE routes do. Free in the multi
+        layout, and in the single-table layout when the caller knows the portfolio id;
+        otherwise looked up on id-index. That lookup is eventually consistent, so a holding
+        created a moment ago may not be found yet: routes that can should pass portfolio_id.
+        Raises ItemNotFoundError if the lookup finds nothing.
+        """
+        if not self.is_single:
+            return {'id': holding_id}
+        if portfolio_id:
+            return self.key(entity, {'id': holding_id, 'portfolioId': portfolio_id})
+        prefix = SORT_KEY_PREFIXES[entity]
+        keys = db_client.query_partitions(self.single_table, 'id', [holding_id],
+                                          index_name='id-index').get(holding_id, [])
+        for key in keys:
+            if key['sk'].startswith(prefix):
+                return {'pk': key['pk'], 'sk': key['sk']}
+        raise ItemNotFoundError(f"No {entity} item {holding_id}")
+
+    def update_holding_fields(self, entity: str, holding_id: str, changes: Dict[str, Any],
+                              existing: Optional[Dict[str, Any]] = None,
+                              portfolio_id: Optional[str] = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        SET the given attributes on a holding that must exist, without reading it first
+        (existing or portfolio_id, when the caller has one, saves the single-table key lookup).
+        Returns (before, after); raises ItemNotFoundError if the holding does not exist.
+        """
+        key = self.key(entity, existing) if existing else self.holding_key(entity, holding_id, portfolio_id)
+        names = {f"#u{index}": field for index, field in enumerate(changes)}
+        before = db_client.update_existing_item(
+            self.table_name(entity), key,
+            update_expression="SET " + ", ".join(f"{name} = :u{index}" for index, name in enumerate(names)),
+            expression_values={f":u{index}": value for index, value in enumerate(changes.values())},
+            expression_names=names,
+            return_values='ALL_OLD'
+        )
+        before = strip_storage(before)
+        return before, {**before, **changes}
+
+    def delete_holding_by_id(self, entity: str, holding_id: str, portfolio_id: Optional[str] = None) -> Dict[str, Any]:
+        """Delete a holding that must exist without reading it first; returns the deleted item"""
+        return strip_storage(db_client.delete_existing_item(self.table_name(entity),
+                                                            self.holding_key(entity, holding_id, portfolio_id)))
+
+# Singleton instance
+portfolio_repository = PortfolioRepository()
@@ -0,0 +1,184 @@
+import os
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Dict, Any, List, Optional, Tuple
+
+from boto3.dynamodb.conditions import Key
+
+from benchmark_service import PERFORMANCE_PERIODS, calculate_period_returns
+from dynamodb_client import db_client
+from portfolio_summary import ASSET_CLASSES, summarize_holdings
+from portfolio_repository import portfolio_repository
+from price_history import price_history
+
+logger = logging.getLogger()
+
+CENT = Decimal('0.01')
+
+# Asset classes valued from market quotes rather than a stored valuation
+LISTED_ASSET_CLASSES = ('stocks', 'etfs')
+
+def snapshot_record(portfolio_id: str, day: str, summary: Dict[str, Any], source: str) -> Dict[str, Any]:
+    """
+    Compact snapshot item for one portfolio on one day, from a summarize_holdings() result.
+    Shared by the daily job and historical reconstruction so charts read one format.
+    """
+    return {
+        'portfolioId': portfolio_id,
+        'date': day,
+        'totalValue': summary['totalValue'].quantize(CENT),
+        'totalCostBasis': summary['totalCostBasis'].quantize(CENT),
+        'byAssetClass': {
+            asset_class: {
+                'value': totals['value'].quantize(CENT),
+                'costBasis': totals['costBasis'].quantize(CENT),
+                'count': totals['count']
+            }
+            for asset_class, totals in summary['byAssetClass'].items() if totals['count']
+        },
+        'source': source,
+        'createdAt': datetime.utcnow().isoformat()
+    }
+
+def time_weighted_series(snapshots: List[Dict[str, Any]]) -> List[Tuple[str, Decimal]]:
+    """
+    Unit value series (starting at 1) of a portfolio from its ascending daily snapshots,
+    so period returns measure performance rather than money added or withdrawn. The
+    change in totalCostBasis between two snapshots is taken as that day's net flow;
+    days that start from a zero value carry the previous unit value.
+    """
+    series = []
+    unit_value, previous = Decimal('1'), None
+    for snapshot in snapshots:
+        value = Decimal(str(snapshot['totalValue']))
+        if previous is not None:
+            start_value = Decimal(str(previous['totalValue']))
+            flow = Decimal(str(snapshot['totalCostBasis'])) - Decimal(str(previous['totalCostBasis']))
+            if start_value > 0:
+                unit_value *= (value - flow) / start_value
+        series.append((snapshot['date'], unit_value))
+        previous = snapshot
+    return series
+
+class PortfolioSnapshotStore:
+    """One value record per portfolio per day in PORTFOLIO_SNAPSHOTS_TABLE, keyed (portfolioId, date)"""
+
+    def __init__(self):
+        self.table_name = os.environ.get('PORTFOLIO_SNAPSHOTS_TABLE')
+
+    def get_snapshots(self, portfolio_id: str, start_date: Optional[str] = None,
+                      end_date: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get snapshots for a date range in ascending order with a single (paginated) query"""
+        if not self.table_name:
+            logger.warning("PORTFOLIO_SNAPSHOTS_TABLE not configured")
+            return []
+
+        table = db_client.get_table(self.table_name)
+        params = {
+            'KeyConditionExpression': Key('portfolioId').eq(portfolio_id) &
+                                      Key('date').between(start_date or '1900-01-01',
+                                                          end_date or date.today().isoformat())
+        }
+
+        items = []
+        while True:
+            response = table.query(**params)
+            items.extend(response.get('Items', []))
+            last_key = response.get('LastEvaluatedKey')
+            if not last_key:
+                return items
+            params['ExclusiveStartKey'] = last_key
+
+    def get_period_return(self, portfolio_id: str, period: str) -> Optional[Decimal]:
+        """
+        Time-weighted percentage return of a portfolio over a benchmark period, measured
+        the way benchmark_service measures the indices (ending at the latest snapshot);
+        None when the snapshots do not reach back to the period start.
+        """
+        start = (date.today() - timedelta(days=PERFORMANCE_PERIODS[period] + 10)).isoformat()
+        snapshots = self.get_snapshots(portfolio_id, start_date=start)
+        return calculate_period_returns(time_weighted_series(snapshots)).get(period)
+
+    def put_snapshots(self, snapshots: List[Dict[str, Any]]) -> int:
+        if not self.table_name:
+            logger.warning("PORTFOLIO_SNAPSHOTS_TABLE not configured, snapshots not stored")
+            return 0
+        return db_client.batch_put_items(self.table_name, snapshots)
+
+    def load_all_holdings(self) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+        """Read every holding once and group the rows by portfolio and asset class"""
+        by_portfolio = defaultdict(lambda: {asset_class: [] for asset_class in ASSET_CLASSES})
+        for asset_class in ASSET_CLASSES:
+            if not portfolio_repository.table_name(asset_class):
+                logger.warning(f"No table configured for {asset_class}, skipping")
+                continue
+            for item in portfolio_repository.scan_entities(asset_class):
+                if item.get('portfolioId'):
+                    by_portfolio[item['portfolioId']][asset_class].append(item)
+        return by_portfolio
+
+    def latest_quotes(self, holdings: Dict[str, Dict[str, List[Dict[str, Any]]]]) -> Dict[str, Decimal]:
+        """
+        Latest price per distinct listed symbol across all portfolios.
+        Uses the most recent stored close, falling back to the freshest currentPrice on a holding.
+        """
+        fallback = {}
+        for portfolio in holdings.values():
+            for asset_class in LISTED_ASSET_CLASSES:
+                for item in portfolio[asset_class]:
+                    symbol = str(item.get('symbol', '')).upper()
+                    if not symbol or item.get('currentPrice') is None:
+                        continue
+                    updated = str(item.get('updatedAt', ''))
+                    if symbol not in fallback or updated > fallback[symbol][0]:
+                        fallback[symbol] = (updated, Decimal(str(item['currentPrice'])))
+
+        quotes = {}
+        for symbol, (_, current_price) in fallback.items():
+            latest = price_history.get_latest_close(symbol)
+            quotes[symbol] = latest[1] if latest else current_price
+        return quotes
+
+    def create_daily_snapshots(self, day: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Value every portfolio from the latest quotes and write one snapshot each.
+        Holdings tables are scanned once and each symbol is priced once, however many
+        portfolios hold it.
+        """
+        day = day or date.today().isoformat()
+        holdings = self.load_all_holdings()
+
+        if portfolio_repository.table_name('portfolios'):
+            # Portfolios without holdings still get a zero snapshot so their charts have no gaps
+            for portfolio in portfolio_repository.list_portfolios():
+                if portfolio['id'] not in holdings:
+                    holdings[portfolio['id']] = {asset_class: [] for asset_class in ASSET_CLASSES}
+
+        quotes = self.latest_quotes(holdings)
+
+        snapshots = []
+        for portfolio_id, portfolio in holdings.items():
+            repriced = dict(portfolio)
+            for asset_class in LISTED_ASSET_CLASSES:
+                repriced[asset_class] = [
+                    {**item, 'totalValue': Decimal(str(item.get('quantity', 0) or 0)) *
+                     quotes.get(str(item.get('symbol', '')).upper(),
+                                Decimal(str(item.get('currentPrice', 0) or 0)))}
+                    for item in portfolio[asset_class]
+                ]
+            snapshots.append(snapshot_record(portfolio_id, day, summarize_holdings(repriced), 'daily'))
+
+        written = self.put_snapshots(snapshots)
+        logger.info(f"Wrote {written} portfolio snapshots for {day} ({len(quotes)} symbols priced)")
+
+        return {
+            'date': day,
+            'portfolios': len(snapshots),
+            'symbolsPriced': len(quotes),
+            'written': written
+        }
+
+# Singleton instance
+snapshot_store = PortfolioSnapshotStore()
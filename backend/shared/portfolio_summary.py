@@ -0,0 +1,91 @@
+import logging
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Any, List, Iterable, Optional
+
+from dynamodb_client import db_client
+from portfolio_repository import portfolio_repository, HOLDING_ENTITIES, VERSION_ATTRIBUTES
+from holdings_cache import holdings_cache
+
+logger = logging.getLogger()
+
+# Asset class -> (table env var, value field, cost basis field)
+ASSET_CLASSES = {
+    'stocks': ('STOCKS_TABLE', 'totalValue', 'totalCostBasis'),
+    'etfs': ('ETFS_TABLE', 'totalValue', 'totalCostBasis'),
+    'properties': ('PROPERTIES_TABLE', 'currentValue', 'totalPurchaseCosts'),
+}
+
+def get_portfolio_holdings(portfolio_id: str) -> Dict[str, List[Dict[str, Any]]]:
+    """Load every holding in a portfolio, grouped by asset class (served from the holdings cache when current)"""
+    return holdings_cache.get_holdings(portfolio_id)
+
+def touch_portfolios(portfolio_ids: Iterable[str], entity: Optional[str] = None) -> None:
+    """
+    Bump holdingsVersion, and the version of the entity that changed (every entity if None),
+    on each portfolio after its holdings change, so cached holdings (holdings_cache) and
+    aggregates built from them (group aggregation) are not served again.
+    Best effort: failures are logged.
+    """
+    table_name = portfolio_repository.table_name('portfolios')
+    if not table_name:
+        return
+
+    entities = [entity] if entity else HOLDING_ENTITIES
+    counters = ', '.join(['holdingsVersion :one'] + [f"{VERSION_ATTRIBUTES[name]} :one" for name in entities])
+    table = db_client.get_table(table_name)
+    now = datetime.utcnow().isoformat()
+    for portfolio_id in sorted({portfolio_id for portfolio_id in portfolio_ids if portfolio_id}):
+        try:
+            table.update_item(
+                Key=portfolio_repository.key('portfolios', {'id': portfolio_id}),
+                UpdateExpression=f"ADD {counters} SET holdingsUpdatedAt = :now",
+                ConditionExpression="attribute_exists(id)",
+                ExpressionAttributeValues={':one': 1, ':now': now}
+            )
+        except Exception as e:
+            logger.warning(f"Could not update holdings version for portfolio {portfolio_id}: {str(e)}")
+
+def summarize_holdings(holdings: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    Sum value and cost basis per asset class.
+    Legacy stock rows without totalCostBasis fall back to quantity * averagePrice.
+    """
+    summary = {
+        'totalValue': Decimal('0'),
+        'totalCostBasis': Decimal('0'),
+        'byAssetClass': {}
+    }
+
+    for asset_class, (_, value_field, cost_field) in ASSET_CLASSES.items():
+        value = Decimal('0')
+        cost = Decimal('0')
+        items = holdings.get(asset_class, [])
+        for item in items:
+            value += Decimal(str(item.get(value_field, 0) or 0))
+            if item.get(cost_field) is not None:
+                cost += Decimal(str(item[cost_field]))
+            else:
+                quantity = Decimal(str(item.get('quantity', 0) or 0))
+                cost += quantity * Decimal(str(item.get('averagePrice', item.get('purchasePrice', 0)) or 0))
+
+        summary['byAssetClass'][asset_class] = {
+            'value': value,
+            'costBasis': cost,
+            'count': len(items)
+        }
+        summary['totalValue'] += value
+        summary['totalCostBasis'] += cost
+
+    summary['totalReturn'] = summary['totalValue'] - summary['totalCostBasis']
+    summary['returnPercentage'] = (
+        summary['totalReturn'] / summary['totalCostBasis'] * Decimal('100')
+        if summary['totalCostBasis'] > 0 else Decimal('0')
+    )
+    return summary
+
+def summarize_portfolio(portfolio_id: str) -> Dict[str, Any]:
+    """Load and summarize a portfolio in one call"""
+    summary = summarize_holdings(get_portfolio_holdings(portfolio_id))
+    summary['portfolioId'] = portfolio_id
+    return summary
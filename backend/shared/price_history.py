@@ -0,0 +1,118 @@
+import os
+import logging
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, Any, List, Optional, Tuple
+
+from boto3.dynamodb.conditions import Key
+
+from dynamodb_client import db_client
+from corporate_actions import corporate_actions, adjust_closes
+
+logger = logging.getLogger()
+
+class PriceHistoryStore:
+    """
+    Daily close series stored in PRICE_HISTORY_TABLE.
+
+    Daily bars are written with an ISO date (YYYY-MM-DD) sort key. The quote cache in
+    market_data_service writes epoch-second sort keys under the same symbol; those sort
+    before any ISO date, so date-range queries only ever see bars and intraday updates.
+    """
+
+    def __init__(self):
+        self.table_name = os.environ.get('PRICE_HISTORY_TABLE')
+
+    def get_daily_closes(self, symbol: str, start_date: Optional[str] = None,
+                         end_date: Optional[str] = None, adjusted: bool = True) -> List[Tuple[str, Decimal]]:
+        """
+        Get (date, close) pairs for a symbol in ascending date order.
+        Multiple entries on the same day collapse to the last one.
+
+        Stored bars are never rewritten for corporate actions. With adjusted (the default)
+        the series is adjusted at read time: history recorded under a previous symbol is
+        merged in before the symbol change, and closes before each split or consolidation
+        are divided by its factor so they match today's share count.
+        """
+        if not self.table_name:
+            logger.warning("PRICE_HISTORY_TABLE not configured")
+            return []
+        if not adjusted:
+            return self._query_closes(symbol, start_date, end_date)
+        return self._adjusted_closes(symbol.upper(), start_date, end_date, set())
+
+    def _adjusted_closes(self, symbol: str, start_date: Optional[str], end_date: Optional[str],
+                         seen: set) -> List[Tuple[str, Decimal]]:
+        seen.add(symbol)
+        closes = self._query_closes(symbol, start_date, end_date)
+        actions = corporate_actions.get_actions(symbol)
+
+        for alias in actions:
+            previous = alias.get('previousSymbol')
+            if alias.get('type') != 'alias' or not previous or previous in seen:
+                continue
+            # The previous symbol's series (itself adjusted) up to the day before the change
+            before = (date.fromisoformat(alias['exDate']) - timedelta(days=1)).isoformat()
+            if start_date and start_date > before:
+                continue
+            history = self._adjusted_closes(previous, start_date, min(before, end_date or before), seen)
+            merged = dict(history)
+            merged.update(closes)
+            closes = sorted(merged.items())
+
+        return adjust_closes(closes, actions)
+
+    def _query_closes(self, symbol: str, start_date: Optional[str],
+                      end_date: Optional[str]) -> List[Tuple[str, Decimal]]:
+        """Stored closes for one symbol, unadjusted"""
+        start_date = start_date or '1900-01-01'
+        # Intraday entries use full ISO timestamps, so extend the upper bound past midnight
+        end_key = (end_date or date.today().isoformat()) + 'T99'
+
+        table = db_client.get_table(self.table_name)
+        params = {
+            'KeyConditionExpression': Key('symbol').eq(symbol.upper()) & Key('date').between(start_date, end_key)
+        }
+
+        closes = {}
+        while True:
+            response = table.query(**params)
+            for item in response.get('Items', []):
+                close = item.get('close', item.get('price'))
+                if close is None:
+                    continue
+                closes[str(item['date'])[:10]] = Decimal(str(close))
+
+            last_key = response.get('LastEvaluatedKey')
+            if not last_key:
+                break
+            params['ExclusiveStartKey'] = last_key
+
+        return sorted(closes.items())
+
+    def get_latest_close(self, symbol: str, lookback_days: int = 14) -> Optional[Tuple[str, Decimal]]:
+        """Get the most recent daily close within the lookback window"""
+        start = (date.today() - timedelta(days=lookback_days)).isoformat()
+        closes = self.get_daily_closes(symbol, start_date=start)
+        return closes[-1] if closes else None
+
+    def put_daily_closes(self, symbol: str, bars: List[Dict[str, Any]], source: str) -> int:
+        """
+        Store daily bars for a symbol with batched writes.
+        Each bar needs 'date' (YYYY-MM-DD) and 'close'.
+        """
+        if not self.table_name:
+            logger.warning("PRICE_HISTORY_TABLE not configured, skipping store")
+            return 0
+
+        items = [{
+            'symbol': symbol.upper(),
+            'date': bar['date'][:10],
+            'close': Decimal(str(bar['close'])),
+            'source': source
+        } for bar in bars]
+
+        return db_client.batch_put_items(self.table_name, items)
+
+# Singleton instance
+price_history = PriceHistoryStore()
@@ -0,0 +1,132 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger()
+
+# Annual assumptions per scenario
+PROPERTY_SCENARIOS = {
+    'conservative': {'capitalGrowth': 0.03, 'rentGrowth': 0.02, 'expenseInflation': 0.035, 'vacancyRate': 0.05},
+    'base': {'capitalGrowth': 0.05, 'rentGrowth': 0.03, 'expenseInflation': 0.03, 'vacancyRate': 0.03},
+    'optimistic': {'capitalGrowth': 0.07, 'rentGrowth': 0.04, 'expenseInflation': 0.025, 'vacancyRate': 0.02},
+}
+
+MAX_PROJECTION_YEARS = 30
+
+# Number of (property version, assumptions) projections kept per container
+PROJECTION_CACHE_SIZE = 256
+
+def _column(properties: List[Dict[str, Any]], field: str) -> np.ndarray:
+    return np.array([float(item.get(field, 0) or 0) for item in properties])
+
+def project_properties(properties: List[Dict[str, Any]], scenarios: Dict[str, Dict[str, float]],
+                       years: int, loan_amounts: Optional[np.ndarray] = None,
+                       interest_rates: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """
+    Project every property under every scenario at once.
+
+    Returns scenarios x properties x (years + 1) arrays; year 0 is today:
+    - value: currentValue compounded at capital growth
+    - rent: annualRentalIncome grown at rent growth, less vacancy (0 in year 0)
+    - expenses: totalAnnualExpenses grown at expense inflation (0 in year 0)
+    - interest: interest-only loan cost (0 in year 0)
+    - cashFlow, cumulativeCashFlow
+    - equity: value less the loan balance
+    - totalReturn: capital growth over totalPurchaseCosts plus cumulative cash flow
+    """
+    if years < 1 or years > MAX_PROJECTION_YEARS:
+        raise ValueError(f"years must be between 1 and {MAX_PROJECTION_YEARS}")
+
+    names = list(scenarios)
+    assumptions = {field: np.array([scenarios[name][field] for name in names])[:, None, None]
+                   for field in ('capitalGrowth', 'rentGrowth', 'expenseInflation', 'vacancyRate')}
+
+    current_value = _column(properties, 'currentValue')[None, :, None]
+    rent = _column(properties, 'annualRentalIncome')[None, :, None]
+    expenses = _column(properties, 'totalAnnualExpenses')[None, :, None]
+    purchase_costs = _column(properties, 'totalPurchaseCosts')[None, :, None]
+    loans = np.zeros(len(properties)) if loan_amounts is None else np.asarray(loan_amounts, dtype=float)
+    rates = np.zeros(len(properties)) if interest_rates is None else np.asarray(interest_rates, dtype=float)
+
+    t = np.arange(years + 1)[None, None, :]
+    # Flows for year t accrue during that year, so they grow from the year-1 level
+    flow_years = np.maximum(t - 1, 0)
+    in_flow_year = (t > 0).astype(float)
+
+    value = current_value * (1 + assumptions['capitalGrowth']) ** t
+    rent_income = (rent * (1 + assumptions['rentGrowth']) ** flow_years
+                   * (1 - assumptions['vacancyRate']) * in_flow_year)
+    expense_cost = expenses * (1 + assumptions['expenseInflation']) ** flow_years * in_flow_year
+    interest = np.broadcast_to((loans * rates)[None, :, None] * in_flow_year, value.shape)
+
+    cash_flow = rent_income - expense_cost - interest
+    cumulative = np.cumsum(cash_flow, axis=2)
+    equity = value - loans[None, :, None]
+
+    return {
+        'scenarios': names,
+        'value': value,
+        'rent': rent_income,
+        'expenses': np.broadcast_to(expense_cost, value.shape),
+        'interest': interest,
+        'cashFlow': cash_flow,
+        'cumulativeCashFlow': cumulative,
+        'equity': equity,
+        'totalReturn': value - purchase_costs + cumulative
+    }
+
+class PropertyProjectionEngine:
+    def __init__(self, cache_size: int = PROJECTION_CACHE_SIZE):
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def project(self, property_item: Dict[str, Any], years: int = 10,
+                scenarios: Optional[Dict[str, Dict[str, float]]] = None,
+                loan_amount: float = 0.0, interest_rate: float = 0.0) -> Dict[str, Any]:
+        """
+        Cash-flow and equity curves for one property under each scenario.
+        Results are cached per property version (id + updatedAt) and assumptions.
+        """
+        scenarios = scenarios or PROPERTY_SCENARIOS
+        key = (
+            property_item.get('id'), property_item.get('updatedAt'), years, loan_amount, interest_rate,
+            tuple((name, tuple(sorted(values.items()))) for name, values in scenarios.items())
+        )
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+
+        curves = project_properties([property_item], scenarios, years,
+                                    np.array([loan_amount]), np.array([interest_rate]))
+        result = {
+            'propertyId': property_item.get('id'),
+            'years': years,
+            'loanAmount': loan_amount,
+            'interestRate': interest_rate,
+            'scenarios': [{
+                'name': name,
+                'assumptions': scenarios[name],
+                'curve': [{
+                    'year': year,
+                    **{field: round(float(curves[field][s, 0, year]), 2)
+                       for field in ('value', 'rent', 'expenses', 'interest', 'cashFlow',
+                                     'cumulativeCashFlow', 'equity', 'totalReturn')}
+                } for year in range(years + 1)]
+            } for s, name in enumerate(curves['scenarios'])]
+        }
+
+        with self._lock:
+            self._cache[key] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        return result
+
+# Singleton instance
+property_projection_engine = PropertyProjectionEngine()
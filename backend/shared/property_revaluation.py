@@ -0,0 +1,154 @@
+import io
+import os
+import csv
+import math
+import logging
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Any, List, Tuple
+
+import numpy as np
+
+from portfolio_repository import portfolio_repository
+from valuation import value_properties, suburb_from_address
+from portfolio_summary import touch_portfolios
+from tag_index import tag_index
+from reference_data import read_text
+
+logger = logging.getLogger()
+
+# Offline runs read data/; deployed stages set PROPERTY_INDEX_FILE to the reference data bucket
+DEFAULT_INDEX_FILE = os.path.join(os.path.dirname(__file__), '../data/property_price_index.csv')
+
+def normalize_area(name: Any) -> str:
+    return ' '.join(str(name or '').split()).upper()
+
+def load_price_index(path: str) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """
+    Load a price-index CSV with columns area,date,index (one row per area per period)
+    from a local path or s3:// location. Areas are suburbs or council areas and are
+    matched case-insensitively; malformed rows are logged and skipped.
+    Returns area -> (ascending datetime64[D] dates, index values).
+    """
+    rows = defaultdict(list)
+    for line, row in enumerate(csv.DictReader(io.StringIO(read_text(path))), start=2):
+        try:
+            area = normalize_area(row['area'])
+            day = date.fromisoformat(str(row['date'])[:10]).isoformat()
+            value = float(row['index'])
+            if not area or not math.isfinite(value) or value <= 0:
+                raise ValueError(f"invalid row {row}")
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Skipping price index line {line}: {str(e)}")
+            continue
+        rows[area].append((day, value))
+
+    index = {}
+    for area, points in rows.items():
+        points.sort()
+        index[area] = (np.array([day for day, _ in points], dtype='datetime64[D]'),
+                       np.array([value for _, value in points]))
+    return index
+
+def _area_for(item: Dict[str, Any], index: Dict[str, Tuple[np.ndarray, np.ndarray]]) -> str:
+    # Suburb is the finer-grained index; fall back to the council area. Properties stored
+    # without a suburb use the one in their address
+    suburb = item.get('suburb') or suburb_from_address(item.get('address'))
+    for name in (suburb, item.get('councilArea')):
+        area = normalize_area(name)
+        if area and area in index:
+            return area
+    return ''
+
+def _base_date(item: Dict[str, Any]) -> str:
+    """Date the stored currentValue applies from, or '' if there is no usable date"""
+    value = str(item.get('valuationDate') or item.get('createdAt') or item.get('purchaseDate') or '')[:10]
+    try:
+        return date.fromisoformat(value).isoformat()
+    except ValueError:
+        return ''
+
+def revaluation_factors(properties: List[Dict[str, Any]],
+                        index: Dict[str, Tuple[np.ndarray, np.ndarray]]) -> Tuple[np.ndarray, List[str]]:
+    """
+    Growth factor latest index / index at valuation date for every property, computed per
+    area with one searchsorted call. Properties with no matching area, no valuation date,
+    a valuation before the index starts or already at the latest index get factor NaN.
+    Returns (factors, latest index date per property).
+    """
+    factors = np.full(len(properties), np.nan)
+    as_of = [''] * len(properties)
+
+    by_area = defaultdict(list)
+    for position, item in enumerate(properties):
+        area = _area_for(item, index)
+        if area and _base_date(item):
+            by_area[area].append(position)
+
+    for area, positions in by_area.items():
+        dates, values = index[area]
+        base_dates = np.array([_base_date(properties[p]) for p in positions], dtype='datetime64[D]')
+        # Index level in force on each valuation date
+        base_position = np.searchsorted(dates, base_dates, side='right') - 1
+        base_values = values[np.clip(base_position, 0, len(values) - 1)]
+        valid = (base_position >= 0) & (base_dates < dates[-1]) & (base_values > 0)
+        area_factors = np.divide(values[-1], base_values, out=np.full(len(positions), np.nan), where=valid)
+
+        factors[positions] = area_factors
+        latest = str(dates[-1])
+        for p in positions:
+            as_of[p] = latest
+
+    return factors, as_of
+
+def revalue_properties(index_path: str = DEFAULT_INDEX_FILE, dry_run: bool = False) -> Dict[str, Any]:
+    """
+    Revalue every property against the price index in one batched pass.
+    Properties are read once; changed items are rewritten with batched writes
+    along with their recomputed capital growth, yields and returns.
+    """
+    if not portfolio_repository.table_name('properties'):
+        raise ValueError(f"Properties table not configured for DATA_LAYOUT={portfolio_repository.layout}")
+
+    index = load_price_index(index_path)
+    properties = portfolio_repository.scan_entities('properties')
+    factors, as_of = revaluation_factors(properties, index)
+
+    changed = np.flatnonzero(~np.isnan(factors))
+    items = [properties[i] for i in changed]
+    new_values = [Decimal(str(round(float(properties[i].get('currentValue', 0) or 0) * factors[i])))
+                  for i in changed]
+
+    now = datetime.utcnow().isoformat()
+    updated = []
+    for i, item, metrics in zip(changed, items, value_properties(items, new_values)):
+        updated.append({
+            **item,
+            **{field: value for field, value in metrics.items() if value is not None},
+            'valuationDate': as_of[i],
+            'valuationMethod': 'index',
+            'updatedAt': now
+        })
+
+    written = 0
+    if not dry_run:
+        written = portfolio_repository.put_holdings('properties', updated)
+        touch_portfolios((item.get('portfolioId') for item in updated), 'properties')
+        tag_index.sync_assets('properties', list(zip(items, updated)))
+    logger.info(f"Revalued {len(updated)} of {len(properties)} properties against {len(index)} index areas"
+                f"{' (dry run)' if dry_run else ''}")
+
+    return {
+        'properties': len(properties),
+        'revalued': len(updated),
+        'written': written,
+        'indexAreas': len(index),
+        'dryRun': dry_run,
+        'sample': [{
+            'id': item['id'],
+            'previousValue': items[n].get('currentValue'),
+            'currentValue': item['currentValue'],
+            'valuationDate': item['valuationDate']
+        } for n, item in enumerate(updated[:10])]
+    }
@@ -0,0 +1,154 @@
+import logging
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger()
+
+TARGET_DIMENSIONS = ('assetClass', 'symbol', 'tag')
+
+# Default asset-class targets for listed holdings by portfolioSettings.riskTolerance
+RISK_TOLERANCE_TARGETS = {
+    'conservative': {'etfs': 0.8, 'stocks': 0.2},
+    'moderate': {'etfs': 0.6, 'stocks': 0.4},
+    'aggressive': {'etfs': 0.4, 'stocks': 0.6},
+}
+
+def _group_key(holding: Dict[str, Any], by: str, targets: Dict[str, float]) -> Optional[str]:
+    if by == 'assetClass':
+        return holding['assetClass']
+    if by == 'symbol':
+        return holding['symbol']
+    # First of the holding's tags that has a target
+    return next((tag for tag in holding.get('tags') or [] if tag in targets), None)
+
+def rebalance(holdings: List[Dict[str, Any]], targets: Dict[str, float], by: str = 'assetClass',
+              drift_band: float = 0.05, cash: float = 0.0, trade_fee: float = 0.0,
+              max_fee_ratio: float = 0.01, lot_sizes: Optional[Dict[str, float]] = None,
+              tax_aware: bool = True) -> Dict[str, Any]:
+    """
+    Compute the trades that bring out-of-band groups back to their target weights.
+
+    holdings: [{'id', 'symbol', 'assetClass', 'quantity', 'currentPrice', 'totalCostBasis', 'tags'}]
+    targets: group -> weight; weights must sum to 1 (within 0.1%)
+    drift_band: absolute weight drift tolerated before a group is traded
+    trade_fee: flat brokerage per trade; trades worth less than trade_fee / max_fee_ratio are skipped
+    lot_sizes: symbol -> minimum tradeable unit (default 1)
+    tax_aware: sell the lowest-gain holdings in a group first instead of pro-rata
+
+    Holdings whose group has no target are left out of the rebalance.
+    """
+    if by not in TARGET_DIMENSIONS:
+        raise ValueError(f"by must be one of {', '.join(TARGET_DIMENSIONS)}")
+    if not targets:
+        raise ValueError("At least one target weight is required")
+    if abs(sum(targets.values()) - 1.0) > 0.001:
+        raise ValueError("Target weights must sum to 1")
+    if any(weight < 0 for weight in targets.values()):
+        raise ValueError("Target weights cannot be negative")
+
+    groups = list(targets)
+    group_index = {group: i for i, group in enumerate(groups)}
+    members = [(h, group_index[key]) for h in holdings
+               if (key := _group_key(h, by, targets)) is not None and key in group_index]
+    lot_sizes = lot_sizes or {}
+
+    n = len(members)
+    price = np.array([float(h.get('currentPrice', 0) or 0) for h, _ in members])
+    quantity = np.array([float(h.get('quantity', 0) or 0) for h, _ in members])
+    cost = np.array([float(h.get('totalCostBasis', 0) or 0) for h, _ in members])
+    group = np.array([g for _, g in members], dtype=int)
+    lot = np.array([float(lot_sizes.get(h['symbol'], 1)) for h, _ in members])
+    value = price * quantity
+
+    total = value.sum() + cash
+    if total <= 0:
+        raise ValueError("Portfolio has no value to rebalance")
+
+    weights = np.array([targets[g] for g in groups])
+    current = np.bincount(group, weights=value, minlength=len(groups))
+    drift = current / total - weights
+    out_of_band = np.abs(drift) > drift_band
+    delta = np.where(out_of_band, weights * total - current, 0.0)
+
+    # Buys: pro-rata to current value within the group (equal split for empty positions)
+    group_value = current[group]
+    group_count = np.bincount(group, minlength=len(groups))[group]
+    share = np.divide(value, group_value, out=1.0 / np.maximum(group_count, 1), where=group_value > 0)
+    trade_value = np.where(delta[group] > 0, delta[group] * share, 0.0)
+
+    # Sells: fill each group's sell amount from its holdings in order of preference
+    gain_ratio = np.divide(value - cost, value, out=np.zeros(n), where=value > 0)
+    order = np.lexsort((gain_ratio if tax_aware else -value, group))
+    sorted_group = group[order]
+    sorted_value = value[order]
+    cumulative = np.cumsum(sorted_value)
+    group_start = np.concatenate(([0.0], np.cumsum(current)))[:-1]
+    before = cumulative - sorted_value - group_start[sorted_group]
+    sell_needed = np.maximum(-delta, 0.0)[sorted_group]
+    sell_value = np.zeros(n)
+    sell_value[order] = np.clip(sell_needed - before, 0.0, sorted_value)
+    trade_value -= sell_value
+
+    # Buys are funded by sells plus cash; scale them down when out-of-band sells fall short
+    buys = np.maximum(trade_value, 0.0)
+    funds = cash + sell_value.sum() - trade_fee * np.count_nonzero(trade_value)
+    if buys.sum() > max(funds, 0.0):
+        trade_value = np.where(trade_value > 0, buys * max(funds, 0.0) / buys.sum(), trade_value)
+
+    # Round to whole lots towards zero; sells of an entire position keep the exact quantity
+    raw_quantity = np.divide(trade_value, price, out=np.zeros(n), where=price > 0)
+    trade_quantity = np.trunc(raw_quantity / lot) * lot
+    full_exit = np.isclose(-raw_quantity, quantity) & (raw_quantity < 0)
+    trade_quantity = np.where(full_exit, -quantity, trade_quantity)
+    trade_value = trade_quantity * price
+
+    # Skip trades where the brokerage would be out of proportion
+    min_trade = trade_fee / max_fee_ratio if max_fee_ratio > 0 else 0.0
+    keep = (trade_quantity != 0) & (np.abs(trade_value) >= min_trade)
+    trade_quantity = np.where(keep, trade_quantity, 0.0)
+    trade_value = np.where(keep, trade_value, 0.0)
+
+    cost_per_unit = np.divide(cost, quantity, out=np.zeros(n), where=quantity > 0)
+    realized_gain = np.where(trade_quantity < 0, -trade_quantity * (price - cost_per_unit), 0.0)
+    fees = keep * trade_fee
+
+    trades = []
+    for i in np.flatnonzero(keep):
+        holding = members[i][0]
+        trades.append({
+            'holdingId': holding.get('id'),
+            'symbol': holding['symbol'],
+            'assetClass': holding['assetClass'],
+            'group': groups[group[i]],
+            'action': 'BUY' if trade_quantity[i] > 0 else 'SELL',
+            'quantity': round(float(abs(trade_quantity[i])), 6),
+            'price': round(float(price[i]), 6),
+            'estimatedValue': round(float(abs(trade_value[i])), 2),
+            'estimatedFee': round(float(fees[i]), 2),
+            'estimatedRealizedGain': round(float(realized_gain[i]), 2) if trade_quantity[i] < 0 else None
+        })
+
+    after = np.bincount(group, weights=value + trade_value, minlength=len(groups))
+    cash_after = cash - trade_value.sum() - fees.sum()
+
+    return {
+        'by': by,
+        'driftBand': drift_band,
+        'totalValue': round(float(total), 2),
+        'groups': [{
+            'group': g,
+            'targetWeight': round(float(weights[i]), 6),
+            'currentWeight': round(float(current[i] / total), 6),
+            'drift': round(float(drift[i]), 6),
+            'outOfBand': bool(out_of_band[i]),
+            'weightAfter': round(float(after[i] / total), 6)
+        } for i, g in enumerate(groups)],
+        'trades': trades,
+        'totalBuys': round(float(trade_value[trade_value > 0].sum()), 2),
+        'totalSells': round(float(-trade_value[trade_value < 0].sum()), 2),
+        'totalFees': round(float(fees.sum()), 2),
+        'estimatedRealizedGain': round(float(realized_gain.sum()), 2),
+        'cashAfter': round(float(cash_after), 2),
+        'excludedHoldings': len(holdings) - n
+    }
@@ -0,0 +1,60 @@
+import os
+import logging
+from typing import List, Tuple
+
+from botocore.exceptions import ClientError
+
+from aws_clients import aws_clients
+
+logger = logging.getLogger()
+
+# Error codes S3 returns for a missing object or bucket
+MISSING_CODES = ('NoSuchKey', 'NoSuchBucket', '404')
+
+def is_s3(location: str) -> bool:
+    return location.startswith('s3://')
+
+def _bucket_and_key(location: str) -> Tuple[str, str]:
+    bucket, _, key = location[len('s3://'):].partition('/')
+    return bucket, key
+
+def read_text(location: str) -> str:
+    """
+    Contents of a reference data file (price index, corporate actions feed, ETF
+    constituents): a local path on offline runs, or s3://bucket/key in a deployed stage.
+    Raises FileNotFoundError when it does not exist.
+    """
+    if not is_s3(location):
+        with open(location, newline='', encoding='utf-8-sig') as f:
+            return f.read()
+    bucket, key = _bucket_and_key(location)
+    try:
+        response = aws_clients.client('s3').get_object(Bucket=bucket, Key=key)
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') in MISSING_CODES:
+            raise FileNotFoundError(location)
+        raise
+    return response['Body'].read().decode('utf-8-sig')
+
+def list_files(location: str, suffix: str = '') -> List[str]:
+    """
+    Locations of the files directly under a local directory or s3://bucket/prefix/ whose
+    names end with suffix, sorted; empty when there is no such directory or prefix
+    """
+    if not is_s3(location):
+        if not os.path.isdir(location):
+            return []
+        return [os.path.join(location, name) for name in sorted(os.listdir(location))
+                if name.lower().endswith(suffix)]
+    bucket, prefix = _bucket_and_key(location)
+    prefix = prefix.rstrip('/') + '/' if prefix.strip('/') else ''
+    keys = []
+    try:
+        for page in aws_clients.client('s3').get_paginator('list_objects_v2').paginate(
+                Bucket=bucket, Prefix=prefix, Delimiter='/'):
+            keys.extend(item['Key'] for item in page.get('Contents', []) if item['Key'].lower().endswith(suffix))
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') not in MISSING_CODES:
+            raise
+        logger.warning(f"Reference data bucket not found: {bucket}")
+    return [f"s3://{bucket}/{key}" for key in sorted(keys)]
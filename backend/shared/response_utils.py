@@ -1,29 +1,67 @@
-import json
+import os
+import gzip
+import base64
+import hashlib
+from functools import wraps
 from typing import Dict, Any, Optional
 
+from serialization import dumps
+
+# Smaller bodies fit in a packet or two either way; compressing them only costs CPU
+GZIP_MIN_BYTES = int(os.environ.get('GZIP_MIN_BYTES', '1024'))
+
+# JSON compresses ~5-10x at level 5; higher levels cost CPU for a few percent more
+GZIP_LEVEL = 5
+
+# Suffix distinguishing the gzip representation's ETag from the identity one
+GZIP_ETAG_SUFFIX = '-gzip'
+
+def body_etag(body: str) -> str:
+    """Strong ETag for a serialized response body"""
+    return f'"{hashlib.blake2b(body.encode(), digest_size=16).hexdigest()}"'
+
+def entity_etag(*versions: Any) -> str:
+    """
+    Strong ETag from entity versions (e.g. a portfolio's holdingsVersion plus the query
+    parameters that shape the response), for handlers that can name the version of what
+    they return without hashing the body
+    """
+    return body_etag(dumps(versions))
+
 def create_response(status_code: int, body: Dict[str, Any], 
-                   headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
-    """Create a standardized API Gateway response"""
+                   headers: Optional[Dict[str, str]] = None,
+                   etag: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Create a standardized API Gateway response. 200 responses carry a strong ETag, from
+    the given entity version or else the body, for conditional_get to revalidate against.
+    """
     default_headers = {
         'Content-Type': 'application/json',
         'Access-Control-Allow-Origin': '*',
         'Access-Control-Allow-Credentials': 'true',
-        'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token',
+        'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token,If-None-Match',
         'Access-Control-Allow-Methods': 'GET,POST,PUT,DELETE,OPTIONS'
     }
     
+    serialized = dumps(body)
+    if status_code == 200:
+        default_headers['ETag'] = etag or body_etag(serialized)
+        default_headers['Access-Control-Expose-Headers'] = 'ETag'
+        # Browsers may keep the response but must revalidate it before every use
+        default_headers['Cache-Control'] = 'private, no-cache'
+    
     if headers:
         default_headers.update(headers)
     
     return {
         'statusCode': status_code,
         'headers': default_headers,
-        'body': json.dumps(body, default=str)
+        'body': serialized
     }
 
-def success_response(data: Dict[str, Any]) -> Dict[str, Any]:
+def success_response(data: Dict[str, Any], etag: Optional[str] = None) -> Dict[str, Any]:
     """Create a 200 success response"""
-    return create_response(200, data)
+    return create_response(200, data, etag=etag)
 
 def created_response(data: Dict[str, Any]) -> Dict[str, Any]:
     """Create a 201 created response"""
@@ -46,4 +84,96 @@ def not_found_response(message: str = "Resource not found") -> Dict[str, Any]:
 
 def internal_error_response(message: str = "Internal server error") -> Dict[str, Any]:
     """Create a 500 internal server error response"""
-    return error_response(500, message, "INTERNAL_ERROR")
\ No newline at end of file
+    return error_response(500, message, "INTERNAL_ERROR")
+
+def _request_headers(event: Dict[str, Any]) -> Dict[str, str]:
+    # HTTP API (payload 2.0) lowercases header names; REST API events keep the client's case
+    return {name.lower(): value for name, value in (event.get('headers') or {}).items()}
+
+def _request_method(event: Dict[str, Any]) -> str:
+    return (event.get('requestContext', {}).get('http', {}).get('method') or event.get('httpMethod') or '').upper()
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match uses the weak comparison; either encoding of the same body matches"""
+    if if_none_match.strip() == '*':
+        return True
+    opaque = etag.removeprefix('W/')
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip().removeprefix('W/')
+        if candidate in (opaque, opaque[:-1] + GZIP_ETAG_SUFFIX + '"'):
+            return True
+    return False
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    for coding in accept_encoding.split(','):
+        name, _, params = coding.strip().partition(';')
+        if name.strip().lower() in ('gzip', '*'):
+            quality = params.strip().removeprefix('q=')
+            try:
+                return not params or float(quality) > 0
+            except ValueError:
+                return True
+    return False
+
+def etag_matches(event: Dict[str, Any], etag: str) -> bool:
+    """Whether the request's If-None-Match already names this ETag"""
+    return _etag_matches(_request_headers(event).get('if-none-match', ''), etag)
+
+def not_modified_response(etag: str) -> Dict[str, Any]:
+    """Create a 304 response, for handlers that can tell from an entity version alone"""
+    response = create_response(304, {}, {'ETag': etag, 'Access-Control-Expose-Headers': 'ETag',
+                                         'Cache-Control': 'private, no-cache'})
+    response['headers'].pop('Content-Type')
+    response['body'] = ''
+    return response
+
+def conditional_response(event: Dict[str, Any], response: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Answer a GET with 304 Not Modified when If-None-Match carries the response's ETag,
+    otherwise gzip bodies of GZIP_MIN_BYTES or more for clients that accept it. HTTP APIs
+    do not compress responses themselves.
+    """
+    headers = response.get('headers') or {}
+    etag = headers.get('ETag')
+    if _request_method(event) not in ('GET', 'HEAD') or not etag:
+        return response
+    
+    request_headers = _request_headers(event)
+    if response.get('statusCode') == 304:
+        # A handler's own 304 names the identity ETag; echo the gzip one if that is what the client holds
+        gzip_etag = etag[:-1] + GZIP_ETAG_SUFFIX + '"'
+        if gzip_etag in request_headers.get('if-none-match', ''):
+            return {**response, 'headers': {**headers, 'ETag': gzip_etag}}
+        return response
+    if response.get('statusCode') != 200:
+        return response
+    
+    body = response.get('body') or ''
+    compressible = len(body) >= GZIP_MIN_BYTES and not response.get('isBase64Encoded')
+    compress = compressible and _accepts_gzip(request_headers.get('accept-encoding', ''))
+    if compressible:
+        headers = {**headers, 'Vary': 'Accept-Encoding'}
+    if compress:
+        # A different byte sequence needs its own strong ETag
+        headers['ETag'] = etag[:-1] + GZIP_ETAG_SUFFIX + '"'
+    
+    if _etag_matches(request_headers.get('if-none-match', ''), etag):
+        headers = {name: value for name, value in headers.items() if name != 'Content-Type'}
+        return {'statusCode': 304, 'headers': headers, 'body': ''}
+    
+    if compress:
+        return {
+            **response,
+            'headers': {**headers, 'Content-Encoding': 'gzip'},
+            'body': base64.b64encode(gzip.compress(body.encode(), compresslevel=GZIP_LEVEL, mtime=0)).decode('ascii'),
+            'isBase64Encoded': True
+        }
+    return {**response, 'headers': headers}
+
+def conditional_get(f):
+    """Decorator for GET handlers: ETag revalidation (304) and gzip, via conditional_response"""
+    @wraps(f)
+    def decorated_function(event, context):
+        return conditional_response(event, f(event, context))
+    
+    return decorated_function
@@ -0,0 +1,118 @@
+import os
+import json
+import logging
+from datetime import datetime, date
+from decimal import Decimal
+from typing import Any, Iterator, TextIO
+
+logger = logging.getLogger()
+
+# How DynamoDB Decimals go on the wire: 'string' keeps the historical quoted form
+# ("123.45"); 'number' emits a JSON number (123.45) wherever that number is exact
+NUMBER_MODES = ('string', 'number')
+
+# Elements per chunk when a large list is encoded incrementally
+STREAM_CHUNK_ITEMS = 500
+
+def _decimal_number(value: Decimal):
+    # The C encoder only writes numbers for int and float. Integral values stay exact as int;
+    # others become a float only when its repr reads back as the same Decimal. Amounts with
+    # more significant digits than a double holds (about 15), and NaN or Infinity, stay
+    # quoted strings as in string mode, so number mode never changes a stored value
+    if not value.is_finite():
+        return str(value)
+    if value == value.to_integral_value():
+        return int(value)
+    text = str(value)
+    # Plain notation in 16 characters, point included, is at most 15 digits: always exact
+    if len(text) <= 16 and 'E' not in text:
+        return float(text)
+    number = float(value)
+    if Decimal(repr(number)) == value:
+        return number
+    return text
+
+def _encode_set(value):
+    # DynamoDB sets are homogeneous; sorting keeps the output (and its ETag) stable
+    try:
+        return sorted(value)
+    except TypeError:
+        return list(value)
+
+class JSONSerializer:
+    """
+    JSON encoding for API responses, built once per container. Uses the C encoder with
+    circular-reference checks off (DynamoDB items are trees) and compact separators;
+    values it cannot encode natively go through a per-type table instead of str():
+    Decimal per number_mode, datetime and date as ISO 8601, sets as sorted lists.
+    Anything else still falls back to str(), as json.dumps(default=str) did.
+    """
+
+    def __init__(self, number_mode: str = 'string'):
+        if number_mode not in NUMBER_MODES:
+            raise ValueError(f"Unknown number mode '{number_mode}', expected one of {', '.join(NUMBER_MODES)}")
+        self.number_mode = number_mode
+        encode_decimal = _decimal_number if number_mode == 'number' else str
+        encoders = {
+            datetime: datetime.isoformat,
+            date: date.isoformat,
+            set: _encode_set,
+            frozenset: _encode_set
+        }
+        
+        # Called by the C encoder for every value it cannot encode itself, so Decimal (by far
+        # the most common) is tested first and everything is bound locally
+        def default(value, _Decimal=Decimal, _encode_decimal=encode_decimal, _encoders=encoders, _str=str):
+            if value.__class__ is _Decimal:
+                return _encode_decimal(value)
+            return _encoders.get(value.__class__, _str)(value)
+        
+        self._encode = json.JSONEncoder(default=default, check_circular=False, separators=(',', ':')).encode
+
+    def dumps(self, obj: Any) -> str:
+        """Encode obj as one JSON string"""
+        return self._encode(obj)
+
+    def iter_encode(self, obj: Any, chunk_items: int = STREAM_CHUNK_ITEMS) -> Iterator[str]:
+        """
+        Encode obj as a sequence of string chunks. Lists at the top level or directly
+        under a top-level object (e.g. {'stocks': [...], 'count': n}) are encoded
+        chunk_items elements at a time, so a large list is never held as one string;
+        the chunks join to the same text dumps() returns.
+        """
+        if isinstance(obj, dict):
+            yield '{'
+            for position, (key, value) in enumerate(obj.items()):
+                yield (',' if position else '') + self.dumps(str(key)) + ':'
+                yield from self._iter_value(value, chunk_items)
+            yield '}'
+        else:
+            yield from self._iter_value(obj, chunk_items)
+
+    def _iter_value(self, value: Any, chunk_items: int) -> Iterator[str]:
+        if not isinstance(value, (list, tuple)) or len(value) <= chunk_items:
+            yield self.dumps(value)
+            return
+        yield '['
+        for start in range(0, len(value), chunk_items):
+            chunk = self.dumps(value[start:start + chunk_items])[1:-1]
+            yield (',' if start else '') + chunk
+        yield ']'
+
+    def dump(self, obj: Any, stream: TextIO, chunk_items: int = STREAM_CHUNK_ITEMS) -> None:
+        """Write obj to a text stream chunk by chunk"""
+        for chunk in self.iter_encode(obj, chunk_items):
+            stream.write(chunk)
+
+def _configured_serializer() -> JSONSerializer:
+    mode = os.environ.get('JSON_NUMBER_MODE', 'string').lower()
+    if mode not in NUMBER_MODES:
+        logger.warning(f"Unknown JSON_NUMBER_MODE={mode}, using string")
+        mode = 'string'
+    return JSONSerializer(mode)
+
+# Singleton instance
+json_serializer = _configured_serializer()
+
+def dumps(obj: Any) -> str:
+    return json_serializer.dumps(obj)
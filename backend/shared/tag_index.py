@@ -0,0 +1,318 @@
+import os
+import logging
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Any, List, Optional, Tuple
+
+from boto3.dynamodb.conditions import Key
+
+from dynamodb_client import db_client
+from portfolio_repository import portfolio_repository
+from valuation import to_decimal, MONEY_QUANTUM, HUNDRED, ZERO
+
+logger = logging.getLogger()
+
+# Asset class -> (asset type, table env var, value field)
+TAGGED_ASSET_CLASSES = {
+    'stocks': ('stock', 'STOCKS_TABLE', 'totalValue'),
+    'etfs': ('etf', 'ETFS_TABLE', 'totalValue'),
+    'properties': ('property', 'PROPERTIES_TABLE', 'currentValue'),
+}
+
+TAG_CATEGORIES = ('strategy', 'timeframe', 'purpose', 'risk', 'geographic', 'tax', 'custom')
+
+META_ENTRY = 'META'
+COUNTER_FIELDS = ('stocksCount', 'etfsCount', 'propertiesCount', 'totalValue', 'totalReturn')
+
+def parse_tags(value: Any) -> List[str]:
+    """
+    Validate a holding's tags field: a list of ids of defined tags, deduplicated in order.
+    Raises ValueError for any other shape or an id missing from the tag catalogue.
+    """
+    if value is None:
+        return []
+    if not isinstance(value, list) or not all(isinstance(tag, str) and tag for tag in value):
+        raise ValueError("tags must be a list of tag ids")
+    tags = list(dict.fromkeys(value))
+    unknown = tag_index.unknown_tags(tags)
+    if unknown:
+        raise ValueError(f"Unknown tags: {', '.join(unknown)}")
+    return tags
+
+def _asset_entry(asset_class: str, asset_id: str) -> str:
+    return f"ASSET#{asset_class}#{asset_id}"
+
+def _counter_entry(portfolio_id: str) -> str:
+    return f"COUNT#{portfolio_id}"
+
+def _contribution(asset_class: str, item: Optional[Dict[str, Any]]) -> Tuple[Decimal, Decimal]:
+    if not item:
+        return ZERO, ZERO
+    value_field = TAGGED_ASSET_CLASSES[asset_class][2]
+    return to_decimal(item.get(value_field)), to_decimal(item.get('totalReturn'))
+
+def _asset_name(asset_class: str, item: Dict[str, Any]) -> str:
+    if asset_class == 'properties':
+        return str(item.get('address', '')).split(',')[0]
+    return item.get('symbol', '')
+
+def _return_percentage(value: Decimal, total_return: Decimal) -> Decimal:
+    # Cost is value less return, matching the frontend's tag summaries
+    cost = value - total_return
+    return (total_return * HUNDRED / cost).quantize(MONEY_QUANTUM) if cost > 0 else ZERO
+
+def tag_summary(counters: Dict[str, Any]) -> Dict[str, Any]:
+    """Counters item (META or per-portfolio) -> TaggedAssetSummary fields"""
+    counts = {field: int(counters.get(field, 0) or 0) for field in ('stocksCount', 'etfsCount', 'propertiesCount')}
+    value = to_decimal(counters.get('totalValue'))
+    total_return = to_decimal(counters.get('totalReturn'))
+    return {
+        'tagId': counters['tagId'],
+        **counts,
+        'totalAssetsCount': sum(counts.values()),
+        'totalValue': value,
+        'totalReturn': total_return,
+        'returnPercentage': _return_percentage(value, total_return)
+    }
+
+class TagIndex:
+    """
+    Tag definitions, a tag -> assets inverted index and per-tag counters in TAGS_TABLE
+    (tagId HASH, entry RANGE):
+    - META: the tag definition plus counters across all portfolios
+    - COUNT#<portfolioId>: counters for one portfolio
+    - ASSET#<assetClass>#<assetId>: an index entry holding the value and return it contributes
+
+    Holding write paths call sync_assets with the item before and after the write; counters
+    are adjusted with ADD so tag summaries read one item per tag instead of every asset.
+    Both kinds of counter item are found through sparse GSIs (kind-index, counterPortfolioId-index).
+    """
+
+    def __init__(self):
+        self.table_name = os.environ.get('TAGS_TABLE')
+
+    def unknown_tags(self, tag_ids: List[str]) -> List[str]:
+        """The ids in tag_ids with no tag definition, in order"""
+        if not self.table_name or not tag_ids:
+            return []
+        metas = db_client.batch_get_items(self.table_name, [{'tagId': tag_id, 'entry': META_ENTRY}
+                                                            for tag_id in dict.fromkeys(tag_ids)])
+        # A META item without kind holds counters only, not a definition
+        defined = {meta['tagId'] for meta in metas if meta.get('kind') == 'tag'}
+        return [tag_id for tag_id in tag_ids if tag_id not in defined]
+
+    def _add(self, table, tag_id: str, entry: str, deltas: Dict[str, Any], extra: Optional[Dict[str, Any]] = None,
+             defined_only: bool = False) -> None:
+        names = {f"#f{i}": field for i, field in enumerate(deltas)}
+        values = {f":d{i}": delta for i, delta in enumerate(deltas.values())}
+        expression = "ADD " + ", ".join(f"#f{i} :d{i}" for i in range(len(deltas)))
+        if extra:
+            names.update({f"#s{i}": field for i, field in enumerate(extra)})
+            values.update({f":s{i}": value for i, value in enumerate(extra.values())})
+            expression += " SET " + ", ".join(f"#s{i} = :s{i}" for i in range(len(extra)))
+        params = {}
+        if defined_only:
+            # ADD would otherwise create a bare counters item for an undefined tag
+            names['#kind'] = 'kind'
+            params['ConditionExpression'] = 'attribute_exists(#kind)'
+        table.update_item(Key={'tagId': tag_id, 'entry': entry}, UpdateExpression=expression,
+                          ExpressionAttributeNames=names, ExpressionAttributeValues=values, **params)
+
+    def sync_assets(self, asset_class: str,
+                    changes: List[Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]) -> int:
+        """
+        Apply holding writes to the index. changes are (before, after) item pairs; before is
+        None for a create and after is None for a delete. Untagged holdings cost nothing.
+        Best effort: failures are logged, and rebuild() restores exact counters. Tags with
+        no definition are skipped rather than given counters (parse_tags rejects them on write).
+        Returns the number of index entries written or removed.
+        """
+        if not self.table_name:
+            return 0
+        table = db_client.get_table(self.table_name)
+        count_field = f"{asset_class}Count"
+        now = datetime.utcnow().isoformat()
+        written = 0
+
+        for before, after in changes:
+            old_tags = set((before or {}).get('tags') or [])
+            new_tags = set((after or {}).get('tags') or [])
+            if not old_tags and not new_tags:
+                continue
+
+            item = after or before
+            old_value, old_return = _contribution(asset_class, before)
+            new_value, new_return = _contribution(asset_class, after)
+            portfolio_id = item.get('portfolioId', '')
+
+            for tag_id in sorted(old_tags | new_tags):
+                had, has = tag_id in old_tags, tag_id in new_tags
+                deltas = {
+                    count_field: int(has) - int(had),
+                    'totalValue': (new_value if has else ZERO) - (old_value if had else ZERO),
+                    'totalReturn': (new_return if has else ZERO) - (old_return if had else ZERO)
+                }
+                deltas = {field: delta for field, delta in deltas.items() if delta != 0}
+                try:
+                    if deltas:
+                        self._add(table, tag_id, META_ENTRY, deltas, {'countersUpdatedAt': now}, defined_only=True)
+                        if portfolio_id:
+                            self._add(table, tag_id, _counter_entry(portfolio_id), deltas,
+                                      {'counterPortfolioId': portfolio_id})
+                    if has:
+                        table.put_item(Item={
+                            'tagId': tag_id,
+                            'entry': _asset_entry(asset_class, item['id']),
+                            'assetClass': asset_class,
+                            'assetId': item['id'],
+                            'portfolioId': portfolio_id,
+                            'name': _asset_name(asset_class, item),
+                            'value': new_value,
+                            'totalReturn': new_return,
+                            'returnPercentage': to_decimal(item.get('returnPercentage')),
+                            'updatedAt': now
+                        })
+                    else:
+                        table.delete_item(Key={'tagId': tag_id, 'entry': _asset_entry(asset_class, item['id'])})
+                    written += 1
+                except Exception as e:
+                    logger.warning(f"Could not update tag {tag_id} for {asset_class} {item.get('id')}: {str(e)}")
+
+        return written
+
+    def create_tag(self, tag: Dict[str, Any]) -> Dict[str, Any]:
+        """Create or replace a tag definition, keeping any counters it already has"""
+        table = db_client.get_table(self.table_name)
+        fields = {field: tag[field] for field in ('name', 'description', 'color', 'category', 'isDefault',
+                                                  'isArchived', 'createdAt', 'updatedAt', 'createdBy') if field in tag}
+        response = table.update_item(
+            Key={'tagId': tag['id'], 'entry': META_ENTRY},
+            UpdateExpression="SET #kind = :kind, " + ", ".join(f"#{field} = :{field}" for field in fields),
+            ExpressionAttributeNames={'#kind': 'kind', **{f"#{field}": field for field in fields}},
+            ExpressionAttributeValues={':kind': 'tag', **{f":{field}": value for field, value in fields.items()}},
+            ReturnValues='ALL_NEW'
+        )
+        return self._tag_definition(response['Attributes'])
+
+    def _tag_definition(self, meta: Dict[str, Any]) -> Dict[str, Any]:
+        definition = {field: value for field, value in meta.items()
+                      if field not in COUNTER_FIELDS and field not in ('tagId', 'entry', 'kind', 'countersUpdatedAt')}
+        definition['id'] = meta['tagId']
+        definition['usageCount'] = tag_summary(meta)['totalAssetsCount']
+        return definition
+
+    def _query_all(self, **params) -> List[Dict[str, Any]]:
+        table = db_client.get_table(self.table_name)
+        items = []
+        while True:
+            response = table.query(**params)
+            items.extend(response.get('Items', []))
+            last_key = response.get('LastEvaluatedKey')
+            if not last_key:
+                return items
+            params['ExclusiveStartKey'] = last_key
+
+    def get_tag_metas(self) -> List[Dict[str, Any]]:
+        return self._query_all(IndexName='kind-index', KeyConditionExpression=Key('kind').eq('tag'))
+
+    def get_tags(self) -> List[Dict[str, Any]]:
+        """Every defined tag with its usageCount"""
+        return [self._tag_definition(meta) for meta in self.get_tag_metas()]
+
+    def get_summaries(self, portfolio_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Value, return and counts per tag from the counters, overall or for one portfolio, by value"""
+        metas = {meta['tagId']: meta for meta in self.get_tag_metas()}
+        if portfolio_id:
+            counters = self._query_all(IndexName='counterPortfolioId-index',
+                                       KeyConditionExpression=Key('counterPortfolioId').eq(portfolio_id))
+        else:
+            counters = list(metas.values())
+
+        summaries = []
+        for item in counters:
+            summary = tag_summary(item)
+            meta = metas.get(item['tagId'])
+            if summary['totalAssetsCount'] == 0 or meta is None or meta.get('isArchived'):
+                continue
+            summaries.append({**summary, 'tagName': meta.get('name', ''), 'tagColor': meta.get('color', '')})
+        return sorted(summaries, key=lambda summary: -summary['totalValue'])
+
+    def get_tag_assets(self, tag_id: str, portfolio_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Index entries for one tag, best return first"""
+        entries = self._query_all(KeyConditionExpression=Key('tagId').eq(tag_id) & Key('entry').begins_with('ASSET#'))
+        assets = [{
+            'id': entry['assetId'],
+            'type': TAGGED_ASSET_CLASSES[entry['assetClass']][0],
+            'portfolioId': entry.get('portfolioId'),
+            'name': entry.get('name', ''),
+            'value': entry.get('value', ZERO),
+            'totalReturn': entry.get('totalReturn', ZERO),
+            'returnPercentage': entry.get('returnPercentage', ZERO)
+        } for entry in entries if not portfolio_id or entry.get('portfolioId') == portfolio_id]
+        return sorted(assets, key=lambda asset: -asset['returnPercentage'])
+
+    def rebuild(self) -> Dict[str, Any]:
+        """
+        Recompute every index entry and counter from the holdings tables.
+        Repairs drift from failed incremental updates; scans every holding once.
+        """
+        table = db_client.get_table(self.table_name)
+        existing = db_client.scan_table(self.table_name)
+        defined = {item['tagId'] for item in existing if item['entry'] == META_ENTRY and item.get('kind') == 'tag'}
+
+        entries, counters = [], defaultdict(lambda: defaultdict(Decimal))
+        for asset_class in TAGGED_ASSET_CLASSES:
+            if not portfolio_repository.table_name(asset_class):
+                continue
+            for item in portfolio_repository.scan_entities(asset_class):
+                value, total_return = _contribution(asset_class, item)
+                portfolio_id = item.get('portfolioId', '')
+                for tag_id in set(item.get('tags') or []) & defined:
+                    entries.append({
+                        'tagId': tag_id,
+                        'entry': _asset_entry(asset_class, item['id']),
+                        'assetClass': asset_class,
+                        'assetId': item['id'],
+                        'portfolioId': portfolio_id,
+                        'name': _asset_name(asset_class, item),
+                        'value': value,
+                        'totalReturn': total_return,
+                        'returnPercentage': to_decimal(item.get('returnPercentage'))
+                    })
+                    for entry in (META_ENTRY, _counter_entry(portfolio_id)) if portfolio_id else (META_ENTRY,):
+                        totals = counters[(tag_id, entry)]
+                        totals[f"{asset_class}Count"] += 1
+                        totals['totalValue'] += value
+                        totals['totalReturn'] += total_return
+
+        # Drop stale index entries and counters, then write the recomputed ones
+        keep = {(entry['tagId'], entry['entry']) for entry in entries} | set(counters)
+        # Counters-only META items left by undefined tags go too
+        stale = [{'tagId': item['tagId'], 'entry': item['entry']} for item in existing
+                 if (item['entry'] != META_ENTRY or item['tagId'] not in defined)
+                 and (item['tagId'], item['entry']) not in keep]
+        db_client.batch_delete_items(self.table_name, stale)
+        db_client.batch_put_items(self.table_name, entries)
+
+        now = datetime.utcnow().isoformat()
+        # Tags with no assets left still get their META counters reset to zero
+        keys = {(tag_id, META_ENTRY) for tag_id in defined} | set(counters)
+        for tag_id, entry in sorted(keys):
+            totals = counters.get((tag_id, entry), {})
+            fields = {field: totals.get(field, 0) for field in COUNTER_FIELDS}
+            if entry != META_ENTRY:
+                fields['counterPortfolioId'] = entry[len('COUNT#'):]
+            table.update_item(
+                Key={'tagId': tag_id, 'entry': entry},
+                UpdateExpression="SET " + ", ".join(f"#{field} = :{field}" for field in fields)
+                                 + ", countersUpdatedAt = :now",
+                ExpressionAttributeNames={f"#{field}": field for field in fields},
+                ExpressionAttributeValues={**{f":{field}": value for field, value in fields.items()}, ':now': now}
+            )
+
+        logger.info(f"Rebuilt tag index: {len(entries)} entries, {len(counters)} counters, {len(stale)} stale removed")
+        return {'entries': len(entries), 'counters': len(counters), 'staleRemoved': len(stale)}
+
+# Singleton instance
+tag_index = TagIndex()
@@ -0,0 +1,516 @@
+import os
+import uuid
+import logging
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Any, List, Optional, Tuple
+
+from boto3.dynamodb.conditions import Key
+
+from dynamodb_client import db_client
+from corporate_actions import corporate_actions
+
+logger = logging.getLogger()
+
+MATCHING_METHODS = ('FIFO', 'LIFO', 'SPECIFIC')
+
+# Australian CGT discount for individuals holding an asset for at least 12 months
+CGT_DISCOUNT_RATE = Decimal('0.5')
+
+ZERO = Decimal('0')
+
+# Corporate actions the ledger applies to open lots; 'alias' records are bookkeeping only
+LOT_ACTION_TYPES = ('split', 'consolidation', 'symbol_change')
+
+def parse_date(value: str) -> date:
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).date() if 'T' in value else date.fromisoformat(value[:10])
+
+def financial_year(day: date) -> str:
+    """Australian financial year label, e.g. 2024-07-01 -> '2024-25'"""
+    start = day.year if day.month >= 7 else day.year - 1
+    return f"{start}-{str(start + 1)[-2:]}"
+
+def is_discount_eligible(acquired: date, disposed: date) -> bool:
+    """
+    Held for at least 12 months, excluding the acquisition and disposal days,
+    i.e. disposed after the first anniversary of acquisition.
+    """
+    try:
+        anniversary = acquired.replace(year=acquired.year + 1)
+    except ValueError:
+        # Acquired on 29 February
+        anniversary = date(acquired.year + 1, 3, 1)
+    return disposed > anniversary
+
+def transaction_sequence(transaction: Dict[str, Any]) -> int:
+    """Per-portfolio entry order of a stored transaction, from its TXN#{date}#{sequence}#{id} key; 0 if unstored"""
+    sk = transaction.get('sk')
+    return int(sk.split('#', 3)[2]) if sk else 0
+
+def lot_key(lot: Dict[str, Any]) -> str:
+    """LOT#{acquiredDate}#{sequence}#{lotId}: acquisition order, then entry order within a day"""
+    return f"LOT#{lot['acquiredDate']}#{lot.get('sequence', 0):010d}#{lot['lotId']}"
+
+def action_id(action: Dict[str, Any]) -> str:
+    """Same id corporate_actions records on the holdings it adjusts"""
+    return f"{action['symbol']}#{action['actionKey']}"
+
+class TaxLotLedger:
+    """
+    In-memory lot matching engine.
+
+    Open lots are kept per symbol in an OrderedDict keyed by lot ID in acquisition order,
+    which gives O(1) access to the oldest lot (FIFO), the newest lot (LIFO) and any
+    specific lot, and O(1) removal of exhausted lots.
+
+    Transactions are recorded as traded. Splits, consolidations and symbol changes given
+    in actions are applied to the open lots as their ex-dates are passed (quantity times
+    the factor, cost per unit divided by it, so the cost base is unchanged), so a sale
+    after a 2:1 split matches twice the units bought before it.
+    """
+
+    def __init__(self, method: str = 'FIFO', actions: Optional[List[Dict[str, Any]]] = None):
+        if method not in MATCHING_METHODS:
+            raise ValueError(f"method must be one of {', '.join(MATCHING_METHODS)}")
+        self.method = method
+        self.lots = {}
+        self.held = {}
+        self.disposals = []
+        self.last_key = None
+        self.pending_actions = sorted((action for action in actions or [] if action['type'] in LOT_ACTION_TYPES),
+                                      key=lambda action: (action['exDate'], action['actionKey']))
+        self.applied_actions = []
+
+    def load_lots(self, lots: List[Dict[str, Any]]) -> None:
+        """Restore open lots, ordered by acquisition date and then the sequence of the buy that opened them"""
+        for lot in sorted(lots, key=lambda lot: (lot['acquiredDate'], int(lot.get('sequence', 0)))):
+            self.held[lot['symbol']] = self.held.get(lot['symbol'], ZERO) + Decimal(str(lot['quantity']))
+            self.lots.setdefault(lot['symbol'], OrderedDict())[lot['lotId']] = {
+                'lotId': lot['lotId'],
+                'symbol': lot['symbol'],
+                'acquiredDate': lot['acquiredDate'],
+                'sequence': int(lot.get('sequence', 0)),
+                'quantity': Decimal(str(lot['quantity'])),
+                'originalQuantity': Decimal(str(lot.get('originalQuantity', lot['quantity']))),
+                'costPerUnit': Decimal(str(lot['costPerUnit']))
+            }
+
+    def apply_actions(self, through: Optional[str] = None) -> None:
+        """Apply pending corporate actions with an ex-date on or before through (all if None)"""
+        while self.pending_actions and (through is None or self.pending_actions[0]['exDate'] <= through):
+            action = self.pending_actions.pop(0)
+            symbol = action['symbol']
+            if action['type'] == 'symbol_change':
+                moved = self.lots.pop(symbol, OrderedDict())
+                if moved:
+                    target = self.lots.get(action['newSymbol'], OrderedDict())
+                    # sorted is stable, so lots keep their order within each symbol
+                    merged = sorted([*target.values(), *moved.values()],
+                                    key=lambda lot: (lot['acquiredDate'], lot['sequence']))
+                    for lot in moved.values():
+                        lot['symbol'] = action['newSymbol']
+                    self.lots[action['newSymbol']] = OrderedDict((lot['lotId'], lot) for lot in merged)
+                if symbol in self.held:
+                    self.held[action['newSymbol']] = self.held.get(action['newSymbol'], ZERO) + self.held.pop(symbol)
+            else:
+                factor = Decimal(str(action['factor']))
+                for lot in self.lots.get(symbol, {}).values():
+                    lot['quantity'] *= factor
+                    lot['originalQuantity'] *= factor
+                    lot['costPerUnit'] /= factor
+                if symbol in self.held:
+                    self.held[symbol] *= factor
+            self.applied_actions.append(action_id(action))
+
+    def apply(self, transaction: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Apply one transaction; returns the disposals it realized"""
+        # Trades on or after an ex-date are in post-action units
+        self.apply_actions(transaction['date'][:10])
+        if transaction['type'] == 'BUY':
+            self._buy(transaction)
+            realized = []
+        elif transaction['type'] == 'SELL':
+            realized = self._sell(transaction)
+        else:
+            raise ValueError(f"Unknown transaction type {transaction['type']}")
+        self.last_key = transaction.get('sk', self.last_key)
+        return realized
+
+    def apply_all(self, transactions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        realized = []
+        for transaction in transactions:
+            realized.extend(self.apply(transaction))
+        return realized
+
+    def _buy(self, transaction: Dict[str, Any]) -> None:
+        quantity = Decimal(str(transaction['quantity']))
+        if quantity <= 0:
+            raise ValueError("Buy quantity must be positive")
+        fees = Decimal(str(transaction.get('fees', 0)))
+        cost_per_unit = Decimal(str(transaction['price'])) + fees / quantity
+        lot_id = transaction.get('lotId') or transaction['transactionId']
+        self.held[transaction['symbol']] = self.held.get(transaction['symbol'], ZERO) + quantity
+
+        self.lots.setdefault(transaction['symbol'], OrderedDict())[lot_id] = {
+            'lotId': lot_id,
+            'symbol': transaction['symbol'],
+            'acquiredDate': transaction['date'][:10],
+            'sequence': transaction_sequence(transaction),
+            'quantity': quantity,
+            'originalQuantity': quantity,
+            'costPerUnit': cost_per_unit
+        }
+
+    def _sell(self, transaction: Dict[str, Any]) -> List[Dict[str, Any]]:
+        symbol = transaction['symbol']
+        quantity = Decimal(str(transaction['quantity']))
+        price = Decimal(str(transaction['price']))
+        fees = Decimal(str(transaction.get('fees', 0)))
+        sold_date = parse_date(transaction['date'])
+        lots = self.lots.get(symbol, OrderedDict())
+
+        available = self.held.get(symbol, ZERO)
+        if quantity <= 0 or quantity > available:
+            raise ValueError(f"Cannot sell {quantity} {symbol}: {available} held on {transaction['date'][:10]}")
+
+        realized = []
+        for lot_id, take in self._select_lots(lots, quantity, transaction):
+            lot = lots[lot_id]
+            proceeds = take * price - fees * take / quantity
+            cost_base = take * lot['costPerUnit']
+            gain = proceeds - cost_base
+            acquired = date.fromisoformat(lot['acquiredDate'])
+
+            realized.append({
+                'transactionId': transaction['transactionId'],
+                'lotId': lot_id,
+                'symbol': symbol,
+                'quantity': take,
+                'acquiredDate': lot['acquiredDate'],
+                'disposedDate': sold_date.isoformat(),
+                'proceeds': proceeds,
+                'costBase': cost_base,
+                'gain': gain,
+                'discountEligible': gain > 0 and is_discount_eligible(acquired, sold_date),
+                'financialYear': financial_year(sold_date)
+            })
+
+            lot['quantity'] -= take
+            if lot['quantity'] == 0:
+                del lots[lot_id]
+
+        self.held[symbol] = available - quantity
+        self.disposals.extend(realized)
+        return realized
+
+    def _select_lots(self, lots: OrderedDict, quantity: Decimal,
+                     transaction: Dict[str, Any]) -> List[Tuple[str, Decimal]]:
+        """Pick (lotId, quantity) slices to cover a sale using the ledger's method"""
+        if self.method == 'SPECIFIC' and transaction.get('lotSelections'):
+            selections = [(s['lotId'], Decimal(str(s['quantity']))) for s in transaction['lotSelections']]
+            for lot_id, take in selections:
+                if lot_id not in lots or take > lots[lot_id]['quantity']:
+                    raise ValueError(f"Lot {lot_id} cannot cover {take} {transaction['symbol']}")
+            if sum((take for _, take in selections), ZERO) != quantity:
+                raise ValueError("Lot selections must add up to the sell quantity")
+            return selections
+
+        # FIFO, LIFO, and SPECIFIC sells without selections (which fall back to FIFO)
+        order = reversed(lots) if self.method == 'LIFO' else iter(lots)
+        selections = []
+        remaining = quantity
+        for lot_id in order:
+            take = min(remaining, lots[lot_id]['quantity'])
+            selections.append((lot_id, take))
+            remaining -= take
+            if remaining == 0:
+                break
+        return selections
+
+    def open_lots(self) -> List[Dict[str, Any]]:
+        return [lot for lots in self.lots.values() for lot in lots.values()]
+
+def summarize_by_financial_year(disposals: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Net capital gain per financial year. Capital losses (including losses carried
+    forward) offset non-discountable gains first, then discountable gains, before the
+    CGT discount is applied. Unused losses carry forward to the next year.
+    """
+    years = {}
+    for disposal in disposals:
+        year = years.setdefault(disposal['financialYear'], {
+            'financialYear': disposal['financialYear'],
+            'proceeds': ZERO, 'costBase': ZERO,
+            'discountableGains': ZERO, 'otherGains': ZERO, 'capitalLosses': ZERO,
+            'disposals': 0
+        })
+        gain = Decimal(str(disposal['gain']))
+        year['proceeds'] += Decimal(str(disposal['proceeds']))
+        year['costBase'] += Decimal(str(disposal['costBase']))
+        year['disposals'] += 1
+        if gain < 0:
+            year['capitalLosses'] -= gain
+        elif disposal['discountEligible']:
+            year['discountableGains'] += gain
+        else:
+            year['otherGains'] += gain
+
+    carried = ZERO
+    summaries = []
+    for label in sorted(years):
+        year = years[label]
+        losses = year['capitalLosses'] + carried
+        year['lossesCarriedIn'] = carried
+
+        other = year['otherGains'] - min(losses, year['otherGains'])
+        losses -= year['otherGains'] - other
+        discountable = year['discountableGains'] - min(losses, year['discountableGains'])
+        losses -= year['discountableGains'] - discountable
+
+        year['cgtDiscount'] = discountable * CGT_DISCOUNT_RATE
+        year['netCapitalGain'] = other + discountable - year['cgtDiscount']
+        year['lossesCarriedForward'] = losses
+        carried = losses
+        summaries.append(year)
+
+    return summaries
+
+def unrealized_gains(lots: List[Dict[str, Any]], prices: Dict[str, Decimal],
+                     as_of: Optional[date] = None) -> Dict[str, Any]:
+    """Unrealized gain per open lot at the given prices"""
+    as_of = as_of or date.today()
+    rows = []
+    total = ZERO
+    for lot in lots:
+        price = prices.get(lot['symbol'])
+        if price is None:
+            continue
+        market_value = lot['quantity'] * price
+        cost_base = lot['quantity'] * lot['costPerUnit']
+        gain = market_value - cost_base
+        total += gain
+        rows.append({
+            **lot,
+            'price': price,
+            'marketValue': market_value,
+            'costBase': cost_base,
+            'gain': gain,
+            'discountEligible': gain > 0 and is_discount_eligible(date.fromisoformat(lot['acquiredDate']), as_of)
+        })
+    return {'lots': rows, 'totalUnrealizedGain': total}
+
+class TaxLotStore:
+    """
+    Persists transactions, open lots and realized disposals in TAX_LOTS_TABLE under the
+    portfolio ID, with sort key prefixes TXN#, LOT#, GAIN# and a STATE item holding the
+    matching method, the last processed transaction and the transaction sequence counter.
+
+    Transactions are keyed TXN#{date}#{sequence}#{transactionId}, the sequence being a
+    per-portfolio counter, so transactions on the same day replay in the order entered.
+    Open lots are keyed LOT#{acquiredDate}#{sequence}#{lotId} with the sequence of the buy
+    that opened them, so incremental processing restores them in that same order.
+    """
+
+    def __init__(self):
+        self.table_name = os.environ.get('TAX_LOTS_TABLE')
+
+    def _query_prefix(self, portfolio_id: str, prefix: str, after: Optional[str] = None) -> List[Dict[str, Any]]:
+        table = db_client.get_table(self.table_name)
+        if after:
+            condition = Key('portfolioId').eq(portfolio_id) & Key('sk').between(after + '\x00', prefix + '\uffff')
+        else:
+            condition = Key('portfolioId').eq(portfolio_id) & Key('sk').begins_with(prefix)
+
+        params = {'KeyConditionExpression': condition}
+        items = []
+        while True:
+            response = table.query(**params)
+            items.extend(response.get('Items', []))
+            if not response.get('LastEvaluatedKey'):
+                return items
+            params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    def get_state(self, portfolio_id: str) -> Optional[Dict[str, Any]]:
+        return db_client.get_item(self.table_name, {'portfolioId': portfolio_id, 'sk': 'STATE'})
+
+    def get_transactions(self, portfolio_id: str, after: Optional[str] = None) -> List[Dict[str, Any]]:
+        return self._query_prefix(portfolio_id, 'TXN#', after)
+
+    def get_open_lots(self, portfolio_id: str) -> List[Dict[str, Any]]:
+        # lot_key keeps acquisition order, and entry order within a day, for every symbol
+        return self._query_prefix(portfolio_id, 'LOT#')
+
+    def get_disposals(self, portfolio_id: str) -> List[Dict[str, Any]]:
+        return self._query_prefix(portfolio_id, 'GAIN#')
+
+    def _reserve_sequence(self, portfolio_id: str, count: int) -> Tuple[int, Dict[str, Any]]:
+        """
+        Reserve count consecutive transaction sequence numbers with one atomic ADD on the
+        STATE item; returns the first number and the state as updated
+        """
+        state = db_client.update_item(self.table_name, {'portfolioId': portfolio_id, 'sk': 'STATE'},
+                                      'ADD transactionSequence :count', {':count': count})
+        return int(state['transactionSequence']) - count + 1, state
+
+    def add_transactions(self, portfolio_id: str, transactions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Validate and store new transactions, in the order given"""
+        for body in transactions:
+            transaction_type = str(body.get('type', '')).upper()
+            if transaction_type not in ('BUY', 'SELL'):
+                raise ValueError("type must be BUY or SELL")
+            for field in ('symbol', 'quantity', 'price', 'date'):
+                if field not in body:
+                    raise ValueError(f"{field} is required")
+        if not transactions:
+            return []
+
+        first_sequence, state = self._reserve_sequence(portfolio_id, len(transactions))
+        items = []
+        for sequence, body in enumerate(transactions, start=first_sequence):
+            transaction_type = str(body['type']).upper()
+            transaction_id = body.get('transactionId') or str(uuid.uuid4())
+            transaction_date = parse_date(body['date']).isoformat()
+            item = {
+                'portfolioId': portfolio_id,
+                'sk': f"TXN#{transaction_date}#{sequence:010d}#{transaction_id}",
+                'transactionId': transaction_id,
+                'type': transaction_type,
+                'symbol': body['symbol'].upper(),
+                'quantity': Decimal(str(body['quantity'])),
+                'price': Decimal(str(body['price'])),
+                'fees': Decimal(str(body.get('fees', 0))),
+                'date': transaction_date,
+                'createdAt': datetime.utcnow().isoformat()
+            }
+            if body.get('lotSelections'):
+                item['lotSelections'] = [
+                    {'lotId': s['lotId'], 'quantity': Decimal(str(s['quantity']))} for s in body['lotSelections']
+                ]
+            items.append(item)
+
+        db_client.batch_put_items(self.table_name, items)
+
+        # Anything sorting before the processed cursor invalidates the incremental state
+        if state.get('lastTransactionKey') and any(item['sk'] < state.get('lastTransactionKey', '') for item in items):
+            db_client.update_item(
+                self.table_name, {'portfolioId': portfolio_id, 'sk': 'STATE'},
+                'SET needsReplay = :replay', {':replay': True}
+            )
+        return items
+
+    def corporate_actions_for(self, symbols) -> List[Dict[str, Any]]:
+        """Recorded splits, consolidations and symbol changes for symbols and what they were renamed to"""
+        actions, seen, pending = [], set(), list(symbols)
+        while pending:
+            symbol = pending.pop()
+            if symbol in seen:
+                continue
+            seen.add(symbol)
+            for action in corporate_actions.get_actions(symbol):
+                if action['type'] in LOT_ACTION_TYPES:
+                    actions.append(action)
+                    if action['type'] == 'symbol_change':
+                        pending.append(action['newSymbol'])
+        return actions
+
+    def is_stale(self, state: Dict[str, Any], symbols, transactions: Optional[List[Dict[str, Any]]] = None) -> bool:
+        """
+        Whether stored lots can no longer be brought up to date incrementally: a corporate
+        action for one of symbols was recorded after they were processed, or one of the
+        new transactions is dated before an action already applied to its symbol
+        """
+        actions = self.corporate_actions_for(symbols)
+        applied = set(state.get('appliedActions') or [])
+        if any(action_id(action) not in applied for action in actions):
+            return True
+        return any(action['exDate'] > transaction['date'] and
+                   transaction['symbol'] in (action['symbol'], action.get('newSymbol'))
+                   for action in actions for transaction in transactions or [])
+
+    def process(self, portfolio_id: str, method: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Bring the stored ledger up to date. Only transactions after the last processed one
+        are applied; a new method, a back-dated transaction or a newly recorded corporate
+        action for a held symbol triggers a full replay.
+        """
+        state = self.get_state(portfolio_id) or {}
+        method = method or state.get('method', 'FIFO')
+        last_key = state.get('lastTransactionKey')
+        replay = method != state.get('method') or not last_key or state.get('needsReplay', False)
+
+        if not replay:
+            new_transactions = self.get_transactions(portfolio_id, after=last_key)
+            open_lots = self.get_open_lots(portfolio_id)
+            # Lots stored before keys carried the buy's sequence cannot be ordered within a day
+            replay = any('sequence' not in lot for lot in open_lots) or self.is_stale(
+                state, {lot['symbol'] for lot in open_lots} | {t['symbol'] for t in new_transactions},
+                new_transactions)
+
+        if replay:
+            old_lots = self.get_open_lots(portfolio_id)
+            old_disposals = self.get_disposals(portfolio_id)
+            transactions = self.get_transactions(portfolio_id)
+            ledger = TaxLotLedger(method, self.corporate_actions_for({t['symbol'] for t in transactions}))
+            realized = ledger.apply_all(transactions)
+            # Lots are stored as of today, after every recorded action
+            ledger.apply_actions()
+            applied_actions = ledger.applied_actions
+            changed_lots = ledger.open_lots()
+            db_client.batch_delete_items(self.table_name, [
+                {'portfolioId': portfolio_id, 'sk': item['sk']} for item in old_lots + old_disposals
+            ])
+            transaction_count = len(transactions)
+        else:
+            ledger = TaxLotLedger(method)
+            applied_actions = list(state.get('appliedActions') or [])
+            ledger.load_lots(open_lots)
+            touched = {t['symbol'] for t in new_transactions}
+            realized = ledger.apply_all(new_transactions)
+            # Rewrite only the symbols these transactions touched
+            remaining = {lot['lotId'] for lot in ledger.open_lots()}
+            db_client.batch_delete_items(self.table_name, [
+                {'portfolioId': portfolio_id, 'sk': lot['sk']}
+                for lot in open_lots if lot['symbol'] in touched and lot['lotId'] not in remaining
+            ])
+            changed_lots = [lot for lot in ledger.open_lots() if lot['symbol'] in touched]
+            transaction_count = state.get('transactionCount', 0) + len(new_transactions)
+
+        items = [{
+            'portfolioId': portfolio_id,
+            'sk': lot_key(lot),
+            **lot
+        } for lot in changed_lots]
+        items += [{
+            'portfolioId': portfolio_id,
+            'sk': f"GAIN#{d['disposedDate']}#{d['transactionId']}#{d['lotId']}",
+            **d
+        } for d in realized]
+        db_client.batch_put_items(self.table_name, items)
+        # SET rather than put, so the transaction sequence counter is left alone
+        db_client.update_item(
+            self.table_name, {'portfolioId': portfolio_id, 'sk': 'STATE'},
+            'SET #method = :method, lastTransactionKey = :last, transactionCount = :count, '
+            'appliedActions = :actions, needsReplay = :replay, updatedAt = :updated',
+            {':method': method, ':last': ledger.last_key or last_key, ':count': transaction_count,
+             ':actions': applied_actions, ':replay': False, ':updated': datetime.utcnow().isoformat()},
+            expression_names={'#method': 'method'}
+        )
+
+        return {
+            'method': method,
+            'replayed': replay,
+            'transactionsApplied': transaction_count if replay else len(new_transactions),
+            'disposalsRealized': len(realized)
+        }
+
+    def replay(self, portfolio_id: str, method: str) -> TaxLotLedger:
+        """Rebuild a ledger in memory with a different method, without storing it"""
+        transactions = self.get_transactions(portfolio_id)
+        ledger = TaxLotLedger(method, self.corporate_actions_for({t['symbol'] for t in transactions}))
+        ledger.apply_all(transactions)
+        ledger.apply_actions()
+        return ledger
+
+# Singleton instance
+tax_lot_store = TaxLotStore()
@@ -0,0 +1,201 @@
+import logging
+from datetime import date, datetime
+from decimal import Decimal, Context, ROUND_HALF_UP, localcontext
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger()
+
+# Stored money and percentage fields are rounded to 4 decimal places
+MONEY_QUANTUM = Decimal('0.0001')
+
+HUNDRED = Decimal('100')
+ZERO = Decimal('0')
+
+# Enough precision for quantity x price on any realistic holding, independent of the
+# caller's thread context
+_CONTEXT = Context(prec=28, rounding=ROUND_HALF_UP)
+
+def to_decimal(value: Any, default: Decimal = ZERO) -> Decimal:
+    """Convert a stored or request value to Decimal via str, so floats keep their printed value"""
+    if type(value) is Decimal:
+        return value
+    if value is None or value == '':
+        return default
+    return Decimal(str(value))
+
+def parse_purchase_date(value: Any) -> Optional[date]:
+    """Parse YYYY-MM-DD or a full ISO timestamp (with optional Z suffix); None if invalid"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).date()
+    except ValueError:
+        return None
+
+def value_holdings(holdings: List[Dict[str, Any]], prices: Optional[Dict[str, Any]] = None,
+                   as_of: Optional[date] = None) -> List[Dict[str, Any]]:
+    """
+    Revalue a batch of stock or ETF holdings in one call.
+
+    For each holding (in order) returns the derived fields:
+    - currentPrice: prices[symbol] if given, else the stored currentPrice, else the purchase price
+    - totalCostBasis: quantity x purchasePrice (legacy averagePrice) + purchaseFees
+    - totalValue, totalReturn, returnPercentage (0 when there is no cost basis)
+    - daysHeld: days since purchaseDate, or the stored value when the date is missing or invalid
+    - annualExpenseCost: totalValue x expenseRatio% (only when expenseRatio > 0)
+
+    Inputs may be Decimals, numbers or numeric strings; money outputs are rounded to 4dp.
+    Every write path and bulk job uses this so they store the same answers.
+
+    The arithmetic is Decimal per holding rather than NumPy over float columns: stored money
+    must round half-up exactly, which float64 products do not (about 0.5% of realistic
+    holdings round differently), and converting to and from Decimal at the boundary costs
+    more than the loop it replaces.
+    """
+    prices = {str(symbol).upper(): to_decimal(price) for symbol, price in (prices or {}).items()}
+    as_of = as_of or date.today()
+    # Many holdings share a purchase date; parse each distinct value once
+    parsed_dates = {}
+
+    results = []
+    with localcontext(_CONTEXT):
+        for holding in holdings:
+            quantity = to_decimal(holding.get('quantity'))
+            purchase_price = holding.get('purchasePrice')
+            if purchase_price is None:
+                purchase_price = holding.get('averagePrice')
+            purchase_price = to_decimal(purchase_price)
+            fees = to_decimal(holding.get('purchaseFees'))
+
+            symbol = str(holding.get('symbol', '')).upper()
+            current_price = prices.get(symbol)
+            if current_price is None:
+                current_price = to_decimal(holding.get('currentPrice'), purchase_price)
+
+            cost_basis = quantity * purchase_price + fees
+            total_value = quantity * current_price
+            total_return = total_value - cost_basis
+            return_percentage = total_return * HUNDRED / cost_basis if cost_basis > 0 else ZERO
+
+            purchase_date = holding.get('purchaseDate')
+            purchased = parsed_dates.get(purchase_date, False)
+            if purchased is False:
+                purchased = parsed_dates[purchase_date] = parse_purchase_date(purchase_date)
+            days_held = (as_of - purchased).days if purchased else holding.get('daysHeld')
+
+            result = {
+                'currentPrice': current_price,
+                'totalCostBasis': cost_basis.quantize(MONEY_QUANTUM),
+                'totalValue': total_value.quantize(MONEY_QUANTUM),
+                'totalReturn': total_return.quantize(MONEY_QUANTUM),
+                'returnPercentage': return_percentage.quantize(MONEY_QUANTUM),
+                'daysHeld': days_held
+            }
+
+            expense_ratio = holding.get('expenseRatio')
+            if expense_ratio:
+                expense_ratio = to_decimal(expense_ratio)
+                if expense_ratio > 0:
+                    result['annualExpenseCost'] = (total_value * expense_ratio / HUNDRED).quantize(MONEY_QUANTUM)
+
+            results.append(result)
+
+    return results
+
+# Stored fields value_holdings reads. An update that supplies all of them can be valued
+# without reading the stored item (ETFs also need expenseRatio for annualExpenseCost).
+HOLDING_VALUATION_INPUTS = ('quantity', 'purchasePrice', 'purchaseFees', 'currentPrice', 'purchaseDate')
+ETF_VALUATION_INPUTS = HOLDING_VALUATION_INPUTS + ('expenseRatio',)
+
+def value_holding(holding: Dict[str, Any], price: Any = None, as_of: Optional[date] = None) -> Dict[str, Any]:
+    """Revalue a single holding; see value_holdings"""
+    prices = {holding.get('symbol', ''): price} if price is not None else None
+    return value_holdings([holding], prices, as_of)[0]
+
+# Annual property expenses that make up totalAnnualExpenses
+PROPERTY_EXPENSE_FIELDS = ('councilRates', 'waterRates', 'insurance', 'propertyManagementFees',
+                           'maintenanceRepairs', 'strataFees', 'landTax')
+
+PROPERTY_COST_FIELDS = ('purchasePrice', 'stampDuty', 'legalFees', 'otherPurchaseCosts')
+
+WEEKS_PER_YEAR = Decimal('52')
+
+def value_properties(properties: List[Dict[str, Any]], current_values: Optional[List[Any]] = None,
+                     as_of: Optional[date] = None) -> List[Dict[str, Any]]:
+    """
+    Derive the stored property metrics for a batch of properties in one call.
+
+    current_values optionally replaces each property's currentValue (e.g. after revaluation).
+    For each property (in order) returns currentValue, totalPurchaseCosts, annualRentalIncome
+    (weeklyRent x 52), totalAnnualExpenses, capitalGrowth, capitalGrowthPercentage,
+    grossRentalYield, netRentalYield, annualCashFlow, totalReturn, returnPercentage and daysHeld.
+    """
+    as_of = as_of or date.today()
+    parsed_dates = {}
+
+    results = []
+    with localcontext(_CONTEXT):
+        for index, item in enumerate(properties):
+            current_value = to_decimal(current_values[index] if current_values is not None else item.get('currentValue'))
+            purchase_costs = sum((to_decimal(item.get(field)) for field in PROPERTY_COST_FIELDS), ZERO)
+            expenses = sum((to_decimal(item.get(field)) for field in PROPERTY_EXPENSE_FIELDS), ZERO)
+            rental_income = to_decimal(item.get('weeklyRent')) * WEEKS_PER_YEAR
+
+            capital_growth = current_value - purchase_costs
+            cash_flow = rental_income - expenses
+            total_return = capital_growth + cash_flow
+
+            if purchase_costs > 0:
+                growth_percentage = capital_growth * HUNDRED / purchase_costs
+                return_percentage = total_return * HUNDRED / purchase_costs
+            else:
+                growth_percentage = return_percentage = ZERO
+            if current_value > 0:
+                gross_yield = rental_income * HUNDRED / current_value
+                net_yield = cash_flow * HUNDRED / current_value
+            else:
+                gross_yield = net_yield = ZERO
+
+            purchase_date = item.get('purchaseDate')
+            purchased = parsed_dates.get(purchase_date, False)
+            if purchased is False:
+                purchased = parsed_dates[purchase_date] = parse_purchase_date(purchase_date)
+
+            results.append({
+                'currentValue': current_value,
+                'totalPurchaseCosts': purchase_costs.quantize(MONEY_QUANTUM),
+                'annualRentalIncome': rental_income.quantize(MONEY_QUANTUM),
+                'totalAnnualExpenses': expenses.quantize(MONEY_QUANTUM),
+                'capitalGrowth': capital_growth.quantize(MONEY_QUANTUM),
+                'capitalGrowthPercentage': growth_percentage.quantize(MONEY_QUANTUM),
+                'grossRentalYield': gross_yield.quantize(MONEY_QUANTUM),
+                'netRentalYield': net_yield.quantize(MONEY_QUANTUM),
+                'annualCashFlow': cash_flow.quantize(MONEY_QUANTUM),
+                'totalReturn': total_return.quantize(MONEY_QUANTUM),
+                'returnPercentage': return_percentage.quantize(MONEY_QUANTUM),
+                'daysHeld': (as_of - purchased).days if purchased else item.get('daysHeld')
+            })
+
+    return results
+
+# State abbreviations that may follow the suburb in an address
+AU_STATES = ('NSW', 'VIC', 'QLD', 'WA', 'SA', 'TAS', 'ACT', 'NT')
+
+def suburb_from_address(address: Any) -> str:
+    """
+    Suburb of an Australian address written street first ('12 Smith St, Newtown NSW 2042'
+    or '12 Smith St, Newtown, NSW, 2042'): what follows the street, less state and postcode.
+    '' when the address has no part after the street.
+    """
+    parts = [part.strip() for part in str(address or '').split(',') if part.strip()]
+    words = ' '.join(parts[1:]).split()
+    while words and (words[-1].isdigit() or words[-1].upper() in AU_STATES):
+        words.pop()
+    return ' '.join(words)
+
+# Stored fields value_properties reads
+PROPERTY_VALUATION_INPUTS = ('currentValue', 'weeklyRent', 'purchaseDate') + PROPERTY_COST_FIELDS + PROPERTY_EXPENSE_FIELDS
+
+def value_property(item: Dict[str, Any], as_of: Optional[date] = None) -> Dict[str, Any]:
+    """Derive the stored metrics for a single property; see value_properties"""
+    return value_properties([item], as_of=as_of)[0]
@@ -0,0 +1,35 @@
+"""
+Shared fixtures: every DynamoDB call made through aws_clients is answered by the
+in-memory stand-in (benchmarks/fake_dynamodb.py), with the tables and indexes from
+serverless.yml. Environment is set before any shared module is imported, since the
+singletons read their table names when they are created.
+"""
+
+import os
+import sys
+
+import pytest
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.append(os.path.join(BACKEND, 'shared'))
+sys.path.append(os.path.join(BACKEND, 'benchmarks'))
+
+os.environ.setdefault('AWS_ACCESS_KEY_ID', 'test')
+os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'test')
+os.environ['DYNAMODB_METRICS'] = 'off'
+
+from fake_dynamodb import FakeDynamoDB
+
+fake = FakeDynamoDB.from_serverless(os.path.join(BACKEND, 'serverless.yml'), stage='test')
+os.environ.update(fake.environment)
+os.environ['DATA_LAYOUT'] = 'multi'
+os.environ['REGION'] = 'ap-southeast-2'
+
+from aws_clients import aws_clients
+fake.install(aws_clients)
+
+@pytest.fixture
+def dynamodb():
+    """The in-memory DynamoDB, emptied before each test"""
+    fake.reset()
+    return fake
@@ -0,0 +1,73 @@
+from decimal import Decimal
+
+import pytest
+
+from corporate_actions import adjust_closes, corporate_actions, parse_action, parse_ratio
+from portfolio_repository import portfolio_repository
+
+@pytest.fixture
+def holdings(dynamodb):
+    portfolio_repository.put_portfolio({'id': 'p1', 'name': 'Core'})
+    portfolio_repository.put_holding('stocks', {
+        'id': 's1', 'portfolioId': 'p1', 'symbol': 'BHP', 'name': 'BHP', 'quantity': Decimal('100'),
+        'purchasePrice': Decimal('40'), 'currentPrice': Decimal('50'), 'purchaseDate': '2023-01-10',
+        'updatedAt': '2024-01-01T00:00:00'})
+    portfolio_repository.put_holding('stocks', {
+        'id': 's2', 'portfolioId': 'p1', 'symbol': 'BHP', 'name': 'BHP', 'quantity': Decimal('10'),
+        'purchasePrice': Decimal('25'), 'currentPrice': Decimal('25'), 'purchaseDate': '2024-04-01',
+        'updatedAt': '2024-04-01T00:00:00'})
+    yield
+    corporate_actions.invalidate()
+
+def test_ratios_and_rows_are_validated():
+    assert parse_ratio('2:1') == Decimal('2')
+    assert parse_ratio('1:10') == Decimal('0.1')
+    with pytest.raises(ValueError):
+        parse_ratio('0:1')
+    with pytest.raises(ValueError, match='newSymbol'):
+        parse_action({'symbol': 'OLD', 'exDate': '2024-03-01', 'type': 'symbol_change', 'newSymbol': 'old'})
+    assert parse_action({'symbol': 'bhp', 'exDate': '2024-03-01', 'type': 'Split', 'ratio': '2:1'})['actionKey'] == '2024-03-01#split'
+
+def test_closes_before_a_split_are_adjusted():
+    closes = [('2024-02-29', Decimal('50')), ('2024-03-01', Decimal('25'))]
+    split = {'exDate': '2024-03-01', 'factor': Decimal('2')}
+    assert adjust_closes(closes, [split]) == [('2024-02-29', Decimal('25')), ('2024-03-01', Decimal('25'))]
+
+def test_split_adjusts_holdings_bought_before_the_ex_date_once(holdings):
+    action = parse_action({'symbol': 'BHP', 'exDate': '2024-03-01', 'type': 'split', 'ratio': '2:1'})
+    assert corporate_actions.apply_action(action)['holdingsAdjusted'] == 1
+
+    before, after = (portfolio_repository.get_holding('stocks', holding_id) for holding_id in ('s1', 's2'))
+    assert (before['quantity'], before['purchasePrice'], before['currentPrice']) == (200, 20, 25)
+    assert before['appliedCorporateActions'] == ['BHP#2024-03-01#split']
+    assert after['quantity'] == 10
+
+    # Re-running after a partial failure leaves applied holdings alone
+    assert corporate_actions.apply_action(action)['holdingsAdjusted'] == 0
+    assert [item['actionKey'] for item in corporate_actions.get_actions('BHP')] == ['2024-03-01#split']
+
+def test_symbol_change_renames_holdings_and_records_an_alias(holdings):
+    action = parse_action({'symbol': 'BHP', 'exDate': '2024-05-01', 'type': 'symbol_change', 'newSymbol': 'BHPG'})
+    assert corporate_actions.apply_action(action)['holdingsAdjusted'] == 2
+    assert {holding['symbol'] for holding in portfolio_repository.scan_entities('stocks')} == {'BHPG'}
+    alias, = corporate_actions.get_actions('BHPG')
+    assert (alias['type'], alias['previousSymbol']) == ('alias', 'BHP')
+
+def test_feed_skips_recorded_and_future_actions(holdings, tmp_path):
+    feed = tmp_path / 'actions.csv'
+    feed.write_text('symbol,exDate,type,ratio,newSymbol\n'
+                    'BHP,2024-03-01,split,2:1,\n'
+                    'BHP,2999-01-01,consolidation,1:10,\n')
+    first = corporate_actions.apply_feed(str(feed))
+    assert (first['applied'], first['notYetEffective']) == (1, 1)
+    assert corporate_actions.apply_feed(str(feed))['alreadyApplied'] == 1
+
+def test_malformed_feed_rows_do_not_block_valid_actions(holdings, tmp_path):
+    feed = tmp_path / 'actions.csv'
+    feed.write_text('symbol,exDate,type,ratio,newSymbol\n'
+                    'BHP,2024-03-01,split,two,\n'
+                    'BHP,2024-03-01,split,2:1,\n'
+                    ',2024-03-01,split,2:1,\n')
+    result = corporate_actions.apply_feed(str(feed))
+    assert result['applied'] == 1
+    assert [error.split(':')[0] for error in result['invalidRows']] == ['actions.csv line 2', 'actions.csv line 4']
@@ -0,0 +1,44 @@
+import importlib.util
+import json
+import os
+
+import pytest
+
+from dynamodb_client import ItemNotFoundError, db_client
+from portfolio_repository import portfolio_repository
+
+FUNCTIONS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'functions')
+
+def load_handler(path):
+    spec = importlib.util.spec_from_file_location(os.path.basename(path)[:-3], os.path.join(FUNCTIONS, path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.handler
+
+@pytest.fixture
+def stocks_table(dynamodb):
+    table_name = portfolio_repository.table_name('stocks')
+    db_client.put_item(table_name, {'id': 's1', 'portfolioId': 'p1', 'symbol': 'BHP', 'name': 'BHP'})
+    return table_name
+
+def test_update_existing_item_returns_old_or_new_and_never_creates(stocks_table):
+    before = db_client.update_existing_item(stocks_table, {'id': 's1'}, 'SET #n = :name', {':name': 'BHP Group'},
+                                            {'#n': 'name'}, return_values='ALL_OLD')
+    assert before['name'] == 'BHP'
+    with pytest.raises(ItemNotFoundError):
+        db_client.update_existing_item(stocks_table, {'id': 'missing'}, 'SET #n = :name', {':name': 'x'}, {'#n': 'name'})
+    assert db_client.get_item(stocks_table, {'id': 'missing'}) is None
+
+def test_delete_existing_item_returns_the_deleted_item(stocks_table):
+    assert db_client.delete_existing_item(stocks_table, {'id': 's1'})['symbol'] == 'BHP'
+    with pytest.raises(ItemNotFoundError):
+        db_client.delete_existing_item(stocks_table, {'id': 's1'})
+
+def test_missing_holding_maps_to_404(stocks_table):
+    update_stock = load_handler('stocks/update_stock.py')
+    delete_stock = load_handler('stocks/delete_stock.py')
+    missing = {'pathParameters': {'stockId': 'missing'}}
+
+    assert update_stock({**missing, 'body': json.dumps({'name': 'x'})}, None)['statusCode'] == 404
+    assert delete_stock(missing, None)['statusCode'] == 404
+    assert delete_stock({'pathParameters': {'stockId': 's1'}}, None)['statusCode'] == 200
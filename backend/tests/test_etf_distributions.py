@@ -0,0 +1,20 @@
+from datetime import date
+from decimal import Decimal
+
+from etf_distributions import distribution_record, distribution_store
+
+AS_OF = date(2024, 6, 30)
+
+def holding(portfolio_amount):
+    return {'id': 'e1', 'symbol': 'VAS', 'quantity': 100, 'currentPrice': 100,
+            'lastDistributionDate': '2024-04-01', 'lastDistributionAmount': portfolio_amount}
+
+def test_holding_amounts_are_used_without_entering_the_shared_series(dynamodb):
+    income = distribution_store.portfolio_income([holding('0.9')], AS_OF)
+    assert income['etfs'][0]['trailingDistribution'] == Decimal('0.9')
+    assert distribution_store.get_histories(['VAS']) == {'VAS': []}
+
+def test_shared_series_takes_precedence_over_holding_amounts(dynamodb):
+    distribution_store.put_distributions([distribution_record('VAS', '2024-04-01', '0.8', source='feed')])
+    income = distribution_store.portfolio_income([holding('999')], AS_OF)
+    assert income['etfs'][0]['trailingDistribution'] == Decimal('0.8')
@@ -0,0 +1,52 @@
+import pytest
+
+from etf_lookthrough import LookThroughEngine, UNALLOCATED
+
+@pytest.fixture
+def engine(tmp_path):
+    # VAS in percentages leaving 10% unallocated; IVV in fractions, with bad rows to skip
+    (tmp_path / 'VAS.csv').write_text('symbol,name,weight,sector,country\n'
+                                      'BHP,BHP Group,50,Materials,au\n'
+                                      'CBA,Commonwealth Bank,40,Financials,AU\n')
+    (tmp_path / 'IVV.csv').write_text('symbol,name,weight,sector,country\n'
+                                      'AAPL,Apple,0.6,Technology,US\n'
+                                      'MSFT,Microsoft,n/a,Technology,US\n'
+                                      'NVDA,Nvidia,-0.1,Technology,US\n'
+                                      'BHP,BHP Group,0.4,Materials,AU\n')
+    (tmp_path / 'notes.txt').write_text('not a constituents file')
+    return LookThroughEngine(str(tmp_path))
+
+def by(rows, key):
+    return {row[key]: row['value'] for row in rows}
+
+def test_etfs_are_looked_through_to_their_constituents(engine):
+    result = engine.exposure([], [{'symbol': 'VAS', 'totalValue': 1000}, {'symbol': 'ivv', 'totalValue': 500}])
+    assert by(result['bySecurity'], 'symbol') == {'BHP': 700.0, 'CBA': 400.0, 'AAPL': 300.0}
+    assert by(result['byCountry'], 'country') == {'AU': 1100.0, 'US': 300.0, UNALLOCATED: 100.0}
+    assert result['totalValue'] == 1500.0
+    assert result['lookThroughCoverage'] == 1.0
+    assert result['etfsLookedThrough'] == 2
+
+def test_bad_weights_are_skipped_not_fatal(engine):
+    universe = engine.get_universe()
+    assert sorted(universe.etfs) == ['IVV', 'VAS']
+    assert 'MSFT' not in universe.security_index and 'NVDA' not in universe.security_index
+
+def test_direct_holdings_merge_with_constituents_and_unknown_etfs_stay_opaque(engine):
+    stocks = [{'symbol': 'BHP', 'totalValue': 100, 'exchange': 'ASX'},
+              {'symbol': 'XRO', 'name': 'Xero', 'sector': 'Technology', 'exchange': 'ASX', 'totalValue': 50}]
+    result = engine.exposure(stocks, [{'symbol': 'VAS', 'totalValue': 1000}, {'symbol': 'VGS', 'totalValue': 200}])
+    assert by(result['bySecurity'], 'symbol') == {'BHP': 600.0, 'CBA': 400.0, 'VGS': 200.0, 'XRO': 50.0}
+    assert result['etfsWithoutConstituents'] == ['VGS']
+    assert by(result['byCountry'], 'country')['Unknown'] == 200.0
+    assert result['lookThroughCoverage'] == pytest.approx(1000 / 1350, abs=1e-6)
+
+def test_top_limits_the_securities_returned(engine):
+    result = engine.exposure([], [{'symbol': 'VAS', 'totalValue': 1000}], top=1)
+    assert [row['symbol'] for row in result['bySecurity']] == ['BHP']
+    assert result['securityCount'] == 2
+
+def test_missing_constituents_directory_looks_through_nothing(tmp_path):
+    result = LookThroughEngine(str(tmp_path / 'missing')).exposure([], [{'symbol': 'VAS', 'totalValue': 10}])
+    assert result['etfsWithoutConstituents'] == ['VAS']
+    assert result['lookThroughCoverage'] == 0.0
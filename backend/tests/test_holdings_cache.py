@@ -0,0 +1,62 @@
+import pytest
+
+import holdings_cache as holdings_cache_module
+from holdings_cache import HoldingsCache
+from portfolio_repository import portfolio_repository
+from portfolio_summary import touch_portfolios
+
+@pytest.fixture
+def portfolio(dynamodb):
+    portfolio_repository.put_portfolio({'id': 'p1', 'name': 'Core'})
+    portfolio_repository.put_holding('stocks', {'id': 's1', 'portfolioId': 'p1', 'symbol': 'BHP'})
+    return 'p1'
+
+@pytest.fixture
+def settled(monkeypatch):
+    monkeypatch.setattr(holdings_cache_module, 'HOLDINGS_SETTLE_SECONDS', 0)
+
+def add_stock(holding_id, symbol):
+    portfolio_repository.put_holding('stocks', {'id': holding_id, 'portfolioId': 'p1', 'symbol': symbol})
+    touch_portfolios(['p1'], 'stocks')
+
+def test_version_bump_invalidates_cached_list(portfolio, settled):
+    cache = HoldingsCache()
+    assert [item['id'] for item in cache.get_entity_holdings('stocks', portfolio)] == ['s1']
+    assert cache.get_entity_holdings('stocks', portfolio)[0]['symbol'] == 'BHP'
+    assert cache.stats()['hits'] == 1
+
+    add_stock('s2', 'CBA')
+    assert sorted(item['id'] for item in cache.get_entity_holdings('stocks', portfolio)) == ['s1', 's2']
+    assert cache.stats()['misses'] == 2
+
+def test_list_read_before_the_write_settles_is_not_cached(portfolio):
+    cache = HoldingsCache()
+    add_stock('s2', 'CBA')
+    versions = portfolio_repository.get_holdings_versions(portfolio)
+    assert cache.etag('stocks', portfolio, versions) is None
+
+    cache.get_entity_holdings('stocks', portfolio, versions=versions)
+    cache.get_entity_holdings('stocks', portfolio, versions=versions)
+    assert cache.stats()['hits'] == 0
+    assert cache.stats()['unsettled'] == 2
+
+def test_list_written_to_while_read_is_not_cached(portfolio, settled, monkeypatch):
+    cache = HoldingsCache()
+    query = portfolio_repository.get_entity_holdings
+
+    def racing_query(entity, portfolio_id, fields=None):
+        items = query(entity, portfolio_id, fields)
+        add_stock('s2', 'CBA')
+        return items
+
+    monkeypatch.setattr(portfolio_repository, 'get_entity_holdings', racing_query)
+    versions = portfolio_repository.get_holdings_versions(portfolio)
+    assert [item['id'] for item in cache.get_entity_holdings('stocks', portfolio, versions=versions)] == ['s1']
+    assert cache.stats()['entries'] == 0
+
+def test_first_page_that_is_the_whole_list_is_cached(portfolio, settled):
+    cache = HoldingsCache()
+    page, last_key = cache.get_entity_holdings_page('stocks', portfolio, 10)
+    assert [item['id'] for item in page] == ['s1'] and last_key is None
+    cache.get_entity_holdings_page('stocks', portfolio, 10)
+    assert cache.stats()['hits'] == 1
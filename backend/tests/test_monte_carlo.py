@@ -0,0 +1,21 @@
+import pytest
+
+from monte_carlo import MAX_YEARS, MonteCarloEngine
+
+PARAMS = {'listedValue': 100000.0, 'propertyValue': 0.0, 'propertyCashFlow': 0.0, 'monthlyContribution': 0.0,
+          'annualFeeRate': 0.0, 'listedReturn': 0.07, 'listedVolatility': 0.12, 'propertyGrowth': 0.05,
+          'propertyVolatility': 0.08, 'years': 10}
+
+def test_goals_are_read_at_their_own_year():
+    result = MonteCarloEngine(workers=1).project(PARAMS, paths=500, goals=[
+        {'name': 'soon', 'targetAmount': 1, 'years': 1}, {'name': 'horizon', 'targetAmount': 10 ** 9}])
+    assert [(goal['years'], goal['probability']) for goal in result['goals']] == [(1, 1.0), (10, 0.0)]
+
+@pytest.mark.parametrize('years', [0, -1, 11])
+def test_goal_years_outside_the_horizon_are_rejected(years):
+    with pytest.raises(ValueError, match='goal years'):
+        MonteCarloEngine(workers=1).project(PARAMS, paths=10, goals=[{'targetAmount': 1, 'years': years}])
+
+def test_horizon_is_capped():
+    with pytest.raises(ValueError, match=f"between 1 and {MAX_YEARS}"):
+        MonteCarloEngine(workers=1).project({**PARAMS, 'years': MAX_YEARS + 1}, paths=10)
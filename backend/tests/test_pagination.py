@@ -0,0 +1,61 @@
+import pytest
+
+from aws_clients import aws_clients
+from pagination import CursorCodec, CursorError, CursorKeyError, DEV_SIGNING_KEY, MAX_PAGE_SIZE, load_signing_key
+
+class MissingSecret:
+    def get_secret_value(self, SecretId):
+        raise Exception(f"Secret {SecretId} not found")
+
+def missing_secret(service, region=None):
+    return MissingSecret()
+
+def test_deployed_stage_without_a_key_fails_closed(monkeypatch):
+    monkeypatch.delenv('CURSOR_SIGNING_KEY', raising=False)
+    monkeypatch.delenv('IS_OFFLINE', raising=False)
+    monkeypatch.setenv('STAGE', 'prod')
+    monkeypatch.setattr(aws_clients, 'client', missing_secret)
+    codec = CursorCodec()
+    # A first page needs no key
+    assert codec.decode(None, 'portfolios') is None
+    with pytest.raises(CursorKeyError):
+        codec.encode({'id': 'p1'}, 'portfolios')
+
+def test_development_key_is_only_used_locally(monkeypatch):
+    monkeypatch.delenv('CURSOR_SIGNING_KEY', raising=False)
+    monkeypatch.setenv('STAGE', 'dev')
+    monkeypatch.setenv('IS_OFFLINE', 'true')
+    assert load_signing_key() == DEV_SIGNING_KEY
+    monkeypatch.setenv('CURSOR_SIGNING_KEY', 'stage-key')
+    assert load_signing_key() == 'stage-key'
+
+def test_cursor_round_trips_within_its_scope():
+    codec = CursorCodec('test-key')
+    position = {'id': 's1', 'portfolioId': 'p1'}
+    cursor = codec.encode(position, 'stocks:p1')
+    assert codec.page_params({'cursor': cursor, 'limit': '10000'}, 'stocks:p1') == (MAX_PAGE_SIZE, position)
+    assert codec.encode(None, 'stocks:p1') is None
+
+def test_tampered_cursor_is_rejected():
+    codec = CursorCodec('test-key')
+    payload, _, signature = codec.encode({'id': 's1', 'portfolioId': 'p1'}, 'stocks:p1').partition('.')
+    forged = codec.encode({'id': 's1', 'portfolioId': 'p2'}, 'stocks:p1').partition('.')[0]
+    with pytest.raises(CursorError, match='Invalid cursor'):
+        codec.decode(f"{forged}.{signature}", 'stocks:p1')
+    with pytest.raises(CursorError, match='Invalid cursor'):
+        codec.decode(payload, 'stocks:p1')
+    # Signed with another key
+    with pytest.raises(CursorError, match='Invalid cursor'):
+        CursorCodec('other-key').decode(f"{payload}.{signature}", 'stocks:p1')
+
+def test_cursor_from_another_list_is_rejected():
+    codec = CursorCodec('test-key')
+    cursor = codec.encode({'id': 's1', 'portfolioId': 'p1'}, 'stocks:p1')
+    with pytest.raises(CursorError, match='does not belong'):
+        codec.decode(cursor, 'stocks:p2')
+
+def test_limit_must_be_a_positive_integer():
+    codec = CursorCodec('test-key')
+    for limit in ('0', '-5', 'ten'):
+        with pytest.raises(CursorError, match='limit'):
+            codec.page_params({'limit': limit}, 'portfolios')
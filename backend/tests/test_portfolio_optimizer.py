@@ -0,0 +1,79 @@
+import importlib.util
+import json
+import os
+
+import numpy as np
+import pytest
+
+from portfolio_optimizer import MeanVarianceModel, PortfolioOptimizer
+
+FUNCTIONS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'functions')
+
+@pytest.fixture
+def model():
+    # The unconstrained target-return portfolio for 12% shorts C
+    expected_returns = np.array([0.05, 0.08, 0.12, 0.03])
+    volatilities = np.array([0.10, 0.15, 0.25, 0.12])
+    correlation = np.full((4, 4), 0.3) + 0.7 * np.eye(4)
+    covariance = correlation * np.outer(volatilities, volatilities)
+    return MeanVarianceModel(['A', 'B', 'C', 'D'], expected_returns, covariance)
+
+def test_long_only_target_return_is_met_exactly(model):
+    assert model.target_return_weights(0.10)[0].min() < 0
+    weights = model.long_only_target_return_weights(0.10)
+    assert weights.min() >= 0
+    assert weights.sum() == pytest.approx(1.0)
+    assert weights @ model.expected_returns == pytest.approx(0.10)
+
+def test_long_only_target_return_has_least_variance(model):
+    weights = model.long_only_target_return_weights(0.10)
+    variance = weights @ model.covariance @ weights
+    rng = np.random.default_rng(7)
+    for candidate in rng.dirichlet(np.ones(4), 5000):
+        # Project random long-only mixes onto the target return along the A-C edge
+        gap = 0.10 - candidate @ model.expected_returns
+        shift = gap / (0.12 - 0.05)
+        candidate = candidate + shift * np.array([-1.0, 0.0, 1.0, 0.0])
+        if candidate.min() >= 0:
+            assert candidate @ model.covariance @ candidate >= variance - 1e-12
+
+def test_long_only_target_return_out_of_reach_is_rejected(model):
+    with pytest.raises(ValueError, match='targetReturn must be between'):
+        model.long_only_target_return_weights(0.15)
+
+def test_long_only_max_sharpe_beats_every_long_only_mix(model):
+    weights = model.long_only_max_sharpe_weights(0.02)
+    assert weights.min() >= 0 and weights.sum() == pytest.approx(1.0)
+    sharpe = model.stats(weights, 0.02)['sharpeRatio']
+    for candidate in np.random.default_rng(3).dirichlet(np.ones(4), 5000):
+        assert model.stats(candidate, 0.02)['sharpeRatio'] <= sharpe + 1e-6
+
+def test_allow_short_must_be_a_boolean():
+    spec = importlib.util.spec_from_file_location('optimize_portfolio',
+                                                  os.path.join(FUNCTIONS, 'analytics/optimize_portfolio.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    event = {'pathParameters': {'portfolioId': 'p1'}, 'body': json.dumps({'allowShort': 'false'})}
+    response = module.handler(event, None)
+    assert response['statusCode'] == 400
+    assert 'allowShort' in json.loads(response['body'])['error']
+
+def test_long_only_frontier_has_no_short_positions(model, monkeypatch):
+    optimizer = PortfolioOptimizer()
+    monkeypatch.setattr(optimizer, 'get_model', lambda symbols, window_days: model)
+    result = optimizer.optimize(['A', 'B', 'C', 'D'], target_return=0.10, frontier_points=5, allow_short=False)
+    frontier = result['efficientFrontier']
+    assert frontier[0]['volatility'] == result['minVariance']['volatility']
+    assert frontier[-1]['expectedReturn'] == pytest.approx(0.12)
+    for point in frontier[1:]:
+        weights = model.long_only_target_return_weights(point['expectedReturn'])
+        assert weights.min() >= 0
+        assert np.sqrt(weights @ model.covariance @ weights) == pytest.approx(point['volatility'], abs=1e-4)
+        # No less risky than the unconstrained portfolio with the same return
+        free = model.target_return_weights(point['expectedReturn'])[0]
+        assert point['volatility'] >= np.sqrt(free @ model.covariance @ free) - 1e-6
+
+def test_frontier_with_identical_returns_is_rejected():
+    model = MeanVarianceModel(['A', 'B'], np.array([0.05, 0.05]), np.diag([0.01, 0.02]))
+    with pytest.raises(ValueError, match='identical'):
+        model.efficient_frontier()
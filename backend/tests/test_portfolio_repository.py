@@ -0,0 +1,26 @@
+import pytest
+
+from dynamodb_client import ItemNotFoundError
+from portfolio_repository import PortfolioRepository
+
+@pytest.fixture
+def single(dynamodb, monkeypatch):
+    monkeypatch.setenv('DATA_LAYOUT', 'single')
+    repository = PortfolioRepository()
+    repository.put_portfolio({'id': 'p1', 'name': 'Core'})
+    repository.put_holding('stocks', {'id': 's1', 'portfolioId': 'p1', 'symbol': 'BHP', 'quantity': 10})
+    return repository
+
+def test_holding_is_addressed_directly_with_its_portfolio(single):
+    assert single.get_holding('stocks', 's1', 'p1')['symbol'] == 'BHP'
+    before, after = single.update_holding_fields('stocks', 's1', {'quantity': 20}, portfolio_id='p1')
+    assert (before['quantity'], after['quantity']) == (10, 20)
+    assert single.get_holding('stocks', 's1', 'p2') is None
+
+def test_holding_is_found_by_id_alone(single):
+    assert single.get_holding('stocks', 's1') == {'id': 's1', 'portfolioId': 'p1', 'symbol': 'BHP', 'quantity': 10}
+    # id-index holds every entity; the sort key prefix keeps lookups to the one asked for
+    assert single.get_holding('etfs', 's1') is None
+    assert single.delete_holding_by_id('stocks', 's1')['id'] == 's1'
+    with pytest.raises(ItemNotFoundError):
+        single.delete_holding_by_id('stocks', 's1', 'p1')
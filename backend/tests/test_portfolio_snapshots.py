@@ -0,0 +1,27 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from portfolio_snapshots import snapshot_store, time_weighted_series
+
+def snapshot(day, value, cost_basis):
+    return {'portfolioId': 'p1', 'date': day, 'totalValue': Decimal(value), 'totalCostBasis': Decimal(cost_basis)}
+
+def test_money_added_is_not_counted_as_return():
+    series = time_weighted_series([
+        snapshot('2024-01-01', '1000', '1000'),
+        snapshot('2024-01-02', '1100', '1000'),
+        # 1000 more invested, and the portfolio flat for the day
+        snapshot('2024-01-03', '2100', '2000'),
+    ])
+    assert [value for _, value in series] == [Decimal('1'), Decimal('1.1'), Decimal('1.1')]
+
+def test_period_return_covers_the_same_window_as_the_index(dynamodb):
+    today = date.today()
+    snapshot_store.put_snapshots([
+        snapshot((today - timedelta(days=400)).isoformat(), '500', '500'),
+        snapshot((today - timedelta(days=365)).isoformat(), '1000', '1000'),
+        snapshot(today.isoformat(), '1200', '1000'),
+    ])
+    assert snapshot_store.get_period_return('p1', '1y') == Decimal('20')
+    # The snapshots do not reach back two years
+    assert snapshot_store.get_period_return('p1', '2y') is None
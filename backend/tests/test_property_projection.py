@@ -0,0 +1,28 @@
+import importlib.util
+import json
+import os
+
+import pytest
+
+FUNCTIONS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'functions')
+
+@pytest.fixture
+def projection_handler(dynamodb):
+    spec = importlib.util.spec_from_file_location('get_property_projection',
+                                                  os.path.join(FUNCTIONS, 'properties/get_property_projection.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.handler
+
+@pytest.mark.parametrize('name, value', [('loanAmount', 'nan'), ('interestRate', 'inf'),
+                                         ('capitalGrowth', '-Infinity'), ('vacancyRate', 'NaN')])
+def test_non_finite_parameters_are_rejected(projection_handler, name, value):
+    event = {'pathParameters': {'propertyId': 'prop1'}, 'queryStringParameters': {name: value}}
+    response = projection_handler(event, None)
+    assert response['statusCode'] == 400
+    assert 'finite' in json.loads(response['body'])['error']
+
+def test_finite_parameters_reach_the_property_lookup(projection_handler):
+    event = {'pathParameters': {'propertyId': 'missing'},
+             'queryStringParameters': {'loanAmount': '400000', 'interestRate': '0.06'}}
+    assert projection_handler(event, None)['statusCode'] == 404
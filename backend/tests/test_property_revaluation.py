@@ -0,0 +1,37 @@
+import pytest
+
+from property_revaluation import load_price_index, revaluation_factors
+from valuation import suburb_from_address
+
+@pytest.fixture
+def index(tmp_path):
+    path = tmp_path / 'index.csv'
+    path.write_text('area,date,index\n'
+                    'Newtown,2023-01-01,100\nNewtown,2024-01-01,110\n'
+                    'Inner West,2023-01-01,100\nInner West,2024-01-01,104\n')
+    return load_price_index(str(path))
+
+def test_suburb_row_is_applied_before_the_council_area(index):
+    properties = [
+        {'id': 'a', 'suburb': 'newtown', 'councilArea': 'Inner West', 'valuationDate': '2023-06-01'},
+        {'id': 'b', 'address': '12 Smith St, Newtown NSW 2042', 'councilArea': 'Inner West',
+         'valuationDate': '2023-06-01'},
+        {'id': 'c', 'suburb': 'Marrickville', 'councilArea': 'Inner West', 'valuationDate': '2023-06-01'},
+    ]
+    factors, as_of = revaluation_factors(properties, index)
+    assert list(factors) == pytest.approx([1.1, 1.1, 1.04])
+    assert as_of == ['2024-01-01'] * 3
+
+def test_suburb_from_address():
+    assert suburb_from_address('12 Smith St, Surry Hills NSW 2010') == 'Surry Hills'
+    assert suburb_from_address('123 Main Street, Newtown, NSW, 2042') == 'Newtown'
+    assert suburb_from_address('Lot 4 Old Coach Road') == ''
+
+def test_malformed_index_rows_are_skipped(tmp_path):
+    path = tmp_path / 'index.csv'
+    path.write_text('area,date,index\n'
+                    'Newtown,2023-01-01,100\nNewtown,2023-07-01,n/a\nNewtown,not-a-date,105\n'
+                    ',2024-01-01,100\nNewtown,2024-01-01,110\n')
+    dates, values = load_price_index(str(path))['NEWTOWN']
+    assert [str(day) for day in dates] == ['2023-01-01', '2024-01-01']
+    assert list(values) == [100.0, 110.0]
@@ -0,0 +1,76 @@
+import importlib.util
+import json
+import os
+
+import pytest
+
+from rebalancer import rebalance
+
+FUNCTIONS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'functions')
+
+def holding(symbol, asset_class, quantity, price, cost=None):
+    return {'id': symbol.lower(), 'symbol': symbol, 'assetClass': asset_class, 'quantity': quantity,
+            'currentPrice': price, 'totalCostBasis': quantity * price if cost is None else cost}
+
+def trades(result):
+    return {trade['symbol']: (trade['action'], trade['quantity']) for trade in result['trades']}
+
+@pytest.fixture
+def even_split():
+    return [holding('A', 'stocks', 10, 100), holding('B', 'etfs', 10, 100)]
+
+def test_only_groups_outside_the_drift_band_trade(even_split):
+    targets = {'etfs': 0.6, 'stocks': 0.4}
+    within = rebalance(even_split, targets, drift_band=0.15)
+    assert within['trades'] == [] and not any(group['outOfBand'] for group in within['groups'])
+
+    outside = rebalance(even_split, targets, drift_band=0.05)
+    assert trades(outside) == {'A': ('SELL', 2.0), 'B': ('BUY', 2.0)}
+    assert [group['weightAfter'] for group in outside['groups']] == [0.6, 0.4]
+
+def test_trades_round_down_to_whole_lots():
+    holdings = [holding('A', 'stocks', 11, 30), holding('B', 'etfs', 10, 30)]
+    targets = {'etfs': 0.6, 'stocks': 0.4}
+    # 78 of value each way is 2.6 units
+    assert trades(rebalance(holdings, targets)) == {'A': ('SELL', 2.0), 'B': ('BUY', 2.0)}
+    assert trades(rebalance(holdings, targets, lot_sizes={'B': 5})) == {'A': ('SELL', 2.0)}
+
+def test_trades_too_small_for_the_fee_are_skipped(even_split):
+    targets = {'etfs': 0.6, 'stocks': 0.4}
+    # A $10 fee at most 1% of the trade needs trades of at least $1000
+    result = rebalance(even_split, targets, trade_fee=10, max_fee_ratio=0.01)
+    assert result['trades'] == [] and result['totalFees'] == 0
+
+    result = rebalance(even_split, targets, trade_fee=1, max_fee_ratio=0.01)
+    assert set(trades(result)) == {'A', 'B'} and result['totalFees'] == 2
+
+def test_buys_are_funded_from_cash(even_split):
+    result = rebalance(even_split, {'etfs': 0.6, 'stocks': 0.4}, cash=500)
+    assert trades(result) == {'B': ('BUY', 5.0)}
+    assert result['cashAfter'] == 0
+
+def test_buys_are_scaled_to_the_funds_available():
+    holdings = [holding('A', 'stocks', 52, 10), holding('B', 'stocks', 38, 10)]
+    # Only B is out of band; its 120 buy has 100 of cash and no sells to draw on
+    result = rebalance(holdings, {'A': 0.5, 'B': 0.5}, by='symbol', cash=100)
+    assert trades(result) == {'B': ('BUY', 10.0)}
+    assert result['totalBuys'] == 100 and result['cashAfter'] == 0
+
+@pytest.mark.parametrize('tax_aware, sold, gain', [(True, 'Y', 0.0), (False, 'X', 166.67)])
+def test_tax_aware_sells_the_lowest_gain_holding_first(tax_aware, sold, gain):
+    holdings = [holding('X', 'stocks', 6, 100, cost=100), holding('Y', 'stocks', 4, 100),
+                holding('Z', 'etfs', 10, 100)]
+    result = rebalance(holdings, {'etfs': 0.6, 'stocks': 0.4}, tax_aware=tax_aware)
+    sells = {symbol: quantity for symbol, (action, quantity) in trades(result).items() if action == 'SELL'}
+    assert sells == {sold: 2.0}
+    assert result['estimatedRealizedGain'] == gain
+
+def test_tax_aware_must_be_a_boolean():
+    spec = importlib.util.spec_from_file_location('rebalance_portfolio',
+                                                  os.path.join(FUNCTIONS, 'analytics/rebalance_portfolio.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    event = {'pathParameters': {'portfolioId': 'p1'}, 'body': json.dumps({'taxAware': 'false'})}
+    response = module.handler(event, None)
+    assert response['statusCode'] == 400
+    assert 'taxAware' in json.loads(response['body'])['error']
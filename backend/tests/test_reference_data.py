@@ -0,0 +1,47 @@
+import io
+
+import pytest
+from botocore.exceptions import ClientError
+
+import reference_data
+from aws_clients import aws_clients
+
+class FakeS3:
+    def __init__(self, objects):
+        self.objects = objects
+
+    def get_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise ClientError({'Error': {'Code': 'NoSuchKey'}}, 'GetObject')
+        return {'Body': io.BytesIO(self.objects[(Bucket, Key)].encode())}
+
+    def get_paginator(self, operation):
+        objects = self.objects
+
+        class Paginator:
+            def paginate(self, Bucket, Prefix, Delimiter):
+                keys = [key for bucket, key in objects if bucket == Bucket and key.startswith(Prefix)
+                        and Delimiter not in key[len(Prefix):]]
+                yield {'Contents': [{'Key': key} for key in keys]}
+        return Paginator()
+
+@pytest.fixture
+def s3(monkeypatch):
+    fake = FakeS3({('data', 'index.csv'): '﻿area,date,index\n',
+                   ('data', 'etfs/VAS.csv'): 'symbol,weight\n', ('data', 'etfs/README.md'): '',
+                   ('data', 'etfs/old/IOZ.csv'): ''})
+    monkeypatch.setattr(aws_clients, 'client', lambda service, region=None: fake)
+    return fake
+
+def test_reads_s3_objects_without_the_byte_order_mark(s3):
+    assert reference_data.read_text('s3://data/index.csv') == 'area,date,index\n'
+
+def test_missing_s3_object_is_file_not_found(s3):
+    with pytest.raises(FileNotFoundError):
+        reference_data.read_text('s3://data/missing.csv')
+
+def test_lists_files_directly_under_a_prefix(s3, tmp_path):
+    assert reference_data.list_files('s3://data/etfs', '.csv') == ['s3://data/etfs/VAS.csv']
+    (tmp_path / 'VAS.csv').write_text('')
+    assert reference_data.list_files(str(tmp_path), '.csv') == [str(tmp_path / 'VAS.csv')]
+    assert reference_data.list_files(str(tmp_path / 'missing'), '.csv') == []
@@ -0,0 +1,48 @@
+import base64
+import gzip
+import json
+
+from response_utils import GZIP_MIN_BYTES, conditional_response, not_modified_response, success_response
+
+def get(**headers):
+    return {'requestContext': {'http': {'method': 'GET'}}, 'headers': headers}
+
+LARGE = {'items': ['x' * 40] * (GZIP_MIN_BYTES // 20)}
+
+def test_matching_etag_gets_304_without_a_body():
+    response = success_response({'count': 1})
+    etag = response['headers']['ETag']
+    revalidated = conditional_response(get(**{'If-None-Match': etag}), response)
+    assert revalidated['statusCode'] == 304 and revalidated['body'] == ''
+    assert 'Content-Type' not in revalidated['headers']
+    assert conditional_response(get(**{'If-None-Match': '"other"'}), response)['statusCode'] == 200
+
+def test_large_body_is_gzipped_for_clients_that_accept_it():
+    response = success_response(LARGE)
+    compressed = conditional_response(get(**{'Accept-Encoding': 'br, gzip'}), response)
+    assert compressed['isBase64Encoded'] and compressed['headers']['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(base64.b64decode(compressed['body']))) == LARGE
+    assert compressed['headers']['ETag'] == response['headers']['ETag'][:-1] + '-gzip"'
+    assert compressed['headers']['Vary'] == 'Accept-Encoding'
+
+    identity = conditional_response(get(**{'Accept-Encoding': 'gzip;q=0'}), response)
+    assert 'Content-Encoding' not in identity['headers'] and identity['body'] == response['body']
+    small = conditional_response(get(**{'Accept-Encoding': 'gzip'}), success_response({'count': 1}))
+    assert 'Content-Encoding' not in small['headers']
+
+def test_gzip_etag_revalidates_either_encoding():
+    response = success_response(LARGE)
+    gzip_etag = conditional_response(get(**{'Accept-Encoding': 'gzip'}), response)['headers']['ETag']
+    assert conditional_response(get(**{'If-None-Match': gzip_etag, 'Accept-Encoding': 'gzip'}), response)['statusCode'] == 304
+    assert conditional_response(get(**{'If-None-Match': gzip_etag}), response)['statusCode'] == 304
+
+    # A handler's own 304 echoes the ETag the client holds
+    identity_etag = response['headers']['ETag']
+    echoed = conditional_response(get(**{'If-None-Match': gzip_etag}), not_modified_response(identity_etag))
+    assert echoed['headers']['ETag'] == gzip_etag
+
+def test_other_methods_are_left_alone():
+    response = success_response(LARGE)
+    event = {'requestContext': {'http': {'method': 'PUT'}},
+             'headers': {'if-none-match': response['headers']['ETag'], 'accept-encoding': 'gzip'}}
+    assert conditional_response(event, response) is response
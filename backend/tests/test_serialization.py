@@ -0,0 +1,24 @@
+import json
+from decimal import Decimal
+
+from serialization import JSONSerializer
+
+def test_number_mode_writes_decimals_as_numbers():
+    encoded = JSONSerializer('number').dumps({'price': Decimal('123.45'), 'quantity': Decimal('10'),
+                                              'yield': Decimal('0.0001')})
+    assert encoded == '{"price":123.45,"quantity":10,"yield":0.0001}'
+
+def test_number_mode_leaves_strings_with_control_characters_intact():
+    body = {'note': '\x00\x01 looks like a marker \x01\x00', 'value': Decimal('1.5')}
+    serializer = JSONSerializer('number')
+    assert json.loads(serializer.dumps(body)) == {'note': body['note'], 'value': 1.5}
+    assert ''.join(serializer.iter_encode({'items': [body] * 5}, 2)) == serializer.dumps({'items': [body] * 5})
+
+def test_number_mode_keeps_decimals_beyond_float_precision_exact():
+    body = {'balance': Decimal('1234567890123.4567'), 'units': Decimal('0.12345678901234567'),
+            'total': Decimal('12345678901234567890'), 'price': Decimal('98.7650'), 'rate': Decimal('NaN')}
+    encoded = JSONSerializer('number').dumps(body)
+    assert encoded == ('{"balance":"1234567890123.4567","units":"0.12345678901234567",'
+                       '"total":12345678901234567890,"price":98.765,"rate":"NaN"}')
+    decoded = json.loads(encoded)
+    assert all(Decimal(str(decoded[key])) == body[key] for key in ('balance', 'units', 'total', 'price'))
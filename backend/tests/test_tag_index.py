@@ -0,0 +1,45 @@
+import importlib.util
+import json
+import os
+
+import pytest
+
+from dynamodb_client import db_client
+from tag_index import parse_tags, tag_index
+
+FUNCTIONS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'functions')
+
+@pytest.fixture
+def tags(dynamodb):
+    tag_index.create_tag({'id': 'tag_1', 'name': 'Growth', 'category': 'strategy'})
+    return tag_index
+
+def meta(tag_id):
+    return db_client.get_item(tag_index.table_name, {'tagId': tag_id, 'entry': 'META'})
+
+def test_parse_tags_rejects_ids_missing_from_the_catalogue(tags):
+    assert parse_tags(['tag_1', 'tag_1']) == ['tag_1']
+    with pytest.raises(ValueError, match='Unknown tags: tag_9'):
+        parse_tags(['tag_1', 'tag_9'])
+    assert meta('tag_9') is None
+
+def test_create_stock_with_unknown_tag_is_a_bad_request(tags):
+    spec = importlib.util.spec_from_file_location('create_stock', os.path.join(FUNCTIONS, 'stocks/create_stock.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    body = {'symbol': 'BHP', 'quantity': 10, 'purchasePrice': 40, 'purchaseDate': '2024-01-10', 'tags': ['nope']}
+    response = module.handler({'pathParameters': {'portfolioId': 'p1'}, 'body': json.dumps(body)}, None)
+    assert response['statusCode'] == 400
+    assert 'Unknown tags: nope' in json.loads(response['body'])['error']
+
+def test_sync_skips_undefined_tags(tags):
+    stock = {'id': 's1', 'portfolioId': 'p1', 'symbol': 'BHP', 'totalValue': 100, 'tags': ['tag_1', 'legacy']}
+    tag_index.sync_assets('stocks', [(None, stock)])
+    assert meta('tag_1')['stocksCount'] == 1
+    assert meta('legacy') is None
+
+def test_rebuild_drops_counters_of_undefined_tags(tags):
+    db_client.put_item(tag_index.table_name, {'tagId': 'legacy', 'entry': 'META', 'stocksCount': 1})
+    tag_index.rebuild()
+    assert meta('legacy') is None
+    assert meta('tag_1')['kind'] == 'tag'
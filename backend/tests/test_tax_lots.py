@@ -0,0 +1,129 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from corporate_actions import corporate_actions
+from dynamodb_client import db_client
+from tax_lots import TaxLotLedger, is_discount_eligible, summarize_by_financial_year, tax_lot_store
+
+def test_discount_needs_more_than_twelve_months():
+    assert not is_discount_eligible(date(2023, 3, 15), date(2024, 3, 15))
+    assert is_discount_eligible(date(2023, 3, 15), date(2024, 3, 16))
+    # Acquired on 29 February: the anniversary is 1 March
+    assert not is_discount_eligible(date(2024, 2, 29), date(2025, 3, 1))
+    assert is_discount_eligible(date(2024, 2, 29), date(2025, 3, 2))
+
+def test_discount_applies_to_long_held_gains_only():
+    ledger = TaxLotLedger('FIFO')
+    ledger.apply_all([
+        {'transactionId': 'b1', 'type': 'BUY', 'symbol': 'VAS', 'quantity': 10, 'price': 100, 'date': '2022-01-10'},
+        {'transactionId': 'b2', 'type': 'BUY', 'symbol': 'VAS', 'quantity': 10, 'price': 100, 'date': '2023-01-10'},
+        {'transactionId': 's1', 'type': 'SELL', 'symbol': 'VAS', 'quantity': 20, 'price': 110, 'date': '2023-03-01'},
+    ])
+    long_held, short_held = ledger.disposals
+    assert long_held['discountEligible'] and not short_held['discountEligible']
+
+    year, = summarize_by_financial_year(ledger.disposals)
+    assert year['discountableGains'] == Decimal('100')
+    assert year['otherGains'] == Decimal('100')
+    assert year['netCapitalGain'] == Decimal('150')
+
+def test_same_day_buy_then_sell_replays_in_entry_order(dynamodb):
+    for attempt in range(20):
+        portfolio_id = f"p{attempt}"
+        tax_lot_store.add_transactions(portfolio_id, [
+            {'type': 'BUY', 'symbol': 'VAS', 'quantity': 10, 'price': 100, 'date': '2024-05-01'},
+            {'type': 'SELL', 'symbol': 'VAS', 'quantity': 10, 'price': 105, 'date': '2024-05-01'},
+        ])
+        assert tax_lot_store.process(portfolio_id)['disposalsRealized'] == 1
+        assert [t['type'] for t in tax_lot_store.get_transactions(portfolio_id)] == ['BUY', 'SELL']
+
+def test_later_same_day_transaction_is_incremental(dynamodb):
+    tax_lot_store.add_transactions('p1', [
+        {'type': 'BUY', 'symbol': 'VAS', 'quantity': 10, 'price': 100, 'date': '2024-05-01'}])
+    tax_lot_store.process('p1')
+    for _ in range(10):
+        tax_lot_store.add_transactions('p1', [
+            {'type': 'SELL', 'symbol': 'VAS', 'quantity': 1, 'price': 101, 'date': '2024-05-01'}])
+        assert not tax_lot_store.get_state('p1')['needsReplay']
+        assert not tax_lot_store.process('p1')['replayed']
+    assert tax_lot_store.get_open_lots('p1') == []
+
+def test_back_dated_transaction_triggers_replay(dynamodb):
+    tax_lot_store.add_transactions('p1', [
+        {'type': 'BUY', 'symbol': 'VAS', 'quantity': 10, 'price': 100, 'date': '2024-05-01'}])
+    tax_lot_store.process('p1')
+    tax_lot_store.add_transactions('p1', [
+        {'type': 'BUY', 'symbol': 'VAS', 'quantity': 5, 'price': 90, 'date': '2024-04-01'}])
+    assert tax_lot_store.get_state('p1')['needsReplay']
+    assert tax_lot_store.process('p1')['replayed']
+    # The counter survives processing
+    assert tax_lot_store.get_state('p1')['transactionSequence'] == 2
+
+def test_selling_more_than_held_is_rejected():
+    ledger = TaxLotLedger('FIFO')
+    ledger.apply({'transactionId': 'b1', 'type': 'BUY', 'symbol': 'VAS', 'quantity': 1, 'price': 100, 'date': '2024-01-01'})
+    with pytest.raises(ValueError, match='Cannot sell'):
+        ledger.apply({'transactionId': 's1', 'type': 'SELL', 'symbol': 'VAS', 'quantity': 2, 'price': 100,
+                      'date': '2024-01-02'})
+
+def test_split_scales_open_lots_before_later_sales():
+    split = {'symbol': 'VAS', 'exDate': '2024-03-01', 'type': 'split', 'factor': Decimal('2'),
+             'actionKey': '2024-03-01#split'}
+    ledger = TaxLotLedger('FIFO', [split])
+    ledger.apply_all([
+        {'transactionId': 'b1', 'type': 'BUY', 'symbol': 'VAS', 'quantity': 10, 'price': 100, 'date': '2024-01-10'},
+        {'transactionId': 's1', 'type': 'SELL', 'symbol': 'VAS', 'quantity': 20, 'price': 60, 'date': '2024-04-01'},
+    ])
+    disposal, = ledger.disposals
+    assert disposal['quantity'] == Decimal('20')
+    assert disposal['costBase'] == Decimal('1000')
+    assert disposal['gain'] == Decimal('200')
+    assert ledger.applied_actions == ['VAS#2024-03-01#split']
+
+def test_symbol_change_moves_lots_to_the_new_symbol():
+    change = {'symbol': 'OLD', 'exDate': '2024-03-01', 'type': 'symbol_change', 'newSymbol': 'NEW',
+              'actionKey': '2024-03-01#symbol_change'}
+    ledger = TaxLotLedger('FIFO', [change])
+    ledger.apply_all([
+        {'transactionId': 'b1', 'type': 'BUY', 'symbol': 'OLD', 'quantity': 10, 'price': 5, 'date': '2024-01-10'},
+        {'transactionId': 'b2', 'type': 'BUY', 'symbol': 'NEW', 'quantity': 5, 'price': 6, 'date': '2024-04-01'},
+        {'transactionId': 's1', 'type': 'SELL', 'symbol': 'NEW', 'quantity': 12, 'price': 7, 'date': '2024-05-01'},
+    ])
+    assert [(d['lotId'], d['quantity']) for d in ledger.disposals] == [('b1', Decimal('10')), ('b2', Decimal('2'))]
+
+def test_recorded_split_makes_stored_lots_stale(dynamodb):
+    tax_lot_store.add_transactions('p1', [
+        {'type': 'BUY', 'symbol': 'VAS', 'quantity': 10, 'price': 100, 'date': '2024-01-10'}])
+    tax_lot_store.process('p1')
+
+    db_client.put_item(corporate_actions.table_name, {
+        'symbol': 'VAS', 'exDate': '2024-03-01', 'type': 'split', 'factor': Decimal('2'),
+        'actionKey': '2024-03-01#split'})
+    corporate_actions.invalidate()
+
+    tax_lot_store.add_transactions('p1', [
+        {'type': 'SELL', 'symbol': 'VAS', 'quantity': 20, 'price': 60, 'date': '2024-04-01'}])
+    result = tax_lot_store.process('p1')
+    assert result['replayed'] and result['disposalsRealized'] == 1
+    assert tax_lot_store.get_state('p1')['appliedActions'] == ['VAS#2024-03-01#split']
+    assert tax_lot_store.get_open_lots('p1') == []
+
+@pytest.mark.parametrize('method', ['FIFO', 'LIFO'])
+def test_incremental_sale_matches_same_day_lots_like_a_replay(dynamodb, method):
+    tax_lot_store.add_transactions('p1', [
+        {'transactionId': 'zzz', 'type': 'BUY', 'symbol': 'IOZ', 'quantity': 1, 'price': 10, 'date': '2024-01-01'},
+        {'transactionId': 'aaa', 'type': 'BUY', 'symbol': 'IOZ', 'quantity': 1, 'price': 20, 'date': '2024-01-01'},
+        {'transactionId': 'mmm', 'type': 'BUY', 'symbol': 'IOZ', 'quantity': 1, 'price': 30, 'date': '2024-01-01'},
+    ])
+    tax_lot_store.process('p1', method)
+    tax_lot_store.add_transactions('p1', [
+        {'transactionId': 's1', 'type': 'SELL', 'symbol': 'IOZ', 'quantity': 2, 'price': 25, 'date': '2024-02-01'}])
+    assert not tax_lot_store.process('p1')['replayed']
+
+    replayed = tax_lot_store.replay('p1', method)
+    realized = lambda disposals: sorted((d['lotId'], d['gain']) for d in disposals)
+    assert realized(tax_lot_store.get_disposals('p1')) == realized(replayed.disposals)
+    assert [lot['lotId'] for lot in tax_lot_store.get_open_lots('p1')] == \
+        [lot['lotId'] for lot in replayed.open_lots()]
@@ -0,0 +1,111 @@
+"""
+Conformance checks for the shared valuation kernel.
+
+Every holding and property write path and bulk job stores what the kernel returns, so
+these cases pin down the answers they must agree on.
+"""
+
+from datetime import date
+from decimal import Decimal
+
+from valuation import value_holdings, value_holding, value_properties, value_property, parse_purchase_date
+
+AS_OF = date(2025, 7, 1)
+
+def test_cost_basis_includes_fees():
+    result = value_holding({'symbol': 'CBA', 'quantity': 100, 'purchasePrice': '95.50',
+                            'purchaseFees': '9.95', 'currentPrice': '110.25'}, as_of=AS_OF)
+    assert result['totalCostBasis'] == Decimal('9559.9500')
+    assert result['totalValue'] == Decimal('11025.0000')
+    assert result['totalReturn'] == Decimal('1465.0500')
+    assert result['returnPercentage'] == Decimal('15.3249')
+
+def test_legacy_average_price_without_fees():
+    result = value_holding({'symbol': 'BHP', 'quantity': Decimal('10'), 'averagePrice': Decimal('40'),
+                            'currentPrice': Decimal('44')}, as_of=AS_OF)
+    assert result['totalCostBasis'] == Decimal('400.0000')
+    assert result['returnPercentage'] == Decimal('10.0000')
+
+def test_purchase_price_wins_over_average_price():
+    result = value_holding({'symbol': 'BHP', 'quantity': 10, 'purchasePrice': 42, 'averagePrice': 40,
+                            'currentPrice': 42}, as_of=AS_OF)
+    assert result['totalCostBasis'] == Decimal('420.0000')
+    assert result['totalReturn'] == Decimal('0.0000')
+
+def test_current_price_defaults_to_purchase_price():
+    result = value_holding({'symbol': 'WES', 'quantity': 5, 'purchasePrice': 60}, as_of=AS_OF)
+    assert result['currentPrice'] == Decimal('60')
+    assert result['totalValue'] == Decimal('300.0000')
+
+def test_price_override_by_symbol():
+    holdings = [
+        {'symbol': 'vas', 'quantity': 10, 'purchasePrice': 90, 'currentPrice': 95},
+        {'symbol': 'VGS', 'quantity': 10, 'purchasePrice': 100, 'currentPrice': 105},
+    ]
+    results = value_holdings(holdings, prices={'VAS': Decimal('99.5')}, as_of=AS_OF)
+    assert results[0]['currentPrice'] == Decimal('99.5')
+    assert results[0]['totalValue'] == Decimal('995.0000')
+    assert results[1]['currentPrice'] == Decimal('105')
+
+def test_zero_cost_basis_has_zero_return_percentage():
+    result = value_holding({'symbol': 'GIFT', 'quantity': 10, 'purchasePrice': 0, 'currentPrice': 5}, as_of=AS_OF)
+    assert result['totalReturn'] == Decimal('50.0000')
+    assert result['returnPercentage'] == Decimal('0')
+
+def test_float_inputs_keep_printed_value():
+    result = value_holding({'symbol': 'X', 'quantity': 3, 'purchasePrice': 0.1, 'currentPrice': 0.3}, as_of=AS_OF)
+    assert result['totalCostBasis'] == Decimal('0.3000')
+    assert result['totalValue'] == Decimal('0.9000')
+
+def test_money_rounds_half_up_to_four_places():
+    result = value_holding({'symbol': 'X', 'quantity': '0.5', 'purchasePrice': '0.00015',
+                            'currentPrice': '0.00015'}, as_of=AS_OF)
+    assert result['totalValue'] == Decimal('0.0001')
+
+def test_days_held():
+    assert value_holding({'symbol': 'X', 'purchaseDate': '2025-06-01'}, as_of=AS_OF)['daysHeld'] == 30
+    assert value_holding({'symbol': 'X', 'purchaseDate': '2025-06-01T10:00:00Z'}, as_of=AS_OF)['daysHeld'] == 30
+
+def test_missing_or_invalid_date_keeps_stored_days_held():
+    assert value_holding({'symbol': 'X', 'daysHeld': 12}, as_of=AS_OF)['daysHeld'] == 12
+    assert value_holding({'symbol': 'X', 'purchaseDate': 'last week', 'daysHeld': 7}, as_of=AS_OF)['daysHeld'] == 7
+    assert value_holding({'symbol': 'X'}, as_of=AS_OF)['daysHeld'] is None
+    assert parse_purchase_date('2025-13-01') is None
+
+def test_expense_cost_only_with_expense_ratio():
+    etf = {'symbol': 'VAS', 'quantity': 100, 'purchasePrice': 90, 'currentPrice': 100, 'expenseRatio': '0.07'}
+    assert value_holding(etf, as_of=AS_OF)['annualExpenseCost'] == Decimal('7.0000')
+    assert 'annualExpenseCost' not in value_holding({**etf, 'expenseRatio': None}, as_of=AS_OF)
+    assert 'annualExpenseCost' not in value_holding({**etf, 'expenseRatio': 0}, as_of=AS_OF)
+
+def test_batch_matches_single():
+    holdings = [{'symbol': f"S{i}", 'quantity': i + 1, 'purchasePrice': 10 + i / 4, 'purchaseFees': 9.5,
+                 'currentPrice': 12 + i / 3, 'purchaseDate': '2024-01-15'} for i in range(50)]
+    batch = value_holdings(holdings, as_of=AS_OF)
+    assert batch == [value_holding(holding, as_of=AS_OF) for holding in holdings]
+
+def test_property_metrics():
+    result = value_property({'purchasePrice': 700000, 'stampDuty': 28000, 'legalFees': 2000,
+                             'currentValue': 800000, 'weeklyRent': 650, 'councilRates': 2200,
+                             'insurance': 1800, 'purchaseDate': '2024-07-01'}, as_of=AS_OF)
+    assert result['totalPurchaseCosts'] == Decimal('730000.0000')
+    assert result['annualRentalIncome'] == Decimal('33800.0000')
+    assert result['totalAnnualExpenses'] == Decimal('4000.0000')
+    assert result['capitalGrowth'] == Decimal('70000.0000')
+    assert result['capitalGrowthPercentage'] == Decimal('9.5890')
+    assert result['grossRentalYield'] == Decimal('4.2250')
+    assert result['netRentalYield'] == Decimal('3.7250')
+    assert result['annualCashFlow'] == Decimal('29800.0000')
+    assert result['returnPercentage'] == Decimal('13.6712')
+    assert result['daysHeld'] == 365
+
+def test_property_revalued_value_overrides_stored_value():
+    item = {'purchasePrice': 500000, 'currentValue': 600000}
+    result = value_properties([item], current_values=[Decimal('650000')], as_of=AS_OF)[0]
+    assert result['currentValue'] == Decimal('650000')
+    assert result['capitalGrowth'] == Decimal('150000.0000')
+
+def test_property_without_value_has_zero_yields():
+    result = value_property({'purchasePrice': 0, 'currentValue': 0, 'weeklyRent': 500}, as_of=AS_OF)
+    assert result['grossRentalYield'] == Decimal('0')
+    assert result['returnPercentage'] == Decimal('0')
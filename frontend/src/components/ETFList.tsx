@@ -12,11 +12,11 @@ const ETFList: React.FC<ETFListProps> = ({ etfs, onRefresh, onDelete }) => {
   const [refreshingPrices, setRefreshingPrices] = useState<Set<string>>(new Set());
   const [deletingETFs, setDeletingETFs] = useState<Set<string>>(new Set());
 
-  const handleRefreshPrice = async (etfId: string, forceRefresh: boolean = false) => {
+  const handleRefreshPrice = async (etfId: string, forceRefresh: boolean = false, portfolioId?: string) => {
     setRefreshingPrices(prev => new Set(prev).add(etfId));
     
     try {
-      await etfService.refreshETFPrice(etfId, forceRefresh);
+      await etfService.refreshETFPrice(etfId, forceRefresh, portfolioId);
       onRefresh(); // Refresh the entire list
     } catch (error) {
       console.error('Failed to refresh ETF price:', error);
@@ -30,7 +30,7 @@ const ETFList: React.FC<ETFListProps> = ({ etfs, onRefresh, onDelete }) => {
     }
   };
 
-  const handleDelete = async (etfId: string, symbol: string) => {
+  const handleDelete = async (etfId: string, symbol: string, portfolioId?: string) => {
     if (!window.confirm(`Are you sure you want to delete ${symbol}?`)) {
       return;
     }
@@ -38,7 +38,7 @@ const ETFList: React.FC<ETFListProps> = ({ etfs, onRefresh, onDelete }) => {
     setDeletingETFs(prev => new Set(prev).add(etfId));
     
     try {
-      await etfService.deleteETF(etfId);
+      await etfService.deleteETF(etfId, portfolioId);
       onDelete(etfId);
     } catch (error) {
       console.error('Failed to delete ETF:', error);
@@ -193,7 +193,7 @@ const ETFList: React.FC<ETFListProps> = ({ etfs, onRefresh, onDelete }) => {
                 <td className="px-6 py-4 whitespace-nowrap text-right text-sm font-medium">
                   <div className="flex space-x-2">
                     <button
-                      onClick={() => handleRefreshPrice(etf.id, true)}
+                      onClick={() => handleRefreshPrice(etf.id, true, etf.portfolioId)}
                       disabled={refreshingPrices.has(etf.id)}
                       className="text-blue-600 hover:text-blue-900 disabled:text-gray-400"
                       title="Refresh price"
@@ -202,7 +202,7 @@ const ETFList: React.FC<ETFListProps> = ({ etfs, onRefresh, onDelete }) => {
                     </button>
                     
                     <button
-                      onClick={() => handleDelete(etf.id, etf.symbol)}
+                      onClick={() => handleDelete(etf.id, etf.symbol, etf.portfolioId)}
                       disabled={deletingETFs.has(etf.id)}
                       className="text-red-600 hover:text-red-900 disabled:text-gray-400"
                       title="Delete ETF"
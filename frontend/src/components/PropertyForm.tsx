@@ -21,6 +21,7 @@ const PropertyForm: React.FC<PropertyFormProps> = ({ onSubmit, onCancel, isSubmi
     floorArea: 0,
     yearBuilt: new Date().getFullYear(),
     councilArea: '',
+    suburb: '',
     stampDuty: 0,
     legalFees: 0,
     otherPurchaseCosts: 0,
@@ -147,6 +148,20 @@ const PropertyForm: React.FC<PropertyFormProps> = ({ onSubmit, onCancel, isSubmi
                       placeholder="e.g., City of Sydney"
                     />
                   </div>
+
+                  <div>
+                    <label className="block text-sm font-medium text-gray-700 mb-1">
+                      Suburb
+                    </label>
+                    <input
+                      type="text"
+                      name="suburb"
+                      value={formData.suburb}
+                      onChange={handleInputChange}
+                      className="w-full px-3 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-blue-500 focus:border-transparent"
+                      placeholder="e.g., Surry Hills (taken from the address if left blank)"
+                    />
+                  </div>
                 </div>
 
                 <div className="grid grid-cols-1 md:grid-cols-3 gap-4">
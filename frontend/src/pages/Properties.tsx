@@ -51,13 +51,13 @@ const Properties: React.FC = () => {
     }
   };
 
-  const handleDeleteProperty = async (propertyId: string, address: string) => {
+  const handleDeleteProperty = async (propertyId: string, address: string, portfolioId?: string) => {
     if (!window.confirm(`Are you sure you want to delete ${address}?`)) {
       return;
     }
 
     try {
-      await propertyService.deleteProperty(propertyId);
+      await propertyService.deleteProperty(propertyId, portfolioId);
       setProperties(prev => prev.filter(property => property.id !== propertyId));
     } catch (error) {
       console.error('Failed to delete property:', error);
@@ -400,7 +400,7 @@ const Properties: React.FC = () => {
                       
                       <td className="px-6 py-4 whitespace-nowrap text-right text-sm font-medium">
                         <button
-                          onClick={() => handleDeleteProperty(property.id, property.address)}
+                          onClick={() => handleDeleteProperty(property.id, property.address, property.portfolioId)}
                           className="text-red-600 hover:text-red-900"
                           title="Delete property"
                         >
@@ -97,7 +97,7 @@ export default function StocksPage() {
     
     try {
       setIsUpdating(true)
-      const updatedStock = await stocksService.updateStock(editingStock.id, updateData)
+      const updatedStock = await stocksService.updateStock(editingStock.id, updateData, editingStock.portfolioId)
       
       // Update the stock in the list
       setStocks(prevStocks => 
@@ -128,7 +128,7 @@ export default function StocksPage() {
 
     try {
       setDeleteConfirm(prev => ({ ...prev, isDeleting: true }))
-      await stocksService.deleteStock(deleteConfirm.stock.id)
+      await stocksService.deleteStock(deleteConfirm.stock.id, deleteConfirm.stock.portfolioId)
       setStocks(prevStocks => prevStocks.filter(s => s.id !== deleteConfirm.stock!.id))
       setDeleteConfirm({ isOpen: false, stock: null, isDeleting: false })
     } catch (err) {
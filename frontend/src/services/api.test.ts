@@ -59,6 +59,24 @@ describe('API Service', () => {
     expect(result).toEqual(mockResponse)
   })
 
+  test('getAll follows nextCursor across pages', async () => {
+    mockFetch
+      .mockResolvedValueOnce({
+        ok: true,
+        json: async () => ({ stocks: [{ id: 'a' }, { id: 'b' }], nextCursor: 'abc.def' }),
+      })
+      .mockResolvedValueOnce({
+        ok: true,
+        json: async () => ({ stocks: [{ id: 'c' }], nextCursor: null }),
+      })
+
+    const result = await api.getAll('/portfolios/p1/stocks', 'stocks')
+
+    expect(mockFetch).toHaveBeenCalledTimes(2)
+    expect(mockFetch.mock.calls[1][0]).toBe('http://localhost:3000/api/portfolios/p1/stocks?cursor=abc.def')
+    expect(result).toEqual([{ id: 'a' }, { id: 'b' }, { id: 'c' }])
+  })
+
   test('handles API errors correctly', async () => {
     const errorResponse = { message: 'Not found' }
     mockFetch.mockResolvedValueOnce({
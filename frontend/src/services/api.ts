@@ -128,8 +128,29 @@ async function apiRequest(endpoint: string, options: RequestInit = {}) {
   }
 }
 
+// Every item of a paginated list endpoint: follows nextCursor until the last page
+async function getAllPages(endpoint: string, key: string) {
+  const items: any[] = [];
+  let cursor: string | null = null;
+  do {
+    const separator = endpoint.includes('?') ? '&' : '?';
+    const page = await apiRequest(cursor ? `${endpoint}${separator}cursor=${encodeURIComponent(cursor)}` : endpoint,
+                                  { method: 'GET' });
+    items.push(...(page?.[key] || []));
+    cursor = page?.nextCursor || null;
+  } while (cursor);
+  return items;
+}
+
+// A holding's /stocks/{id}-style route. With the holding's portfolio id the backend
+// addresses the item directly instead of looking it up by id
+export function holdingPath(collection: string, id: string, portfolioId?: string) {
+  return portfolioId ? `/${collection}/${id}?portfolioId=${encodeURIComponent(portfolioId)}` : `/${collection}/${id}`;
+}
+
 export default {
   get: (endpoint: string) => apiRequest(endpoint, { method: 'GET' }),
+  getAll: getAllPages,
   post: (endpoint: string, data: any) => 
     apiRequest(endpoint, {
       method: 'POST',
@@ -1,10 +1,9 @@
 import { ETF, CreateETFRequest } from '../types';
-import api from './api';
+import api, { holdingPath } from './api';
 
 export const etfService = {
   async getETFs(portfolioId: string): Promise<ETF[]> {
-    const response = await api.get(`/portfolios/${portfolioId}/etfs`);
-    return response?.etfs || [];
+    return api.getAll(`/portfolios/${portfolioId}/etfs`, 'etfs');
   },
 
   async createETF(portfolioId: string, etf: CreateETFRequest): Promise<ETF> {
@@ -12,17 +11,17 @@ export const etfService = {
     return response.etf || response;
   },
 
-  async updateETF(etfId: string, updates: Partial<CreateETFRequest>): Promise<ETF> {
-    const response = await api.put(`/etfs/${etfId}`, updates);
+  async updateETF(etfId: string, updates: Partial<CreateETFRequest>, portfolioId?: string): Promise<ETF> {
+    const response = await api.put(holdingPath('etfs', etfId, portfolioId), updates);
     return response.etf || response;
   },
 
-  async deleteETF(etfId: string): Promise<void> {
-    return api.delete(`/etfs/${etfId}`);
+  async deleteETF(etfId: string, portfolioId?: string): Promise<void> {
+    return api.delete(holdingPath('etfs', etfId, portfolioId));
   },
 
-  async refreshETFPrice(etfId: string, forceRefresh: boolean = false): Promise<ETF> {
-    const response = await api.put(`/etfs/${etfId}`, {
+  async refreshETFPrice(etfId: string, forceRefresh: boolean = false, portfolioId?: string): Promise<ETF> {
+    const response = await api.put(holdingPath('etfs', etfId, portfolioId), {
       forceRefresh,
       refreshPrice: true,
     });
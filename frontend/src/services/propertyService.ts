@@ -1,10 +1,9 @@
 import { Property, CreatePropertyRequest } from '../types';
-import api from './api';
+import api, { holdingPath } from './api';
 
 export const propertyService = {
   async getProperties(portfolioId: string): Promise<Property[]> {
-    const response = await api.get(`/portfolios/${portfolioId}/properties`);
-    return response?.properties || [];
+    return api.getAll(`/portfolios/${portfolioId}/properties`, 'properties');
   },
 
   async createProperty(portfolioId: string, property: CreatePropertyRequest): Promise<Property> {
@@ -12,12 +11,12 @@ export const propertyService = {
     return response.property || response;
   },
 
-  async updateProperty(propertyId: string, updates: Partial<CreatePropertyRequest>): Promise<Property> {
-    const response = await api.put(`/properties/${propertyId}`, updates);
+  async updateProperty(propertyId: string, updates: Partial<CreatePropertyRequest>, portfolioId?: string): Promise<Property> {
+    const response = await api.put(holdingPath('properties', propertyId, portfolioId), updates);
     return response.property || response;
   },
 
-  async deleteProperty(propertyId: string): Promise<void> {
-    return api.delete(`/properties/${propertyId}`);
+  async deleteProperty(propertyId: string, portfolioId?: string): Promise<void> {
+    return api.delete(holdingPath('properties', propertyId, portfolioId));
   },
 };
\ No newline at end of file
@@ -1,4 +1,4 @@
-import api from './api';
+import api, { holdingPath } from './api';
 import { Stock, CreateStockRequest } from '../types';
 
 // Portfolio service functions
@@ -10,7 +10,7 @@ export const portfolioService = {
 
   // Get all portfolios
   async getPortfolios() {
-    return api.get('/portfolios');
+    return api.getAll('/portfolios', 'portfolios');
   }
 };
 
@@ -18,9 +18,8 @@ export const portfolioService = {
 export const stocksService = {
   // Get stocks for a portfolio
   async getStocks(portfolioId: string): Promise<Stock[]> {
-    const response = await api.get(`/portfolios/${portfolioId}/stocks`);
-    // API returns { stocks: [...], portfolioId: "...", count: 0 }
-    return response?.stocks || [];
+    // API returns pages of { stocks: [...], portfolioId: "...", count: 0, nextCursor: ... }
+    return api.getAll(`/portfolios/${portfolioId}/stocks`, 'stocks');
   },
 
   // Add a new stock to a portfolio
@@ -30,14 +29,14 @@ export const stocksService = {
   },
 
   // Update a stock
-  async updateStock(stockId: string, stockData: Partial<CreateStockRequest>): Promise<Stock> {
-    const response = await api.put(`/stocks/${stockId}`, stockData);
+  async updateStock(stockId: string, stockData: Partial<CreateStockRequest>, portfolioId?: string): Promise<Stock> {
+    const response = await api.put(holdingPath('stocks', stockId, portfolioId), stockData);
     return response.stock || response; // Handle response format
   },
 
   // Delete a stock
-  async deleteStock(stockId: string): Promise<void> {
-    return api.delete(`/stocks/${stockId}`);
+  async deleteStock(stockId: string, portfolioId?: string): Promise<void> {
+    return api.delete(holdingPath('stocks', stockId, portfolioId));
   }
 };
 
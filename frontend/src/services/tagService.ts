@@ -1,4 +1,5 @@
 import { AssetTag, TaggedAssetSummary, DEFAULT_TAGS, TAG_CATEGORIES, Stock, ETF, Property } from '../types'
+import api from './api'
 
 class TagService {
   private tags: AssetTag[] = []
@@ -17,6 +18,18 @@ class TagService {
     }))
 
     this.initialized = true
+    await this.registerTags(this.tags)
+  }
+
+  // Holdings only accept tag ids the backend catalogue defines, so add any it lacks
+  private async registerTags(tags: AssetTag[]): Promise<void> {
+    try {
+      const response = await api.get('/tags?includeArchived=true')
+      const known = new Set((response.tags || []).map((tag: AssetTag) => tag.id))
+      await Promise.all(tags.filter(tag => !known.has(tag.id)).map(tag => api.post('/tags', tag)))
+    } catch (error) {
+      console.error('Error registering tags:', error)
+    }
   }
 
   // ============ TAG MANAGEMENT ============
@@ -64,6 +77,7 @@ class TagService {
       createdBy: 'current_user_id'
     }
 
+    await api.post('/tags', newTag)
     this.tags.push(newTag)
     return newTag
   }
@@ -1,5 +1,6 @@
 export interface Stock {
   id: string;
+  portfolioId?: string;
   symbol: string;
   name: string;
   quantity: number;
@@ -23,6 +24,7 @@ export interface Stock {
 
 export interface ETF {
   id: string;
+  portfolioId?: string;
   symbol: string;
   name: string;
   quantity: number;
@@ -51,6 +53,7 @@ export interface ETF {
 
 export interface Property {
   id: string;
+  portfolioId?: string;
   address: string;
   propertyType: 'house' | 'unit' | 'townhouse' | 'duplex' | 'commercial' | 'land' | 'rural';
   purchasePrice: number;
@@ -65,6 +68,7 @@ export interface Property {
   floorArea?: number;          // Built-up area in square meters
   yearBuilt?: number;
   councilArea?: string;
+  suburb?: string;              // Selects the property's price index
   
   // Purchase Costs (Australian specific)
   stampDuty?: number;
@@ -183,6 +187,7 @@ export interface CreatePropertyRequest {
   floorArea?: number;
   yearBuilt?: number;
   councilArea?: string;
+  suburb?: string;              // Selects the property's price index
   
   // Purchase Costs
   stampDuty?: number;
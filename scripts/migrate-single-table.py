@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+PortfolioSync single-table migration
+
+Copies portfolios, stocks, ETFs and properties from the per-entity tables into the
+single-table layout (PORTFOLIO_DATA_TABLE, pk = PORTFOLIO#id, sk = META | STOCK#id |
+ETF#id | PROP#id). Each source table is read with a segmented parallel scan and
+written with batch writes. Copies overwrite, so the script can be re-run; switch the
+stage to DATA_LAYOUT=single once the counts match.
+
+Usage: python scripts/migrate-single-table.py --stage dev [--segments 8] [--dry-run]
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+
+SERVICE = 'portfoliosync-backend'
+
+TABLE_SUFFIXES = {
+    'PORTFOLIOS_TABLE': 'portfolios',
+    'STOCKS_TABLE': 'stocks',
+    'ETFS_TABLE': 'etfs',
+    'PROPERTIES_TABLE': 'properties',
+    'PORTFOLIO_DATA_TABLE': 'portfolio-data',
+}
+
+def configure(stage: str, region: str) -> None:
+    """Table names as serverless.yml derives them, unless already set in the environment"""
+    os.environ.setdefault('REGION', region)
+    for env, suffix in TABLE_SUFFIXES.items():
+        os.environ.setdefault(env, f"{SERVICE}-{stage}-{suffix}")
+
+def migrate(segments: int, dry_run: bool) -> Counter:
+    from dynamodb_client import db_client
+    from portfolio_repository import ENTITY_TABLES, single_table_item
+
+    target = os.environ['PORTFOLIO_DATA_TABLE']
+    copied = Counter()
+    for entity, table_env in ENTITY_TABLES.items():
+        source = os.environ[table_env]
+        started = time.perf_counter()
+        items = db_client.parallel_scan(source, segments)
+
+        converted, skipped = [], 0
+        for item in items:
+            try:
+                converted.append(single_table_item(entity, item))
+            except (KeyError, ValueError) as e:
+                # Orphaned holdings without a portfolioId have no partition to live in
+                skipped += 1
+                print(f"  skipping {entity} item {item.get('id')}: {str(e)}")
+
+        if not dry_run:
+            db_client.batch_put_items(target, converted)
+        copied[entity] = len(converted)
+        print(f"{entity:<11} {source} -> {target}: {len(converted)} copied, {skipped} skipped "
+              f"({time.perf_counter() - started:.1f}s){' [dry run]' if dry_run else ''}")
+    return copied
+
+def verify(segments: int, expected: Counter) -> bool:
+    from dynamodb_client import db_client
+
+    found = Counter(item.get('entityType') for item in db_client.parallel_scan(os.environ['PORTFOLIO_DATA_TABLE'], segments))
+    ok = True
+    for entity, count in expected.items():
+        status = 'ok' if found[entity] >= count else 'MISSING'
+        ok = ok and status == 'ok'
+        print(f"  {entity:<11} expected {count}, found {found[entity]} {status}")
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description='Copy PortfolioSync data into the single-table layout')
+    parser.add_argument('--stage', default='dev', help='Serverless stage whose tables to migrate')
+    parser.add_argument('--region', default='ap-southeast-2', help='AWS region')
+    parser.add_argument('--segments', type=int, default=8, help='Parallel scan segments per table')
+    parser.add_argument('--dry-run', action='store_true', help='Scan and convert without writing')
+
+    args = parser.parse_args()
+
+    configure(args.stage, args.region)
+    sys.path.append(os.path.join(os.path.dirname(__file__), '../backend/shared'))
+
+    copied = migrate(args.segments, args.dry_run)
+    if args.dry_run:
+        return
+
+    print("Verifying target table...")
+    if not verify(args.segments, copied):
+        sys.exit(1)
+    print("Migration complete. Deploy with DATA_LAYOUT=single to switch reads and writes.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+#!/bin/bash
+
+# Upload the provider reference data the scheduled jobs read to a stage's bucket:
+#   ./scripts/upload-reference-data.sh <stage> [source dir, default backend/data]
+# See backend/data/README.md for the files and their formats.
+set -e
+
+STAGE=${1:?Usage: $0 <stage> [source dir]}
+SOURCE=${2:-$(dirname "$0")/../backend/data}
+BUCKET="portfoliosync-backend-${STAGE}-reference-data"
+
+echo "📤 Uploading reference data from ${SOURCE} to s3://${BUCKET}/"
+aws s3 sync "${SOURCE}" "s3://${BUCKET}/" --exclude '*' --include '*.csv'
+echo "✅ Reference data uploaded"